@@ -0,0 +1,87 @@
+"""
+Запуск рабочего процесса, которому нужны 300 позиций справочника:
+загрузка выгрузки JSON Lines целиком против открытия бинарного снимка,
+отображенного в память, с созданием только запрошенных моделей.
+Замеряется на справочниках из 10 000 и 100 000 позиций номенклатуры.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_catalogue_snapshot.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.snapshot_reposity import snapshot_reposity
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+from src.logics.catalogue_jsonl import CatalogueExporter, CatalogueImporter
+from src.logics.catalogue_snapshot import CatalogueSnapshotWriter
+
+SIZES = (10_000, 100_000)
+TOUCHED = 300
+
+
+def build(size: int) -> indexed_reposity:
+    random.seed(size)
+    repo = indexed_reposity()
+    gram = UnitModel("грамм", 1.0)
+    units = [gram, UnitModel("килограмм", 1000.0, gram)]
+    groups = [NomenclatureGroupModel(f"Группа {number}") for number in range(50)]
+    items = [NomenclatureModel(f"Товар {number}", f"Товар {number} полное наименование",
+                               random.choice(groups), random.choice(units), random.uniform(1, 500))
+             for number in range(size)]
+    repo.set_data(reposity.range_key(), units)
+    repo.set_data(reposity.nomenclature_group_key(), groups)
+    repo.set_data(reposity.nomenclature_key(), items)
+    for number in range(size // 10):
+        receipt = ReceiptModel(f"Блюдо {number}", 2, "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, 100, gram) for item in random.sample(items, 6))
+        receipt.extend_steps(CookingStepModel(step, f"Шаг {step}") for step in range(1, 4))
+        repo.add(reposity.receipt_key(), receipt)
+    return repo
+
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main():
+    for size in SIZES:
+        source = build(size)
+        touched = [item.id for item in random.sample(source.models(reposity.nomenclature_key()), TOUCHED)]
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl = os.path.join(directory, "catalogue.jsonl")
+            snapshot = os.path.join(directory, "catalogue.snap")
+            CatalogueExporter(source).export_file(jsonl)
+            CatalogueSnapshotWriter(source).write(snapshot)
+
+            full = timed(lambda: CatalogueImporter(indexed_reposity()).import_file(jsonl))
+            opened = []
+            open_time = timed(lambda: opened.append(snapshot_reposity(snapshot)))
+            repo = opened[0]
+            lookup = timed(lambda: [repo.get_by_id(reposity.nomenclature_key(), model_id) for model_id in touched])
+            created = repo.snapshot.materialized(reposity.nomenclature_key())
+            repo.close()
+
+            print(f"Номенклатуры: {size:,}, рецептов: {size // 10:,}")
+            print(f"  JSON Lines {os.path.getsize(jsonl) / 2**20:6.1f} МБ, загрузка целиком: {full * 1000:10.1f} мс")
+            print(f"  Снимок     {os.path.getsize(snapshot) / 2**20:6.1f} МБ, открытие:          "
+                  f"{open_time * 1000:10.3f} мс")
+            print(f"  {TOUCHED} позиций по id из снимка: {lookup * 1000:8.2f} мс "
+                  f"(создано моделей номенклатуры: {created})")
+
+
+if __name__ == "__main__":
+    main()
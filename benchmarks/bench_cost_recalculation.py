@@ -0,0 +1,77 @@
+"""
+Пересчет себестоимости каталога из 10 000 рецептов после изменения цен:
+полный пересчет против корректировки по обратному индексу.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_cost_recalculation.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.logics.receipt_cost_engine import ReceiptCostEngine
+
+NOMENCLATURE = 2_000
+RECEIPTS = 10_000
+BASES = 500  # Полуфабрикаты, входящие в другие рецепты
+PRICE_CHANGES = 100
+FULL_RECOMPUTES = 5  # Полный пересчет медленный - замеряется на нескольких изменениях
+
+
+def build():
+    random.seed(6)
+    gram = UnitModel("грамм", 1.0)
+    kg = UnitModel("килограмм", 1000.0, gram)
+    items = [NomenclatureModel(f"Товар {number}", unit=kg, price=random.uniform(50, 900))
+             for number in range(NOMENCLATURE)]
+    bases = []
+    for number in range(BASES):
+        base = ReceiptModel(f"Полуфабрикат {number}", random.randint(1, 10), "1 ч")
+        base.extend_ingredients(IngredientModel(item, random.randint(10, 500), gram)
+                                for item in random.sample(items, 6))
+        bases.append(base)
+    receipts = list(bases)
+    for number in range(RECEIPTS - BASES):
+        receipt = ReceiptModel(f"Блюдо {number}", random.randint(1, 4), "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, random.randint(10, 300), gram)
+                                   for item in random.sample(items, 8))
+        receipt.add_ingredient(ReceiptComponentModel(random.choice(bases), 1))
+        receipts.append(receipt)
+    return items, receipts
+
+
+def main():
+    items, receipts = build()
+    engine = ReceiptCostEngine()
+    engine.add_many(receipts)
+    changes = [(random.choice(items), random.uniform(50, 900)) for _ in range(PRICE_CHANGES)]
+
+    started = time.perf_counter()
+    for item, price in changes[:FULL_RECOMPUTES]:
+        item.price = price
+        engine.recompute_all()
+    full = (time.perf_counter() - started) / FULL_RECOMPUTES
+
+    started = time.perf_counter()
+    for item, price in changes:
+        engine.set_price(item, price * 1.1)
+    incremental = (time.perf_counter() - started) / PRICE_CHANGES
+
+    incremental_costs = {receipt: engine.cost(receipt) for receipt in receipts}
+    drift = max(abs(incremental_costs[receipt] - cost) for receipt, cost in engine.recompute_all().items())
+    print(f"Рецептов: {RECEIPTS:,}, номенклатуры: {NOMENCLATURE:,}")
+    print(f"Полный пересчет:        {full * 1000:9.3f} мс на изменение цены")
+    print(f"Пересчет по индексу:    {incremental * 1000:9.3f} мс на изменение цены")
+    print(f"Наибольшее расхождение: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
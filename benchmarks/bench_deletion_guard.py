@@ -0,0 +1,95 @@
+"""
+Проверка возможности удаления номенклатуры: 10 000 рецептов по 8 ингредиентов
+и 200 000 складских движений. Просмотр всех рецептов и движений против
+обратного индекса ссылок, поддерживаемого при записи.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_deletion_guard.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+
+NOMENCLATURE = 20_000
+RECEIPTS = 10_000
+MOVEMENTS = 200_000
+CHECKS = 1_000
+SCAN_CHECKS = 20  # Просмотр медленный - замеряется на части проверок
+
+
+def build():
+    random.seed(13)
+    gram = UnitModel("грамм", 1.0)
+    group = NomenclatureGroupModel("Продукты")
+    items = [NomenclatureModel(f"Товар {number}", group=group, unit=gram) for number in range(NOMENCLATURE)]
+    receipts = []
+    for number in range(RECEIPTS):
+        receipt = ReceiptModel(f"Блюдо {number}", 1, "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, 100, gram) for item in random.sample(items[:10_000], 8))
+        receipts.append(receipt)
+    storages = [StorageModel(f"Склад {number}") for number in range(10)]
+    movements = [StockMovementModel(StockMovementType.RECEIPT, random.choice(items[:15_000]),
+                                    random.choice(storages), 1, gram, datetime(2024, 1, 1))
+                 for _ in range(MOVEMENTS)]
+    return gram, group, items, receipts, movements
+
+
+def scan_in_use(repo, ledger, nomenclature) -> bool:
+    """Проверка без индекса: просмотр всех рецептов и движений"""
+    for receipt in repo.models(reposity.receipt_key()):
+        for item in receipt.ingredients:
+            if item.nomenclature == nomenclature:
+                return True
+    return any(movement.nomenclature == nomenclature for movement in ledger.movements)
+
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main():
+    gram, group, items, receipts, movements = build()
+    repo = indexed_reposity()
+    ledger = StockLedger()
+    repo.add_reference_source(ledger)
+
+    fill = timed(lambda: (repo.set_data(reposity.range_key(), [gram]),
+                          repo.set_data(reposity.nomenclature_group_key(), [group]),
+                          repo.set_data(reposity.nomenclature_key(), items),
+                          [repo.add(reposity.receipt_key(), receipt) for receipt in receipts]))
+    post = timed(lambda: ledger.post_many(movements))
+
+    # Половина проверяемых позиций не используется (номенклатура старше 15 000)
+    checked = random.sample(items[5_000:], CHECKS)
+    indexed = timed(lambda: [repo.is_referenced(item) for item in checked]) / CHECKS
+    scanned = timed(lambda: [scan_in_use(repo, ledger, item) for item in checked[:SCAN_CHECKS]]) / SCAN_CHECKS
+    mismatches = sum(1 for item in checked[:SCAN_CHECKS]
+                     if repo.is_referenced(item) != scan_in_use(repo, ledger, item))
+
+    print(f"Номенклатуры: {NOMENCLATURE:,}, рецептов: {RECEIPTS:,}, движений: {MOVEMENTS:,}")
+    print(f"Заполнение репозитория с индексом ссылок: {fill * 1000:10.1f} мс")
+    print(f"Проведение движений с индексом ссылок:    {post * 1000:10.1f} мс")
+    print(f"Проверка по индексу:   {indexed * 1e6:12.3f} мкс")
+    print(f"Проверка просмотром:   {scanned * 1e6:12.3f} мкс")
+    print(f"Расхождений: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
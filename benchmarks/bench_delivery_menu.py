@@ -0,0 +1,84 @@
+"""
+Меню доставки из 5 000 блюд с упаковкой: первый расчет меню, повторный
+запрос (из кэша) и пересчет после изменения одного рецепта, цены упаковки
+и упаковки блюда.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_delivery_menu.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.logics.delivery_menu import DeliveryMenu
+
+NOMENCLATURE = 1_000
+DISHES = 5_000
+CHANGES = 100
+
+
+def build():
+    random.seed(10)
+    gram = UnitModel("грамм", 1.0)
+    piece = UnitModel("штука", 1.0)
+    items = [NomenclatureModel(f"Товар {number}", unit=gram, price=random.uniform(0.05, 2))
+             for number in range(NOMENCLATURE)]
+    boxes = [NomenclatureModel(f"Упаковка {number}", unit=piece, price=random.uniform(5, 30)) for number in range(5)]
+    dishes = []
+    for number in range(DISHES):
+        dish = ReceiptModel(f"Блюдо {number}", random.randint(1, 4), "30 мин")
+        dish.extend_ingredients(IngredientModel(item, random.randint(10, 300), gram)
+                                for item in random.sample(items, 8))
+        dishes.append(dish)
+    return gram, piece, items, boxes, dishes
+
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main():
+    gram, piece, items, boxes, dishes = build()
+    menu = DeliveryMenu([IngredientModel(boxes[0], 1, piece)])
+
+    def fill():
+        # Каждое десятое блюдо - в своей упаковке
+        for number, dish in enumerate(dishes):
+            menu.add(dish, None if number % 10 else [IngredientModel(random.choice(boxes[1:]), 1, piece)])
+
+    cold = timed(fill)
+    warm = timed(menu.precompute)
+
+    def change_recipes():
+        for dish in random.sample(dishes, CHANGES):
+            dish.add_ingredient(IngredientModel(random.choice(items), 5, gram))
+            menu.cost(dish)
+
+    def change_box_prices():
+        for _ in range(CHANGES):
+            menu.set_price(random.choice(boxes[1:]), random.uniform(5, 30))
+
+    def change_dish_packaging():
+        for dish in random.sample(dishes, CHANGES):
+            menu.add(dish, [IngredientModel(random.choice(boxes), 2, piece)])
+            menu.cost(dish)
+
+    print(f"Блюд: {DISHES:,}, номенклатуры: {NOMENCLATURE:,}")
+    print(f"Сборка и расчет меню:      {cold * 1000:9.3f} мс")
+    print(f"Проверка меню (из кэша):   {warm * 1000:9.3f} мс")
+    print(f"Изменение рецепта:         {timed(change_recipes) / CHANGES * 1000:9.3f} мс на изменение")
+    print(f"Изменение цены упаковки:   {timed(change_box_prices) / CHANGES * 1000:9.3f} мс на изменение")
+    print(f"Замена упаковки блюда:     {timed(change_dish_packaging) / CHANGES * 1000:9.3f} мс на изменение")
+
+
+if __name__ == "__main__":
+    main()
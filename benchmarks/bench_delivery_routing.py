@@ -0,0 +1,82 @@
+"""
+Маршрутизация вечерней очереди заказов: 2 000 ресторанов, 400 районов
+(сетка 20 x 20 км), 50 000 адресов. Индексы маршрутизатора против
+полного перебора ресторанов и районов.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_delivery_routing.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.geometry import polygon_contains
+from src.models.restaurant_model import RestaurantModel, RestaurantServiceType
+from src.models.district_model import DistrictModel
+from src.logics.delivery_router import DeliveryRouter
+
+SIDE = 20  # Районов по стороне города (район - 1 x 1 км)
+RESTAURANTS = 2_000
+ORDERS = 50_000
+BRUTE_FORCE_ORDERS = 2_000  # Полный перебор медленный - замеряется на части очереди
+
+
+def build():
+    random.seed(9)
+    restaurants = [RestaurantModel(f"Ресторан {number}", (random.uniform(0, SIDE), random.uniform(0, SIDE)),
+                                   random.choice(list(RestaurantServiceType)))
+                   for number in range(RESTAURANTS)]
+    districts = []
+    for row in range(SIDE):
+        for column in range(SIDE):
+            # Слегка смещенные вершины, чтобы районы не были прямоугольниками
+            shift = random.uniform(-0.1, 0.1)
+            polygon = [(column, row), (column + 1, row), (column + 1, row + 1),
+                       (column + 0.5, row + 1 + shift), (column, row + 1)]
+            districts.append(DistrictModel(f"Район {row}-{column}", polygon, random.choice([0, 150, 250])))
+    orders = [(random.uniform(0, SIDE), random.uniform(0, SIDE)) for _ in range(ORDERS)]
+    return restaurants, districts, orders
+
+
+def brute_force(restaurants, districts, point):
+    x, y = point
+    district = next((item for item in districts if polygon_contains(item.polygon, x, y)), None)
+    if district is None:
+        return None
+    restaurant = min(restaurants, key=lambda item: (item.location[0] - x) ** 2 + (item.location[1] - y) ** 2)
+    return restaurant, district
+
+
+def main():
+    restaurants, districts, orders = build()
+
+    started = time.perf_counter()
+    router = DeliveryRouter(restaurants, districts)
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    routes = router.route_many(orders)
+    indexed = (time.perf_counter() - started) / ORDERS
+
+    delivering = [item for item in restaurants if item.delivers]
+    sample = orders[:BRUTE_FORCE_ORDERS]
+    started = time.perf_counter()
+    expected = [brute_force(delivering, districts, point) for point in sample]
+    brute = (time.perf_counter() - started) / BRUTE_FORCE_ORDERS
+
+    actual = [(route.restaurant, route.district) if route is not None else None
+              for route in routes[:BRUTE_FORCE_ORDERS]]
+    mismatches = sum(1 for pair, reference in zip(actual, expected) if pair != reference)
+    print(f"Ресторанов: {RESTAURANTS:,} (на доставку: {len(delivering):,}), районов: {len(districts):,}, "
+          f"заказов: {ORDERS:,}")
+    print(f"Построение индексов:  {build_time * 1000:9.3f} мс")
+    print(f"Индексы:              {indexed * 1e6:9.3f} мкс на заказ")
+    print(f"Полный перебор:       {brute * 1e6:9.3f} мкс на заказ")
+    print(f"Расхождений с перебором: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Журнал изменений справочников: 20 000 номенклатуры, 2 000 рецептов и
+200 000 изменений цен. Восстановление по всей истории против снимка
+с журналом последних изменений, а также запись событий с fsync каждого
+события против пакетной фиксации.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_event_log.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.logics.event_log import EventLog
+
+NOMENCLATURE = 20_000
+RECEIPTS = 2_000
+UPDATES = 200_000
+DELTA = 1_000
+SYNC_EVENTS = 500  # Запись с fsync каждого события медленная - замеряется на части событий
+
+
+def fill(repo):
+    random.seed(17)
+    gram = repo.add(reposity.range_key(), UnitModel("грамм", 1.0))
+    group = repo.add(reposity.nomenclature_group_key(), NomenclatureGroupModel("Продукты"))
+    items = [repo.add(reposity.nomenclature_key(), NomenclatureModel(f"Товар {number}", group=group, unit=gram))
+             for number in range(NOMENCLATURE)]
+    for number in range(RECEIPTS):
+        receipt = ReceiptModel(f"Блюдо {number}", 1, "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, 100, gram) for item in random.sample(items, 8))
+        repo.add(reposity.receipt_key(), receipt)
+    return items
+
+
+def change_prices(repo, items, count: int):
+    for _ in range(count):
+        item = random.choice(items)
+        item.price = round(random.uniform(1, 1000), 2)
+        repo.update(reposity.nomenclature_key(), item)
+
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def replay(directory: str) -> float:
+    return timed(lambda: EventLog(directory).replay(indexed_reposity()))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        history = os.path.join(directory, "history")
+        repo = indexed_reposity()
+        log = EventLog(history, batch_size=1000, compact_every=None)
+        log.attach(repo)
+        items = fill(repo)
+        logging = timed(lambda: change_prices(repo, items, UPDATES))
+        log.close()
+        full_size = os.path.getsize(log.log_path)
+        full = replay(history)
+
+        log = EventLog(history, batch_size=1000, compact_every=None)
+        repo = indexed_reposity()
+        log.attach(repo)
+        compaction = timed(log.compact)
+        items = repo.models(reposity.nomenclature_key())
+        change_prices(repo, items, DELTA)
+        log.close()
+        delta = replay(history)
+        snapshot_size = os.path.getsize(log.snapshot_path)
+
+        synced = {}
+        for batch_size in (1, 100):
+            repo = indexed_reposity()
+            log = EventLog(os.path.join(directory, f"sync_{batch_size}"), batch_size=batch_size,
+                           flush_interval=60, compact_every=None)
+            log.attach(repo)
+            items = fill(repo)
+            log.flush()
+            synced[batch_size] = timed(lambda: (change_prices(repo, items, SYNC_EVENTS), log.flush())) / SYNC_EVENTS
+            log.close()
+
+    print(f"Номенклатуры: {NOMENCLATURE:,}, рецептов: {RECEIPTS:,}, изменений цен: {UPDATES:,}")
+    print(f"Запись изменений (пакеты по 1000):           {logging:10.2f} с")
+    print(f"Журнал всей истории: {full_size / 2**20:8.1f} МБ, восстановление {full:8.2f} с")
+    print(f"Сжатие в снимок:                             {compaction:10.2f} с")
+    print(f"Снимок {snapshot_size / 2**20:.1f} МБ + {DELTA:,} событий: восстановление {delta:8.2f} с")
+    print(f"Событие с fsync каждого события:  {synced[1] * 1e6:10.1f} мкс")
+    print(f"Событие с фиксацией по 100:       {synced[100] * 1e6:10.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
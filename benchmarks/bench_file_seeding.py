@@ -0,0 +1,65 @@
+"""
+Заполнение репозитория из нескольких тысяч файлов технологических карт:
+разбор в одном процессе против пула процессов.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_file_seeding.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.start_service import DefaultDataCreator
+from src.file_data_creator import FileDataCreator
+
+CARDS = 3_000
+NOMENCLATURE = 400
+
+
+def write_cards(directory: str):
+    random.seed(4)
+    units = ["грамм", "штука", "миллилитр", "столовая ложка"]
+    for number in range(CARDS):
+        card = {
+            "name": f"Блюдо {number}",
+            "portions": random.randint(1, 6),
+            "cooking_time": "30 мин",
+            "ingredients": [{"nomenclature": f"Товар {random.randrange(NOMENCLATURE)}",
+                             "quantity": random.randint(1, 500), "unit": random.choice(units)}
+                            for _ in range(10)],
+            "steps": [f"Шаг {step} приготовления блюда {number}" for step in range(1, 9)],
+        }
+        with open(os.path.join(directory, f"card_{number:05}.json"), "w", encoding="utf-8") as file:
+            json.dump(card, file, ensure_ascii=False)
+
+
+def seed(directory: str, workers: int) -> float:
+    repo = indexed_reposity()
+    started = time.perf_counter()
+    FileDataCreator(directory, workers=workers, reference_creator=DefaultDataCreator()).create_data(repo)
+    elapsed = time.perf_counter() - started
+    assert len(repo.models(reposity.receipt_key())) == CARDS
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        write_cards(directory)
+        single = seed(directory, 1)
+        workers = os.cpu_count() or 1
+        pooled = seed(directory, workers)
+
+    print(f"Технологических карт: {CARDS:,}, ядер: {workers}")
+    print(f"Один процесс:        {single:6.2f} с")
+    print(f"Пул из {workers} процессов:  {pooled:6.2f} с")
+
+
+if __name__ == "__main__":
+    main()
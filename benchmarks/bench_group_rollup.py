@@ -0,0 +1,103 @@
+"""
+Итоги по группам номенклатуры: справочник из 100 000 позиций в иерархии
+10 x 10 x 10 групп, остатки на 5 складах. Запрос итога группы сканированием
+остатков против итогов, накопленных по таблице замыкания.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_group_rollup.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+from src.logics.group_rollup import GroupRollup, RollupMeasure
+
+ITEMS = 100_000
+BRANCHING = 10
+STORAGES = 5
+WRITE_OFFS = 20_000
+QUERIES = 1_000
+SCAN_QUERIES = 20  # Сканирование медленное - замеряется на части запросов
+
+
+def build():
+    random.seed(12)
+    gram = UnitModel("грамм", 1.0)
+    kg = UnitModel("килограмм", 1000.0, gram)
+    groups = []
+    for top in range(BRANCHING):
+        parent = NomenclatureGroupModel(f"Группа {top}")
+        groups.append(parent)
+        for middle in range(BRANCHING):
+            child = NomenclatureGroupModel(f"Группа {top}.{middle}", parent)
+            groups.append(child)
+            groups.extend(NomenclatureGroupModel(f"Группа {top}.{middle}.{leaf}", child) for leaf in range(BRANCHING))
+    leaves = [group for group in groups if group.name.count(".") == 2]
+    items = [NomenclatureModel(f"Товар {number}", group=random.choice(leaves), unit=kg,
+                               price=random.uniform(50, 900)) for number in range(ITEMS)]
+    storages = [StorageModel(f"Склад {number}") for number in range(STORAGES)]
+    ledger = StockLedger()
+    ledger.post_many([StockMovementModel(StockMovementType.RECEIPT, item, random.choice(storages),
+                                         random.randint(10, 100), kg, datetime(2024, 1, 1)) for item in items])
+    write_offs = [StockMovementModel(StockMovementType.WRITE_OFF, item, random.choice(storages), 1, kg,
+                                     datetime(2024, 1, 2)) for item in random.sample(items, WRITE_OFFS)]
+    return gram, groups, ledger, write_offs
+
+
+def scan_total(ledger: StockLedger, group: NomenclatureGroupModel, unit: UnitModel) -> float:
+    """Итог группы без сводки: обход всех остатков"""
+    return sum(quantity for (_, nomenclature, root), quantity in ledger.balances().items()
+               if root is unit and group in nomenclature.group.ancestors)
+
+
+def main():
+    gram, groups, ledger, write_offs = build()
+
+    started = time.perf_counter()
+    rollup = GroupRollup(ledger)
+    load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ledger.post_many(write_offs)
+    posted_with = time.perf_counter() - started
+
+    queried = random.choices(groups, k=QUERIES)
+    started = time.perf_counter()
+    totals = [rollup.total(group, RollupMeasure.BALANCE, unit=gram) for group in queried]
+    indexed = (time.perf_counter() - started) / QUERIES
+
+    started = time.perf_counter()
+    expected = [scan_total(ledger, group, gram) for group in queried[:SCAN_QUERIES]]
+    scanned = (time.perf_counter() - started) / SCAN_QUERIES
+    drift = max(abs(total - value) for total, value in zip(totals, expected))
+
+    started = time.perf_counter()
+    groups[1].parent = groups[BRANCHING * BRANCHING + BRANCHING + 1]
+    rollup.total(groups[0], RollupMeasure.BALANCE, unit=gram)
+    moved = time.perf_counter() - started
+    started = time.perf_counter()
+    rollup.refresh()
+    rebuild = time.perf_counter() - started
+
+    print(f"Позиций: {ITEMS:,}, групп: {len(groups):,}, складов: {STORAGES}")
+    print(f"Загрузка сводки из журнала:   {load * 1000:10.1f} мс")
+    print(f"Проведение {WRITE_OFFS:,} списаний со сводкой: {posted_with * 1000:10.1f} мс")
+    print(f"Итог группы по сводке:        {indexed * 1e6:10.3f} мкс")
+    print(f"Итог группы сканированием:    {scanned * 1e6:10.3f} мкс")
+    print(f"Наибольшее расхождение:       {drift:.2e}")
+    print(f"Учет переноса группы:         {moved * 1000:10.3f} мс")
+    print(f"Полная пересборка итогов:     {rebuild * 1000:10.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
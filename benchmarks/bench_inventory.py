@@ -0,0 +1,76 @@
+"""
+Плановая инвентаризация 10 складов по 20 000 позиций (200 000 строк пересчета,
+около 5 % позиций с расхождением) и частичная инвентаризация одной группы.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_inventory.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+from src.logics.inventory_service import InventoryService
+
+STORAGES = 10
+ITEMS = 20_000
+GROUPS = 20
+MISMATCH_SHARE = 0.05
+
+
+def build():
+    random.seed(11)
+    gram = UnitModel("грамм", 1.0)
+    kg = UnitModel("килограмм", 1000.0, gram)
+    groups = [NomenclatureGroupModel(f"Группа {number}") for number in range(GROUPS)]
+    items = [NomenclatureModel(f"Товар {number}", group=groups[number % GROUPS], unit=kg) for number in range(ITEMS)]
+    storages = [StorageModel(f"Склад {number}") for number in range(STORAGES)]
+    ledger = StockLedger()
+    period = datetime(2024, 1, 1)
+    ledger.post_many([StockMovementModel(StockMovementType.RECEIPT, item, storage, random.randint(1, 100), kg, period)
+                      for storage in storages for item in items])
+    counts = []
+    for storage in storages:
+        for item in items:
+            quantity = ledger.balance(item, storage)
+            if random.random() < MISMATCH_SHARE:
+                quantity = max(0.0, quantity + random.choice([-1.5, -0.5, 0.5, 2.0]))
+            counts.append((storage, item, quantity))
+    return groups, storages, ledger, counts
+
+
+def main():
+    groups, storages, ledger, counts = build()
+    service = InventoryService(ledger)
+    period = datetime(2024, 1, 31)
+
+    started = time.perf_counter()
+    discrepancies = service.reconcile(counts, period)
+    reconciled = time.perf_counter() - started
+
+    started = time.perf_counter()
+    service.post(discrepancies, period)
+    posted = time.perf_counter() - started
+
+    partial = [row for row in counts if row[0] is storages[0] and row[1].group is groups[0]]
+    started = time.perf_counter()
+    service.conduct(partial, datetime(2024, 2, 10), storages=[storages[0]], groups=[groups[0]])
+    partial_time = time.perf_counter() - started
+
+    print(f"Складов: {STORAGES}, позиций на складе: {ITEMS:,}, строк пересчета: {len(counts):,}")
+    print(f"Сверка с учетными остатками:   {reconciled * 1000:9.1f} мс")
+    print(f"Проведение {len(discrepancies):,} корректировок: {posted * 1000:9.1f} мс")
+    print(f"Частичная (группа, склад, {len(partial):,} строк): {partial_time * 1000:9.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
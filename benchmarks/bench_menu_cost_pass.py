@@ -0,0 +1,74 @@
+"""
+Расчет себестоимости всего меню: обход состава рецептов через
+представления только для чтения против копирования списков при каждом обращении.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_menu_cost_pass.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+NOMENCLATURE = 500
+RECEIPTS = 2_000
+PASSES = 20
+
+
+def build():
+    random.seed(3)
+    gram = UnitModel("грамм", 1.0)
+    items = [NomenclatureModel(f"Товар {number}", unit=gram) for number in range(NOMENCLATURE)]
+    prices = {item: random.uniform(0.01, 2.0) for item in items}
+    receipts = []
+    for number in range(RECEIPTS):
+        receipt = ReceiptModel(f"Блюдо {number}", random.randint(1, 4), "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, random.randint(10, 300), gram)
+                                   for item in random.sample(items, 12))
+        receipt.extend_steps(CookingStepModel(step, f"Шаг {step}") for step in range(1, 7))
+        receipts.append(receipt)
+    return receipts, prices
+
+
+def cost_pass(receipts, prices, ingredients, steps) -> float:
+    """Проход по меню, как при выводе карточек: себестоимость порции, число позиций и шагов"""
+    total = 0.0
+    for receipt in receipts:
+        cost = 0.0
+        for index in range(len(ingredients(receipt))):
+            ingredient = ingredients(receipt)[index]
+            cost += ingredient.quantity * prices[ingredient.nomenclature]
+        total += cost / receipt.portions + len(steps(receipt))
+    return total
+
+
+def measure(receipts, prices, ingredients, steps) -> float:
+    started = time.perf_counter()
+    for _ in range(PASSES):
+        cost_pass(receipts, prices, ingredients, steps)
+    return (time.perf_counter() - started) / PASSES
+
+
+def main():
+    receipts, prices = build()
+    # Прежнее поведение свойств: копия списка при каждом обращении
+    copied = measure(receipts, prices, lambda receipt: list(receipt.ingredients),
+                     lambda receipt: list(receipt.cooking_steps))
+    viewed = measure(receipts, prices, lambda receipt: receipt.ingredients,
+                     lambda receipt: receipt.cooking_steps)
+
+    print(f"Рецептов в меню: {len(receipts):,}")
+    print(f"Копирование списков:  {copied * 1000:7.2f} мс на проход")
+    print(f"Представления:        {viewed * 1000:7.2f} мс на проход")
+
+
+if __name__ == "__main__":
+    main()
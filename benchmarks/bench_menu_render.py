@@ -0,0 +1,65 @@
+"""
+Вывод карт меню всех ресторанов в Markdown после изменения одного рецепта:
+шаблоны компилируются один раз, неизмененные карты берутся из кэша.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_menu_render.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+from src.logics.recipe_card_markdown import RecipeCardRenderer
+
+RESTAURANTS = 20
+RECEIPTS = 2_000
+MENU = 300
+
+
+def build():
+    random.seed(5)
+    units = [UnitModel(name, 1.0) for name in ("грамм", "штука", "миллилитр", "столовая ложка")]
+    items = [NomenclatureModel(f"Товар {number}") for number in range(500)]
+    receipts = []
+    for number in range(RECEIPTS):
+        receipt = ReceiptModel(f"Блюдо {number}", random.randint(1, 6), "30 мин")
+        receipt.extend_ingredients(IngredientModel(item, random.randint(1, 500), random.choice(units))
+                                   for item in random.sample(items, 10))
+        receipt.extend_steps(CookingStepModel(step, f"Этап {step}\nОписание шага {step}") for step in range(1, 9))
+        receipts.append(receipt)
+    menus = [random.sample(receipts, MENU) for _ in range(RESTAURANTS)]
+    return receipts, menus
+
+
+def render_all(renderer, menus) -> float:
+    started = time.perf_counter()
+    for menu in menus:
+        renderer.render_menu(menu)
+    return time.perf_counter() - started
+
+
+def main():
+    receipts, menus = build()
+    renderer = RecipeCardRenderer()
+    cold = render_all(renderer, menus)
+    receipts[0].portions += 1
+    warm = render_all(renderer, menus)
+    renderer.invalidate()
+    uncached = render_all(renderer, menus)
+
+    print(f"Ресторанов: {RESTAURANTS}, карт в меню: {MENU}, рецептов: {RECEIPTS:,}")
+    print(f"Первый вывод:                    {cold * 1000:8.1f} мс")
+    print(f"Повторный вывод после изменения: {warm * 1000:8.1f} мс")
+    print(f"Вывод без кэша карт:             {uncached * 1000:8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
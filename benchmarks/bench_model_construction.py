@@ -0,0 +1,58 @@
+"""
+Скорость создания моделей: конструктор с валидацией и загрузка доверенных строк.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_model_construction.py
+"""
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.company_model import CompanyModel
+
+COUNT = 100_000
+
+
+def rate(function) -> float:
+    """Количество объектов в секунду"""
+    started = time.perf_counter()
+    function()
+    return COUNT / (time.perf_counter() - started)
+
+
+def main():
+    gram = UnitModel("грамм", 1.0)
+    group = NomenclatureGroupModel("Овощи")
+    rows = [{"id": str(uuid.uuid4()), "name": f"Товар {number}", "full_name": f"Товар {number} полное",
+             "group": group, "unit": gram} for number in range(COUNT)]
+
+    def construct():
+        for row in rows:
+            model = NomenclatureModel(row["name"], row["full_name"], row["group"], row["unit"])
+            model.id = row["id"]
+
+    def construct_company():
+        for _ in range(COUNT):
+            company = CompanyModel("Ромашка")
+            company.inn = "123456789012"
+            company.account = "12345678901"
+            company.BIK = "123456789"
+
+    print(f"NomenclatureModel(...)                  {rate(construct):12,.0f} объектов/с")
+    print(f"CompanyModel + реквизиты                {rate(construct_company):12,.0f} объектов/с")
+    if hasattr(NomenclatureModel, "from_trusted_row"):
+        def trusted():
+            for row in rows:
+                NomenclatureModel.from_trusted_row(row)
+
+        print(f"NomenclatureModel.from_trusted_row(...) {rate(trusted):12,.0f} объектов/с")
+
+
+if __name__ == "__main__":
+    main()
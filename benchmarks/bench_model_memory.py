@@ -0,0 +1,54 @@
+"""
+Замер памяти, занимаемой одним объектом модели.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_model_memory.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.company_model import CompanyModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+COUNT = 20_000
+
+
+def measure(factory) -> float:
+    """Средний прирост памяти (байт) на один объект"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(number) for number in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / COUNT
+
+
+def main():
+    gram = UnitModel("грамм", 1.0)
+    group = NomenclatureGroupModel("Овощи")
+    carrot = NomenclatureModel("Морковь", "Морковь столовая", group, gram)
+
+    cases = {
+        "UnitModel": lambda number: UnitModel("грамм", 1.0, gram),
+        "NomenclatureGroupModel": lambda number: NomenclatureGroupModel("Овощи"),
+        "NomenclatureModel": lambda number: NomenclatureModel("Морковь", "Морковь столовая", group, gram),
+        "ReceiptModel": lambda number: ReceiptModel("Салат", 2, "15 мин"),
+        "CompanyModel": lambda number: CompanyModel("Ромашка"),
+        "IngredientModel": lambda number: IngredientModel(carrot, 2, gram),
+        "CookingStepModel": lambda number: CookingStepModel(1, "Нарезать"),
+    }
+    for name, factory in cases.items():
+        print(f"{name:<24} {measure(factory):8.1f} байт/объект")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Проведение производства за день по 10 ресторанам: пакетное списание
+против поштучной проверки и списания каждого ингредиента.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_production_posting.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.production_order_model import ProductionOrderModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+from src.logics.receipt_calculator import ReceiptCalculator
+from src.logics.production_service import ProductionService, WriteOffMode
+
+RESTAURANTS = 10
+NOMENCLATURE = 300
+RECEIPTS = 80
+ORDERS_PER_RESTAURANT = 1_500
+
+
+def build():
+    random.seed(2)
+    gram = UnitModel("грамм", 1.0)
+    kg = UnitModel("килограмм", 1000.0, gram)
+    items = [NomenclatureModel(f"Товар {number}", unit=kg) for number in range(NOMENCLATURE)]
+    receipts = []
+    for number in range(RECEIPTS):
+        receipt = ReceiptModel(f"Блюдо {number}", random.randint(1, 4), "30 мин")
+        for item in random.sample(items, 8):
+            receipt.add_ingredient(IngredientModel(item, random.randint(10, 300), gram))
+        receipts.append(receipt)
+    storages = [StorageModel(f"Ресторан {number}") for number in range(RESTAURANTS)]
+
+    day = datetime(2024, 3, 1, 10)
+    orders = [ProductionOrderModel(random.choice(receipts), random.randint(1, 6), storage,
+                                   day + timedelta(minutes=random.randrange(720)))
+              for storage in storages for _ in range(ORDERS_PER_RESTAURANT)]
+
+    ledger = StockLedger()
+    ledger.post_many([StockMovementModel(StockMovementType.RECEIPT, item, storage, 10_000, kg, datetime(2024, 2, 1))
+                      for item in items for storage in storages])
+    return ledger, orders
+
+
+def main():
+    ledger, orders = build()
+    started = time.perf_counter()
+    ProductionService(ledger).post(orders, WriteOffMode.BLOCKING)
+    batched = time.perf_counter() - started
+
+    # Поштучно: на каждый ингредиент каждого заказа - чтение остатка, проверка и проведение
+    ledger, orders = build()
+    calculator = ReceiptCalculator(ledger.converter)
+    started = time.perf_counter()
+    for order in orders:
+        for (item, unit), quantity in calculator.expand(order.receipt, order.portions).items():
+            if ledger.balance(item, order.storage, unit) < quantity:
+                raise RuntimeError("Недостаточно остатков")
+            ledger.post(StockMovementModel(StockMovementType.WRITE_OFF, item, order.storage, quantity, unit,
+                                           order.period))
+    one_by_one = time.perf_counter() - started
+
+    print(f"Заказов за день: {len(orders):,}")
+    print(f"Поштучное списание: {one_by_one:7.2f} с ({len(orders) / one_by_one:10,.0f} заказов/с)")
+    print(f"Пакетное списание:  {batched:7.2f} с ({len(orders) / batched:10,.0f} заказов/с)")
+
+
+if __name__ == "__main__":
+    main()
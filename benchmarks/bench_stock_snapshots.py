@@ -0,0 +1,77 @@
+"""
+Остатки на дату по году синтетических движений: пересчет с начала учета
+против ежемесячных снимков.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_stock_snapshots.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+
+STORAGES = 10
+NOMENCLATURE = 500
+MOVEMENTS = 200_000
+QUERIES = 2_000
+
+
+def main():
+    random.seed(1)
+    gram = UnitModel("грамм", 1.0)
+    storages = [StorageModel(f"Склад {number}") for number in range(STORAGES)]
+    items = [NomenclatureModel(f"Товар {number}", unit=gram) for number in range(NOMENCLATURE)]
+    start = datetime(2024, 1, 1)
+    seconds = 366 * 24 * 3600
+
+    movements = []
+    for _ in range(MOVEMENTS):
+        movement_type = StockMovementType.RECEIPT if random.random() < 0.6 else StockMovementType.WRITE_OFF
+        movements.append(StockMovementModel(
+            movement_type, random.choice(items), random.choice(storages), random.randint(1, 100), gram,
+            start + timedelta(seconds=random.randrange(seconds))))
+    movements.sort(key=lambda movement: movement.period)
+
+    ledger = StockLedger()
+    started = time.perf_counter()
+    ledger.post_many(movements)
+    posting = time.perf_counter() - started
+
+    queries = [(random.choice(items), random.choice(storages),
+                start + timedelta(seconds=random.randrange(seconds))) for _ in range(QUERIES)]
+
+    # Без снимков: остаток на дату суммирует все движения с начала учета
+    started = time.perf_counter()
+    for item, storage, period in queries[:50]:
+        total = 0.0
+        for movement in ledger.movements_between(None, period):
+            if movement.nomenclature is item and movement.storage is storage:
+                total += movement.quantity if movement.movement_type == StockMovementType.RECEIPT else -movement.quantity
+    full_scan = (time.perf_counter() - started) / 50
+
+    started = time.perf_counter()
+    closed = ledger.close_months(datetime(2025, 1, 1))
+    closing = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for item, storage, period in queries:
+        ledger.balance_at(item, storage, period)
+    with_snapshots = (time.perf_counter() - started) / QUERIES
+
+    print(f"Проведение {MOVEMENTS:,} движений:        {posting:8.2f} с")
+    print(f"Закрытие {len(closed)} месяцев (снимки):       {closing:8.2f} с")
+    print(f"Остаток на дату, полный пересчет: {full_scan * 1000:10.3f} мс/запрос")
+    print(f"Остаток на дату, снимок + дельта: {with_snapshots * 1000:10.3f} мс/запрос")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Потокобезопасный репозиторий данных
+"""
+import threading
+from contextlib import contextmanager, ExitStack
+from src.indexed_reposity import indexed_reposity
+from src.core.rw_lock import ReadWriteLock
+from src.core.validator import OperationException
+
+
+class concurrent_reposity(indexed_reposity):
+    """
+    Индексированный репозиторий для многопоточного доступа.
+
+    Каждая коллекция защищена своей блокировкой чтения/записи: чтение
+    разных и одной коллекции идет параллельно, изменения коллекции
+    исключительны. batch() захватывает запись во всех коллекциях сразу,
+    поэтому читатели не видят частично заполненных данных.
+
+    Модели общие для всех потоков (один экземпляр на id), поэтому update
+    с expected_version реализует оптимистичную блокировку через функцию
+    изменения: она применяется к хранящейся модели под блокировкой записи
+    и только если версия записи (row_version) не изменилась с момента
+    чтения - отклоненное изменение не успевает подействовать.
+
+    data возвращает согласованную копию коллекций, снятую под блокировками
+    чтения всех коллекций. Проверка ссылок (is_referenced, referrers) читает
+    обратные индексы всех коллекций под блокировками чтения, а коллекцию
+    рецептов блокирует на запись: перед проверкой в ее индексе ссылок
+    перерегистрируются рецепты, измененные на месте.
+    """
+
+    __locks: dict = None  # Ключ коллекции -> блокировка чтения/записи
+    __locks_guard: threading.Lock = None  # Защита словаря блокировок
+
+    def __init__(self):
+        self.__locks = {}
+        self.__locks_guard = threading.Lock()
+        super().__init__()
+
+    def lock(self, key: str) -> ReadWriteLock:
+        """Блокировка коллекции (создается при первом обращении)"""
+        lock = self.__locks.get(key)
+        if lock is None:
+            with self.__locks_guard:
+                lock = self.__locks.setdefault(key, ReadWriteLock())
+        return lock
+
+    @contextmanager
+    def batch(self, keys: list = None):
+        """
+        Исключительный доступ к нескольким коллекциям на время блока with.
+
+        Блокировки берутся в порядке сортировки ключей, чтобы параллельные
+        пакеты не блокировали друг друга взаимно.
+
+        Args:
+            keys (list): Ключи коллекций (по умолчанию - все стандартные и существующие)
+        """
+        with ExitStack() as stack:
+            for key in sorted(self.__keys() if keys is None else keys):
+                stack.enter_context(self.lock(key).write())
+            yield self
+
+    @property
+    def data(self):
+        """Согласованная копия всех коллекций (записи рецептов - те же объекты)"""
+        with ExitStack() as stack:
+            for key in sorted(self.__keys()):
+                stack.enter_context(self.lock(key).read())
+            return {key: dict(collection) if isinstance(collection, dict) else list(collection)
+                    for key, collection in super().data.items()}
+
+    @data.setter
+    def data(self, value: dict):
+        """Замена всех данных репозитория под блокировкой всех коллекций"""
+        with self.batch(set(super().data.keys()) | set(value.keys())):
+            indexed_reposity.data.fset(self, value)
+
+    def set_data(self, key: str, value):
+        with self.lock(key).write():
+            super().set_data(key, value)
+
+    def snapshot(self, key: str) -> list:
+        """Согласованная копия моделей коллекции для обхода без блокировки"""
+        with self.lock(key).read():
+            return super().models(key)
+
+    def models(self, key: str) -> list:
+        with self.lock(key).read():
+            return super().models(key)
+
+    def get_by_id(self, key: str, model_id: str):
+        with self.lock(key).read():
+            return super().get_by_id(key, model_id)
+
+    def find_by_name(self, key: str, name: str):
+        with self.lock(key).read():
+            return super().find_by_name(key, name)
+
+    def find_all_by_name(self, key: str, name: str) -> list:
+        with self.lock(key).read():
+            return super().find_all_by_name(key, name)
+
+    def find_nomenclature_by_group(self, group) -> list:
+        with self.lock(self.nomenclature_key()).read():
+            return super().find_nomenclature_by_group(group)
+
+    def find_units_by_base_unit(self, base_unit) -> list:
+        with self.lock(self.range_key()).read():
+            return super().find_units_by_base_unit(base_unit)
+
+    def add(self, key: str, model):
+        with self.lock(key).write():
+            return super().add(key, model)
+
+    def get_or_add(self, key: str, name: str, factory):
+        """Поиск по наименованию и добавление выполняются атомарно"""
+        with self.lock(key).write():
+            return super().get_or_add(key, name, factory)
+
+    def update(self, key: str, model, expected_version: int = None, change=None):
+        """
+        Фиксация изменений модели с увеличением ее версии записи.
+
+        Args:
+            model: Хранящаяся модель (с change - любая модель с ее id)
+            expected_version (int): Версия записи, прочитанная до изменения
+                                    (None - без проверки)
+            change: Функция "модель -> None", изменяющая хранящуюся модель; вызывается
+                    под блокировкой записи после проверки версии (None - изменения
+                    уже внесены в хранящуюся модель)
+
+        Returns:
+            Хранящийся в репозитории экземпляр
+
+        Raises:
+            OperationException: Если модели нет в коллекции, ее версия изменилась
+                                или без change передан не хранящийся экземпляр
+        """
+        with self.lock(key).write():
+            stored = super().get_by_id(key, model.id)
+            if stored is None:
+                raise OperationException(f"Модель '{model.name}' отсутствует в коллекции {key}")
+            version = stored.row_version
+            if expected_version is not None and version != expected_version:
+                raise OperationException(
+                    f"Модель '{model.name}' изменена другим потоком: "
+                    f"версия {version}, ожидалась {expected_version}")
+            if change is not None:
+                change(stored)
+            elif model is not stored:
+                raise OperationException(
+                    f"Модель '{model.name}' не является хранящимся экземпляром: изменения передаются через change")
+            super().update(key, stored)
+            stored.row_version = version + 1
+            return stored
+
+    def remove(self, key: str, model) -> bool:
+        # Проверка ссылок читает индексы всех коллекций: блокируются все, в порядке сортировки ключей
+        with self.batch():
+            return super().remove(key, model)
+
+    def is_referenced(self, model) -> bool:
+        with self.__reference_locks():
+            return super().is_referenced(model)
+
+    def referrers(self, model, limit: int = None) -> list:
+        with self.__reference_locks():
+            return super().referrers(model, limit)
+
+    @contextmanager
+    def __reference_locks(self):
+        """Блокировки проверки ссылок: чтение всех коллекций, запись - коллекции рецептов"""
+        with ExitStack() as stack:
+            for key in sorted(self.__keys()):
+                lock = self.lock(key)
+                stack.enter_context(lock.write() if key == self.receipt_key() else lock.read())
+            yield
+
+    def __keys(self) -> set:
+        """Ключи стандартных и всех существующих коллекций"""
+        return set(super().data.keys()) | {self.range_key(), self.nomenclature_group_key(),
+                                           self.nomenclature_key(), self.receipt_key()}
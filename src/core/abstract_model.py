@@ -1,27 +1,66 @@
 from abc import ABC
 import uuid
 from src.core.validator import ArgumentException, Validator
+from src.core.trusted_loader import TrustedLoaders
 
 # Абстрактная базовая модель для всех сущностей
 class AbstractModel(ABC):
-    __id: str = ""  # Уникальный идентификатор
-    __name: str = ""  # Название модели
+    # Состояние хранится в слотах: без __dict__ на каждый экземпляр
+    __slots__ = ("__id", "__name", "__row_version")
+
+    # Правила проверки полей (функции проверки собираются один раз)
+    __checks = Validator.compile_schema({
+        "id": dict(expected_type=str, min_length=1),
+        "name": dict(expected_type=str, max_length=50, min_length=1),
+    })
+
+    # Значения по умолчанию и преобразования для from_trusted_row
+    _trusted_defaults = {"id": lambda: uuid.uuid4().int, "name": "", "row_version": 0}
+    _trusted_converters = {"id": lambda value: AbstractModel.id_key_of(value)}
 
     def __init__(self, name: str = ""):
         super().__init__()
-        self.__id = str(uuid.uuid4())  # Генерация UUID
+        self.__id = uuid.uuid4().int  # Генерация UUID (хранится как 128-битное число)
+        self.__row_version = 0  # Версия записи для оптимистичной блокировки
         self.name = name  # Установка имени через сеттер
 
+    @staticmethod
+    def _compact_id(value: str):
+        # UUID в канонической записи хранится числом, прочие идентификаторы - строкой
+        if len(value) == 36 and value[8] == value[13] == value[18] == value[23] == "-":
+            digits = value.replace("-", "")
+            try:
+                compact = int(digits, 16)
+            except ValueError:
+                return value
+            # Обратное преобразование должно дать ту же строку (регистр, отсутствие знаков и т.п.)
+            if "%032x" % compact == digits:
+                return compact
+        return value
+
     @property
     def id(self) -> str:
         # Геттер для идентификатора
-        return self.__id
+        value = self.__id
+        if isinstance(value, int):
+            digits = "%032x" % value
+            return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+        return value
 
     @id.setter
     def id(self, value: str):
         # Сеттер для идентификатора с валидацией
-        Validator.validate_argument(value, str, "id", min_length=1)
-        self.__id = value.strip()
+        self.__id = AbstractModel._compact_id(self.__checks["id"](value).strip())
+
+    @property
+    def id_key(self):
+        # Идентификатор в форме хранения (число для UUID) - ключ индексов без форматирования строки
+        return self.__id
+
+    @staticmethod
+    def id_key_of(value):
+        # Ключ индексов для идентификатора, переданного строкой
+        return AbstractModel._compact_id(value) if isinstance(value, str) else value
 
     @property
     def name(self) -> str:
@@ -31,15 +70,38 @@ class AbstractModel(ABC):
     @name.setter
     def name(self, value: str):
         # Сеттер для названия с валидацией
-        Validator.validate_argument(value, str, "name", max_length=50, min_length=1)
-        self.__name = value.strip()
+        self.__name = self.__checks["name"](value).strip()
+
+    @property
+    def row_version(self) -> int:
+        # Версия записи: увеличивается репозиторием при каждом сохранении изменений
+        return self.__row_version
+
+    @row_version.setter
+    def row_version(self, value: int):
+        # Сеттер для версии записи с валидацией
+        Validator.validate_argument(value, int, "row_version")
+        if value < 0:
+            raise ArgumentException("Версия записи не может быть отрицательной")
+        self.__row_version = value
+
+    @classmethod
+    def from_trusted_row(cls, row: dict):
+        # Создание модели из заведомо корректных данных (база, файл импорта) без повторной валидации.
+        # Ключи row - имена полей (id, name, ...), отсутствующие поля получают значения по умолчанию
+        return TrustedLoaders.get(cls)(row)
 
     def __eq__(self, value: object) -> bool:
         # Сравнение моделей по идентификатору
         if not isinstance(value, AbstractModel):
             return False
-        return self.id == value.id
+        return self.__id == value.__id
+
+    def __hash__(self) -> int:
+        # Хеш по идентификатору: модели можно использовать в множествах и ключах словарей.
+        # Идентификатор модели, помещенной в множество или словарь, менять нельзя
+        return hash(self.__id)
 
     def __str__(self) -> str:
         # Строковое представление модели
-        return f"{self.__name} ({self.__id})"
\ No newline at end of file
+        return f"{self.__name} ({self.id})"
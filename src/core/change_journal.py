@@ -0,0 +1,84 @@
+"""
+Счетчик изменений с журналом последних изменений
+"""
+import threading
+import weakref
+from collections import deque
+
+
+class ChangeJournal:
+    """
+    Потокобезопасный счетчик изменений с журналом последних изменений.
+
+    Номер изменения увеличивается и запись добавляется в журнал под одной
+    блокировкой, поэтому номера не повторяются и журнал упорядочен даже при
+    изменении моделей из нескольких потоков. Модели в записях хранятся
+    слабыми ссылками: журнал не удерживает модели, которые больше нигде
+    не используются.
+    """
+
+    __revision: int = 0  # Номер последнего изменения
+    __entries: deque = None  # Последние изменения: (номер изменения, слабые ссылки на модели)
+    __lock: threading.Lock = None  # Защита счетчика и журнала
+
+    def __init__(self, maxlen: int = 1024):
+        """
+        Args:
+            maxlen (int): Наибольшее количество записей в журнале (0 - только счетчик)
+        """
+        self.__revision = 0
+        self.__entries = deque(maxlen=maxlen)
+        self.__lock = threading.Lock()
+
+    @property
+    def revision(self) -> int:
+        """Номер последнего изменения"""
+        return self.__revision
+
+    def record(self, *models) -> int:
+        """
+        Учет изменения.
+
+        Args:
+            models: Модели, которых касается изменение (None сохраняется как None)
+
+        Returns:
+            int: Номер изменения
+        """
+        references = tuple(None if model is None else weakref.ref(model) for model in models)
+        with self.__lock:
+            self.__revision += 1
+            if self.__entries.maxlen:
+                self.__entries.append((self.__revision, references))
+            return self.__revision
+
+    def since(self, revision: int, until: int = None):
+        """
+        Изменения после изменения с номером revision.
+
+        Args:
+            until (int): Номер последнего возвращаемого изменения (None - до текущего);
+                         позволяет получить изменения ровно до ранее прочитанного revision
+
+        Returns:
+            list: Кортежи моделей записей в порядке изменений или None, если журнал
+                  их уже не содержит (или модель одной из записей уже удалена)
+        """
+        with self.__lock:
+            until = self.__revision if until is None else until
+            if revision >= until:
+                return []
+            entries = self.__entries
+            if not entries or entries[0][0] > revision + 1:
+                return None
+            selected = [references for number, references in entries if revision < number <= until]
+        result = []
+        for references in selected:
+            models = []
+            for reference in references:
+                model = None if reference is None else reference()
+                if model is None and reference is not None:
+                    return None
+                models.append(model)
+            result.append(tuple(models))
+        return result
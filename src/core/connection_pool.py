@@ -0,0 +1,80 @@
+"""
+Пул соединений SQLite
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+from src.core.validator import OperationException, Validator
+
+
+class ConnectionPool:
+    """
+    Небольшой пул заранее открытых соединений SQLite.
+
+    Соединения открываются один раз в режиме WAL, поэтому читатели не блокируют
+    писателя, а рабочие потоки не переоткрывают базу на каждый запрос.
+    Скомпилированные запросы кэшируются самим sqlite3 для каждого соединения.
+    """
+
+    __database: str = ""  # Путь к файлу базы данных
+    __connections: queue.LifoQueue = None  # Свободные соединения
+    __all_connections: list = None  # Все открытые соединения пула
+    __timeout: float = 5.0  # Время ожидания свободного соединения (сек)
+
+    def __init__(self, database: str, size: int = 4, timeout: float = 5.0):
+        """
+        Args:
+            database (str): Путь к файлу базы данных
+            size (int): Количество соединений в пуле
+            timeout (float): Время ожидания свободного соединения (сек)
+        """
+        Validator.validate_argument(database, str, "database", min_length=1)
+        Validator.validate_argument(size, int, "size")
+        if size <= 0:
+            raise OperationException("Размер пула соединений должен быть положительным числом")
+
+        self.__database = database
+        self.__timeout = timeout
+        self.__connections = queue.LifoQueue(maxsize=size)
+        self.__all_connections = []
+        for _ in range(size):
+            connection = self.__connect()
+            self.__all_connections.append(connection)
+            self.__connections.put(connection)
+
+    @property
+    def database(self) -> str:
+        return self.__database
+
+    def __connect(self) -> sqlite3.Connection:
+        """Открытие и настройка соединения"""
+        connection = sqlite3.connect(self.__database, check_same_thread=False, cached_statements=256)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Получение соединения из пула на время блока with"""
+        try:
+            connection = self.__connections.get(timeout=self.__timeout)
+        except queue.Empty:
+            raise OperationException("Нет свободных соединений с базой данных")
+        try:
+            yield connection
+        finally:
+            self.__connections.put(connection)
+
+    @contextmanager
+    def transaction(self):
+        """Соединение с открытой транзакцией: фиксация при успехе, откат при ошибке"""
+        with self.connection() as connection:
+            with connection:
+                yield connection
+
+    def close(self):
+        """Закрытие всех соединений пула"""
+        for connection in self.__all_connections:
+            connection.close()
+        self.__all_connections = []
@@ -0,0 +1,30 @@
+"""
+Плоская геометрия для расположения ресторанов и районов доставки
+"""
+from src.core.validator import ArgumentException
+
+
+def as_point(value) -> tuple:
+    """Проверка и приведение координат к кортежу (x, y) из float"""
+    if not isinstance(value, (tuple, list)) or len(value) != 2 \
+            or not all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+        raise ArgumentException("Координаты должны быть парой чисел (x, y)")
+    return float(value[0]), float(value[1])
+
+
+def polygon_bounds(polygon: tuple) -> tuple:
+    """Ограничивающий прямоугольник многоугольника (min_x, min_y, max_x, max_y)"""
+    xs = [x for x, _ in polygon]
+    ys = [y for _, y in polygon]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def polygon_contains(polygon: tuple, x: float, y: float) -> bool:
+    """Точка внутри многоугольника (метод луча; точки на границе могут отнестись к соседнему)"""
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
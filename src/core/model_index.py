@@ -0,0 +1,81 @@
+"""
+Хеш-индекс моделей по вычисляемому ключу
+"""
+
+
+class ModelIndex:
+    """
+    Индекс моделей по значению ключевой функции.
+
+    Для каждого значения ключа хранит модели в порядке добавления. Значение ключа
+    запоминается на момент индексации, поэтому после изменения модели достаточно
+    вызвать update(), чтобы перенести ее в новую корзину.
+    """
+
+    __key_func = None  # Функция получения ключа из модели
+    __buckets: dict = None  # Значение ключа -> {идентичность объекта: модель}
+    __keys: dict = None  # Идентичность объекта -> значение ключа при индексации
+
+    def __init__(self, key_func):
+        """
+        Args:
+            key_func: Функция, возвращающая значение ключа для модели
+                      (None - модель в индекс не попадает)
+        """
+        self.__key_func = key_func
+        self.__buckets = {}
+        self.__keys = {}
+
+    def add(self, model):
+        """Добавляет модель в индекс"""
+        value = self.__key_func(model)
+        self.__keys[id(model)] = value
+        if value is None:
+            return
+        bucket = self.__buckets.get(value)
+        if bucket is None:
+            bucket = self.__buckets[value] = {}
+        bucket[id(model)] = model
+
+    def remove(self, model):
+        """Удаляет модель из индекса"""
+        if id(model) not in self.__keys:
+            return
+        value = self.__keys.pop(id(model))
+        if value is None:
+            return
+        bucket = self.__buckets.get(value)
+        if bucket is not None:
+            bucket.pop(id(model), None)
+            if not bucket:
+                del self.__buckets[value]
+
+    def update(self, model):
+        """Переиндексирует модель после изменения ее полей"""
+        if self.__keys.get(id(model)) == self.__key_func(model) and id(model) in self.__keys:
+            return
+        self.remove(model)
+        self.add(model)
+
+    def find(self, value) -> list:
+        """Все модели с указанным значением ключа"""
+        bucket = self.__buckets.get(value)
+        return list(bucket.values()) if bucket else []
+
+    def first(self, value):
+        """Первая добавленная модель с указанным значением ключа или None"""
+        bucket = self.__buckets.get(value)
+        if not bucket:
+            return None
+        return next(iter(bucket.values()))
+
+    def clear(self):
+        """Очищает индекс"""
+        self.__buckets.clear()
+        self.__keys.clear()
+
+    def __contains__(self, value) -> bool:
+        return value in self.__buckets
+
+    def __len__(self) -> int:
+        return len(self.__keys)
@@ -0,0 +1,52 @@
+"""
+Представление списка только для чтения
+"""
+from collections.abc import Sequence
+
+
+class ReadOnlyView(Sequence):
+    """
+    Неизменяемое представление списка без копирования.
+
+    Отражает текущее содержимое списка-владельца: изменения, внесенные
+    через методы модели, сразу видны в уже выданном представлении.
+    Срез возвращает кортеж (копию выбранной части).
+    """
+
+    __slots__ = ("__items",)
+
+    def __init__(self, items: list):
+        """
+        Args:
+            items (list): Список, содержимое которого открывается для чтения
+        """
+        self.__items = items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self.__items[index])
+        return self.__items[index]
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __reversed__(self):
+        return reversed(self.__items)
+
+    def __contains__(self, value) -> bool:
+        return value in self.__items
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ReadOnlyView):
+            other = other.__items
+        if isinstance(other, (list, tuple)):
+            return len(self.__items) == len(other) and all(a == b for a, b in zip(self.__items, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyView({self.__items!r})"
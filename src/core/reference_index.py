@@ -0,0 +1,93 @@
+"""
+Обратный индекс ссылок между моделями
+"""
+
+
+class ReferenceIndex:
+    """
+    Обратный индекс "модель -> объекты, которые на нее ссылаются".
+
+    Ссылки объекта регистрируются при его записи (set) и снимаются при
+    удалении (discard), поэтому проверка "используется ли модель" - одно
+    обращение к словарю, без просмотра всех документов. Модели сравниваются
+    по идентификатору (AbstractModel.__eq__), ссылающиеся объекты - тоже
+    по их __eq__/__hash__.
+    """
+
+    __targets: dict = None  # Ссылающийся объект -> модели, на которые он ссылается
+    __referrers: dict = None  # Модель -> {ссылающийся объект: количество ссылок}
+
+    def __init__(self):
+        self.__targets = {}
+        self.__referrers = {}
+
+    def __len__(self) -> int:
+        """Количество ссылающихся объектов"""
+        return len(self.__targets)
+
+    def set(self, referrer, targets):
+        """
+        Регистрация ссылок объекта (заменяет ранее зарегистрированные).
+
+        Args:
+            referrer: Ссылающийся объект
+            targets: Модели, на которые он ссылается (None пропускаются, повторы учитываются)
+        """
+        self.discard(referrer)
+        targets = tuple(target for target in targets if target is not None)
+        if not targets:
+            return
+        self.__targets[referrer] = targets
+        referrers = self.__referrers
+        for target in targets:
+            counts = referrers.get(target)
+            if counts is None:
+                counts = referrers[target] = {}
+            counts[referrer] = counts.get(referrer, 0) + 1
+
+    def discard(self, referrer):
+        """Снятие всех ссылок объекта"""
+        targets = self.__targets.pop(referrer, None)
+        if targets is None:
+            return
+        referrers = self.__referrers
+        for target in targets:
+            counts = referrers[target]
+            remaining = counts[referrer] - 1
+            if remaining:
+                counts[referrer] = remaining
+            else:
+                del counts[referrer]
+                if not counts:
+                    del referrers[target]
+
+    def clear(self):
+        self.__targets.clear()
+        self.__referrers.clear()
+
+    def is_referenced(self, model) -> bool:
+        """Признак наличия ссылок на модель"""
+        return model in self.__referrers
+
+    def count(self, model) -> int:
+        """Количество объектов, ссылающихся на модель"""
+        return len(self.__referrers.get(model, ()))
+
+    def referrers(self, model, limit: int = None) -> list:
+        """
+        Объекты, ссылающиеся на модель.
+
+        Args:
+            limit (int): Наибольшее количество объектов в результате (None - все)
+        """
+        counts = self.__referrers.get(model)
+        if not counts:
+            return []
+        if limit is None:
+            return list(counts)
+        result = []
+        for referrer in counts:
+            if len(result) >= limit:
+                break
+            result.append(referrer)
+        return result
@@ -0,0 +1,91 @@
+"""
+Блокировка "много читателей - один писатель"
+"""
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Блокировка чтения/записи с приоритетом писателей.
+
+    Читатели не блокируют друг друга; писатель получает исключительный доступ.
+    Поток-писатель может повторно брать блокировку на запись и на чтение,
+    поток-читатель - повторно на чтение. Повышение чтения до записи не поддерживается.
+    """
+
+    __condition: threading.Condition = None  # Условие ожидания
+    __readers: int = 0  # Количество удерживаемых блокировок чтения
+    __writer: int = None  # Идентификатор потока-писателя
+    __writer_depth: int = 0  # Глубина повторного захвата писателем
+    __waiting_writers: int = 0  # Количество ожидающих писателей
+    __local: threading.local = None  # Число блокировок чтения текущего потока
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__writer_depth += 1
+                return
+            held = getattr(self.__local, "reads", 0)
+            # Повторное чтение не ждет писателей, иначе возможна взаимная блокировка
+            if held == 0:
+                while self.__writer is not None or self.__waiting_writers:
+                    self.__condition.wait()
+            self.__readers += 1
+            self.__local.reads = held + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__writer_depth -= 1
+                return
+            self.__readers -= 1
+            self.__local.reads -= 1
+            if self.__readers == 0:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__writer_depth += 1
+                return
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = me
+            self.__writer_depth = 1
+
+    def release_write(self):
+        with self.__condition:
+            self.__writer_depth -= 1
+            if self.__writer_depth == 0:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Блокировка чтения на время блока with"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Блокировка записи на время блока with"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
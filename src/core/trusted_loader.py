@@ -0,0 +1,79 @@
+"""
+Создание моделей из доверенных данных без повторной валидации
+"""
+
+_MISSING = object()
+
+
+def _slot_setters(cls) -> dict:
+    """Имя поля -> функция записи в слот (по всем классам иерархии)"""
+    setters = {}
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot == "__weakref__":
+                continue
+            attribute = slot
+            if slot.startswith("__") and not slot.endswith("__"):
+                attribute = f"_{klass.__name__.lstrip('_')}{slot}"
+            setters[slot.lstrip("_")] = klass.__dict__[attribute].__set__
+    return setters
+
+
+def _merged(cls, attribute: str) -> dict:
+    """Объединение словарей-атрибутов классов иерархии (потомки переопределяют предков)"""
+    result = {}
+    for klass in reversed(cls.__mro__):
+        result.update(klass.__dict__.get(attribute, {}))
+    return result
+
+
+def compile_trusted_loader(cls):
+    """
+    Сборка функции, создающей экземпляр cls из словаря значений полей.
+
+    Значения записываются прямо в слоты модели, минуя сеттеры и их проверки.
+    Отсутствующие поля получают значения из словарей _trusted_defaults классов
+    иерархии (вызываемое значение - фабрика), а _trusted_converters позволяют
+    привести значение к форме хранения.
+
+    Returns:
+        Функция row -> модель
+    """
+    defaults = _merged(cls, "_trusted_defaults")
+    converters = _merged(cls, "_trusted_converters")
+    fields = []
+    for name, setter in _slot_setters(cls).items():
+        default = defaults.get(name)
+        fields.append((name, setter, default, callable(default), converters.get(name)))
+
+    new = cls.__new__
+
+    def load(row: dict):
+        model = new(cls)
+        get = row.get
+        for name, setter, default, is_factory, converter in fields:
+            value = get(name, _MISSING)
+            if value is _MISSING:
+                value = default() if is_factory else default
+            elif converter is not None:
+                value = converter(value)
+            setter(model, value)
+        return model
+
+    return load
+
+
+class TrustedLoaders:
+    """Кэш собранных функций загрузки по классам моделей"""
+
+    __loaders: dict = {}  # Класс модели -> функция загрузки
+
+    @staticmethod
+    def get(cls):
+        loader = TrustedLoaders.__loaders.get(cls)
+        if loader is None:
+            loader = TrustedLoaders.__loaders[cls] = compile_trusted_loader(cls)
+        return loader
@@ -26,4 +26,84 @@ class Validator:
             raise ArgumentException(f"Аргумент '{argument_name}' должен содержать минимум {min_length} символов")
         
         if hasattr(value, '__len__') and max_length is not None and len(value) > max_length:
-            raise ArgumentException(f"Аргумент '{argument_name}' должен содержать максимум {max_length} символов")
\ No newline at end of file
+            raise ArgumentException(f"Аргумент '{argument_name}' должен содержать максимум {max_length} символов")
+
+    @staticmethod
+    def compile_rule(argument_name, expected_type=None, max_length=None, min_length=None,
+                     positive=False, positive_message="", digits=None, digits_message="",
+                     exception=None):
+        """
+        Сборка функции проверки одного аргумента по правилу.
+
+        Код функции генерируется один раз и содержит только нужные проверки, а тексты
+        ошибок формируются заранее. Функция возвращает проверенное значение
+        (для digits - приведенное к строке) или выбрасывает исключение.
+
+        Args:
+            argument_name: Имя аргумента в сообщениях об ошибках
+            expected_type: Тип или кортеж типов значения
+            max_length, min_length: Ограничения длины
+            positive: Значение должно быть больше нуля
+            positive_message: Текст ошибки для positive
+            digits: Значение (строка или число) должно состоять ровно из digits цифр
+            digits_message: Текст ошибки для digits
+            exception: Класс исключения (по умолчанию ArgumentException)
+        """
+        exception = exception or ArgumentException
+        names = {"_error": exception}
+        lines = ["def check(value):",
+                 "    if value is None:",
+                 "        raise _error(_none_message)"]
+        names["_none_message"] = f"Аргумент '{argument_name}' не может быть None"
+
+        if digits is not None:
+            names["_digits"] = digits
+            names["_digits_message"] = digits_message or f"Аргумент '{argument_name}' должен содержать {digits} цифр"
+            names["_type_message"] = "Поле должно быть строкой или числом"
+            lines += ["    if isinstance(value, int):",
+                      "        value = str(value)",
+                      "    elif not isinstance(value, str):",
+                      "        raise _error(_type_message)",
+                      "    if len(value) != _digits or not value.isdigit():",
+                      "        raise _error(_digits_message)"]
+        elif expected_type:
+            types = expected_type if isinstance(expected_type, tuple) else (expected_type,)
+            names["_type"] = types
+            names["_type_message"] = (f"Аргумент '{argument_name}' должен быть типа "
+                                      f"{' или '.join(item.__name__ for item in types)}")
+            lines += ["    if not isinstance(value, _type):",
+                      "        raise _error(_type_message)"]
+
+        if min_length is not None:
+            names["_min_length"] = min_length
+            names["_min_message"] = f"Аргумент '{argument_name}' должен содержать минимум {min_length} символов"
+            lines += ["    if len(value) < _min_length:",
+                      "        raise _error(_min_message)"]
+
+        if max_length is not None:
+            names["_max_length"] = max_length
+            names["_max_message"] = f"Аргумент '{argument_name}' должен содержать максимум {max_length} символов"
+            lines += ["    if len(value) > _max_length:",
+                      "        raise _error(_max_message)"]
+
+        if positive:
+            names["_positive_message"] = positive_message or f"Аргумент '{argument_name}' должен быть положительным числом"
+            lines += ["    if value <= 0:",
+                      "        raise _error(_positive_message)"]
+
+        lines.append("    return value")
+        exec("\n".join(lines), names)
+        return names["check"]
+
+    @staticmethod
+    def compile_schema(schema: dict) -> dict:
+        """
+        Сборка функций проверки для набора правил модели.
+
+        Args:
+            schema (dict): Имя поля -> параметры compile_rule (без имени аргумента)
+
+        Returns:
+            dict: Имя поля -> функция проверки
+        """
+        return {name: Validator.compile_rule(name, **rule) for name, rule in schema.items()}
@@ -0,0 +1,200 @@
+"""
+Создание данных из файлов технологических карт
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from src.reposity import reposity
+from src.start_service import BaseDataCreator
+from src.core.validator import ArgumentException, OperationException
+from src.settings_manager import SettingsManager
+from src.logics.recipe_card_markdown import parse_markdown_card
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+
+def parse_json_card(path: str) -> dict:
+    """
+    Разбор технологической карты в формате JSON.
+
+    Формат файла:
+        {"name": ..., "portions": 2, "cooking_time": "15 мин",
+         "ingredients": [{"nomenclature": "Морковь", "quantity": 2, "unit": "штука"}, ...],
+         "steps": ["Очистить морковь", ...]}
+
+    Returns:
+        dict: Описание карты из простых типов (передается между процессами)
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        card = json.load(file)
+    steps = []
+    for number, step in enumerate(card.get("steps", []), start=1):
+        if isinstance(step, dict):
+            steps.append((step.get("step_number", number), step["description"]))
+        else:
+            steps.append((number, step))
+    return {
+        "name": card["name"],
+        "portions": card.get("portions", 1),
+        "cooking_time": card.get("cooking_time", ""),
+        "ingredients": [(item["nomenclature"], item["quantity"], item["unit"])
+                        for item in card.get("ingredients", [])],
+        "steps": steps,
+    }
+
+
+def _parse_file(task: tuple) -> dict:
+    """Разбор одного файла в процессе-обработчике с указанием файла в ошибке"""
+    parser, path = task
+    try:
+        return parser(path)
+    except Exception as error:
+        raise OperationException(f"Ошибка разбора технологической карты {path}: {error}") from None
+
+
+class FileDataCreator(BaseDataCreator):
+    """
+    Создание рецептов из файлов технологических карт.
+
+    Файлы независимы друг от друга, поэтому разбираются параллельно в пуле
+    процессов; обработчики возвращают описания карт из простых типов,
+    а модели создаются и объединяются с репозиторием в основном процессе:
+    номенклатура ищется по наименованию через индексы репозитория и создается,
+    только если ее еще нет; рецепты с уже существующим наименованием пропускаются.
+
+    Единицы измерения не создаются: карта может ссылаться только на единицы
+    репозитория (иначе неизвестно их базовое отношение), поэтому справочники
+    (единицы, группы, номенклатура) берутся из reference_creator или должны
+    быть в репозитории заранее.
+    """
+
+    # Расширение файла -> функция разбора (должна быть доступна по имени модуля для пула процессов)
+    parsers = {".json": parse_json_card, ".md": parse_markdown_card}
+
+    __paths: list = None  # Файлы технологических карт
+    __workers: int = None  # Количество процессов разбора
+    __reference_creator: BaseDataCreator = None  # Создание справочников
+    __parallel_threshold: int = 16  # Меньше файлов - разбор без пула процессов
+
+    def __init__(self, sources, workers: int = None, reference_creator: BaseDataCreator = None):
+        """
+        Args:
+            sources: Каталог с картами или список путей к файлам
+            workers (int): Количество процессов разбора (по умолчанию - pools.parse_workers настроек
+                           приложения, где 0 - по числу ядер; 1 - без пула)
+            reference_creator (BaseDataCreator): Создание справочников перед загрузкой рецептов
+        """
+        if workers is None:
+            workers = SettingsManager().app_config.pools.parse_workers or None
+        elif workers <= 0:
+            raise ArgumentException("Количество процессов должно быть положительным числом")
+        self.__paths = self.__collect(sources)
+        self.__workers = workers
+        self.__reference_creator = reference_creator
+
+    @property
+    def paths(self) -> list:
+        return self.__paths.copy()
+
+    def _create_units(self, repo: reposity):
+        if self.__reference_creator is not None:
+            self.__reference_creator._create_units(repo)
+
+    def _create_groups(self, repo: reposity):
+        if self.__reference_creator is not None:
+            self.__reference_creator._create_groups(repo)
+
+    def _create_nomenclature(self, repo: reposity):
+        if self.__reference_creator is not None:
+            self.__reference_creator._create_nomenclature(repo)
+
+    def _create_receipts(self, repo: reposity):
+        """
+        Разбор файлов и добавление новых рецептов в репозиторий.
+
+        Raises:
+            OperationException: Если карта ссылается на единицу измерения, которой нет
+                                в репозитории (репозиторий при этом не изменяется)
+        """
+        cards = []
+        names = set()
+        for card in self.parse():
+            if card["name"] in names or repo.find_by_name(reposity.receipt_key(), card["name"]) is not None:
+                continue
+            names.add(card["name"])
+            cards.append(card)
+        units = self.__units(repo, cards)
+        entries = [self.__build(repo, card, units) for card in cards]
+
+        add_many = getattr(repo, "add_many", None)
+        if add_many is not None:
+            add_many(reposity.receipt_key(), entries)
+        else:
+            for entry in entries:
+                repo.add(reposity.receipt_key(), entry)
+
+    def parse(self) -> list:
+        """
+        Разбор всех файлов (в порядке списка файлов).
+
+        Returns:
+            list: Описания карт из простых типов
+        """
+        tasks = [(self.__parser(path), path) for path in self.__paths]
+        workers = self.__workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) < self.__parallel_threshold:
+            return [_parse_file(task) for task in tasks]
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_parse_file, tasks, chunksize=chunksize))
+
+    @staticmethod
+    def __units(repo: reposity, cards: list) -> dict:
+        """
+        Единицы измерения карт по наименованию (до создания номенклатуры и рецептов).
+
+        Raises:
+            OperationException: Если единицы измерения нет в репозитории
+        """
+        units = {}
+        for card in cards:
+            for _, _, unit_name in card["ingredients"]:
+                if unit_name in units:
+                    continue
+                unit = repo.find_by_name(reposity.range_key(), unit_name)
+                if unit is None:
+                    raise OperationException(f"Технологическая карта {card['name']}: "
+                                             f"единица измерения {unit_name} не найдена")
+                units[unit_name] = unit
+        return units
+
+    def __build(self, repo: reposity, card: dict, units: dict) -> dict:
+        """Создание рецепта из описания карты со ссылками на модели репозитория"""
+        receipt = ReceiptModel(card["name"], card["portions"], card["cooking_time"])
+        ingredients = []
+        for nomenclature_name, quantity, unit_name in card["ingredients"]:
+            unit = units[unit_name]
+            nomenclature = repo.get_or_add(reposity.nomenclature_key(), nomenclature_name,
+                                           lambda: NomenclatureModel(nomenclature_name, nomenclature_name,
+                                                                     None, unit))
+            ingredients.append(IngredientModel(nomenclature, quantity, unit))
+        steps = [CookingStepModel(number, description) for number, description in card["steps"]]
+        return self._fill_receipt(receipt, ingredients, steps)
+
+    def __parser(self, path: str):
+        """Функция разбора по расширению файла"""
+        parser = self.parsers.get(os.path.splitext(path)[1].lower())
+        if parser is None:
+            raise OperationException(f"Неизвестный формат технологической карты: {path}")
+        return parser
+
+    def __collect(self, sources) -> list:
+        """Список файлов карт: все файлы известных форматов каталога или переданные пути"""
+        if isinstance(sources, str):
+            if not os.path.isdir(sources):
+                raise ArgumentException(f"Каталог технологических карт {sources} не найден")
+            return sorted(os.path.join(sources, name) for name in os.listdir(sources)
+                          if os.path.splitext(name)[1].lower() in self.parsers)
+        return list(sources)
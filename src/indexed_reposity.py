@@ -0,0 +1,333 @@
+"""
+Репозиторий данных с хеш-индексами
+"""
+from src.reposity import reposity
+from src.core.model_index import ModelIndex
+from src.core.reference_index import ReferenceIndex
+from src.core.abstract_model import AbstractModel
+from src.core.validator import OperationException
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.receipt_model import ReceiptModel
+
+# Коллекция -> коллекции, модели которых могут на нее ссылаться
+REFERRER_KEYS = {
+    reposity.range_key(): (reposity.range_key(), reposity.nomenclature_key(), reposity.receipt_key()),
+    reposity.nomenclature_group_key(): (reposity.nomenclature_group_key(), reposity.nomenclature_key()),
+    reposity.nomenclature_key(): (reposity.receipt_key(),),
+    reposity.receipt_key(): (reposity.receipt_key(),),
+}
+
+
+class indexed_reposity(reposity):
+    """
+    Репозиторий, поддерживающий индексы по идентификатору и наименованию
+    для каждой коллекции, а также вторичные индексы:
+    номенклатура по группе и единицы измерения по базовой единице.
+
+    Индексы поддерживаются при add/update/remove и перестраиваются
+    при замене коллекции целиком через set_data/data.
+
+    Индекс по id работает как карта идентичности: для каждого id в коллекции
+    хранится один объект, и повторное добавление модели с тем же id
+    возвращает уже хранящийся экземпляр.
+
+    Обратный индекс ссылок (единица -> номенклатура и рецепты, группа ->
+    номенклатура и подгруппы, номенклатура и рецепт -> рецепты) позволяет
+    заблокировать удаление используемой модели без просмотра коллекций
+    (п. 6.2 ТЗ). Ссылки из данных вне репозитория (например, складских
+    движений) учитываются через add_reference_source. Ссылки рецептов,
+    ингредиенты которых изменены на месте (add_ingredient, mark_changed)
+    без update, перерегистрируются по журналу изменений ReceiptModel
+    перед проверкой ссылок.
+
+    Подписчики (subscribe) получают уведомления об изменениях моделей:
+    observer(операция, ключ коллекции, модели), где операция - "put"
+    (добавление новой модели или update), "delete" (удаление) или "reset"
+    (замена коллекции целиком через set_data/data, передаются все ее модели).
+    """
+
+    __by_id: dict = None  # Ключ коллекции -> индекс по id
+    __by_name: dict = None  # Ключ коллекции -> индекс по наименованию
+    __by_group: ModelIndex = None  # Номенклатура по id группы
+    __by_base_unit: ModelIndex = None  # Единицы измерения по id базовой единицы
+    __references: dict = None  # Ключ коллекции -> обратный индекс ссылок ее моделей
+    __reference_sources: list = None  # Внешние источники ссылок (is_referenced, referrers)
+    __observers: list = None  # Подписчики на изменения моделей
+    __receipt_revision: int = 0  # Номер изменения состава рецептов, учтенный в индексе ссылок
+
+    def __init__(self):
+        self.__by_id = {}
+        self.__by_name = {}
+        self.__by_group = ModelIndex(lambda item: item.group.id_key if item.group is not None else None)
+        self.__by_base_unit = ModelIndex(lambda item: item.base_unit.id_key if item.base_unit is not None else None)
+        self.__references = {}
+        self.__reference_sources = []
+        self.__observers = []
+        super().__init__()
+        self.__rebuild_all()
+
+    @property
+    def data(self):
+        return super().data
+
+    @data.setter
+    def data(self, value: dict):
+        """Сеттер для установки всех данных репозитория с перестроением индексов"""
+        keys = set(self.data.keys())
+        reposity.data.fset(self, value)
+        self.__rebuild_all()
+        if self.__observers:
+            for key in [*value.keys(), *sorted(keys - set(value.keys()))]:
+                self.__notify("reset", key, self.models(key))
+
+    def set_data(self, key: str, value):
+        """Установка данных по ключу с перестроением индексов коллекции"""
+        super().set_data(key, value)
+        self.__rebuild(key)
+        if self.__observers:
+            self.__notify("reset", key, self.models(key))
+
+    def get_by_id(self, key: str, model_id: str):
+        """Поиск модели коллекции по идентификатору за O(1)"""
+        index = self.__by_id.get(key)
+        return index.first(AbstractModel.id_key_of(model_id)) if index is not None else None
+
+    def find_by_name(self, key: str, name: str):
+        """Поиск первой модели коллекции с указанным наименованием за O(1)"""
+        index = self.__by_name.get(key)
+        return index.first(name) if index is not None else None
+
+    def find_all_by_name(self, key: str, name: str) -> list:
+        """Все модели коллекции с указанным наименованием"""
+        index = self.__by_name.get(key)
+        return index.find(name) if index is not None else []
+
+    def find_nomenclature_by_group(self, group) -> list:
+        """Номенклатура, входящая в группу"""
+        return self.__by_group.find(group.id_key)
+
+    def find_units_by_base_unit(self, base_unit) -> list:
+        """Единицы измерения, пересчитываемые через указанную базовую единицу"""
+        return self.__by_base_unit.find(base_unit.id_key)
+
+    def subscribe(self, observer):
+        """
+        Подписка на изменения моделей.
+
+        Args:
+            observer: Функция observer(операция, ключ коллекции, модели);
+                      вызывается после изменения коллекции и индексов
+        """
+        self.__observers.append(observer)
+
+    def unsubscribe(self, observer):
+        """Отмена подписки на изменения моделей"""
+        if observer in self.__observers:
+            self.__observers.remove(observer)
+
+    def add_reference_source(self, source):
+        """
+        Подключение внешнего источника ссылок, блокирующих удаление.
+
+        Args:
+            source: Объект с методами is_referenced(model) и referrers(model, limit)
+                    (например, StockLedger)
+        """
+        self.__reference_sources.append(source)
+
+    def is_referenced(self, model) -> bool:
+        """Признак того, что на модель ссылаются другие модели или внешние источники"""
+        self.__refresh_receipt_references()
+        for index in self.__references.values():
+            if index.is_referenced(model):
+                return True
+        return any(source.is_referenced(model) for source in self.__reference_sources)
+
+    def referrers(self, model, limit: int = None) -> list:
+        """
+        Объекты, ссылающиеся на модель.
+
+        Args:
+            limit (int): Наибольшее количество объектов в результате (None - все)
+        """
+        self.__refresh_receipt_references()
+        result = []
+        for source in [*self.__references.values(), *self.__reference_sources]:
+            remaining = None if limit is None else limit - len(result)
+            if remaining is not None and remaining <= 0:
+                break
+            result.extend(source.referrers(model, remaining))
+        return result
+
+    def check_remove(self, model):
+        """
+        Проверка возможности удаления модели.
+
+        Raises:
+            OperationException: Если модель используется; в сообщении перечислены
+                                первые ссылающиеся объекты
+        """
+        if not self.is_referenced(model):
+            return
+        shown = 5
+        references = self.referrers(model, shown + 1)
+        described = "; ".join(str(item) for item in references[:shown])
+        if len(references) > shown:
+            described += " и другие"
+        raise OperationException(f"Модель '{model.name}' используется и не может быть удалена: {described}")
+
+    def add(self, key: str, model):
+        """
+        Добавление модели в коллекцию с индексацией.
+
+        Returns:
+            Хранящийся в репозитории экземпляр (уже существующий, если модель с таким id добавлена ранее)
+        """
+        receipt = model["receipt"] if isinstance(model, dict) else model
+        existing = self.get_by_id(key, receipt.id)
+        if existing is not None:
+            return existing
+        model = super().add(key, model)
+        self.__index(key, model)
+        if self.__observers:
+            self.__notify("put", key, [model])
+        return model
+
+    def update(self, key: str, model):
+        """
+        Переиндексация модели после изменения ее полей.
+
+        Raises:
+            OperationException: Если модель не хранится в коллекции (не добавлена
+                                или хранится другой экземпляр с тем же id)
+        """
+        self._check_stored(key, model)
+        super().update(key, model)
+        if key in self.__by_id:
+            self.__by_id[key].update(model)
+            self.__by_name[key].update(model)
+        if key == self.nomenclature_key():
+            self.__by_group.update(model)
+        elif key == self.range_key():
+            self.__by_base_unit.update(model)
+        if key in self.__references:
+            self.__references[key].set(model, self.__referenced(key, model))
+        if self.__observers:
+            self.__notify("put", key, [model])
+        return model
+
+    def remove(self, key: str, model) -> bool:
+        """
+        Удаление модели из коллекции и индексов.
+
+        Raises:
+            OperationException: Если на модель ссылаются другие модели или внешние источники
+        """
+        self.check_remove(model)
+        return self._discard(key, model)
+
+    def _check_stored(self, key: str, model):
+        """Проверка того, что модель - хранящийся в коллекции экземпляр"""
+        if self.get_by_id(key, model.id) is not model:
+            raise OperationException(
+                f"Модель '{model.name}' не добавлена в коллекцию '{key}': изменения не сохраняются")
+
+    def _discard(self, key: str, model) -> bool:
+        """Удаление модели из коллекции и индексов без проверки ссылок"""
+        stored = self.get_by_id(key, model.id)
+        if stored is None or not super().remove(key, stored):
+            return False
+        if key in self.__references:
+            self.__references[key].discard(stored)
+        self.__by_id[key].remove(stored)
+        self.__by_name[key].remove(stored)
+        if key == self.nomenclature_key():
+            self.__by_group.remove(stored)
+        elif key == self.range_key():
+            self.__by_base_unit.remove(stored)
+        if self.__observers:
+            self.__notify("delete", key, [stored])
+        return True
+
+    def __notify(self, operation: str, key: str, models: list):
+        for observer in list(self.__observers):
+            observer(operation, key, models)
+
+    def __index(self, key: str, model):
+        """Добавление модели во все индексы коллекции"""
+        if key not in self.__by_id:
+            self.__by_id[key] = ModelIndex(lambda item: item.id_key)
+            self.__by_name[key] = ModelIndex(lambda item: item.name)
+            self.__references[key] = ReferenceIndex()
+        self.__by_id[key].add(model)
+        self.__by_name[key].add(model)
+        self.__references[key].set(model, self.__referenced(key, model))
+        if key == self.nomenclature_key():
+            self.__by_group.add(model)
+        elif key == self.range_key():
+            self.__by_base_unit.add(model)
+
+    def __refresh_receipt_references(self):
+        """Перерегистрация ссылок рецептов коллекции, состав которых изменен без update"""
+        revision = ReceiptModel.revision()
+        if revision == self.__receipt_revision:
+            return
+        changed = ReceiptModel.changes_since(self.__receipt_revision, revision)
+        key = self.receipt_key()
+        index = self.__references.get(key)
+        if index is not None:
+            if changed is None:
+                # Журнал не покрывает изменения: перерегистрируются все рецепты
+                changed = self.models(key)
+            by_id = self.__by_id[key]
+            for receipt in set(changed):
+                if by_id.first(receipt.id_key) is receipt:
+                    index.set(receipt, self.__referenced(key, receipt))
+        # Номер запоминается только после перерегистрации: прерванное обновление повторяется
+        self.__receipt_revision = revision
+
+    def __rebuild(self, key: str):
+        """Перестроение индексов одной коллекции"""
+        self.__by_id.pop(key, None)
+        self.__by_name.pop(key, None)
+        self.__references.pop(key, None)
+        if key == self.nomenclature_key():
+            self.__by_group.clear()
+        elif key == self.range_key():
+            self.__by_base_unit.clear()
+        if key == self.receipt_key():
+            self.__receipt_revision = ReceiptModel.revision()
+        for model in self.models(key):
+            self.__index(key, model)
+
+    def __rebuild_all(self):
+        """Перестроение индексов всех коллекций"""
+        self.__by_id.clear()
+        self.__by_name.clear()
+        self.__references.clear()
+        self.__by_group.clear()
+        self.__by_base_unit.clear()
+        self.__receipt_revision = ReceiptModel.revision()
+        for key in self.data.keys():
+            for model in self.models(key):
+                self.__index(key, model)
+
+    @staticmethod
+    def __referenced(key: str, model) -> list:
+        """Модели, на которые ссылается модель коллекции"""
+        if key == reposity.range_key():
+            return [model.base_unit]
+        if key == reposity.nomenclature_group_key():
+            return [model.parent]
+        if key == reposity.nomenclature_key():
+            return [model.group, model.unit]
+        if key == reposity.receipt_key():
+            result = []
+            for item in model.ingredients:
+                if isinstance(item, ReceiptComponentModel):
+                    result.append(item.receipt)
+                else:
+                    result.append(item.nomenclature)
+                    result.append(item.unit)
+            return result
+        return []
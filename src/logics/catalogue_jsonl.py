@@ -0,0 +1,288 @@
+"""
+Потоковый импорт и экспорт справочников в формате JSON Lines
+"""
+import json
+from src.reposity import reposity
+from src.core.validator import ArgumentException, OperationException
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+# Тип записи -> ключ коллекции репозитория (в порядке зависимостей)
+RECORD_TYPES = {
+    "unit": reposity.range_key(),
+    "group": reposity.nomenclature_group_key(),
+    "nomenclature": reposity.nomenclature_key(),
+    "receipt": reposity.receipt_key(),
+}
+
+
+def order_by_dependencies(items: list, identity, dependencies) -> list:
+    """
+    Упорядочивание элементов так, чтобы зависимости шли раньше зависимых
+    (обход в глубину без рекурсии; зависимости вне списка пропускаются).
+
+    Args:
+        items (list): Элементы (модели или записи)
+        identity: Функция "элемент -> идентификатор"
+        dependencies: Функция "элемент -> элементы, от которых он зависит"
+    """
+    ids = {identity(item) for item in items}
+    done = set()
+    result = []
+    for item in items:
+        stack = [(item, False)]
+        while stack:
+            current, expanded = stack.pop()
+            current_id = identity(current)
+            if current_id in done:
+                continue
+            if expanded:
+                done.add(current_id)
+                result.append(current)
+                continue
+            stack.append((current, True))
+            for dependency in dependencies(current):
+                dependency_id = identity(dependency)
+                if dependency_id in ids and dependency_id not in done:
+                    stack.append((dependency, False))
+    return result
+
+
+class CatalogueExporter:
+    """
+    Выгрузка справочников репозитория в JSON Lines: одна запись - одна строка.
+
+    Записи выводятся в порядке зависимостей: единицы (базовые раньше
+    производных), группы (родительские раньше подгрупп), номенклатура, рецепты (вложенные карты раньше
+    включающих их рецептов), поэтому файл загружается за один проход.
+    """
+
+    __repo: reposity = None  # Репозиторий-источник
+
+    def __init__(self, repo: reposity):
+        if not isinstance(repo, reposity):
+            raise ArgumentException("Репозиторий должен быть экземпляром reposity")
+        self.__repo = repo
+
+    def export(self, stream) -> int:
+        """
+        Запись справочников в текстовый поток.
+
+        Returns:
+            int: Количество записанных строк
+        """
+        count = 0
+        for record in self.records():
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+        return count
+
+    def export_file(self, path: str) -> int:
+        """Запись справочников в файл"""
+        with open(path, "w", encoding="utf-8") as stream:
+            return self.export(stream)
+
+    def records(self):
+        """Генератор записей в порядке зависимостей"""
+        repo = self.__repo
+        units = repo.models(reposity.range_key())
+        groups = repo.models(reposity.nomenclature_group_key())
+        receipts = repo.models(reposity.receipt_key())
+        ordered = [
+            (reposity.range_key(), order_by_dependencies(units, lambda unit: unit.id, self.__base_unit)),
+            (reposity.nomenclature_group_key(), order_by_dependencies(groups, lambda group: group.id, self.__parent)),
+            (reposity.nomenclature_key(), repo.models(reposity.nomenclature_key())),
+            (reposity.receipt_key(), order_by_dependencies(receipts, lambda receipt: receipt.id, self.__components)),
+        ]
+        for key, models in ordered:
+            for model in models:
+                yield self.record(key, model)
+
+    @staticmethod
+    def record(key: str, model) -> dict:
+        """Запись модели коллекции"""
+        if key == reposity.range_key():
+            return {"type": "unit", "id": model.id, "name": model.name, "factor": model.factor,
+                    "base_unit_id": model.base_unit.id if model.base_unit is not None else None}
+        if key == reposity.nomenclature_group_key():
+            return {"type": "group", "id": model.id, "name": model.name,
+                    "parent_id": model.parent.id if model.parent is not None else None}
+        if key == reposity.nomenclature_key():
+            return {"type": "nomenclature", "id": model.id, "name": model.name, "full_name": model.full_name,
+                    "group_id": model.group.id if model.group is not None else None,
+                    "unit_id": model.unit.id if model.unit is not None else None, "price": model.price}
+        if key == reposity.receipt_key():
+            return {"type": "receipt", "id": model.id, "name": model.name,
+                    "portions": model.portions, "cooking_time": model.cooking_time,
+                    "ingredients": [CatalogueExporter.__ingredient(item) for item in model.ingredients],
+                    "steps": [{"step_number": step.step_number, "description": step.description}
+                              for step in model.cooking_steps]}
+        raise ArgumentException(f"Коллекция {key} не выгружается в справочники")
+
+    @staticmethod
+    def __ingredient(item) -> dict:
+        """Запись строки состава рецепта"""
+        if isinstance(item, ReceiptComponentModel):
+            return {"receipt_id": item.receipt.id, "portions": item.portions}
+        return {"nomenclature_id": item.nomenclature.id, "quantity": item.quantity, "unit_id": item.unit.id}
+
+    @staticmethod
+    def __base_unit(unit) -> list:
+        return [unit.base_unit] if unit.base_unit is not None else []
+
+    @staticmethod
+    def __parent(group) -> list:
+        return [group.parent] if group.parent is not None else []
+
+    @staticmethod
+    def __components(receipt) -> list:
+        return [item.receipt for item in receipt.ingredients if isinstance(item, ReceiptComponentModel)]
+
+
+class CatalogueImporter:
+    """
+    Загрузка справочников из JSON Lines за один проход.
+
+    Файл читается построчно, в памяти держатся только соответствие
+    "id -> модель" для разрешения ссылок и текущий пакет записей.
+    Ссылки допускаются только на записи, прочитанные ранее, или на модели,
+    уже находящиеся в репозитории. Модели добавляются в репозиторий пакетами
+    (через add_many, если репозиторий его поддерживает) с сохранением
+    порядка записей.
+    """
+
+    __repo: reposity = None  # Репозиторий-приемник
+    __batch_size: int = 1000  # Размер пакета добавления
+    __models: dict = None  # (ключ коллекции, id) -> загруженная модель
+    __batch: list = None  # Текущий пакет моделей
+    __batch_key: str = None  # Коллекция текущего пакета
+
+    def __init__(self, repo: reposity, batch_size: int = 1000):
+        if not isinstance(repo, reposity):
+            raise ArgumentException("Репозиторий должен быть экземпляром reposity")
+        if batch_size <= 0:
+            raise ArgumentException("Размер пакета должен быть положительным числом")
+        self.__repo = repo
+        self.__batch_size = batch_size
+
+    def import_stream(self, stream) -> dict:
+        """
+        Загрузка справочников из текстового потока.
+
+        Returns:
+            dict: Ключ коллекции -> количество загруженных моделей
+
+        Raises:
+            OperationException: Если строка не разбирается, имеет неизвестный тип
+                                или ссылается на отсутствующую модель
+        """
+        return self.__import(enumerate(stream, start=1), "Строка")
+
+    def import_records(self, records) -> dict:
+        """
+        Загрузка справочников из уже разобранных записей (словарей в формате строк файла).
+
+        Returns:
+            dict: Ключ коллекции -> количество загруженных моделей
+
+        Raises:
+            OperationException: Если запись имеет неизвестный тип или ссылается на отсутствующую модель
+        """
+        return self.__import(enumerate(records, start=1), "Запись")
+
+    def __import(self, items, label: str) -> dict:
+        """Загрузка пронумерованных строк или записей"""
+        self.__models = {}
+        self.__batch = []
+        self.__batch_key = None
+        counts = {key: 0 for key in RECORD_TYPES.values()}
+
+        for number, record in items:
+            try:
+                if isinstance(record, str):
+                    if not record.strip():
+                        continue
+                    record = json.loads(record)
+                key = RECORD_TYPES.get(record.get("type"))
+                if key is None:
+                    raise OperationException(f"неизвестный тип записи '{record.get('type')}'")
+                model = self.__create(key, record)
+            except (ValueError, KeyError, TypeError, AttributeError,
+                    ArgumentException, OperationException) as error:
+                raise OperationException(f"{label} {number}: {error}") from error
+
+            if key != self.__batch_key or len(self.__batch) >= self.__batch_size:
+                self.__flush()
+                self.__batch_key = key
+            self.__batch.append(model)
+            self.__models[(key, model.id)] = model
+            counts[key] += 1
+
+        self.__flush()
+        self.__models = None
+        return counts
+
+    def import_file(self, path: str) -> dict:
+        """Загрузка справочников из файла"""
+        with open(path, "r", encoding="utf-8") as stream:
+            return self.import_stream(stream)
+
+    def __flush(self):
+        """Добавление накопленного пакета в репозиторий"""
+        if not self.__batch:
+            return
+        add_many = getattr(self.__repo, "add_many", None)
+        if add_many is not None:
+            stored = add_many(self.__batch_key, self.__batch)
+        else:
+            stored = [self.__repo.add(self.__batch_key, model) for model in self.__batch]
+        # Репозиторий может вернуть уже хранящийся экземпляр с тем же id
+        for model in stored:
+            self.__models[(self.__batch_key, model.id)] = model
+        self.__batch = []
+
+    def __resolve(self, key: str, model_id: str):
+        """Модель по ссылке: из прочитанных записей или из репозитория"""
+        if model_id is None:
+            return None
+        model = self.__models.get((key, model_id))
+        if model is None:
+            model = self.__repo.get_by_id(key, model_id)
+        if model is None:
+            raise OperationException(f"ссылка на отсутствующую модель {model_id} ({key})")
+        return model
+
+    def __create(self, key: str, record: dict):
+        """Создание модели из записи с проверкой значений"""
+        if key == reposity.range_key():
+            model = UnitModel(record["name"], record.get("factor", 1.0),
+                              self.__resolve(key, record.get("base_unit_id")))
+        elif key == reposity.nomenclature_group_key():
+            model = NomenclatureGroupModel(record["name"], self.__resolve(key, record.get("parent_id")))
+        elif key == reposity.nomenclature_key():
+            model = NomenclatureModel(record["name"], record.get("full_name", ""),
+                                      self.__resolve(reposity.nomenclature_group_key(), record.get("group_id")),
+                                      self.__resolve(reposity.range_key(), record.get("unit_id")),
+                                      record.get("price", 0.0))
+        else:
+            model = ReceiptModel(record["name"], record.get("portions", 1), record.get("cooking_time", ""))
+            model.extend_ingredients(self.__ingredient(item) for item in record.get("ingredients", []))
+            model.extend_steps(CookingStepModel(step["step_number"], step["description"])
+                               for step in record.get("steps", []))
+        model.id = record["id"]
+        return model
+
+    def __ingredient(self, item: dict):
+        """Строка состава рецепта из записи"""
+        if item.get("receipt_id") is not None:
+            return ReceiptComponentModel(self.__resolve(reposity.receipt_key(), item["receipt_id"]),
+                                         item["portions"])
+        return IngredientModel(self.__resolve(reposity.nomenclature_key(), item["nomenclature_id"]),
+                               item["quantity"],
+                               self.__resolve(reposity.range_key(), item["unit_id"]))
@@ -0,0 +1,330 @@
+"""
+Бинарный снимок справочников с отображением в память и ленивым созданием моделей
+"""
+import mmap
+import os
+import struct
+from src.reposity import reposity
+from src.core.validator import ArgumentException, OperationException
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+_MAGIC = b"CATSNAP1"
+
+# Строка - (смещение, длина) в таблице строк; ссылка на запись - ее номер в разделе (-1 - нет ссылки)
+_UNIT = struct.Struct("<IIIIdi")  # id, name, factor, base_unit
+_GROUP = struct.Struct("<IIIIi")  # id, name, parent
+_NOMENCLATURE = struct.Struct("<IIIIIIiid")  # id, name, full_name, group, unit, price
+_RECEIPT = struct.Struct("<IIIIiIIIIII")  # id, name, portions, cooking_time, первый/число ингредиентов, шагов
+_INGREDIENT = struct.Struct("<Bidi")  # вложенная карта (1) или номенклатура (0), запись, количество, unit
+_STEP = struct.Struct("<iII")  # step_number, description
+_INDEX = struct.Struct("<III")  # ключ (строка), номер записи; строки индекса отсортированы по ключу
+
+# Разделы файла в порядке оглавления
+_COLLECTIONS = (reposity.range_key(), reposity.nomenclature_group_key(),
+                reposity.nomenclature_key(), reposity.receipt_key())
+_RECORDS = dict(zip(_COLLECTIONS, (_UNIT, _GROUP, _NOMENCLATURE, _RECEIPT)))
+_SECTIONS = (*(f"records:{key}" for key in _COLLECTIONS), "ingredients", "steps", "strings",
+             *(f"id:{key}" for key in _COLLECTIONS), *(f"name:{key}" for key in _COLLECTIONS))
+_SECTION = struct.Struct("<QQ")  # Смещение раздела, количество записей (для строк - размер в байтах)
+_HEADER = struct.Struct("<8sI")  # Признак формата, количество разделов
+
+
+class CatalogueSnapshotWriter:
+    """
+    Запись справочников репозитория (единиц, групп, номенклатуры, рецептов)
+    в бинарный снимок для CatalogueSnapshot.
+
+    Файл состоит из оглавления разделов, записей фиксированной длины
+    по коллекциям, строк состава и шагов рецептов, общей таблицы строк
+    (повторяющиеся строки хранятся один раз) и отсортированных индексов
+    "id -> запись" и "наименование -> запись" для каждой коллекции.
+    Ссылки между моделями хранятся номерами записей.
+    """
+
+    __repo: reposity = None  # Репозиторий-источник
+
+    def __init__(self, repo: reposity):
+        if not isinstance(repo, reposity):
+            raise ArgumentException("Репозиторий должен быть экземпляром reposity")
+        self.__repo = repo
+
+    def write(self, path: str) -> dict:
+        """
+        Запись снимка (через временный файл с атомарной заменой).
+
+        Returns:
+            dict: Ключ коллекции -> количество записанных моделей
+
+        Raises:
+            OperationException: Если модель ссылается на модель, отсутствующую в репозитории
+        """
+        models = {key: self.__repo.models(key) for key in _COLLECTIONS}
+        positions = {key: {model.id: position for position, model in enumerate(collection)}
+                     for key, collection in models.items()}
+        strings = bytearray()
+        offsets = {}
+
+        def text(value: str) -> tuple:
+            encoded = value.encode("utf-8")
+            offset = offsets.get(encoded)
+            if offset is None:
+                offset = offsets[encoded] = len(strings)
+                strings.extend(encoded)
+            return offset, len(encoded)
+
+        def position(key: str, model) -> int:
+            if model is None:
+                return -1
+            found = positions[key].get(model.id)
+            if found is None:
+                raise OperationException(f"Модель '{model.name}' коллекции {key} отсутствует в репозитории")
+            return found
+
+        sections = {}
+        sections[f"records:{reposity.range_key()}"] = [
+            _UNIT.pack(*text(unit.id), *text(unit.name), unit.factor,
+                       position(reposity.range_key(), unit.base_unit))
+            for unit in models[reposity.range_key()]]
+        sections[f"records:{reposity.nomenclature_group_key()}"] = [
+            _GROUP.pack(*text(group.id), *text(group.name),
+                        position(reposity.nomenclature_group_key(), group.parent))
+            for group in models[reposity.nomenclature_group_key()]]
+        sections[f"records:{reposity.nomenclature_key()}"] = [
+            _NOMENCLATURE.pack(*text(item.id), *text(item.name), *text(item.full_name),
+                               position(reposity.nomenclature_group_key(), item.group),
+                               position(reposity.range_key(), item.unit), item.price)
+            for item in models[reposity.nomenclature_key()]]
+        receipts, ingredients, steps = [], [], []
+        for receipt in models[reposity.receipt_key()]:
+            receipts.append(_RECEIPT.pack(*text(receipt.id), *text(receipt.name), receipt.portions,
+                                          *text(receipt.cooking_time),
+                                          len(ingredients), len(receipt.ingredients),
+                                          len(steps), len(receipt.cooking_steps)))
+            for item in receipt.ingredients:
+                if isinstance(item, ReceiptComponentModel):
+                    ingredients.append(_INGREDIENT.pack(1, position(reposity.receipt_key(), item.receipt),
+                                                        item.portions, -1))
+                else:
+                    ingredients.append(_INGREDIENT.pack(0, position(reposity.nomenclature_key(), item.nomenclature),
+                                                        item.quantity, position(reposity.range_key(), item.unit)))
+            steps.extend(_STEP.pack(step.step_number, *text(step.description)) for step in receipt.cooking_steps)
+        sections[f"records:{reposity.receipt_key()}"] = receipts
+        sections["ingredients"] = ingredients
+        sections["steps"] = steps
+        for key, collection in models.items():
+            for kind, value_of in (("id", lambda model: model.id), ("name", lambda model: model.name)):
+                keyed = sorted(((value_of(model).encode("utf-8"), number) for number, model in enumerate(collection)))
+                sections[f"{kind}:{key}"] = [_INDEX.pack(offsets[encoded], len(encoded), number)
+                                             for encoded, number in keyed]
+
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as stream:
+            offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+            directory = []
+            for name in _SECTIONS:
+                if name == "strings":
+                    directory.append(_SECTION.pack(offset, len(strings)))
+                    offset += len(strings)
+                else:
+                    rows = sections[name]
+                    directory.append(_SECTION.pack(offset, len(rows)))
+                    offset += sum(len(row) for row in rows)
+            stream.write(_HEADER.pack(_MAGIC, len(_SECTIONS)))
+            stream.write(b"".join(directory))
+            for name in _SECTIONS:
+                stream.write(strings if name == "strings" else b"".join(sections[name]))
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, path)
+        return {key: len(collection) for key, collection in models.items()}
+
+
+class CatalogueSnapshot:
+    """
+    Справочники из бинарного снимка (CatalogueSnapshotWriter), отображенного в память.
+
+    При открытии читается только оглавление, поэтому время открытия не
+    зависит от размера справочников. Модель создается при первом обращении
+    к ней (поиск по id или наименованию - двоичным поиском по индексу снимка)
+    вместе с моделями, на которые она ссылается, и запоминается: повторные
+    обращения возвращают тот же экземпляр. Файл отображается только для
+    чтения, поэтому процессы, открывшие один снимок, используют общие
+    страницы файлового кэша.
+
+    Созданные модели - обычные изменяемые модели; снимок их изменений не видит.
+    """
+
+    __file = None  # Открытый файл снимка
+    __map: mmap.mmap = None  # Отображение файла в память
+    __sections: dict = None  # Раздел -> (смещение, количество записей)
+    __models: dict = None  # Ключ коллекции -> {номер записи: созданная модель}
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            OperationException: Если файл не является снимком справочников
+        """
+        self.__file = open(path, "rb")
+        try:
+            size = os.fstat(self.__file.fileno()).st_size
+            if size < _HEADER.size:
+                raise OperationException(f"Файл {path} не является снимком справочников")
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = _HEADER.unpack_from(self.__map, 0)
+            if magic != _MAGIC or count != len(_SECTIONS) \
+                    or size < _HEADER.size + _SECTION.size * count:
+                raise OperationException(f"Файл {path} не является снимком справочников")
+        except BaseException:
+            self.close()
+            raise
+        self.__sections = {name: _SECTION.unpack_from(self.__map, _HEADER.size + _SECTION.size * number)
+                           for number, name in enumerate(_SECTIONS)}
+        self.__models = {key: {} for key in _COLLECTIONS}
+
+    def close(self):
+        """Закрытие отображения (созданные модели остаются действительными)"""
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def count(self, key: str) -> int:
+        """Количество моделей коллекции в снимке"""
+        return self.__sections[f"records:{self.__check_key(key)}"][1]
+
+    def materialized(self, key: str) -> int:
+        """Количество уже созданных моделей коллекции"""
+        return len(self.__models[self.__check_key(key)])
+
+    def get_by_id(self, key: str, model_id: str):
+        """Модель коллекции по идентификатору (None - не найдена)"""
+        numbers = self.__search(f"id:{self.__check_key(key)}", model_id, first_only=True)
+        return self.model(key, numbers[0]) if numbers else None
+
+    def find_by_name(self, key: str, name: str):
+        """Первая модель коллекции с указанным наименованием (None - не найдена)"""
+        numbers = self.__search(f"name:{self.__check_key(key)}", name, first_only=True)
+        return self.model(key, numbers[0]) if numbers else None
+
+    def find_all_by_name(self, key: str, name: str) -> list:
+        """Все модели коллекции с указанным наименованием"""
+        return [self.model(key, number)
+                for number in self.__search(f"name:{self.__check_key(key)}", name, first_only=False)]
+
+    def models(self, key: str) -> list:
+        """Все модели коллекции в порядке записи (создает еще не созданные)"""
+        return [self.model(key, number) for number in range(self.count(key))]
+
+    def model(self, key: str, number: int):
+        """Модель по номеру записи коллекции"""
+        created = self.__models[key].get(number)
+        if created is not None:
+            return created
+        if self.__map is None:
+            raise OperationException("Снимок справочников закрыт")
+        offset, count = self.__sections[f"records:{key}"]
+        if not 0 <= number < count:
+            raise ArgumentException(f"Нет записи {number} в коллекции {key}")
+        layout = _RECORDS[key]
+        row = layout.unpack_from(self.__map, offset + layout.size * number)
+        # Записи снимка проверены при создании моделей - повторная валидация не нужна;
+        # модели, на которые ссылается запись, создаются раньше нее (рецепт - до разбора состава)
+        if key == reposity.range_key():
+            model = UnitModel.from_trusted_row({
+                "id": self.__text(row[0], row[1]), "name": self.__text(row[2], row[3]), "factor": row[4],
+                "base_unit": self.model(key, row[5]) if row[5] >= 0 else None})
+            self.__models[key][number] = model
+        elif key == reposity.nomenclature_group_key():
+            model = NomenclatureGroupModel.from_trusted_row({
+                "id": self.__text(row[0], row[1]), "name": self.__text(row[2], row[3]),
+                "parent": self.model(key, row[4]) if row[4] >= 0 else None})
+            self.__models[key][number] = model
+        elif key == reposity.nomenclature_key():
+            model = NomenclatureModel.from_trusted_row({
+                "id": self.__text(row[0], row[1]), "name": self.__text(row[2], row[3]),
+                "full_name": self.__text(row[4], row[5]), "price": row[8],
+                "group": self.model(reposity.nomenclature_group_key(), row[6]) if row[6] >= 0 else None,
+                "unit": self.model(reposity.range_key(), row[7]) if row[7] >= 0 else None})
+            self.__models[key][number] = model
+        else:
+            model = ReceiptModel.from_trusted_row({"id": self.__text(row[0], row[1]),
+                                                   "name": self.__text(row[2], row[3]), "portions": row[4],
+                                                   "cooking_time": self.__text(row[5], row[6])})
+            self.__models[key][number] = model
+            model.extend_ingredients(self.__ingredients(row[7], row[8]))
+            model.extend_steps(self.__steps(row[9], row[10]))
+        return model
+
+    def __ingredients(self, first: int, count: int) -> list:
+        offset = self.__sections["ingredients"][0] + _INGREDIENT.size * first
+        result = []
+        for kind, target, quantity, unit in _INGREDIENT.iter_unpack(
+                self.__map[offset:offset + _INGREDIENT.size * count]):
+            if kind == 1:
+                result.append(ReceiptComponentModel.from_trusted_row(
+                    {"receipt": self.model(reposity.receipt_key(), target), "portions": quantity}))
+            else:
+                result.append(IngredientModel.from_trusted_row(
+                    {"nomenclature": self.model(reposity.nomenclature_key(), target), "quantity": quantity,
+                     "unit": self.model(reposity.range_key(), unit)}))
+        return result
+
+    def __steps(self, first: int, count: int) -> list:
+        offset = self.__sections["steps"][0] + _STEP.size * first
+        return [CookingStepModel.from_trusted_row({"step_number": step_number,
+                                                   "description": self.__text(text_offset, length)})
+                for step_number, text_offset, length in _STEP.iter_unpack(
+                    self.__map[offset:offset + _STEP.size * count])]
+
+    def __text(self, offset: int, length: int) -> str:
+        start = self.__sections["strings"][0] + offset
+        return self.__map[start:start + length].decode("utf-8")
+
+    def __search(self, section: str, value: str, first_only: bool) -> list:
+        """Номера записей с ключом value (двоичный поиск по отсортированному индексу)"""
+        if self.__map is None:
+            raise OperationException("Снимок справочников закрыт")
+        if not isinstance(value, str):
+            return []
+        target = value.encode("utf-8")
+        offset, count = self.__sections[section]
+        strings = self.__sections["strings"][0]
+        data = self.__map
+        unpack = _INDEX.unpack_from
+        size = _INDEX.size
+
+        def key_at(position: int) -> tuple:
+            text_offset, length, number = unpack(data, offset + size * position)
+            return data[strings + text_offset:strings + text_offset + length], number
+
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if key_at(middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        while low < count:
+            key, number = key_at(low)
+            if key != target:
+                break
+            result.append(number)
+            if first_only:
+                break
+            low += 1
+        return result
+
+    @staticmethod
+    def __check_key(key: str) -> str:
+        if key not in _RECORDS:
+            raise ArgumentException(f"Коллекция {key} не хранится в снимке справочников")
+        return key
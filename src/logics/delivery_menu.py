@@ -0,0 +1,205 @@
+"""
+Меню доставки: блюда с упаковкой
+"""
+from src.core.validator import ArgumentException, OperationException
+from src.logics.receipt_calculator import ReceiptCalculator
+from src.logics.receipt_cost_engine import ReceiptCostEngine
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+
+
+class DeliveryMenu:
+    """
+    Отдельное меню доставки, в каждое блюдо которого включается упаковка (п. 3.3 ТЗ).
+
+    Для рецепта создается вариант доставки - составная технологическая карта
+    на одну порцию: порция исходного рецепта (п. 2.5 ТЗ) и упаковка. Упаковка
+    задается общей для меню или отдельно для блюда; количество упаковки
+    указывается на порцию.
+
+    Состав и себестоимость вариантов считаются один раз и запоминаются
+    (ReceiptCalculator, ReceiptCostEngine). Изменение исходного рецепта
+    (ReceiptModel.version) сбрасывает только его вариант, изменение цены
+    упаковки или продукта корректирует только потребляющие их варианты,
+    замена упаковки пересобирает только варианты с этой упаковкой.
+    """
+
+    __calculator: ReceiptCalculator = None  # Разворот вариантов в потребность
+    __engine: ReceiptCostEngine = None  # Себестоимость вариантов
+    __packaging: tuple = ()  # Упаковка меню по умолчанию
+    __own_packaging: dict = None  # Рецепт -> упаковка блюда (если отличается от общей)
+    __variants: dict = None  # Рецепт -> вариант доставки
+    __receipts: dict = None  # Вариант доставки -> рецепт
+
+    def __init__(self, packaging: list = None, calculator: ReceiptCalculator = None):
+        """
+        Args:
+            packaging (list): Упаковка каждого блюда - IngredientModel на порцию
+            calculator (ReceiptCalculator): Расчет потребности (по умолчанию создается новый)
+        """
+        self.__packaging = self.__check_packaging(packaging or [])
+        self.__calculator = calculator or ReceiptCalculator()
+        self.__engine = ReceiptCostEngine(self.__calculator)
+        self.__own_packaging = {}
+        self.__variants = {}
+        self.__receipts = {}
+
+    @property
+    def receipts(self) -> list:
+        """Рецепты меню доставки"""
+        return list(self.__variants)
+
+    @property
+    def packaging(self) -> tuple:
+        """Упаковка меню по умолчанию"""
+        return self.__packaging
+
+    def add(self, receipt: ReceiptModel, packaging: list = None) -> ReceiptModel:
+        """
+        Включение рецепта в меню доставки (повторное включение заменяет упаковку).
+
+        Args:
+            packaging (list): Упаковка блюда (по умолчанию - упаковка меню)
+
+        Returns:
+            ReceiptModel: Вариант доставки
+
+        Raises:
+            OperationException: Если себестоимость варианта нельзя рассчитать
+                                (меню не изменяется)
+        """
+        if not isinstance(receipt, ReceiptModel):
+            raise ArgumentException("Рецепт должен быть экземпляром ReceiptModel")
+        previous = self.__own_packaging.get(receipt)
+        if packaging is None:
+            self.__own_packaging.pop(receipt, None)
+        else:
+            self.__own_packaging[receipt] = self.__check_packaging(packaging)
+        try:
+            return self.__rebuild(receipt)
+        except OperationException:
+            if previous is None:
+                self.__own_packaging.pop(receipt, None)
+            else:
+                self.__own_packaging[receipt] = previous
+            raise
+
+    def add_many(self, receipts) -> None:
+        """Включение нескольких рецептов с упаковкой меню"""
+        for receipt in receipts:
+            self.add(receipt)
+
+    def remove(self, receipt: ReceiptModel) -> bool:
+        """Исключение рецепта из меню доставки"""
+        variant = self.__variants.pop(receipt, None)
+        if variant is None:
+            return False
+        self.__own_packaging.pop(receipt, None)
+        self.__forget(variant)
+        return True
+
+    def variant(self, receipt: ReceiptModel) -> ReceiptModel:
+        """Вариант доставки рецепта (None - рецепт не входит в меню)"""
+        return self.__variants.get(receipt)
+
+    def set_packaging(self, packaging: list) -> list:
+        """
+        Замена упаковки меню по умолчанию.
+
+        Returns:
+            list: Рецепты, варианты которых пересобраны
+
+        Raises:
+            OperationException: Если себестоимость хотя бы одного варианта нельзя
+                                рассчитать (упаковка меню не изменяется)
+        """
+        previous = self.__packaging
+        self.__packaging = self.__check_packaging(packaging)
+        affected = [receipt for receipt in self.__variants if receipt not in self.__own_packaging]
+        rebuilt = []
+        try:
+            for receipt in affected:
+                self.__rebuild(receipt)
+                rebuilt.append(receipt)
+        except OperationException:
+            self.__packaging = previous
+            for receipt in rebuilt:
+                self.__rebuild(receipt)
+            raise
+        return affected
+
+    def composition(self, receipt: ReceiptModel) -> dict:
+        """
+        Полный состав порции блюда доставки вместе с упаковкой.
+
+        Returns:
+            MappingProxyType: (номенклатура, единица) -> количество на порцию (только для чтения)
+        """
+        return self.__calculator.per_portion(self.__variant(receipt))
+
+    def cost(self, receipt: ReceiptModel, portions: float = None) -> float:
+        """
+        Себестоимость блюда доставки вместе с упаковкой.
+
+        Args:
+            portions (float): Количество порций (по умолчанию - одна порция)
+        """
+        return self.__engine.cost(self.__variant(receipt), portions)
+
+    def set_price(self, nomenclature: NomenclatureModel, price: float) -> list:
+        """
+        Изменение цены продукта или упаковки.
+
+        Returns:
+            list: Рецепты, себестоимость доставки которых изменилась
+        """
+        return [self.__receipts[variant] for variant in self.__engine.set_price(nomenclature, price)]
+
+    def precompute(self) -> dict:
+        """
+        Расчет (или проверка актуальности) состава и себестоимости всех блюд меню.
+
+        Returns:
+            dict: Рецепт -> себестоимость порции доставки
+        """
+        return {receipt: self.__engine.cost(variant) for receipt, variant in self.__variants.items()}
+
+    def __variant(self, receipt: ReceiptModel) -> ReceiptModel:
+        variant = self.__variants.get(receipt)
+        if variant is None:
+            raise ArgumentException(f"Рецепт '{receipt.name}' не входит в меню доставки")
+        return variant
+
+    def __rebuild(self, receipt: ReceiptModel) -> ReceiptModel:
+        """Создание варианта доставки рецепта с текущей упаковкой (прежний вариант заменяется после расчета)"""
+        variant = ReceiptModel(receipt.name, 1, receipt.cooking_time)
+        variant.extend_ingredients([ReceiptComponentModel(receipt, 1),
+                                    *self.__own_packaging.get(receipt, self.__packaging)])
+        try:
+            self.__engine.add(variant)
+        except OperationException:
+            self.__calculator.invalidate(variant)
+            raise
+        previous = self.__variants.get(receipt)
+        if previous is not None:
+            self.__forget(previous)
+        self.__variants[receipt] = variant
+        self.__receipts[variant] = receipt
+        return variant
+
+    def __forget(self, variant: ReceiptModel):
+        """Удаление варианта из расчетов"""
+        self.__receipts.pop(variant, None)
+        self.__engine.remove(variant)
+        self.__calculator.invalidate(variant)
+
+    @staticmethod
+    def __check_packaging(packaging) -> tuple:
+        """Проверка строк упаковки"""
+        packaging = tuple(packaging)
+        for item in packaging:
+            if not isinstance(item, IngredientModel):
+                raise ArgumentException("Упаковка должна задаваться экземплярами IngredientModel")
+        return packaging
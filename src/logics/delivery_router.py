@@ -0,0 +1,205 @@
+"""
+Маршрутизация заказов на доставку: ближайший ресторан и район адреса
+"""
+import math
+from typing import NamedTuple
+from src.core.validator import ArgumentException
+from src.core.geometry import as_point
+from src.models.restaurant_model import RestaurantModel
+from src.models.district_model import DistrictModel
+
+
+class DeliveryRoute(NamedTuple):
+    """Результат маршрутизации заказа"""
+    restaurant: RestaurantModel  # Ближайший ресторан, работающий на доставку
+    district: DistrictModel  # Район адреса доставки
+    distance: float  # Расстояние от ресторана до адреса
+
+    @property
+    def price(self) -> float:
+        """Стоимость доставки (п. 3.1 ТЗ)"""
+        return self.district.delivery_price
+
+
+class DeliveryRouter:
+    """
+    Поиск ближайшего ресторана, работающего на доставку (п. 3.2 ТЗ),
+    и района адреса доставки (п. 3.1 ТЗ).
+
+    Рестораны хранятся в двумерном k-d дереве (плоские списки узлов),
+    районы - в равномерной сетке: в каждой ячейке перечислены районы,
+    чей ограничивающий прямоугольник ее пересекает, и точка проверяется
+    только на попадание в эти районы. Индексы строятся один раз
+    при создании маршрутизатора.
+    """
+
+    __xs: list = None  # Координата x узла дерева
+    __ys: list = None  # Координата y узла дерева
+    __axes: list = None  # Ось разбиения узла (0 - x, 1 - y)
+    __left: list = None  # Левый потомок узла (-1 - нет)
+    __right: list = None  # Правый потомок узла (-1 - нет)
+    __restaurants: list = None  # Ресторан узла
+    __root: int = -1  # Корень дерева
+    __districts: list = None  # Районы доставки
+    __origin: tuple = None  # Левый нижний угол сетки
+    __cell_size: float = 1.0  # Размер ячейки сетки
+    __columns: int = 0  # Количество ячеек сетки по x
+    __rows: int = 0  # Количество ячеек сетки по y
+    __cells: list = None  # Ячейка -> кортеж индексов районов
+
+    def __init__(self, restaurants: list, districts: list, cell_size: float = None):
+        """
+        Args:
+            restaurants (list): Рестораны (учитываются только работающие на доставку)
+            districts (list): Районы доставки
+            cell_size (float): Размер ячейки сетки районов (по умолчанию - около четырех ячеек на район)
+        """
+        for restaurant in restaurants:
+            if not isinstance(restaurant, RestaurantModel):
+                raise ArgumentException("Ресторан должен быть экземпляром RestaurantModel")
+        for district in districts:
+            if not isinstance(district, DistrictModel):
+                raise ArgumentException("Район должен быть экземпляром DistrictModel")
+        if cell_size is not None and cell_size <= 0:
+            raise ArgumentException("Размер ячейки должен быть положительным числом")
+
+        self.__xs, self.__ys, self.__axes = [], [], []
+        self.__left, self.__right, self.__restaurants = [], [], []
+        self.__root = self.__build([item for item in restaurants if item.delivers], 0)
+        self.__districts = list(districts)
+        self.__build_grid(cell_size)
+
+    def nearest_restaurant(self, point: tuple) -> tuple:
+        """
+        Ближайший к точке ресторан, работающий на доставку.
+
+        Returns:
+            tuple: (ресторан, расстояние) или (None, inf), если таких ресторанов нет
+        """
+        x, y = as_point(point)
+        node, distance = self.__nearest(x, y)
+        return (self.__restaurants[node] if node >= 0 else None), math.sqrt(distance)
+
+    def district_of(self, point: tuple) -> DistrictModel:
+        """Район, в который попадает точка (None - адрес вне районов доставки)"""
+        return self.__district(*as_point(point))
+
+    def route(self, point: tuple) -> DeliveryRoute:
+        """
+        Маршрутизация одного заказа.
+
+        Returns:
+            DeliveryRoute: Ресторан, район и расстояние; None - если адрес вне районов
+                           доставки или нет ресторанов, работающих на доставку
+        """
+        x, y = as_point(point)
+        return self.__route(x, y)
+
+    def route_many(self, points) -> list:
+        """
+        Маршрутизация очереди заказов.
+
+        Returns:
+            list: DeliveryRoute (или None) для каждой точки в порядке очереди
+        """
+        route = self.__route
+        return [route(*as_point(point)) for point in points]
+
+    def __route(self, x: float, y: float) -> DeliveryRoute:
+        district = self.__district(x, y)
+        if district is None:
+            return None
+        node, distance = self.__nearest(x, y)
+        if node < 0:
+            return None
+        return DeliveryRoute(self.__restaurants[node], district, math.sqrt(distance))
+
+    def __build(self, restaurants: list, depth: int) -> int:
+        """Построение поддерева; возвращает номер его корня (-1 - пустое)"""
+        if not restaurants:
+            return -1
+        axis = depth % 2
+        restaurants.sort(key=lambda item: item.location[axis])
+        middle = len(restaurants) // 2
+        restaurant = restaurants[middle]
+        node = len(self.__restaurants)
+        self.__xs.append(restaurant.location[0])
+        self.__ys.append(restaurant.location[1])
+        self.__axes.append(axis)
+        self.__restaurants.append(restaurant)
+        self.__left.append(-1)
+        self.__right.append(-1)
+        self.__left[node] = self.__build(restaurants[:middle], depth + 1)
+        self.__right[node] = self.__build(restaurants[middle + 1:], depth + 1)
+        return node
+
+    def __nearest(self, x: float, y: float) -> tuple:
+        """Номер ближайшего узла и квадрат расстояния до него"""
+        xs, ys, axes, left, right = self.__xs, self.__ys, self.__axes, self.__left, self.__right
+        best, best_distance = -1, math.inf
+        stack = [(self.__root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if node < 0 or bound >= best_distance:
+                continue
+            dx = x - xs[node]
+            dy = y - ys[node]
+            distance = dx * dx + dy * dy
+            if distance < best_distance:
+                best, best_distance = node, distance
+            difference = dx if axes[node] == 0 else dy
+            if difference < 0:
+                near, far = left[node], right[node]
+            else:
+                near, far = right[node], left[node]
+            # Дальнее поддерево просматривается, только если плоскость разбиения ближе найденного
+            stack.append((far, difference * difference))
+            stack.append((near, 0.0))
+        return best, best_distance
+
+    def __build_grid(self, cell_size: float):
+        """Распределение районов по ячейкам сетки"""
+        if not self.__districts:
+            self.__origin, self.__columns, self.__rows, self.__cells = (0.0, 0.0), 0, 0, []
+            return
+        min_x = min(district.bounds[0] for district in self.__districts)
+        min_y = min(district.bounds[1] for district in self.__districts)
+        max_x = max(district.bounds[2] for district in self.__districts)
+        max_y = max(district.bounds[3] for district in self.__districts)
+        if cell_size is None:
+            area = max((max_x - min_x) * (max_y - min_y), 1e-9)
+            cell_size = math.sqrt(area / (4 * len(self.__districts)))
+        self.__origin = (min_x, min_y)
+        self.__cell_size = cell_size
+        self.__columns = int((max_x - min_x) / cell_size) + 1
+        self.__rows = int((max_y - min_y) / cell_size) + 1
+
+        cells = [[] for _ in range(self.__columns * self.__rows)]
+        for index, district in enumerate(self.__districts):
+            left, bottom, right, top = self.__cell_range(district.bounds)
+            for row in range(bottom, top + 1):
+                for column in range(left, right + 1):
+                    cells[row * self.__columns + column].append(index)
+        self.__cells = [tuple(cell) for cell in cells]
+
+    def __cell_range(self, bounds: tuple) -> tuple:
+        """Диапазон ячеек (левая, нижняя, правая, верхняя), покрывающий прямоугольник"""
+        origin_x, origin_y = self.__origin
+        size = self.__cell_size
+        return (int((bounds[0] - origin_x) / size), int((bounds[1] - origin_y) / size),
+                int((bounds[2] - origin_x) / size), int((bounds[3] - origin_y) / size))
+
+    def __district(self, x: float, y: float) -> DistrictModel:
+        """Район точки по кандидатам из ее ячейки"""
+        origin_x, origin_y = self.__origin
+        if not self.__cells or x < origin_x or y < origin_y:
+            return None
+        column = int((x - origin_x) / self.__cell_size)
+        row = int((y - origin_y) / self.__cell_size)
+        if column >= self.__columns or row >= self.__rows:
+            return None
+        districts = self.__districts
+        for index in self.__cells[row * self.__columns + column]:
+            if districts[index].contains((x, y)):
+                return districts[index]
+        return None
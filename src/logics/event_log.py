@@ -0,0 +1,398 @@
+"""
+Журнал изменений репозитория с восстановлением при запуске
+"""
+import json
+import os
+import threading
+import time
+from src.indexed_reposity import indexed_reposity
+from src.core.validator import ArgumentException, OperationException
+from src.logics.catalogue_jsonl import (RECORD_TYPES, CatalogueExporter, CatalogueImporter,
+                                        order_by_dependencies)
+
+# Ключ коллекции -> тип записи
+_RECORD_TYPE_OF = {key: record_type for record_type, key in RECORD_TYPES.items()}
+
+
+class EventLog:
+    """
+    Журнал упреждающей записи изменений справочников (единиц, групп,
+    номенклатуры, рецептов) с периодическим сжатием в снимок.
+
+    В каталоге журнала лежат два файла в формате JSON Lines:
+    снимок (записи CatalogueExporter, его можно загрузить и CatalogueImporter)
+    и журнал событий после снимка - по строке на событие:
+    {"op": "put", "record": {...}}, {"op": "delete", "type": ..., "id": ...},
+    {"op": "reset", "type": ..., "records": [...]}.
+
+    Подключенный к репозиторию (attach) журнал получает его уведомления
+    (indexed_reposity.subscribe) и дописывает события в буфер. Буфер
+    записывается в файл и фиксируется на диске (fsync) одним вызовом - когда
+    накопится batch_size событий, а также при flush() и close(). Фоновый поток
+    фиксирует буфер, события которого ждут дольше flush_interval секунд, даже
+    если новых событий нет. При сбое теряются только события
+    незафиксированного буфера (batch_size=1 - фиксация каждого события).
+
+    При запуске (replay) снимок и журнал сводятся по id записей (побеждает
+    последнее событие) и загружаются в репозиторий одним проходом, поэтому
+    время восстановления зависит от размера справочников и журнала после
+    последнего сжатия, а не от всей истории изменений. Недописанная последняя
+    строка журнала (сбой во время записи) отбрасывается.
+
+    Сжатие записывает сведенное состояние в новый снимок (временный файл,
+    fsync, атомарная замена). Журнал событий сначала переносится в файл
+    сжатия, а новые события пишутся в новый журнал, поэтому после
+    compact_every событий сжатие идет в фоновом потоке, не задерживая запись
+    изменений; compact() выполняет его в вызывающем потоке. При запуске
+    журналы читаются в порядке "снимок, файл сжатия, журнал". События
+    идемпотентны, поэтому сбой на любом шаге сжатия не искажает состояние.
+
+    Изменения моделей фиксируются только через add/update/remove/set_data
+    репозитория; коллекции, не входящие в справочники, не записываются.
+    Предназначен для репозиториев в памяти (indexed_reposity, concurrent_reposity):
+    sqlite_reposity сохраняет данные сам.
+    """
+
+    __directory: str = ""  # Каталог журнала
+    __snapshot_path: str = ""  # Файл снимка
+    __log_path: str = ""  # Файл событий после снимка
+    __compacting_path: str = ""  # События, переносимые в снимок идущим (или прерванным) сжатием
+    __batch_size: int = 100  # Событий в одной фиксации
+    __flush_interval: float = 1.0  # Наибольший интервал между фиксациями (сек)
+    __compact_every: int = 10000  # Событий в журнале до автоматического сжатия (None - вручную)
+    __file = None  # Открытый на дозапись файл событий
+    __buffer: list = None  # Строки событий, еще не записанные в файл
+    __flushed_at: float = 0.0  # Время последней фиксации (time.monotonic)
+    __logged: int = 0  # Событий в журнале после последнего сжатия
+    __repo: indexed_reposity = None  # Подключенный репозиторий
+    __lock: threading.Lock = None  # Защита буфера и файла событий
+    __compaction: threading.Lock = None  # Захвачена, пока идет сжатие (в том числе фоновое)
+    __compaction_error: Exception = None  # Ошибка последнего фонового сжатия
+    __closing: threading.Event = None  # Сигнал остановки потока фиксации
+    __timer: threading.Thread = None  # Поток фиксации по flush_interval
+
+    def __init__(self, directory: str, batch_size: int = 100, flush_interval: float = 1.0,
+                 compact_every: int = 10000):
+        """
+        Args:
+            directory (str): Каталог журнала (создается при необходимости)
+            batch_size (int): Количество событий, после которого буфер фиксируется на диске
+            flush_interval (float): Наибольший интервал между фиксациями в секундах
+            compact_every (int): Количество событий, после которого журнал сжимается в снимок
+                                 (None - только вызовом compact)
+        """
+        if batch_size <= 0:
+            raise ArgumentException("Размер пакета фиксации должен быть положительным числом")
+        if flush_interval < 0:
+            raise ArgumentException("Интервал фиксации не может быть отрицательным")
+        if compact_every is not None and compact_every <= 0:
+            raise ArgumentException("Порог сжатия журнала должен быть положительным числом")
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__snapshot_path = os.path.join(directory, "snapshot.jsonl")
+        self.__log_path = os.path.join(directory, "events.jsonl")
+        self.__compacting_path = os.path.join(directory, "events.compacting.jsonl")
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__compact_every = compact_every
+        self.__buffer = []
+        self.__lock = threading.Lock()
+        self.__compaction = threading.Lock()
+        self.__closing = threading.Event()
+
+    @property
+    def snapshot_path(self) -> str:
+        return self.__snapshot_path
+
+    @property
+    def log_path(self) -> str:
+        return self.__log_path
+
+    @property
+    def pending(self) -> int:
+        """Количество событий, еще не зафиксированных на диске"""
+        return len(self.__buffer)
+
+    def replay(self, repo: indexed_reposity) -> dict:
+        """
+        Загрузка состояния из снимка и журнала в репозиторий.
+
+        Returns:
+            dict: Ключ коллекции -> количество загруженных моделей
+
+        Raises:
+            OperationException: Если файл поврежден не только в последней строке
+                                или запись ссылается на отсутствующую модель
+        """
+        if not isinstance(repo, indexed_reposity):
+            raise ArgumentException("Репозиторий должен быть экземпляром indexed_reposity")
+        with self.__compaction, self.__lock:
+            state, self.__logged = self.__load_state(self.__compacting_path, self.__log_path)
+        return CatalogueImporter(repo).import_records(self.__ordered(state))
+
+    def attach(self, repo: indexed_reposity) -> dict:
+        """
+        Восстановление репозитория (replay) и запись его дальнейших изменений.
+
+        Returns:
+            dict: Ключ коллекции -> количество восстановленных моделей
+        """
+        if self.__repo is not None:
+            raise OperationException("Журнал уже подключен к репозиторию")
+        counts = self.replay(repo)
+        with self.__lock:
+            self.__file = open(self.__log_path, "a", encoding="utf-8")
+            self.__flushed_at = time.monotonic()
+        self.__repo = repo
+        repo.subscribe(self.changed)
+        if self.__flush_interval > 0:
+            self.__closing.clear()
+            self.__timer = threading.Thread(target=self.__flush_periodically, daemon=True)
+            self.__timer.start()
+        return counts
+
+    def changed(self, operation: str, key: str, models: list):
+        """Запись изменения репозитория (вызывается репозиторием)"""
+        record_type = _RECORD_TYPE_OF.get(key)
+        if record_type is None:
+            return
+        if operation == "put":
+            lines = [{"op": "put", "record": CatalogueExporter.record(key, model)} for model in models]
+        elif operation == "delete":
+            lines = [{"op": "delete", "type": record_type, "id": model.id} for model in models]
+        elif operation == "reset":
+            lines = [{"op": "reset", "type": record_type,
+                      "records": [CatalogueExporter.record(key, model) for model in models]}]
+        else:
+            raise ArgumentException(f"Неизвестная операция '{operation}'")
+        with self.__lock:
+            if self.__file is None:
+                raise OperationException("Журнал закрыт")
+            for line in lines:
+                self.__buffer.append(json.dumps(line, ensure_ascii=False) + "\n")
+            if len(self.__buffer) >= self.__batch_size \
+                    or time.monotonic() - self.__flushed_at >= self.__flush_interval:
+                self.__flush()
+
+    def flush(self):
+        """Фиксация буфера событий на диске"""
+        with self.__lock:
+            self.__flush()
+
+    def compact(self):
+        """Сжатие: запись сведенного состояния в снимок и очистка журнала (ждет фоновое сжатие)"""
+        with self.__compaction:
+            with self.__lock:
+                self.__rotate()
+            self.__compact_rotated()
+
+    def close(self):
+        """
+        Фиксация буфера, отключение от репозитория, ожидание фонового сжатия и закрытие файла.
+
+        Raises:
+            OperationException: Если фоновое сжатие завершилось ошибкой (события остаются
+                                в файле сжатия и будут перенесены в снимок следующим сжатием)
+        """
+        if self.__repo is not None:
+            self.__repo.unsubscribe(self.changed)
+            self.__repo = None
+        if self.__timer is not None:
+            self.__closing.set()
+            self.__timer.join()
+            self.__timer = None
+        with self.__lock:
+            if self.__file is not None:
+                self.__flush()
+                self.__file.close()
+                self.__file = None
+        with self.__compaction:
+            error, self.__compaction_error = self.__compaction_error, None
+        if error is not None:
+            raise OperationException(f"Сжатие журнала не выполнено: {error}") from error
+
+    def __flush(self):
+        self.__write()
+        if self.__compact_every is not None and self.__logged >= self.__compact_every \
+                and self.__compaction.acquire(blocking=False):
+            # Сжатие идет в фоне; пока оно не закончится, новое не запускается
+            try:
+                self.__rotate()
+                threading.Thread(target=self.__compact_in_background, daemon=True).start()
+            except BaseException:
+                self.__compaction.release()
+                raise
+
+    def __flush_periodically(self):
+        """Поток фиксации: буфер записывается не позже flush_interval после прошлой фиксации"""
+        delay = self.__flush_interval
+        while not self.__closing.wait(delay):
+            with self.__lock:
+                if self.__file is None:
+                    return
+                if self.__buffer and time.monotonic() - self.__flushed_at >= self.__flush_interval:
+                    self.__flush()
+                delay = self.__flush_interval
+                if self.__buffer:
+                    delay = max(self.__flush_interval - (time.monotonic() - self.__flushed_at), 0.0)
+
+    def __write(self):
+        """Запись буфера в файл событий одной операцией и fsync"""
+        if self.__buffer:
+            self.__file.write("".join(self.__buffer))
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__logged += len(self.__buffer)
+            self.__buffer = []
+        self.__flushed_at = time.monotonic()
+
+    def __rotate(self):
+        """
+        Перенос зафиксированных событий в файл сжатия; дальнейшие события пишутся
+        в новый журнал (вызывается при захваченных __lock и __compaction).
+        """
+        if self.__file is not None:
+            self.__write()
+            self.__file.close()
+        if os.path.exists(self.__log_path):
+            if os.path.exists(self.__compacting_path):
+                # Прерванное сжатие: его события еще не в снимке, новые дописываются после них
+                with open(self.__log_path, "rb") as source, open(self.__compacting_path, "ab") as target:
+                    target.write(source.read())
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.remove(self.__log_path)
+            else:
+                os.replace(self.__log_path, self.__compacting_path)
+            self.__sync_directory()
+        if self.__file is not None:
+            self.__file = open(self.__log_path, "a", encoding="utf-8")
+        self.__logged = 0
+
+    def __compact_in_background(self):
+        try:
+            self.__compact_rotated()
+        except Exception as error:
+            self.__compaction_error = error
+        finally:
+            self.__compaction.release()
+
+    def __compact_rotated(self):
+        """
+        Запись снимка по прежнему снимку и файлу сжатия (вызывается при захваченной
+        __compaction; журнал новых событий не читается, поэтому __lock не нужна).
+        """
+        state, _ = self.__load_state(self.__compacting_path)
+        temporary = self.__snapshot_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as stream:
+            for record in self.__ordered(state):
+                stream.write(json.dumps(record, ensure_ascii=False))
+                stream.write("\n")
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, self.__snapshot_path)
+        self.__sync_directory()
+        # Снимок уже содержит все события файла сжатия: его можно удалить
+        if os.path.exists(self.__compacting_path):
+            os.remove(self.__compacting_path)
+            self.__sync_directory()
+
+    def __load_state(self, *logs: str) -> tuple:
+        """
+        Сведение снимка и журналов событий (в порядке следования).
+
+        Returns:
+            tuple: (тип записи -> {id -> запись}, количество событий журналов)
+        """
+        state = {record_type: {} for record_type in RECORD_TYPES}
+        for number, line in self.__lines(self.__snapshot_path):
+            try:
+                record = json.loads(line)
+                state[record["type"]][record["id"]] = record
+            except (ValueError, KeyError, TypeError) as error:
+                raise OperationException(f"Снимок, строка {number}: {error}") from error
+
+        count = 0
+        for path in logs:
+            count += self.__apply_events(state, path)
+        return state, count
+
+    def __apply_events(self, state: dict, path: str) -> int:
+        """Применение событий файла к сведенному состоянию; возвращает количество событий"""
+        count = 0
+        for number, line in self.__lines(path):
+            try:
+                event = json.loads(line)
+                operation = event["op"]
+                if operation == "put":
+                    record = event["record"]
+                    state[record["type"]][record["id"]] = record
+                elif operation == "delete":
+                    state[event["type"]].pop(event["id"], None)
+                elif operation == "reset":
+                    state[event["type"]] = {record["id"]: record for record in event["records"]}
+                else:
+                    raise OperationException(f"неизвестная операция '{operation}'")
+            except (ValueError, KeyError, TypeError, OperationException) as error:
+                raise OperationException(
+                    f"Журнал событий {os.path.basename(path)}, строка {number}: {error}") from error
+            count += 1
+        return count
+
+    @staticmethod
+    def __lines(path: str):
+        """
+        Полные строки файла с номерами.
+
+        Хвост после последнего перевода строки - недописанное при сбое
+        событие: он отбрасывается и отрезается от файла, чтобы новые
+        события не дописывались к нему.
+        """
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as stream:
+            content = stream.read()
+        end = content.rfind(b"\n") + 1
+        if end < len(content):
+            with open(path, "r+b") as stream:
+                stream.truncate(end)
+                os.fsync(stream.fileno())
+        lines = content[:end].decode("utf-8").splitlines()
+        return [(number, line) for number, line in enumerate(lines, start=1) if line.strip()]
+
+    @staticmethod
+    def __ordered(state: dict) -> list:
+        """Записи в порядке зависимостей для загрузки за один проход"""
+        units = state["unit"]
+        groups = state["group"]
+        receipts = state["receipt"]
+
+        def base_unit(record):
+            base = units.get(record.get("base_unit_id"))
+            return [base] if base is not None else []
+
+        def parent(record):
+            group = groups.get(record.get("parent_id"))
+            return [group] if group is not None else []
+
+        def components(record):
+            return [receipts[item["receipt_id"]] for item in record.get("ingredients", [])
+                    if item.get("receipt_id") in receipts]
+
+        def identity(record):
+            return record["id"]
+
+        return [*order_by_dependencies(list(units.values()), identity, base_unit),
+                *order_by_dependencies(list(groups.values()), identity, parent),
+                *state["nomenclature"].values(),
+                *order_by_dependencies(list(receipts.values()), identity, components)]
+
+    def __sync_directory(self):
+        """Фиксация замены файла в каталоге (где это поддерживается)"""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(self.__directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
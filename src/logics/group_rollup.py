@@ -0,0 +1,287 @@
+"""
+Итоги по иерархии номенклатурных групп
+"""
+from enum import Enum
+from src.core.validator import ArgumentException, OperationException
+from src.logics.stock_ledger import StockLedger
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.stock_movement_model import StockMovementType
+from src.models.storage_model import StorageModel
+from src.models.unit_model import UnitModel
+
+
+class RollupMeasure(Enum):
+    """Показатель итогов по группам"""
+    BALANCE = "Остаток"
+    CONSUMPTION = "Расход"
+    COST = "Стоимость расхода"
+
+
+class GroupRollup:
+    """
+    Итоги остатков, расхода и стоимости расхода по группам номенклатуры
+    вместе со всеми их подгруппами.
+
+    Для каждой группы запоминается она сама и все группы, в которые она
+    входит (таблица замыкания иерархии). Каждое изменение показателя
+    номенклатуры сразу прибавляется к итогам всех групп этой цепочки,
+    поэтому итог группы - одно обращение к словарю, независимо от размера
+    справочника. Итоги ведутся в целом и по складам; количества - в разрезе
+    корневой единицы измерения, стоимость - без единицы (по цене номенклатуры
+    на момент списания). Списание, которое нельзя пересчитать в единицу цены
+    номенклатуры, не оценивается, а о нем сообщает OperationException.
+
+    При подключении к журналу (StockLedger) остатки и списания загружаются
+    из него, а новые пакеты движений учитываются через подписку на журнал.
+    Перенос номенклатуры (NomenclatureModel.group_moves_since) или группы
+    (NomenclatureGroupModel.moves_since) вычитает ее показатели из итогов
+    прежней цепочки групп и прибавляет к новой - за время, пропорциональное глубине иерархии. Итоги
+    пересобираются из показателей отдельных позиций, только если журнал
+    переносов уже не содержит всех изменений или перенос группы идет
+    вместе с другими переносами.
+    """
+
+    __ledger: StockLedger = None  # Журнал складских движений
+    __items: dict = None  # (показатель, номенклатура, склад, единица) -> значение
+    __by_item: dict = None  # Номенклатура -> ключи ее значений в __items
+    __totals: dict = None  # Группа -> {(показатель, склад или None, единица) -> итог по поддереву группы}
+    __closure: dict = None  # Группа -> (группа и все группы, в которые она входит)
+    __children: dict = None  # Группа -> непосредственные подгруппы
+    __revision: int = -1  # Номер изменения иерархии групп, для которого актуальны итоги
+    __item_revision: int = -1  # Номер изменения групп номенклатуры, для которого актуальны итоги
+
+    def __init__(self, ledger: StockLedger = None):
+        """
+        Args:
+            ledger (StockLedger): Журнал, остатки и списания которого учитываются (необязательно)
+        """
+        if ledger is not None and not isinstance(ledger, StockLedger):
+            raise ArgumentException("Журнал должен быть экземпляром StockLedger")
+        self.__items = {}
+        self.__by_item = {}
+        self.__totals = {}
+        self.__closure = {}
+        self.__children = {}
+        self.__revision = NomenclatureGroupModel.revision()
+        self.__item_revision = NomenclatureModel.group_revision()
+        self.__ledger = ledger
+        if ledger is not None:
+            self.__load(ledger)
+            ledger.subscribe(self.movements_posted)
+
+    def close(self):
+        """Отключение от журнала"""
+        if self.__ledger is not None:
+            self.__ledger.unsubscribe(self.movements_posted)
+            self.__ledger = None
+
+    def add(self, measure: RollupMeasure, nomenclature: NomenclatureModel, amount: float,
+            storage: StorageModel = None, unit: UnitModel = None):
+        """
+        Учет изменения показателя номенклатуры (например, расхода вне складского журнала).
+
+        Args:
+            storage (StorageModel): Склад (None - без разреза по складам)
+            unit (UnitModel): Единица количества (для стоимости не указывается)
+        """
+        if not isinstance(measure, RollupMeasure):
+            raise ArgumentException("Показатель должен быть экземпляром RollupMeasure")
+        if not isinstance(nomenclature, NomenclatureModel):
+            raise ArgumentException("Номенклатура должна быть экземпляром NomenclatureModel")
+        self.__refresh_if_changed()
+        self.__add(measure, nomenclature, storage, unit, amount)
+
+    def total(self, group: NomenclatureGroupModel, measure: RollupMeasure,
+              storage: StorageModel = None, unit: UnitModel = None) -> float:
+        """
+        Итог показателя по группе и всем ее подгруппам.
+
+        Args:
+            storage (StorageModel): Склад (None - по всем складам)
+            unit (UnitModel): Корневая единица количества (для стоимости не указывается)
+
+        Raises:
+            ArgumentException: Если для количества не указана корневая единица
+                               или для стоимости указана единица
+        """
+        if not isinstance(measure, RollupMeasure):
+            raise ArgumentException("Показатель должен быть экземпляром RollupMeasure")
+        if measure == RollupMeasure.COST:
+            if unit is not None:
+                raise ArgumentException("Стоимость расхода ведется без единицы измерения")
+        elif not isinstance(unit, UnitModel) or unit.base_unit is not None:
+            raise ArgumentException("Итог количества запрашивается в корневой единице измерения")
+        self.__refresh_if_changed()
+        totals = self.__totals.get(group)
+        return totals.get((measure, storage, unit), 0.0) if totals is not None else 0.0
+
+    def subgroups(self, group: NomenclatureGroupModel) -> list:
+        """Все подгруппы группы (в глубину), по которым накоплены показатели"""
+        self.__refresh_if_changed()
+        result = []
+        stack = list(self.__children.get(group, ()))
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(self.__children.get(current, ()))
+        return result
+
+    def refresh(self):
+        """Пересборка итогов по текущей иерархии групп"""
+        self.__revision = NomenclatureGroupModel.revision()
+        self.__item_revision = NomenclatureModel.group_revision()
+        self.__closure.clear()
+        self.__children.clear()
+        self.__totals.clear()
+        self.__by_item.clear()
+        items = self.__items
+        self.__items = {}
+        for (measure, nomenclature, storage, unit), amount in items.items():
+            self.__add(measure, nomenclature, storage, unit, amount)
+
+    def movements_posted(self, movements: list, deltas: list):
+        """
+        Учет пакета движений, проведенного в журнале (вызывается журналом).
+
+        Raises:
+            OperationException: Если стоимость списания нельзя рассчитать по цене
+                                номенклатуры (остатки и расход учитываются, стоимость - нет)
+        """
+        self.__refresh_if_changed()
+        add = self.__add
+        error = None
+        for movement, movement_deltas in zip(movements, deltas):
+            for (storage, nomenclature, unit), quantity in movement_deltas:
+                add(RollupMeasure.BALANCE, nomenclature, storage, unit, quantity)
+            if movement.movement_type == StockMovementType.WRITE_OFF:
+                (storage, nomenclature, unit), quantity = movement_deltas[0]
+                add(RollupMeasure.CONSUMPTION, nomenclature, storage, unit, -quantity)
+                try:
+                    add(RollupMeasure.COST, nomenclature, storage, None, self.__cost(nomenclature, unit, -quantity))
+                except OperationException as exception:
+                    # Движение уже проведено в журнале: остальные итоги пакета учитываются до конца
+                    error = error or exception
+        if error is not None:
+            raise error
+
+    def __load(self, ledger: StockLedger):
+        """Загрузка остатков и списаний журнала"""
+        for (storage, nomenclature, unit), quantity in ledger.balances().items():
+            self.__add(RollupMeasure.BALANCE, nomenclature, storage, unit, quantity)
+        to_root = ledger.converter.to_root
+        for movement in ledger.movements:
+            if movement.movement_type == StockMovementType.WRITE_OFF:
+                unit, factor = to_root(movement.unit)
+                quantity = movement.quantity * factor
+                self.__add(RollupMeasure.CONSUMPTION, movement.nomenclature, movement.storage, unit, quantity)
+                self.__add(RollupMeasure.COST, movement.nomenclature, movement.storage, None,
+                           self.__cost(movement.nomenclature, unit, quantity))
+
+    def __add(self, measure: RollupMeasure, nomenclature: NomenclatureModel, storage, unit, amount: float):
+        """Учет значения позиции и его прибавление к итогам групп"""
+        key = (measure, nomenclature, storage, unit)
+        items = self.__items
+        if key in items:
+            items[key] += amount
+        else:
+            items[key] = amount
+            self.__by_item.setdefault(nomenclature, set()).add(key)
+        self.__spread(measure, nomenclature.group, storage, unit, amount)
+
+    def __spread(self, measure: RollupMeasure, group, storage, unit, amount: float):
+        """Прибавление значения к итогам группы и всех групп над ней"""
+        if group is None:
+            return
+        chain = self.__closure.get(group)
+        if chain is None:
+            chain = self.__chain(group)
+        totals = self.__totals
+        overall = (measure, None, unit)
+        by_storage = (measure, storage, unit) if storage is not None else None
+        for ancestor in chain:
+            bucket = totals.get(ancestor)
+            if bucket is None:
+                bucket = totals[ancestor] = {}
+            bucket[overall] = bucket.get(overall, 0.0) + amount
+            if by_storage is not None:
+                bucket[by_storage] = bucket.get(by_storage, 0.0) + amount
+
+    def __move_item(self, nomenclature: NomenclatureModel, previous, current):
+        """Перенос показателей номенклатуры из цепочки прежней группы в цепочку новой"""
+        items = self.__items
+        for key in self.__by_item.get(nomenclature, ()):
+            measure, _, storage, unit = key
+            amount = items[key]
+            self.__spread(measure, previous, storage, unit, -amount)
+            self.__spread(measure, current, storage, unit, amount)
+
+    def __move_group(self, group: NomenclatureGroupModel, previous):
+        """Перенос итогов поддерева группы из цепочки прежнего родителя в цепочку нового"""
+        closure = self.__closure
+        chain = closure.get(group)
+        if chain is None:
+            return  # По поддереву группы показатели не накоплены
+        # Строки замыкания поддерева строятся заново при следующем обращении
+        stack = [group]
+        while stack:
+            current = stack.pop()
+            closure.pop(current, None)
+            stack.extend(self.__children.get(current, ()))
+        if previous is not None:
+            self.__children.get(previous, set()).discard(group)
+        new_chain = self.__chain(group)
+
+        totals = self.__totals
+        amounts = list(totals.get(group, {}).items())
+        for ancestors, sign in ((chain[1:], -1.0), (new_chain[1:], 1.0)):
+            for ancestor in ancestors:
+                bucket = totals.get(ancestor)
+                if bucket is None:
+                    bucket = totals[ancestor] = {}
+                for key, amount in amounts:
+                    bucket[key] = bucket.get(key, 0.0) + sign * amount
+
+    def __chain(self, group: NomenclatureGroupModel) -> tuple:
+        """Строки таблицы замыкания для группы и всех групп над ней"""
+        chain = tuple(group.ancestors)
+        for position, current in enumerate(chain):
+            if current in self.__closure:
+                break
+            self.__closure[current] = chain[position:]
+            if position + 1 < len(chain):
+                self.__children.setdefault(chain[position + 1], set()).add(current)
+        return chain
+
+    def __cost(self, nomenclature: NomenclatureModel, unit: UnitModel, quantity: float) -> float:
+        """Стоимость количества в корневой единице по цене единицы номенклатуры"""
+        if nomenclature.unit is None:
+            raise OperationException(
+                f"У номенклатуры '{nomenclature.name}' не задана единица цены: стоимость расхода не рассчитывается")
+        root, factor = self.__ledger.converter.to_root(nomenclature.unit)
+        if root != unit:
+            raise OperationException(
+                f"Расход '{nomenclature.name}' в единице '{unit.name}' нельзя пересчитать "
+                f"в единицу цены '{nomenclature.unit.name}'")
+        return quantity / factor * nomenclature.price
+
+    def __refresh_if_changed(self):
+        revision = NomenclatureGroupModel.revision()
+        item_revision = NomenclatureModel.group_revision()
+        if self.__revision == revision and self.__item_revision == item_revision:
+            return
+        # Переносы берутся ровно до прочитанных номеров: более поздние будут учтены следующей проверкой
+        group_moves = NomenclatureGroupModel.moves_since(self.__revision, revision)
+        item_moves = NomenclatureModel.group_moves_since(self.__item_revision, item_revision)
+        if group_moves is None or item_moves is None or any(model is None for model, _, _ in group_moves) \
+                or (group_moves and (len(group_moves) > 1 or item_moves)):
+            # Журнал не содержит всех переносов, или перенос группы нельзя применить
+            # отдельно от остальных (цепочки групп уже отражают их все) - полная пересборка
+            self.refresh()
+            return
+        for group, previous, _ in group_moves:
+            self.__move_group(group, previous)
+        for item, previous, current in item_moves:
+            self.__move_item(item, previous, current)
+        self.__revision = revision
+        self.__item_revision = item_revision
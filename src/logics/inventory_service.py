@@ -0,0 +1,194 @@
+"""
+Инвентаризация складов: сверка фактических остатков с учетными
+"""
+from datetime import datetime
+from typing import NamedTuple
+from src.core.validator import ArgumentException
+from src.logics.stock_ledger import StockLedger
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.models.unit_model import UnitModel
+
+
+class InventoryDiscrepancy(NamedTuple):
+    """Расхождение фактического остатка с учетным (количества - в корневой единице)"""
+    storage: StorageModel  # Склад
+    nomenclature: NomenclatureModel  # Номенклатура
+    unit: UnitModel  # Корневая единица измерения
+    book: float  # Учетный остаток
+    counted: float  # Фактический остаток
+
+    @property
+    def difference(self) -> float:
+        """Излишек (больше нуля) или недостача (меньше нуля)"""
+        return self.counted - self.book
+
+
+class InventoryService:
+    """
+    Плановая (п. 1.3 ТЗ) и частичная по группам номенклатуры (п. 1.4 ТЗ)
+    инвентаризация складов.
+
+    Результаты пересчета принимаются пакетом строк
+    (склад, номенклатура, количество[, единица]) сразу по нескольким складам.
+    Учетные остатки на дату инвентаризации берутся из журнала одним запросом
+    и сверяются с фактом за один проход; позиции, которые входят в
+    инвентаризацию, но не были посчитаны, считаются отсутствующими.
+    Корректировки (поступление излишков, списание недостач) проводятся
+    в журнале одним пакетом.
+    """
+
+    __ledger: StockLedger = None  # Журнал складских движений
+    __tolerance: float = 1e-9  # Расхождение меньше этого значения не корректируется
+
+    def __init__(self, ledger: StockLedger):
+        """
+        Args:
+            ledger (StockLedger): Журнал складских движений
+        """
+        if not isinstance(ledger, StockLedger):
+            raise ArgumentException("Журнал должен быть экземпляром StockLedger")
+        self.__ledger = ledger
+
+    def reconcile(self, counts, period: datetime, storages: list = None, groups: list = None) -> list:
+        """
+        Сверка результатов пересчета с учетными остатками.
+
+        Args:
+            counts: Строки пересчета (склад, номенклатура, количество[, единица]);
+                    единица по умолчанию - единица номенклатуры, повторные строки суммируются
+            period (datetime): Дата инвентаризации
+            storages (list): Инвентаризируемые склады (по умолчанию - склады из строк пересчета)
+            groups (list): Группы номенклатуры частичной инвентаризации вместе с их подгруппами
+                           (None - плановая, все позиции)
+
+        Returns:
+            list: InventoryDiscrepancy по позициям с расхождением
+
+        Raises:
+            ArgumentException: Если строка пересчета некорректна или не относится
+                               к инвентаризируемым складам и группам
+        """
+        if not isinstance(period, datetime):
+            raise ArgumentException("Дата инвентаризации должна быть экземпляром datetime")
+        groups = self.__check_groups(groups)
+        in_scope = self.__scope(groups) if groups is not None else None
+        if storages is not None:
+            storages = self.__check_storages(storages)
+        counted = self.__counted(counts, storages, in_scope)
+        if storages is None:
+            storages = {storage for storage, _, _ in counted}
+
+        # Копия остатков: сопоставленные позиции удаляются, остаются не посчитанные
+        book = self.__ledger.balances_at(period)
+        tolerance = self.__tolerance
+        result = []
+        for key, quantity in counted.items():
+            balance = book.pop(key, 0.0)
+            if abs(quantity - balance) > tolerance:
+                result.append(InventoryDiscrepancy(*key, balance, quantity))
+        for key, balance in book.items():
+            storage, nomenclature, _ = key
+            if abs(balance) > tolerance and storage in storages \
+                    and (in_scope is None or in_scope(nomenclature.group)):
+                result.append(InventoryDiscrepancy(*key, balance, 0.0))
+        return result
+
+    def post(self, discrepancies: list, period: datetime) -> list:
+        """
+        Проведение корректировок по расхождениям одним пакетом.
+
+        Returns:
+            list: Проведенные движения
+        """
+        movements = []
+        for item in discrepancies:
+            difference = item.difference
+            if difference > 0:
+                movement_type = StockMovementType.RECEIPT
+            elif difference < 0:
+                movement_type = StockMovementType.WRITE_OFF
+            else:
+                continue
+            movements.append(StockMovementModel(movement_type, item.nomenclature, item.storage,
+                                                abs(difference), item.unit, period))
+        self.__ledger.post_many(movements)
+        return movements
+
+    def conduct(self, counts, period: datetime, storages: list = None, groups: list = None) -> list:
+        """
+        Инвентаризация: сверка и проведение корректировок.
+
+        Returns:
+            list: InventoryDiscrepancy по позициям с расхождением
+        """
+        discrepancies = self.reconcile(counts, period, storages, groups)
+        self.post(discrepancies, period)
+        return discrepancies
+
+    def __counted(self, counts, storages: set, in_scope) -> dict:
+        """Фактические остатки: (склад, номенклатура, корневая единица) -> количество"""
+        to_root = self.__ledger.converter.to_root
+        roots = {}  # id(единица) -> (корневая единица, коэффициент): единиц в пересчете немного
+        counted = {}
+        for row in counts:
+            if len(row) == 3:
+                storage, nomenclature, quantity = row
+                unit = nomenclature.unit
+            else:
+                storage, nomenclature, quantity, unit = row
+                unit = unit or nomenclature.unit
+            if not isinstance(storage, StorageModel):
+                raise ArgumentException("Склад должен быть экземпляром StorageModel")
+            if storages is not None and storage not in storages:
+                raise ArgumentException(f"Склад '{storage.name}' не входит в инвентаризацию")
+            if not isinstance(nomenclature, NomenclatureModel):
+                raise ArgumentException("Номенклатура должна быть экземпляром NomenclatureModel")
+            if not isinstance(quantity, (int, float)) or isinstance(quantity, bool) or quantity < 0:
+                raise ArgumentException(f"Количество '{nomenclature.name}' должно быть неотрицательным числом")
+            if in_scope is not None and not in_scope(nomenclature.group):
+                raise ArgumentException(f"Номенклатура '{nomenclature.name}' не входит в группы инвентаризации")
+            root = roots.get(id(unit))
+            if root is None:
+                root = roots[id(unit)] = to_root(StockLedger._unit_for(nomenclature, unit))
+            key = (storage, nomenclature, root[0])
+            counted[key] = counted.get(key, 0.0) + quantity * root[1]
+        return counted
+
+    @staticmethod
+    def __check_storages(storages) -> set:
+        storages = set(storages)
+        for storage in storages:
+            if not isinstance(storage, StorageModel):
+                raise ArgumentException("Склад должен быть экземпляром StorageModel")
+        return storages
+
+    @staticmethod
+    def __scope(groups: set):
+        """
+        Проверка вхождения группы номенклатуры в инвентаризируемые группы или их подгруппы
+        (по цепочке групп над ней; результат запоминается для каждой группы).
+        """
+        known = {None: False}
+
+        def in_scope(group) -> bool:
+            result = known.get(group)
+            if result is None:
+                result = known[group] = not groups.isdisjoint(group.ancestors)
+            return result
+
+        return in_scope
+
+    @staticmethod
+    def __check_groups(groups) -> set:
+        if groups is None:
+            return None
+        groups = set(groups)
+        if not groups:
+            raise ArgumentException("Для частичной инвентаризации нужно указать группы номенклатуры")
+        for group in groups:
+            if not isinstance(group, NomenclatureGroupModel):
+                raise ArgumentException("Группа должна быть экземпляром NomenclatureGroupModel")
+        return groups
@@ -0,0 +1,111 @@
+"""
+Проведение производства: списание ингредиентов по заказам на производство
+"""
+from enum import Enum
+from src.core.validator import ArgumentException
+from src.logics.stock_ledger import StockLedger
+from src.logics.receipt_calculator import ReceiptCalculator
+from src.models.production_order_model import ProductionOrderModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.settings_manager import SettingsManager
+
+
+class WriteOffMode(Enum):
+    """Вариант списания номенклатуры (п. 2.2 ТЗ)"""
+    BLOCKING = "С блокировкой в случае недостатка остатков"
+    UNDER_BALANCE = "Под сальдо"
+
+
+class ProductionService:
+    """
+    Пакетное проведение заказов на производство.
+
+    Заказы пакета группируются по складам и периодам, разворачиваются в
+    потребность одним вызовом ReceiptCalculator.expand_orders на группу, а списания
+    проводятся в журнале одним пакетом: остатки всех позиций проверяются
+    за один проход, и либо проводится весь пакет, либо ничего.
+    """
+
+    __ledger: StockLedger = None  # Журнал складских движений
+    __calculator: ReceiptCalculator = None  # Расчет потребности по технологическим картам
+
+    def __init__(self, ledger: StockLedger, calculator: ReceiptCalculator = None):
+        """
+        Args:
+            ledger (StockLedger): Журнал складских движений
+            calculator (ReceiptCalculator): Расчет потребности (по умолчанию - с конвертером журнала)
+        """
+        if not isinstance(ledger, StockLedger):
+            raise ArgumentException("Журнал должен быть экземпляром StockLedger")
+        self.__ledger = ledger
+        self.__calculator = calculator or ReceiptCalculator(ledger.converter)
+
+    @property
+    def calculator(self) -> ReceiptCalculator:
+        return self.__calculator
+
+    def requirements(self, orders: list) -> dict:
+        """
+        Потребность пакета заказов по складам.
+
+        Returns:
+            dict: Склад -> {(номенклатура, единица): количество}
+        """
+        return self.__expand(orders, lambda order: order.storage)
+
+    def requirements_by_period(self, orders: list) -> dict:
+        """
+        Потребность пакета заказов по складам и периодам заказов.
+
+        Returns:
+            dict: (склад, период) -> {(номенклатура, единица): количество}
+        """
+        return self.__expand(orders, lambda order: (order.storage, order.period))
+
+    def post(self, orders: list, mode: WriteOffMode = None) -> list:
+        """
+        Проведение пакета заказов на производство.
+
+        На каждую позицию (склад, период, номенклатура, единица) создается одно
+        движение списания с датой заказов этого периода.
+
+        Args:
+            orders (list): Заказы ProductionOrderModel
+            mode (WriteOffMode): Вариант списания (по умолчанию - по storage.allow_negative_balance
+                                 настроек приложения)
+
+        Returns:
+            list: Проведенные движения списания
+
+        Raises:
+            OperationException: В режиме BLOCKING - если остатка хотя бы одной позиции
+                                недостаточно (пакет не проводится)
+        """
+        if mode is None:
+            mode = WriteOffMode.UNDER_BALANCE if SettingsManager().app_config.storage.allow_negative_balance \
+                else WriteOffMode.BLOCKING
+        if not isinstance(mode, WriteOffMode):
+            raise ArgumentException("Вариант списания должен быть экземпляром WriteOffMode")
+        if not orders:
+            return []
+
+        # Движения проводятся в порядке дат: журнал дописывает их в конец без вставок в середину
+        groups = sorted(self.requirements_by_period(orders).items(), key=lambda group: group[0][1])
+        movements = []
+        for (storage, period), requirements in groups:
+            for (nomenclature, unit), quantity in requirements.items():
+                movements.append(StockMovementModel(
+                    StockMovementType.WRITE_OFF, nomenclature, storage, quantity, unit, period))
+
+        self.__ledger.post_many(movements, allow_negative=mode == WriteOffMode.UNDER_BALANCE)
+        return movements
+
+    def __expand(self, orders: list, group_of) -> dict:
+        """Потребность пакета заказов по группам (group_of: заказ -> ключ группы)"""
+        groups = {}
+        for order in orders:
+            if not isinstance(order, ProductionOrderModel):
+                raise ArgumentException("Заказ должен быть экземпляром ProductionOrderModel")
+            groups.setdefault(group_of(order), []).append((order.receipt, order.portions))
+        return {group: self.__calculator.expand_orders(group_orders)
+                for group, group_orders in groups.items()}
@@ -0,0 +1,157 @@
+"""
+Расчет потребности в номенклатуре по технологическим картам
+"""
+from collections import OrderedDict
+from types import MappingProxyType
+from src.core.validator import ArgumentException, OperationException
+from src.logics.unit_converter import UnitConverter
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.unit_model import UnitModel
+from src.settings_manager import SettingsManager
+
+
+class ReceiptCalculator:
+    """
+    Разворачивает технологическую карту (в том числе составную, п. 2.5 ТЗ)
+    в потребность в базовой номенклатуре.
+
+    Потребность на одну порцию каждого рецепта запоминается вместе с номерами
+    изменений (ReceiptModel.version) всех входящих в него карт и пересчитывается,
+    только если изменилась одна из них или коэффициенты единиц измерения.
+    Хранится не более max_size разворотов (раньше других вытесняются
+    рассчитанные раньше).
+
+    Количество приводится к единице номенклатуры, если она пересчитывается
+    из единицы ингредиента, иначе - к корневой единице ингредиента.
+    """
+
+    __converter: UnitConverter = None  # Пересчет единиц измерения
+    __cache: OrderedDict = None  # Рецепт -> (потребность на порцию только для чтения, ((рецепт, версия), ...))
+    __max_size: int = 10_000  # Наибольшее количество разворотов в кэше
+    __unit_revision: int = -1  # Номер изменения единиц, для которого актуален кэш
+
+    def __init__(self, converter: UnitConverter = None, max_size: int = None):
+        """
+        Args:
+            converter (UnitConverter): Конвертер единиц (по умолчанию создается новый)
+            max_size (int): Наибольшее количество разворотов в кэше (по умолчанию - caches.receipt_expansions
+                            настроек приложения)
+        """
+        if max_size is None:
+            max_size = SettingsManager().app_config.caches.receipt_expansions
+        if max_size <= 0:
+            raise ArgumentException("Размер кэша разворотов должен быть положительным числом")
+        self.__converter = converter or UnitConverter()
+        self.__cache = OrderedDict()
+        self.__max_size = max_size
+
+    @property
+    def converter(self) -> UnitConverter:
+        return self.__converter
+
+    def invalidate(self, receipt: ReceiptModel = None):
+        """Сброс запомненного разворота рецепта (None - всех рецептов)"""
+        if receipt is None:
+            self.__cache.clear()
+        else:
+            self.__cache.pop(receipt, None)
+
+    def per_portion(self, receipt: ReceiptModel) -> dict:
+        """
+        Потребность на одну порцию рецепта.
+
+        Returns:
+            MappingProxyType: (номенклатура, единица) -> количество (запомненный разворот
+                              только для чтения)
+
+        Raises:
+            OperationException: Если технологические карты вложены друг в друга циклически
+        """
+        if not isinstance(receipt, ReceiptModel):
+            raise ArgumentException("Рецепт должен быть экземпляром ReceiptModel")
+        if self.__unit_revision != UnitModel.revision():
+            self.__cache.clear()
+            self.__unit_revision = UnitModel.revision()
+        return self.__expand(receipt, set())[0]
+
+    def expand(self, receipt: ReceiptModel, portions: float = None) -> dict:
+        """
+        Потребность в номенклатуре на заданное количество порций.
+
+        Args:
+            portions (float): Количество порций (по умолчанию - выход рецепта)
+
+        Returns:
+            dict: (номенклатура, единица) -> количество
+        """
+        per_portion = self.per_portion(receipt)
+        portions = receipt.portions if portions is None else portions
+        return {key: quantity * portions for key, quantity in per_portion.items()}
+
+    def expand_orders(self, orders: list) -> dict:
+        """
+        Суммарная потребность по пакету производственных заказов.
+
+        Порции одинаковых рецептов сначала складываются, поэтому каждый рецепт
+        разворачивается и умножается один раз на весь пакет.
+
+        Args:
+            orders (list): Пары (рецепт, количество порций)
+
+        Returns:
+            dict: (номенклатура, единица) -> количество
+        """
+        portions_by_receipt = {}
+        for receipt, portions in orders:
+            if portions <= 0:
+                raise ArgumentException("Количество порций должно быть положительным числом")
+            portions_by_receipt[receipt] = portions_by_receipt.get(receipt, 0) + portions
+
+        result = {}
+        for receipt, portions in portions_by_receipt.items():
+            for key, quantity in self.per_portion(receipt).items():
+                result[key] = result.get(key, 0.0) + quantity * portions
+        return result
+
+    def __expand(self, receipt: ReceiptModel, path: set) -> tuple:
+        """Потребность на порцию и зависимости рецепта (с проверкой актуальности кэша)"""
+        cached = self.__cache.get(receipt)
+        if cached is not None and all(item.version == version for item, version in cached[1]):
+            return cached
+
+        if receipt in path:
+            raise OperationException(f"Технологическая карта '{receipt.name}' включает сама себя")
+        path.add(receipt)
+
+        per_portion = {}
+        dependencies = [(receipt, receipt.version)]
+        for item in receipt.ingredients:
+            if isinstance(item, ReceiptComponentModel):
+                nested, nested_dependencies = self.__expand(item.receipt, path)
+                ratio = item.portions / receipt.portions
+                for key, quantity in nested.items():
+                    per_portion[key] = per_portion.get(key, 0.0) + quantity * ratio
+                dependencies.extend(nested_dependencies)
+            else:
+                unit, factor = self.__target_unit(item.nomenclature, item.unit)
+                key = (item.nomenclature, unit)
+                per_portion[key] = per_portion.get(key, 0.0) + item.quantity * factor / receipt.portions
+
+        path.discard(receipt)
+        result = (MappingProxyType(per_portion), tuple(dependencies))
+        cache = self.__cache
+        cache[receipt] = result
+        cache.move_to_end(receipt)
+        while len(cache) > self.__max_size:
+            cache.popitem(last=False)
+        return result
+
+    def __target_unit(self, nomenclature, unit: UnitModel) -> tuple:
+        """Единица потребности и коэффициент пересчета в нее из единицы ингредиента"""
+        root, factor = self.__converter.to_root(unit)
+        if nomenclature.unit is not None:
+            nomenclature_root, nomenclature_factor = self.__converter.to_root(nomenclature.unit)
+            if nomenclature_root == root:
+                return nomenclature.unit, factor / nomenclature_factor
+        return root, factor
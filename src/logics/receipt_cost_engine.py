@@ -0,0 +1,217 @@
+"""
+Себестоимость рецептов с пересчетом при изменении цен номенклатуры
+"""
+from src.core.validator import ArgumentException, OperationException
+from src.logics.receipt_calculator import ReceiptCalculator
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.unit_model import UnitModel
+
+
+class ReceiptCostEngine:
+    """
+    Себестоимость порции рецептов меню.
+
+    Для каждого рецепта запоминается расход номенклатуры на порцию
+    (с учетом вложенных технологических карт, через ReceiptCalculator),
+    а обратный индекс "номенклатура -> рецепты и расход" позволяет при
+    изменении цены скорректировать на разницу цены только те рецепты,
+    в которые номенклатура входит, не пересчитывая меню целиком.
+
+    Цена номенклатуры относится к ее единице: расход в другой единице
+    пересчитывается в нее, а расход, который пересчитать нельзя (или
+    номенклатура без единицы), не оценивается - add отклоняет такой рецепт.
+    Изменение состава рецепта (ReceiptModel.version) или коэффициентов
+    единиц приводит к повторному разбору рецепта.
+    """
+
+    __calculator: ReceiptCalculator = None  # Разворот рецептов в потребность
+    __costs: dict = None  # Рецепт -> себестоимость порции
+    __usage: dict = None  # Рецепт -> {(номенклатура, единица): расход на порцию}
+    __dependencies: dict = None  # Рецепт -> ((рецепт или вложенная карта, версия), ...)
+    __consumers: dict = None  # Номенклатура -> {рецепт: расход на порцию в единице цены номенклатуры}
+    __prices: dict = None  # Номенклатура -> цена, учтенная в себестоимости
+    __unit_revision: int = -1  # Номер изменения единиц, для которого актуален расход
+
+    def __init__(self, calculator: ReceiptCalculator = None):
+        """
+        Args:
+            calculator (ReceiptCalculator): Расчет потребности (по умолчанию создается новый)
+        """
+        self.__calculator = calculator or ReceiptCalculator()
+        self.__costs = {}
+        self.__usage = {}
+        self.__dependencies = {}
+        self.__consumers = {}
+        self.__prices = {}
+        self.__unit_revision = UnitModel.revision()
+
+    @property
+    def receipts(self) -> list:
+        """Рецепты, себестоимость которых отслеживается"""
+        return list(self.__costs)
+
+    def add(self, receipt: ReceiptModel) -> float:
+        """
+        Добавление рецепта (или повторный разбор уже добавленного).
+
+        Returns:
+            float: Себестоимость порции
+
+        Raises:
+            OperationException: Если расход номенклатуры нельзя пересчитать в единицу
+                                ее цены (рецепт не добавляется)
+        """
+        if not isinstance(receipt, ReceiptModel):
+            raise ArgumentException("Рецепт должен быть экземпляром ReceiptModel")
+        self.__detach(receipt)
+        usage = dict(self.__calculator.per_portion(receipt))
+        priced = {}
+        for (nomenclature, unit), quantity in usage.items():
+            priced[nomenclature] = priced.get(nomenclature, 0.0) + quantity * self.__price_ratio(
+                receipt, nomenclature, unit)
+
+        cost = 0.0
+        for nomenclature, quantity in priced.items():
+            price = self.__prices.setdefault(nomenclature, nomenclature.price)
+            self.__consumers.setdefault(nomenclature, {})[receipt] = quantity
+            cost += quantity * price
+        self.__usage[receipt] = usage
+        self.__dependencies[receipt] = self.__cards(receipt)
+        self.__costs[receipt] = cost
+        return cost
+
+    def add_many(self, receipts) -> None:
+        """Добавление нескольких рецептов"""
+        for receipt in receipts:
+            self.add(receipt)
+
+    def remove(self, receipt: ReceiptModel) -> bool:
+        """Прекращение расчета себестоимости рецепта"""
+        if receipt not in self.__costs:
+            return False
+        self.__detach(receipt)
+        return True
+
+    def cost(self, receipt: ReceiptModel, portions: float = None) -> float:
+        """
+        Себестоимость рецепта.
+
+        Args:
+            portions (float): Количество порций (по умолчанию - одна порция)
+        """
+        if self.__unit_revision != UnitModel.revision():
+            self.recompute_all()
+        dependencies = self.__dependencies.get(receipt)
+        if dependencies is None or any(card.version != version for card, version in dependencies):
+            self.add(receipt)
+        cost = self.__costs[receipt]
+        return cost if portions is None else cost * portions
+
+    def set_price(self, nomenclature: NomenclatureModel, price: float) -> list:
+        """
+        Изменение цены номенклатуры с пересчетом зависящих от нее рецептов.
+
+        Returns:
+            list: Рецепты, себестоимость которых изменилась
+        """
+        nomenclature.price = price
+        return self.__propagate(nomenclature)
+
+    def set_prices(self, prices: dict) -> set:
+        """
+        Изменение цен нескольких позиций номенклатуры.
+
+        Returns:
+            set: Рецепты, себестоимость которых изменилась
+        """
+        affected = set()
+        for nomenclature, price in prices.items():
+            affected.update(self.set_price(nomenclature, price))
+        return affected
+
+    def sync_prices(self) -> set:
+        """
+        Учет цен, измененных напрямую в моделях номенклатуры (минуя set_price).
+
+        Returns:
+            set: Рецепты, себестоимость которых изменилась
+        """
+        affected = set()
+        for nomenclature, price in list(self.__prices.items()):
+            if nomenclature.price != price:
+                affected.update(self.__propagate(nomenclature))
+        return affected
+
+    def recompute_all(self) -> dict:
+        """
+        Полный пересчет себестоимости всех рецептов.
+
+        Returns:
+            dict: Рецепт -> себестоимость порции
+        """
+        self.__unit_revision = UnitModel.revision()
+        self.__calculator.invalidate()
+        receipts = list(self.__costs)
+        self.__costs.clear()
+        self.__usage.clear()
+        self.__dependencies.clear()
+        self.__consumers.clear()
+        self.__prices.clear()
+        for receipt in receipts:
+            self.add(receipt)
+        return dict(self.__costs)
+
+    def __propagate(self, nomenclature: NomenclatureModel) -> list:
+        """Корректировка рецептов, потребляющих номенклатуру, на разницу цены"""
+        old = self.__prices.get(nomenclature)
+        if old is None:
+            return []
+        delta = nomenclature.price - old
+        self.__prices[nomenclature] = nomenclature.price
+        consumers = self.__consumers.get(nomenclature, {})
+        if delta == 0:
+            return []
+        costs = self.__costs
+        for receipt, quantity in consumers.items():
+            costs[receipt] += quantity * delta
+        return list(consumers)
+
+    def __detach(self, receipt: ReceiptModel):
+        """Удаление рецепта из обратного индекса"""
+        for nomenclature, _ in self.__usage.pop(receipt, {}):
+            consumers = self.__consumers.get(nomenclature)
+            if consumers is not None:
+                consumers.pop(receipt, None)
+        self.__costs.pop(receipt, None)
+        self.__dependencies.pop(receipt, None)
+
+    def __price_ratio(self, receipt: ReceiptModel, nomenclature: NomenclatureModel, unit: UnitModel) -> float:
+        """Коэффициент пересчета расхода в единицу цены номенклатуры"""
+        if nomenclature.unit is None:
+            raise OperationException(
+                f"Рецепт '{receipt.name}': у номенклатуры '{nomenclature.name}' не задана единица цены")
+        if unit is nomenclature.unit:
+            return 1.0
+        try:
+            return self.__calculator.converter.ratio(unit, nomenclature.unit)
+        except OperationException:
+            raise OperationException(
+                f"Рецепт '{receipt.name}': расход '{nomenclature.name}' в единице '{unit.name}' "
+                f"нельзя пересчитать в единицу цены '{nomenclature.unit.name}'") from None
+
+    @staticmethod
+    def __cards(receipt: ReceiptModel) -> tuple:
+        """Рецепт и все вложенные в него карты с их версиями"""
+        result = []
+        seen = set()
+        stack = [receipt]
+        while stack:
+            card = stack.pop()
+            if card in seen:
+                continue
+            seen.add(card)
+            result.append((card, card.version))
+            stack.extend(item.receipt for item in card.ingredients if isinstance(item, ReceiptComponentModel))
+        return tuple(result)
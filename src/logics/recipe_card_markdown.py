@@ -0,0 +1,327 @@
+"""
+Технологические карты в формате Markdown (Docs/salat_vitaminniy.md): разбор и вывод
+"""
+import re
+from collections import OrderedDict
+from string import Formatter
+from src.reposity import reposity
+from src.settings_manager import SettingsManager
+from src.core.validator import ArgumentException, OperationException
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+# Сокращение единицы в карте -> наименование единицы измерения
+UNIT_ABBREVIATIONS = {
+    "шт": "штука",
+    "гр": "грамм",
+    "г": "грамм",
+    "ст.л": "столовая ложка",
+    "ч.л": "чайная ложка",
+    "кг": "килограмм",
+    "мл": "миллилитр",
+    "л": "литр",
+}
+# Наименование единицы -> сокращение при выводе карты
+UNIT_NAMES = {name: abbreviation for abbreviation, name in reversed(list(UNIT_ABBREVIATIONS.items()))}
+
+_TITLE = re.compile(r"^#\s+(.+?)\s*$")
+_PORTIONS = re.compile(r"`\s*(\d+)\s+порци")
+_COOKING_TIME = re.compile(r"Время приготовления:\s*`([^`]*)`")
+_STEP = re.compile(r"^(\d+)\.\s+(.*?)\s*$")
+_STEP_TITLE = re.compile(r"^\*\*(.+?)\*\*$")
+_QUANTITY = re.compile(r"^([\d]+(?:[.,]\d+)?)\s*(.*?)\.?$")
+
+
+def parse_markdown_text(text: str) -> dict:
+    """
+    Разбор текста карты в описание из простых типов.
+
+    Наименование рецепта приводится из заглавных букв к обычному написанию,
+    сокращения единиц заменяются наименованиями единиц измерения.
+    Шаг с заголовком хранится как "заголовок\\nописание". Раздел после
+    горизонтальной черты (советы) не разбирается.
+
+    Returns:
+        dict: {"name", "portions", "cooking_time", "ingredients": [(номенклатура, количество, единица)],
+               "steps": [(номер, описание)]}
+
+    Raises:
+        OperationException: Если в карте нет заголовка или строка состава не разбирается
+    """
+    name = None
+    portions = 1
+    cooking_time = ""
+    ingredients = []
+    steps = []
+    in_table = False
+    step = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == "---":
+            break
+        if name is None:
+            match = _TITLE.match(stripped)
+            if match:
+                name = match.group(1).capitalize()
+            continue
+
+        if stripped.startswith("|"):
+            cells = [cell.strip() for cell in stripped.strip("|").split("|")]
+            if not in_table:
+                in_table = True  # Строка заголовков таблицы
+            elif not all(set(cell) <= set("-: ") for cell in cells):
+                ingredients.append(_parse_ingredient(cells))
+            continue
+        in_table = False
+
+        match = _PORTIONS.search(stripped)
+        if match and not ingredients:
+            portions = int(match.group(1))
+            continue
+        match = _COOKING_TIME.search(stripped)
+        if match:
+            cooking_time = match.group(1).strip()
+            continue
+
+        match = _STEP.match(stripped)
+        if match and line[:1].isdigit():
+            title = _STEP_TITLE.match(match.group(2))
+            step = [int(match.group(1)), [title.group(1)] if title else [], [] if title else [match.group(2)]]
+            steps.append(step)
+        elif step is not None and stripped and not stripped.startswith("#"):
+            step[2].append(stripped)
+        elif stripped.startswith("#"):
+            step = None
+
+    if name is None:
+        raise OperationException("В технологической карте нет заголовка с наименованием рецепта")
+    return {
+        "name": name,
+        "portions": portions,
+        "cooking_time": cooking_time,
+        "ingredients": ingredients,
+        "steps": [(number, "\n".join(title + [" ".join(text)])) for number, title, text in steps],
+    }
+
+
+def parse_markdown_card(path: str) -> dict:
+    """Разбор файла карты (функция разбора для FileDataCreator)"""
+    with open(path, "r", encoding="utf-8") as file:
+        return parse_markdown_text(file.read())
+
+
+def _parse_ingredient(cells: list) -> tuple:
+    """Строка таблицы состава: (номенклатура, количество, наименование единицы)"""
+    if len(cells) < 2 or not cells[0]:
+        raise OperationException(f"Строка состава не разбирается: {' | '.join(cells)}")
+    match = _QUANTITY.match(cells[1])
+    if match is None:
+        raise OperationException(f"Количество '{cells[1]}' ингредиента '{cells[0]}' не разбирается")
+    quantity = float(match.group(1).replace(",", "."))
+    if quantity.is_integer():
+        quantity = int(quantity)
+    abbreviation = match.group(2).strip()
+    return cells[0], quantity, UNIT_ABBREVIATIONS.get(abbreviation, abbreviation)
+
+
+class RecipeCardParser:
+    """
+    Создание моделей рецепта из карты в формате Markdown.
+
+    Номенклатура и единицы измерения ищутся функциями обратного вызова
+    (например, через get_or_add репозитория); без них создаются новые модели.
+    """
+
+    __find_nomenclature = None  # Наименование номенклатуры, единица -> NomenclatureModel
+    __find_unit = None  # Наименование единицы -> UnitModel
+
+    def __init__(self, find_nomenclature=None, find_unit=None):
+        """
+        Args:
+            find_nomenclature: Функция (наименование, единица) -> NomenclatureModel
+            find_unit: Функция (наименование) -> UnitModel
+        """
+        self.__find_nomenclature = find_nomenclature or (lambda name, unit: NomenclatureModel(name, name, None, unit))
+        self.__find_unit = find_unit or (lambda name: UnitModel(name, 1.0))
+
+    def parse(self, text: str) -> dict:
+        """
+        Разбор текста карты.
+
+        Returns:
+            dict: Запись репозитория {"receipt", "ingredients", "steps"}
+        """
+        return self.build(parse_markdown_text(text))
+
+    def parse_file(self, path: str) -> dict:
+        """Разбор файла карты"""
+        return self.build(parse_markdown_card(path))
+
+    def build(self, card: dict) -> dict:
+        """Создание моделей по описанию карты из простых типов"""
+        receipt = ReceiptModel(card["name"], card["portions"], card["cooking_time"])
+        ingredients = []
+        for nomenclature_name, quantity, unit_name in card["ingredients"]:
+            unit = self.__find_unit(unit_name)
+            ingredients.append(IngredientModel(self.__find_nomenclature(nomenclature_name, unit), quantity, unit))
+        steps = [CookingStepModel(number, description) for number, description in card["steps"]]
+        receipt.extend_ingredients(ingredients)
+        receipt.extend_steps(steps)
+        return reposity.receipt_entry(receipt)
+
+
+def compile_template(template: str):
+    """
+    Сборка функции подстановки для шаблона в синтаксисе str.format.
+
+    Шаблон разбирается один раз; функция склеивает готовые фрагменты
+    текста со значениями полей без повторного разбора.
+
+    Returns:
+        Функция values (dict) -> str
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append(repr(literal))
+        if field is not None:
+            if conversion:
+                raise ArgumentException(f"Преобразование !{conversion} в шаблоне не поддерживается")
+            parts.append(f"format(values[{field!r}], {spec or ''!r})")
+    if not parts:
+        parts.append("''")
+    source = f"def render(values):\n    return ''.join(({', '.join(parts)},))\n"
+    namespace = {}
+    exec(compile(source, f"<template {template[:30]!r}>", "exec"), namespace)
+    return namespace["render"]
+
+
+class RecipeCardRenderer:
+    """
+    Вывод рецепта в карту формата Markdown.
+
+    Шаблоны компилируются один раз (и кэшируются по тексту шаблона для всех
+    экземпляров), а готовая карта запоминается вместе со всеми значениями,
+    которые в нее выводятся (наименование, порции, время, состав с наименованиями
+    номенклатуры и единиц, шаги): повторный вывод неизмененного рецепта
+    возвращает сохраненный текст, а изменение любого из этих значений -
+    в том числе в связанных моделях - приводит к новому выводу.
+    Хранится не более max_size карт (давно не выводившиеся вытесняются;
+    по умолчанию - caches.rendered_cards настроек приложения).
+    """
+
+    CARD_TEMPLATE = ("# {title}\n\n#### `{portions}`\n\n{table}\n\n"
+                     "## ПОШАГОВОЕ ПРИГОТОВЛЕНИЕ\nВремя приготовления: `{cooking_time}`\n\n{steps}\n")
+    ROW_TEMPLATE = "| {name} | {quantity} |"
+    STEP_TEMPLATE = "{number}. {text}"
+
+    __templates: dict = {}  # Текст шаблона -> скомпилированная функция (общий для всех экземпляров)
+    __card = None  # Функция подстановки карты
+    __row = None  # Функция подстановки строки состава
+    __step = None  # Функция подстановки шага
+    __cache: OrderedDict = None  # Рецепт -> (выводимые значения, текст карты), от давних к недавним
+    __max_size: int = 10_000  # Наибольшее количество сохраненных карт
+
+    def __init__(self, card_template: str = None, row_template: str = None, step_template: str = None,
+                 max_size: int = None):
+        """
+        Args:
+            max_size (int): Наибольшее количество сохраненных карт (по умолчанию - из настроек)
+        """
+        if max_size is None:
+            max_size = SettingsManager().app_config.caches.rendered_cards
+        if max_size <= 0:
+            raise ArgumentException("Размер кэша карт должен быть положительным числом")
+        self.__card = self.compiled(card_template or self.CARD_TEMPLATE)
+        self.__row = self.compiled(row_template or self.ROW_TEMPLATE)
+        self.__step = self.compiled(step_template or self.STEP_TEMPLATE)
+        self.__cache = OrderedDict()
+        self.__max_size = max_size
+
+    @staticmethod
+    def compiled(template: str):
+        """Скомпилированный шаблон (компилируется при первом обращении)"""
+        render = RecipeCardRenderer.__templates.get(template)
+        if render is None:
+            render = RecipeCardRenderer.__templates[template] = compile_template(template)
+        return render
+
+    def invalidate(self, receipt: ReceiptModel = None):
+        """Сброс сохраненной карты рецепта (None - всех карт)"""
+        if receipt is None:
+            self.__cache.clear()
+        else:
+            self.__cache.pop(receipt, None)
+
+    def render(self, receipt: ReceiptModel) -> str:
+        """Карта рецепта в формате Markdown"""
+        if not isinstance(receipt, ReceiptModel):
+            raise ArgumentException("Рецепт должен быть экземпляром ReceiptModel")
+        inputs = self.__inputs(receipt)
+        cache = self.__cache
+        cached = cache.get(receipt)
+        if cached is not None and cached[0] == inputs:
+            cache.move_to_end(receipt)
+            return cached[1]
+        text = self.__render(receipt)
+        cache[receipt] = (inputs, text)
+        cache.move_to_end(receipt)
+        if len(cache) > self.__max_size:
+            cache.popitem(last=False)
+        return text
+
+    def render_menu(self, receipts) -> list:
+        """Карты всех рецептов меню"""
+        return [self.render(receipt) for receipt in receipts]
+
+    @staticmethod
+    def __inputs(receipt: ReceiptModel) -> tuple:
+        """Значения, от которых зависит текст карты"""
+        items = tuple((item.nomenclature.name, item.quantity, item.unit.name)
+                      if isinstance(item, IngredientModel) else (item.receipt.name, item.portions)
+                      for item in receipt.ingredients)
+        steps = tuple((step.step_number, step.description) for step in receipt.cooking_steps)
+        return receipt.name, receipt.portions, receipt.cooking_time, items, steps
+
+    def __render(self, receipt: ReceiptModel) -> str:
+        rows = [("Ингредиенты", "Количество")]
+        for item in receipt.ingredients:
+            if isinstance(item, IngredientModel):
+                rows.append((item.nomenclature.name, f"{item.quantity:g} {UNIT_NAMES.get(item.unit.name, item.unit.name)}"))
+            else:
+                rows.append((item.receipt.name, f"{item.portions:g} {self.__portions_word(item.portions)}"))
+        name_width = max(len(name) for name, _ in rows)
+        quantity_width = max(len(quantity) for _, quantity in rows)
+        lines = [self.__row({"name": name.ljust(name_width), "quantity": quantity.ljust(quantity_width)})
+                 for name, quantity in rows]
+        lines.insert(1, f"|{'-' * (name_width + 2)}|{'-' * (quantity_width + 2)}|")
+
+        steps = []
+        for step in receipt.cooking_steps:
+            title, _, text = step.description.partition("\n")
+            text = f"**{title}**  \n   {text}" if text else title
+            steps.append(self.__step({"number": step.step_number, "text": text}))
+
+        return self.__card({
+            "title": receipt.name.upper(),
+            "portions": f"{receipt.portions} {self.__portions_word(receipt.portions)}",
+            "table": "\n".join(lines),
+            "cooking_time": receipt.cooking_time,
+            "steps": "\n\n".join(steps),
+        })
+
+    @staticmethod
+    def __portions_word(count: float) -> str:
+        """Слово "порция" в нужной форме"""
+        if not float(count).is_integer():
+            return "порции"
+        count = int(count)
+        if count % 10 == 1 and count % 100 != 11:
+            return "порция"
+        if 2 <= count % 10 <= 4 and not 12 <= count % 100 <= 14:
+            return "порции"
+        return "порций"
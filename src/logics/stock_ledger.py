@@ -0,0 +1,333 @@
+"""
+Складской учет: движения и остатки номенклатуры по складам
+"""
+import bisect
+import calendar
+import threading
+from datetime import datetime
+from src.core.validator import ArgumentException, OperationException
+from src.logics.unit_converter import UnitConverter
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+
+
+class StockLedger:
+    """
+    Журнал складских движений.
+
+    Текущие остатки хранятся нарастающим итогом в разрезе
+    (склад, номенклатура, корневая единица измерения), поэтому запрос остатка
+    не суммирует историю движений. Остаток на дату считается от ближайшего
+    снимка закрытого периода (close_period, close_months) плюс движения
+    этой же позиции после него.
+
+    Методы журнала потокобезопасны: проведение и закрытие периода
+    (в том числе фоновым заданием StockSnapshotJob) не пересекаются.
+    """
+
+    __converter: UnitConverter = None  # Пересчет количеств в корневые единицы
+    __movements: list = None  # Движения, упорядоченные по дате
+    __periods: list = None  # Даты движений (параллельно __movements, для бинарного поиска)
+    __balances: dict = None  # (склад, номенклатура, корневая единица) -> текущий остаток
+    __snapshots: list = None  # Снимки остатков закрытых периодов, упорядоченные по дате
+    __snapshot_periods: list = None  # Даты снимков (для бинарного поиска)
+    __key_periods: dict = None  # Позиция остатка -> даты ее движений по возрастанию
+    __key_deltas: dict = None  # Позиция остатка -> изменения остатка (параллельно __key_periods)
+    __observers: list = None  # Наблюдатели проведения пакетов движений
+    __references: dict = None  # Номенклатура, склад или единица -> движения с ними (в порядке проведения)
+    __lock: threading.RLock = None  # Блокировка изменений журнала
+
+    def __init__(self, converter: UnitConverter = None):
+        """
+        Args:
+            converter (UnitConverter): Конвертер единиц (по умолчанию создается новый)
+        """
+        self.__converter = converter or UnitConverter()
+        self.__movements = []
+        self.__periods = []
+        self.__balances = {}
+        self.__snapshots = []
+        self.__snapshot_periods = []
+        self.__key_periods = {}
+        self.__key_deltas = {}
+        self.__observers = []
+        self.__references = {}
+        self.__lock = threading.RLock()
+
+    @property
+    def converter(self) -> UnitConverter:
+        return self.__converter
+
+    @property
+    def movements(self) -> list:
+        """Движения, упорядоченные по дате"""
+        return self.__movements.copy()
+
+    @property
+    def closed_period(self) -> datetime:
+        """Дата последнего закрытого периода (None - периоды не закрывались)"""
+        return self.__snapshot_periods[-1] if self.__snapshot_periods else None
+
+    def subscribe(self, observer):
+        """
+        Подписка на проведение пакетов движений.
+
+        Наблюдатель вызывается под блокировкой журнала после изменения остатков:
+        observer(движения, изменения остатков), где изменения - списки
+        [((склад, номенклатура, корневая единица), количество)] по каждому движению.
+        """
+        with self.__lock:
+            self.__observers.append(observer)
+
+    def unsubscribe(self, observer):
+        """Отмена подписки на проведение пакетов движений"""
+        with self.__lock:
+            if observer in self.__observers:
+                self.__observers.remove(observer)
+
+    def post(self, movement: StockMovementModel):
+        """Проведение одного движения"""
+        self.post_many([movement])
+
+    def post_many(self, movements: list, allow_negative: bool = True):
+        """
+        Проведение пакета движений.
+
+        Пакет проводится целиком: сначала проверяются и пересчитываются все движения,
+        и только затем изменяются остатки.
+
+        Args:
+            movements (list): Движения
+            allow_negative (bool): Разрешить отрицательные остатки ("под сальдо", п. 2.4 ТЗ).
+                                   Если False, пакет блокируется целиком, когда хотя бы
+                                   одна позиция уходит в минус (п. 2.3 ТЗ)
+
+        Raises:
+            ArgumentException: Если в пакете есть объект, не являющийся движением
+            OperationException: Если движение относится к закрытому периоду, его единицу
+                                нельзя пересчитать или остатка недостаточно
+        """
+        with self.__lock:
+            closed = self.closed_period
+            deltas = []
+            for movement in movements:
+                if not isinstance(movement, StockMovementModel):
+                    raise ArgumentException("Движение должно быть экземпляром StockMovementModel")
+                if closed is not None and movement.period <= closed:
+                    raise OperationException(
+                        f"Период по {closed:%d.%m.%Y} закрыт: движение {movement} не проводится")
+                deltas.append(self._deltas(movement))
+
+            if not allow_negative:
+                self.__check_balances(deltas)
+
+            references = self.__references
+            for movement, movement_deltas in zip(movements, deltas):
+                self._insert(movement)
+                # Движения не удаляются, поэтому обратный индекс только пополняется
+                for model in (movement.nomenclature, movement.storage, movement.target_storage, movement.unit):
+                    if model is not None:
+                        referrers = references.get(model)
+                        if referrers is None:
+                            references[model] = [movement]
+                        elif referrers[-1] is not movement:
+                            referrers.append(movement)
+                for key, quantity in movement_deltas:
+                    self.__balances[key] = self.__balances.get(key, 0.0) + quantity
+                    self._insert_delta(key, movement.period, quantity)
+
+            for observer in self.__observers:
+                observer(movements, deltas)
+
+    def __check_balances(self, deltas: list):
+        """Проверка за один проход, что итоговые остатки пакета не отрицательны"""
+        totals = {}
+        for movement_deltas in deltas:
+            for key, quantity in movement_deltas:
+                totals[key] = totals.get(key, 0.0) + quantity
+
+        shortages = []
+        for key, quantity in totals.items():
+            if quantity < 0:
+                balance = self.__balances.get(key, 0.0)
+                if balance + quantity < -1e-9:
+                    storage, nomenclature, unit = key
+                    shortages.append(f"{nomenclature.name} на складе '{storage.name}': "
+                                     f"остаток {balance:g}, требуется {-quantity:g} {unit.name}")
+        if shortages:
+            raise OperationException("Недостаточно остатков: " + "; ".join(shortages))
+
+    def is_referenced(self, model) -> bool:
+        """Признак участия номенклатуры, склада или единицы в складском учете (п. 6.2 ТЗ)"""
+        return model in self.__references
+
+    def referrers(self, model, limit: int = None) -> list:
+        """
+        Движения, в которых участвует номенклатура, склад или единица.
+
+        Args:
+            limit (int): Наибольшее количество движений в результате (None - все)
+        """
+        referrers = self.__references.get(model, [])
+        return referrers[:limit] if limit is not None else referrers.copy()
+
+    def balance(self, nomenclature, storage, unit=None) -> float:
+        """
+        Текущий остаток номенклатуры на складе.
+
+        Args:
+            unit (UnitModel): Единица результата (по умолчанию - единица номенклатуры)
+        """
+        unit = self._unit_for(nomenclature, unit)
+        root, factor = self.__converter.to_root(unit)
+        return self.__balances.get((storage, nomenclature, root), 0.0) / factor
+
+    def balances(self) -> dict:
+        """Копия текущих остатков: (склад, номенклатура, корневая единица) -> количество"""
+        return dict(self.__balances)
+
+    def close_period(self, period: datetime) -> dict:
+        """
+        Закрытие периода: сохранение снимка остатков на дату.
+
+        После закрытия движения с датой не позже period не принимаются.
+
+        Returns:
+            dict: Снимок остатков (склад, номенклатура, корневая единица) -> количество
+        """
+        if not isinstance(period, datetime):
+            raise ArgumentException("Дата закрытия периода должна быть экземпляром datetime")
+        with self.__lock:
+            if self.closed_period is not None and period <= self.closed_period:
+                raise OperationException(f"Период по {self.closed_period:%d.%m.%Y} уже закрыт")
+
+            # Снимок строится от предыдущего: учитываются только движения после него
+            snapshot = self.balances_at(period)
+            self.__snapshots.append(snapshot)
+            self.__snapshot_periods.append(period)
+            return snapshot
+
+    def close_months(self, until: datetime) -> list:
+        """
+        Закрытие всех полностью завершившихся к дате until месяцев,
+        начиная с месяца после последнего закрытого (или с месяца первого движения).
+
+        Returns:
+            list: Даты созданных снимков (конец каждого закрытого месяца)
+        """
+        closed = []
+        with self.__lock:
+            start = self.closed_period
+            if start is None:
+                if not self.__periods:
+                    return closed
+                start = self.__periods[0]
+                period = self.month_end(start.year, start.month)
+            else:
+                period = self.month_end(*self._next_month(start.year, start.month))
+            while period < until:
+                self.close_period(period)
+                closed.append(period)
+                period = self.month_end(*self._next_month(period.year, period.month))
+        return closed
+
+    @staticmethod
+    def month_end(year: int, month: int) -> datetime:
+        """Последний момент месяца"""
+        return datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, 59, 999999)
+
+    def balances_at(self, period: datetime) -> dict:
+        """Все остатки на дату: ближайший снимок плюс движения после него"""
+        if not self.__periods or period >= self.__periods[-1]:
+            # После даты движений нет: остатки на дату совпадают с текущими
+            return dict(self.__balances)
+        snapshot, start = self.snapshot_before(period)
+        result = dict(snapshot)
+        for movement in self.movements_between(start, period):
+            for key, quantity in self._deltas(movement):
+                result[key] = result.get(key, 0.0) + quantity
+        return result
+
+    def balance_at(self, nomenclature, storage, period: datetime, unit=None) -> float:
+        """Остаток номенклатуры на складе на дату"""
+        unit = self._unit_for(nomenclature, unit)
+        root, factor = self.__converter.to_root(unit)
+        key = (storage, nomenclature, root)
+        snapshot, start = self.snapshot_before(period)
+        quantity = snapshot.get(key, 0.0)
+
+        # Суммируются только движения этой позиции между снимком и датой
+        periods = self.__key_periods.get(key)
+        if periods:
+            deltas = self.__key_deltas[key]
+            low = 0 if start is None else bisect.bisect_right(periods, start)
+            high = bisect.bisect_right(periods, period)
+            quantity += sum(deltas[low:high])
+        return quantity / factor
+
+    def snapshot_before(self, period: datetime) -> tuple:
+        """
+        Ближайший снимок не позже даты.
+
+        Returns:
+            tuple: (снимок, дата снимка) или ({}, None), если снимков до даты нет
+        """
+        index = bisect.bisect_right(self.__snapshot_periods, period) - 1
+        if index < 0:
+            return {}, None
+        return self.__snapshots[index], self.__snapshot_periods[index]
+
+    def movements_between(self, start: datetime, end: datetime) -> list:
+        """Движения с датой в интервале (start, end]; start = None - с начала учета"""
+        low = 0 if start is None else bisect.bisect_right(self.__periods, start)
+        high = bisect.bisect_right(self.__periods, end)
+        return self.__movements[low:high]
+
+    def _insert(self, movement: StockMovementModel):
+        """Вставка движения с сохранением порядка по дате"""
+        if not self.__periods or movement.period >= self.__periods[-1]:
+            self.__movements.append(movement)
+            self.__periods.append(movement.period)
+            return
+        index = bisect.bisect_right(self.__periods, movement.period)
+        self.__movements.insert(index, movement)
+        self.__periods.insert(index, movement.period)
+
+    def _insert_delta(self, key: tuple, period: datetime, quantity: float):
+        """Добавление изменения в историю позиции остатка с сохранением порядка по дате"""
+        periods = self.__key_periods.get(key)
+        if periods is None:
+            self.__key_periods[key] = [period]
+            self.__key_deltas[key] = [quantity]
+            return
+        if period >= periods[-1]:
+            periods.append(period)
+            self.__key_deltas[key].append(quantity)
+            return
+        index = bisect.bisect_right(periods, period)
+        periods.insert(index, period)
+        self.__key_deltas[key].insert(index, quantity)
+
+    def _deltas(self, movement: StockMovementModel) -> list:
+        """Изменения остатков от движения: [((склад, номенклатура, корневая единица), количество)]"""
+        root, factor = self.__converter.to_root(movement.unit)
+        quantity = movement.quantity * factor
+        movement_type = movement.movement_type
+        if movement_type == StockMovementType.RECEIPT:
+            return [((movement.storage, movement.nomenclature, root), quantity)]
+        if movement_type == StockMovementType.WRITE_OFF:
+            return [((movement.storage, movement.nomenclature, root), -quantity)]
+        return [((movement.storage, movement.nomenclature, root), -quantity),
+                ((movement.target_storage, movement.nomenclature, root), quantity)]
+
+    @staticmethod
+    def _next_month(year: int, month: int) -> tuple:
+        """Год и номер следующего месяца"""
+        return (year + 1, 1) if month == 12 else (year, month + 1)
+
+    @staticmethod
+    def _unit_for(nomenclature, unit):
+        """Единица для запроса остатка"""
+        unit = unit or nomenclature.unit
+        if unit is None:
+            raise ArgumentException(f"Для номенклатуры '{nomenclature.name}' не указана единица измерения")
+        return unit
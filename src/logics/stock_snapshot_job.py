@@ -0,0 +1,101 @@
+"""
+Фоновое закрытие месяцев складского журнала
+"""
+import threading
+from datetime import datetime, timedelta
+from src.core.validator import ArgumentException, OperationException
+from src.logics.stock_ledger import StockLedger
+
+
+class StockSnapshotJob:
+    """
+    Фоновое задание, которое периодически закрывает завершившиеся месяцы журнала
+    (ежемесячная инвентаризация, п. 1.3 ТЗ) и тем самым создает снимки остатков.
+
+    Каждый запуск строит снимки только для месяцев после последнего закрытого,
+    поэтому работа задания пропорциональна числу новых движений, а не всей истории.
+    Месяц закрывается не сразу, а через grace после его окончания, чтобы
+    успели провести опоздавшие документы.
+
+    Ошибка запуска в фоновом потоке (например, гонка с проведением документов)
+    не останавливает задание: она запоминается (last_error), запуск повторяется
+    через interval, а stop сообщает об ошибке, если последний запуск не удался.
+    """
+
+    __ledger: StockLedger = None  # Журнал движений
+    __interval: float = 3600.0  # Период запуска (сек)
+    __grace: timedelta = None  # Задержка закрытия месяца после его окончания
+    __clock = None  # Источник текущего времени
+    __stop: threading.Event = None  # Сигнал остановки
+    __thread: threading.Thread = None  # Поток задания
+    __error: Exception = None  # Ошибка последнего запуска в фоновом потоке (None - запуск удался)
+
+    def __init__(self, ledger: StockLedger, interval: float = 3600.0,
+                 grace: timedelta = timedelta(days=1), clock=datetime.now):
+        """
+        Args:
+            ledger (StockLedger): Журнал движений
+            interval (float): Период запуска в секундах
+            grace (timedelta): Задержка закрытия месяца после его окончания
+            clock: Функция, возвращающая текущее время
+        """
+        if not isinstance(ledger, StockLedger):
+            raise ArgumentException("Журнал должен быть экземпляром StockLedger")
+        if interval <= 0:
+            raise ArgumentException("Период запуска должен быть положительным числом")
+        self.__ledger = ledger
+        self.__interval = interval
+        self.__grace = grace
+        self.__clock = clock
+        self.__stop = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def last_error(self) -> Exception:
+        """Ошибка последнего запуска в фоновом потоке (None - запуск удался)"""
+        return self.__error
+
+    def run_once(self) -> list:
+        """
+        Один запуск: закрытие всех месяцев, завершившихся более чем grace назад.
+
+        Returns:
+            list: Даты созданных снимков
+        """
+        return self.__ledger.close_months(self.__clock() - self.__grace)
+
+    def start(self):
+        """Запуск задания в фоновом потоке"""
+        if self.is_running:
+            return
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name="stock-snapshot-job", daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Остановка фонового потока.
+
+        Raises:
+            OperationException: Если последний запуск в фоновом потоке не удался
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+        error, self.__error = self.__error, None
+        if error is not None:
+            raise OperationException(f"Закрытие месяцев не выполнено: {error}") from error
+
+    def __run(self):
+        while not self.__stop.is_set():
+            try:
+                self.run_once()
+                self.__error = None
+            except Exception as error:
+                # Поток продолжает работу: следующий запуск повторит закрытие
+                self.__error = error
+            self.__stop.wait(self.__interval)
@@ -0,0 +1,140 @@
+"""
+Пересчет количеств между единицами измерения
+"""
+from collections import OrderedDict
+from src.core.validator import ArgumentException, OperationException, Validator
+from src.models.unit_model import UnitModel
+from src.settings_manager import SettingsManager
+
+
+class UnitConverter:
+    """
+    Конвертер единиц измерения.
+
+    Для каждой единицы один раз вычисляется корневая единица цепочки base_unit
+    и накопленный коэффициент пересчета в нее. Результаты кэшируются и
+    сбрасываются при любом изменении коэффициента или базовой единицы
+    (см. UnitModel.revision). Хранится не более max_size единиц (раньше
+    других вытесняются рассчитанные раньше).
+    """
+
+    __cache: OrderedDict = None  # id единицы -> (корневая единица, коэффициент пересчета в корневую)
+    __max_size: int = 10_000  # Наибольшее количество рассчитанных единиц в кэше
+    __revision: int = -1  # Номер изменения единиц, для которого актуален кэш
+
+    def __init__(self, units: list = None, max_size: int = None):
+        """
+        Args:
+            units (list): Единицы измерения для предварительного расчета (необязательно)
+            max_size (int): Наибольшее количество единиц в кэше (по умолчанию - caches.unit_conversions
+                            настроек приложения)
+        """
+        if max_size is None:
+            max_size = SettingsManager().app_config.caches.unit_conversions
+        if max_size <= 0:
+            raise ArgumentException("Размер кэша пересчетов должен быть положительным числом")
+        self.__cache = OrderedDict()
+        self.__max_size = max_size
+        if units:
+            self.precompute(units)
+
+    def precompute(self, units: list):
+        """Предварительный расчет коэффициентов для набора единиц"""
+        for unit in units:
+            self.to_root(unit)
+
+    def invalidate(self):
+        """Сброс кэша коэффициентов"""
+        self.__cache.clear()
+        self.__revision = UnitModel.revision()
+
+    def to_root(self, unit: UnitModel) -> tuple:
+        """
+        Корневая единица и накопленный коэффициент пересчета в нее.
+
+        Returns:
+            tuple: (корневая UnitModel, коэффициент)
+
+        Raises:
+            OperationException: Если цепочка базовых единиц зациклена
+        """
+        if self.__revision != UnitModel.revision():
+            self.invalidate()
+        cached = self.__cache.get(unit.id_key)
+        if cached is not None:
+            return cached
+
+        # Проходим цепочку до корня или до уже рассчитанной единицы
+        chain = []
+        visited = set()
+        current = unit
+        while True:
+            cached = self.__cache.get(current.id_key)
+            if cached is not None:
+                root, factor = cached
+                break
+            if current.id_key in visited:
+                raise OperationException(f"Обнаружен цикл в цепочке базовых единиц для '{unit.name}'")
+            visited.add(current.id_key)
+            chain.append(current)
+            if current.base_unit is None:
+                root, factor = current, 1.0
+                chain.pop()
+                self.__cache[current.id_key] = (root, factor)
+                break
+            current = current.base_unit
+
+        # Заполняем кэш для всех единиц цепочки, начиная с ближайшей к корню
+        cache = self.__cache
+        for item in reversed(chain):
+            factor *= item.factor
+            cache[item.id_key] = (root, factor)
+        result = cache[unit.id_key]
+        while len(cache) > self.__max_size:
+            cache.popitem(last=False)
+        return result
+
+    def ratio(self, from_unit: UnitModel, to_unit: UnitModel) -> float:
+        """
+        Коэффициент пересчета количества из одной единицы в другую.
+
+        Raises:
+            OperationException: Если единицы сводятся к разным корневым единицам
+        """
+        from_root, from_factor = self.to_root(from_unit)
+        to_root, to_factor = self.to_root(to_unit)
+        if from_root.id_key != to_root.id_key:
+            raise OperationException(
+                f"Невозможно пересчитать '{from_unit.name}' в '{to_unit.name}': разные базовые единицы")
+        return from_factor / to_factor
+
+    def convert(self, quantity: float, from_unit: UnitModel, to_unit: UnitModel) -> float:
+        """Пересчет количества из одной единицы в другую"""
+        Validator.validate_argument(quantity, (int, float), "quantity")
+        return quantity * self.ratio(from_unit, to_unit)
+
+    def convert_many(self, quantities: list, from_units, to_unit: UnitModel) -> list:
+        """
+        Пакетный пересчет количеств в одну единицу.
+
+        Args:
+            quantities (list): Количества
+            from_units: Единица всех количеств или список единиц той же длины, что и quantities
+            to_unit (UnitModel): Целевая единица
+
+        Returns:
+            list: Количества в целевой единице
+        """
+        if isinstance(from_units, UnitModel):
+            ratio = self.ratio(from_units, to_unit)
+            return [quantity * ratio for quantity in quantities]
+
+        if len(from_units) != len(quantities):
+            raise ArgumentException("Количество единиц должно совпадать с количеством значений")
+
+        # Коэффициент считается один раз на каждую различную единицу пакета
+        ratios = {}
+        for unit in from_units:
+            if unit.id_key not in ratios:
+                ratios[unit.id_key] = self.ratio(unit, to_unit)
+        return [quantity * ratios[unit.id_key] for quantity, unit in zip(quantities, from_units)]
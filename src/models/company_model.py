@@ -1,16 +1,26 @@
 from src.core.abstract_model import AbstractModel
+from src.core.validator import Validator
 
 
 class CompanyModel(AbstractModel):
-    __inn: str = ""
-    __account: str = ""
-    __correspondent_account: str = ""
-    __BIK: str = ""
-    __ownership_type: str = ""
+    __slots__ = ("__inn", "__account", "__correspondent_account", "__BIK", "__ownership_type")
+    __checks = Validator.compile_schema({
+        "inn": dict(digits=12, digits_message="ИНН должен содержать 12 цифр", exception=ValueError),
+        "account": dict(digits=11, digits_message="Счет должен содержать 11 цифр", exception=ValueError),
+        "correspondent_account": dict(digits=11, exception=ValueError,
+                                      digits_message="Корреспондентский счет должен содержать 11 цифр"),
+        "BIK": dict(digits=9, digits_message="БИК должен содержать 9 цифр", exception=ValueError),
+    })
+    _trusted_defaults = {"inn": "", "account": "", "correspondent_account": "", "BIK": "", "ownership_type": ""}
 
 
     def __init__(self, name: str = ""):
         super().__init__(name)
+        self.__inn = ""
+        self.__account = ""
+        self.__correspondent_account = ""
+        self.__BIK = ""
+        self.__ownership_type = ""
 
     @property
     def inn(self) -> str:
@@ -18,14 +28,7 @@ class CompanyModel(AbstractModel):
     
     @inn.setter
     def inn(self, value: str|int) -> str:
-        if isinstance(value, (str, int)):
-            value = str(value)
-            if len(value) == 12 and value.isdigit():
-                self.__inn = value
-            else:
-                raise ValueError("ИНН должен содержать 12 цифр")
-        else:
-            raise ValueError("Поле должно быть строкой или числом")
+        self.__inn = self.__checks["inn"](value)
 
     @property
     def account(self) -> str:
@@ -33,14 +36,7 @@ class CompanyModel(AbstractModel):
     
     @account.setter
     def account(self, value: str|int) -> str:
-        if isinstance(value, (str, int)):
-            value = str(value)
-            if len(value) == 11 and value.isdigit():
-                self.__account = value
-            else:
-                raise ValueError("Счет должен содержать 11 цифр")
-        else:
-            raise ValueError("Поле должно быть строкой или числом")
+        self.__account = self.__checks["account"](value)
 
     @property
     def correspondent_account(self) -> str:
@@ -48,29 +44,15 @@ class CompanyModel(AbstractModel):
     
     @correspondent_account.setter
     def correspondent_account(self, value: str|int) -> str:
-        if isinstance(value, (str, int)):
-            value = str(value)
-            if len(value) == 11 and value.isdigit():
-                self.__correspondent_account = value
-            else:
-                raise ValueError("Корреспондентский счет должен содержать 11 цифр")
-        else:
-            raise ValueError("Поле должно быть строкой или числом")
-        
+        self.__correspondent_account = self.__checks["correspondent_account"](value)
+
     @property
     def BIK(self) -> str:
         return self.__BIK
     
     @BIK.setter
     def BIK(self, value: str|int) -> str:
-        if isinstance(value, (str, int)):
-            value = str(value)
-            if len(value) == 9 and value.isdigit():
-                self.__BIK = value
-            else:
-                raise ValueError("БИК должен содержать 9 цифр")
-        else:
-            raise ValueError("Поле должно быть строкой или числом")
+        self.__BIK = self.__checks["BIK"](value)
 
     @property
     def ownership_type(self) -> str:
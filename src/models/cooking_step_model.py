@@ -1,7 +1,8 @@
 """
 Модель шага приготовления рецепта.
 """
-from src.core.validator import ArgumentException, Validator
+from src.core.validator import Validator
+from src.core.trusted_loader import TrustedLoaders
 
 
 class CookingStepModel:
@@ -11,8 +12,16 @@ class CookingStepModel:
     Содержит информацию о порядке выполнения и описании шага.
     """
 
-    __description: str = ""  # Описание шага приготовления
-    __step_number: int = 0  # Порядковый номер шага
+    __slots__ = (
+        "__description",  # Описание шага приготовления
+        "__step_number",  # Порядковый номер шага
+    )
+    __checks = Validator.compile_schema({
+        "step_number": dict(expected_type=int, positive=True,
+                            positive_message="Номер шага должен быть положительным числом"),
+        "description": dict(expected_type=str, max_length=500),
+    })
+    _trusted_defaults = {"description": ""}
 
     def __init__(self, step_number: int, description: str):
         """
@@ -46,10 +55,7 @@ class CookingStepModel:
         Raises:
             ArgumentException: Если номер шага не является положительным числом
         """
-        Validator.validate_argument(value, int, "step_number")
-        if value <= 0:
-            raise ArgumentException("Номер шага должен быть положительным числом")
-        self.__step_number = value
+        self.__step_number = self.__checks["step_number"](value)
 
     @property
     def description(self) -> str:
@@ -72,8 +78,17 @@ class CookingStepModel:
         Raises:
             ArgumentException: Если описание превышает максимальную длину
         """
-        Validator.validate_argument(value, str, "description", max_length=500)
-        self.__description = value.strip()
+        self.__description = self.__checks["description"](value).strip()
+
+    @classmethod
+    def from_trusted_row(cls, row: dict):
+        """
+        Создание шага из заведомо корректных данных без повторной валидации.
+
+        Args:
+            row (dict): Значения полей step_number, description
+        """
+        return TrustedLoaders.get(cls)(row)
 
     def __str__(self) -> str:
         """
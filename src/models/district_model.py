@@ -0,0 +1,80 @@
+"""
+Модель района доставки.
+"""
+from src.core.abstract_model import AbstractModel
+from src.core.validator import ArgumentException, Validator
+from src.core.geometry import as_point, polygon_bounds, polygon_contains
+
+
+class DistrictModel(AbstractModel):
+    """
+    Модель, представляющая район доставки (п. 3.1 ТЗ): границу-многоугольник
+    и стоимость доставки в район.
+    """
+
+    __slots__ = (
+        "__polygon",  # Вершины границы района ((x, y), ...)
+        "__bounds",  # Ограничивающий прямоугольник (min_x, min_y, max_x, max_y)
+        "__delivery_price",  # Стоимость доставки
+    )
+    __checks = Validator.compile_schema({
+        "delivery_price": dict(expected_type=(int, float)),
+    })
+    _trusted_defaults = {"polygon": (), "bounds": None, "delivery_price": 0.0}
+
+    def __init__(self, name: str = "", polygon: list = (), delivery_price: float = 0.0):
+        """
+        Args:
+            name (str): Наименование района
+            polygon (list): Вершины границы (не менее трех точек)
+            delivery_price (float): Стоимость доставки в район
+        """
+        super().__init__(name)
+        self.polygon = polygon
+        self.delivery_price = delivery_price
+
+    @classmethod
+    def from_trusted_row(cls, row: dict):
+        # Ограничивающий прямоугольник не хранится - вычисляется по границе
+        model = super().from_trusted_row(row)
+        if model.__polygon:
+            model.polygon = model.__polygon
+        return model
+
+    @property
+    def polygon(self) -> tuple:
+        """Вершины границы района"""
+        return self.__polygon
+
+    @polygon.setter
+    def polygon(self, value):
+        points = tuple(as_point(point) for point in value)
+        if len(points) < 3:
+            raise ArgumentException("Граница района должна содержать не менее трех точек")
+        self.__polygon = points
+        self.__bounds = polygon_bounds(points)
+
+    @property
+    def bounds(self) -> tuple:
+        """Ограничивающий прямоугольник (min_x, min_y, max_x, max_y)"""
+        return self.__bounds
+
+    @property
+    def delivery_price(self) -> float:
+        """Стоимость доставки в район"""
+        return self.__delivery_price
+
+    @delivery_price.setter
+    def delivery_price(self, value: float):
+        value = float(self.__checks["delivery_price"](value))
+        if value < 0:
+            raise ArgumentException("Стоимость доставки не может быть отрицательной")
+        self.__delivery_price = value
+
+    def contains(self, point: tuple) -> bool:
+        """Точка внутри района"""
+        x, y = point
+        min_x, min_y, max_x, max_y = self.__bounds
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        return polygon_contains(self.__polygon, x, y)
@@ -2,6 +2,7 @@
 Модель ингредиента рецепта.
 """
 from src.core.validator import ArgumentException, Validator
+from src.core.trusted_loader import TrustedLoaders
 from src.models.nomenclature_model import NomenclatureModel
 from src.models.unit_model import UnitModel
 
@@ -13,9 +14,15 @@ class IngredientModel:
     Содержит информацию о продукте, его количестве и единице измерения.
     """
 
-    __nomenclature: NomenclatureModel = None  # Номенклатура продукта
-    __quantity: float = 0.0  # Количество ингредиента
-    __unit: UnitModel = None  # Единица измерения
+    __slots__ = (
+        "__nomenclature",  # Номенклатура продукта
+        "__quantity",  # Количество ингредиента
+        "__unit",  # Единица измерения
+    )
+    __checks = Validator.compile_schema({
+        "quantity": dict(expected_type=(int, float), positive=True,
+                         positive_message="Количество должно быть положительным числом"),
+    })
 
     def __init__(self, nomenclature: NomenclatureModel, quantity: float, unit: UnitModel):
         """
@@ -76,10 +83,7 @@ class IngredientModel:
         Raises:
             ArgumentException: Если количество не является положительным числом
         """
-        Validator.validate_argument(value, (int, float), "quantity")
-        if value <= 0:
-            raise ArgumentException("Количество должно быть положительным числом")
-        self.__quantity = float(value)
+        self.__quantity = float(self.__checks["quantity"](value))
 
     @property
     def unit(self) -> UnitModel:
@@ -106,6 +110,16 @@ class IngredientModel:
             raise ArgumentException("Единица измерения должна быть экземпляром UnitModel")
         self.__unit = value
 
+    @classmethod
+    def from_trusted_row(cls, row: dict):
+        """
+        Создание ингредиента из заведомо корректных данных без повторной валидации.
+
+        Args:
+            row (dict): Значения полей nomenclature, quantity, unit
+        """
+        return TrustedLoaders.get(cls)(row)
+
     def __str__(self) -> str:
         """
         Строковое представление ингредиента.
@@ -1,5 +1,62 @@
 from src.core.abstract_model import AbstractModel
+from src.core.change_journal import ChangeJournal
+from src.core.validator import ArgumentException
 
 class NomenclatureGroupModel(AbstractModel):
-    def __init__(self, name: str = ""):
-        super().__init__(name)
\ No newline at end of file
+    __slots__ = ("__parent", "__weakref__")
+    __changes: ChangeJournal = ChangeJournal()  # Переносы групп: (группа, прежний родитель, новый родитель)
+    _trusted_defaults = {"parent": None}
+
+    def __init__(self, name: str = "", parent = None):
+        super().__init__(name)
+        self.parent = parent
+
+    @property
+    def parent(self):
+        # Родительская группа (None - группа верхнего уровня)
+        return self.__parent
+
+    @parent.setter
+    def parent(self, value):
+        if value is not None:
+            if not isinstance(value, NomenclatureGroupModel):
+                raise ArgumentException("Родительская группа должна быть экземпляром NomenclatureGroupModel")
+            # Группа не может входить сама в себя
+            current = value
+            while current is not None:
+                if current is self:
+                    raise ArgumentException(f"Группа '{self.name}' не может входить в свою подгруппу")
+                current = current.parent
+        try:
+            previous = self.__parent
+        except AttributeError:
+            previous = value  # Первичная установка родителя в конструкторе
+        self.__parent = value
+        if previous is not value:
+            NomenclatureGroupModel.__changes.record(self, previous, value)
+
+    @property
+    def ancestors(self) -> list:
+        # Группа и все группы, в которые она входит (от группы к верхнему уровню)
+        result = []
+        current = self
+        while current is not None:
+            result.append(current)
+            current = current.parent
+        return result
+
+    @staticmethod
+    def mark_changed():
+        # Отметка изменения иерархии без подробностей (итоги по группам пересобираются целиком)
+        NomenclatureGroupModel.__changes.record(None, None, None)
+
+    @staticmethod
+    def moves_since(revision: int, until: int = None):
+        # Переносы групп после изменения с номером revision (до until): [(группа, откуда, куда)].
+        # None - если журнал переносов их уже не содержит
+        return NomenclatureGroupModel.__changes.since(revision, until)
+
+    @staticmethod
+    def revision() -> int:
+        # Номер изменения иерархии групп (используется для сброса рассчитанных по группам итогов)
+        return NomenclatureGroupModel.__changes.revision
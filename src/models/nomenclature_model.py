@@ -1,18 +1,24 @@
 from src.core.abstract_model import AbstractModel
+from src.core.change_journal import ChangeJournal
 from src.models.nomenclature_group_model import NomenclatureGroupModel
 from src.models.unit_model import UnitModel
 from src.core.validator import ArgumentException, Validator
 
 class NomenclatureModel(AbstractModel):
-    __full_name: str = ""
-    __group = None
-    __unit = None
+    __slots__ = ("__full_name", "__group", "__unit", "__price", "__weakref__")
+    __group_changes: ChangeJournal = ChangeJournal()  # Переносы номенклатуры: (номенклатура, откуда, куда)
+    __checks = Validator.compile_schema({
+        "full_name": dict(expected_type=str, max_length=255),
+        "price": dict(expected_type=(int, float)),
+    })
+    _trusted_defaults = {"full_name": "", "group": None, "unit": None, "price": 0.0}
 
-    def __init__(self, name: str = "", full_name: str = "", group = None, unit = None):
+    def __init__(self, name: str = "", full_name: str = "", group = None, unit = None, price: float = 0.0):
         super().__init__(name)
         self.full_name = full_name
         self.group = group
         self.unit = unit
+        self.price = price
 
     @property
     def full_name(self) -> str:
@@ -20,8 +26,7 @@ class NomenclatureModel(AbstractModel):
 
     @full_name.setter
     def full_name(self, value: str):
-        Validator.validate_argument(value, str, "full_name", max_length=255)
-        self.__full_name = value.strip()
+        self.__full_name = self.__checks["full_name"](value).strip()
 
     @property
     def group(self):
@@ -31,7 +36,24 @@ class NomenclatureModel(AbstractModel):
     def group(self, value):
         if value is not None and not isinstance(value, NomenclatureGroupModel):
             raise ArgumentException("Группа должна быть экземпляром NomenclatureGroupModel")
+        try:
+            previous = self.__group
+        except AttributeError:
+            previous = value  # Первичная установка группы в конструкторе
         self.__group = value
+        if previous is not value:
+            NomenclatureModel.__group_changes.record(self, previous, value)
+
+    @staticmethod
+    def group_moves_since(revision: int, until: int = None):
+        # Переносы номенклатуры между группами после изменения с номером revision (до until):
+        # [(номенклатура, откуда, куда)]. None - если журнал переносов их уже не содержит
+        return NomenclatureModel.__group_changes.since(revision, until)
+
+    @staticmethod
+    def group_revision() -> int:
+        # Номер изменения групп номенклатуры (используется для сброса рассчитанных по группам итогов)
+        return NomenclatureModel.__group_changes.revision
 
     @property
     def unit(self):
@@ -42,3 +64,15 @@ class NomenclatureModel(AbstractModel):
         if value is not None and not isinstance(value, UnitModel):
             raise ArgumentException("Единица измерения должна быть экземпляром UnitModel")
         self.__unit = value
+
+    @property
+    def price(self) -> float:
+        # Цена за единицу измерения номенклатуры
+        return self.__price
+
+    @price.setter
+    def price(self, value: float):
+        value = float(self.__checks["price"](value))
+        if value < 0:
+            raise ArgumentException("Цена не может быть отрицательной")
+        self.__price = value
@@ -0,0 +1,83 @@
+"""
+Модель заказа на производство.
+"""
+from datetime import datetime
+from src.core.abstract_model import AbstractModel
+from src.core.validator import ArgumentException, Validator
+from src.models.receipt_model import ReceiptModel
+from src.models.storage_model import StorageModel
+
+
+class ProductionOrderModel(AbstractModel):
+    """
+    Модель, представляющая заказ на производство (п. 6.1 ТЗ):
+    приготовление заданного количества порций по технологической карте
+    со списанием ингредиентов со склада.
+    """
+
+    __slots__ = (
+        "__receipt",  # Технологическая карта
+        "__portions",  # Количество порций
+        "__storage",  # Склад списания ингредиентов
+        "__period",  # Дата и время производства
+    )
+    __checks = Validator.compile_schema({
+        "portions": dict(expected_type=(int, float), positive=True,
+                         positive_message="Количество порций должно быть положительным числом"),
+        "period": dict(expected_type=datetime),
+    })
+
+    def __init__(self, receipt: ReceiptModel, portions: float, storage: StorageModel, period: datetime):
+        """
+        Инициализирует модель заказа на производство.
+
+        Args:
+            receipt (ReceiptModel): Технологическая карта
+            portions (float): Количество порций
+            storage (StorageModel): Склад списания ингредиентов
+            period (datetime): Дата и время производства
+        """
+        if not isinstance(receipt, ReceiptModel):
+            raise ArgumentException("Рецепт должен быть экземпляром ReceiptModel")
+        super().__init__(receipt.name)
+        self.__receipt = receipt
+        self.portions = portions
+        self.storage = storage
+        self.period = period
+
+    @property
+    def receipt(self) -> ReceiptModel:
+        """Технологическая карта"""
+        return self.__receipt
+
+    @property
+    def portions(self) -> float:
+        """Количество порций"""
+        return self.__portions
+
+    @portions.setter
+    def portions(self, value: float):
+        self.__portions = float(self.__checks["portions"](value))
+
+    @property
+    def storage(self) -> StorageModel:
+        """Склад списания ингредиентов"""
+        return self.__storage
+
+    @storage.setter
+    def storage(self, value: StorageModel):
+        if not isinstance(value, StorageModel):
+            raise ArgumentException("Склад должен быть экземпляром StorageModel")
+        self.__storage = value
+
+    @property
+    def period(self) -> datetime:
+        """Дата и время производства"""
+        return self.__period
+
+    @period.setter
+    def period(self, value: datetime):
+        self.__period = self.__checks["period"](value)
+
+    def __str__(self) -> str:
+        return f"{self.__receipt.name} x {self.__portions} ({self.__storage.name}, {self.__period:%d.%m.%Y})"
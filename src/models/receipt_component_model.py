@@ -0,0 +1,94 @@
+"""
+Модель вложенной технологической карты рецепта.
+"""
+from src.core.validator import ArgumentException, Validator
+from src.core.trusted_loader import TrustedLoaders
+from src.models.receipt_model import ReceiptModel
+
+
+class ReceiptComponentModel:
+    """
+    Модель, представляющая включение одной технологической карты в состав другой
+    (п. 2.5 ТЗ): заданное количество порций вложенного рецепта.
+    """
+
+    __slots__ = (
+        "__receipt",  # Вложенный рецепт
+        "__portions",  # Количество порций вложенного рецепта
+    )
+    __checks = Validator.compile_schema({
+        "portions": dict(expected_type=(int, float), positive=True,
+                         positive_message="Количество порций должно быть положительным числом"),
+    })
+
+    def __init__(self, receipt: ReceiptModel, portions: float):
+        """
+        Инициализирует модель вложенной технологической карты.
+
+        Args:
+            receipt (ReceiptModel): Вложенный рецепт
+            portions (float): Количество порций вложенного рецепта
+        """
+        self.receipt = receipt
+        self.portions = portions
+
+    @property
+    def receipt(self) -> ReceiptModel:
+        """
+        Получает вложенный рецепт.
+
+        Returns:
+            ReceiptModel: Вложенный рецепт
+        """
+        return self.__receipt
+
+    @receipt.setter
+    def receipt(self, value: ReceiptModel):
+        """
+        Устанавливает вложенный рецепт с валидацией.
+
+        Raises:
+            ArgumentException: Если передан неверный тип объекта
+        """
+        if not isinstance(value, ReceiptModel):
+            raise ArgumentException("Вложенная технологическая карта должна быть экземпляром ReceiptModel")
+        self.__receipt = value
+
+    @property
+    def portions(self) -> float:
+        """
+        Получает количество порций вложенного рецепта.
+
+        Returns:
+            float: Количество порций
+        """
+        return self.__portions
+
+    @portions.setter
+    def portions(self, value: float):
+        """
+        Устанавливает количество порций с валидацией.
+
+        Raises:
+            ArgumentException: Если количество не является положительным числом
+        """
+        self.__portions = float(self.__checks["portions"](value))
+
+    @classmethod
+    def from_trusted_row(cls, row: dict):
+        """
+        Создание вложенной карты из заведомо корректных данных без повторной валидации.
+
+        Args:
+            row (dict): Значения полей receipt, portions
+        """
+        return TrustedLoaders.get(cls)(row)
+
+    def __str__(self) -> str:
+        """
+        Строковое представление вложенной технологической карты.
+
+        Returns:
+            str: В формате "наименование рецепта - количество порц."
+        """
+        return f"{self.receipt.name} - {self.portions} порц."
@@ -2,7 +2,11 @@
 Модель рецепта приготовления блюда.
 """
 from src.core.abstract_model import AbstractModel
+from src.core.change_journal import ChangeJournal
+from src.core.read_only_view import ReadOnlyView
 from src.core.validator import ArgumentException, Validator
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
 
 
 class ReceiptModel(AbstractModel):
@@ -13,10 +17,24 @@ class ReceiptModel(AbstractModel):
     Наследует базовую функциональность от AbstractModel.
     """
 
-    __portions: int = 1  # Количество порций
-    __cooking_time: str = ""  # Время приготовления
-    __ingredients: list = None  # Список ингредиентов
-    __cooking_steps: list = None  # Список шагов приготовления
+    __slots__ = (
+        "__portions",  # Количество порций
+        "__cooking_time",  # Время приготовления
+        "__ingredients",  # Список ингредиентов
+        "__cooking_steps",  # Список шагов приготовления
+        "__ingredients_view",  # Представление списка ингредиентов только для чтения
+        "__cooking_steps_view",  # Представление списка шагов только для чтения
+        "__version",  # Номер изменения состава рецепта
+        "__weakref__",  # Слабые ссылки (журнал изменений состава не удерживает рецепты)
+    )
+    __changes: ChangeJournal = ChangeJournal()  # Изменения состава всех рецептов: (рецепт,)
+    __checks = Validator.compile_schema({
+        "portions": dict(expected_type=int, positive=True,
+                         positive_message="Количество порций должно быть положительным числом"),
+        "cooking_time": dict(expected_type=str, max_length=50),
+    })
+    _trusted_defaults = {"portions": 1, "cooking_time": "", "ingredients": list, "cooking_steps": list,
+                         "ingredients_view": None, "cooking_steps_view": None, "version": 0}
 
     def __init__(self, name: str = "", portions: int = 1, cooking_time: str = ""):
         """
@@ -28,10 +46,13 @@ class ReceiptModel(AbstractModel):
             cooking_time (str): Ориентировочное время приготовления
         """
         super().__init__(name)
+        self.__version = 0
         self.portions = portions
         self.cooking_time = cooking_time
         self.__ingredients = []
         self.__cooking_steps = []
+        self.__ingredients_view = None
+        self.__cooking_steps_view = None
 
     @property
     def portions(self) -> int:
@@ -54,10 +75,8 @@ class ReceiptModel(AbstractModel):
         Raises:
             ArgumentException: Если количество порций не является положительным числом
         """
-        Validator.validate_argument(value, int, "portions")
-        if value <= 0:
-            raise ArgumentException("Количество порций должно быть положительным числом")
-        self.__portions = value
+        self.__portions = self.__checks["portions"](value)
+        self.__version += 1
 
     @property
     def cooking_time(self) -> str:
@@ -80,28 +99,163 @@ class ReceiptModel(AbstractModel):
         Raises:
             ArgumentException: Если описание времени превышает максимальную длину
         """
-        Validator.validate_argument(value, str, "cooking_time", max_length=50)
-        self.__cooking_time = value.strip()
+        self.__cooking_time = self.__checks["cooking_time"](value).strip()
 
     @property
-    def ingredients(self):
+    def ingredients(self) -> ReadOnlyView:
         """
-        Получает список ингредиентов.
+        Получает ингредиенты рецепта.
         
         Returns:
-            list: Копия списка ингредиентов рецепта
+            ReadOnlyView: Представление списка ингредиентов только для чтения
+                          (создается один раз, без копирования списка)
         """
-        return self.__ingredients.copy()
+        view = self.__ingredients_view
+        if view is None:
+            view = self.__ingredients_view = ReadOnlyView(self.__ingredients)
+        return view
 
     @property
-    def cooking_steps(self):
+    def cooking_steps(self) -> ReadOnlyView:
         """
-        Получает список шагов приготовления.
+        Получает шаги приготовления рецепта.
         
         Returns:
-            list: Копия списка шагов приготовления рецепта
+            ReadOnlyView: Представление списка шагов только для чтения
+                          (создается один раз, без копирования списка)
         """
-        return self.__cooking_steps.copy()
+        view = self.__cooking_steps_view
+        if view is None:
+            view = self.__cooking_steps_view = ReadOnlyView(self.__cooking_steps)
+        return view
+
+    @property
+    def version(self) -> int:
+        """
+        Получает номер изменения рецепта.
+
+        Увеличивается при изменении порций, ингредиентов и шагов; используется
+        для сброса кэшей рассчитанных данных.
+
+        Returns:
+            int: Номер изменения
+        """
+        return self.__version
+
+    def add_ingredient(self, ingredient):
+        """
+        Добавляет ингредиент или вложенную технологическую карту.
+
+        Args:
+            ingredient: IngredientModel или ReceiptComponentModel
+
+        Raises:
+            ArgumentException: Если передан неверный тип объекта
+        """
+        self.__ingredients.append(self.__check_ingredient(ingredient))
+        self.__composition_changed()
+
+    def extend_ingredients(self, ingredients):
+        """
+        Добавляет несколько ингредиентов за одно изменение рецепта.
+
+        Все элементы проверяются до добавления: при ошибке рецепт не изменяется.
+
+        Args:
+            ingredients: Последовательность IngredientModel или ReceiptComponentModel
+
+        Raises:
+            ArgumentException: Если хотя бы один объект имеет неверный тип
+        """
+        checked = [self.__check_ingredient(ingredient) for ingredient in ingredients]
+        if checked:
+            self.__ingredients.extend(checked)
+            self.__composition_changed()
+
+    def add_step(self, step):
+        """
+        Добавляет шаг приготовления.
+
+        Args:
+            step (CookingStepModel): Шаг приготовления
+
+        Raises:
+            ArgumentException: Если передан неверный тип объекта
+        """
+        self.__cooking_steps.append(self.__check_step(step))
+        self.__version += 1
+
+    def extend_steps(self, steps):
+        """
+        Добавляет несколько шагов приготовления за одно изменение рецепта.
+
+        Args:
+            steps: Последовательность CookingStepModel
+
+        Raises:
+            ArgumentException: Если хотя бы один объект имеет неверный тип
+        """
+        checked = [self.__check_step(step) for step in steps]
+        if checked:
+            self.__cooking_steps.extend(checked)
+            self.__version += 1
+
+    @staticmethod
+    def __check_ingredient(ingredient):
+        """Проверка типа ингредиента"""
+        # Импорт здесь: модель вложенной карты сама ссылается на ReceiptModel
+        from src.models.receipt_component_model import ReceiptComponentModel
+
+        if not isinstance(ingredient, (IngredientModel, ReceiptComponentModel)):
+            raise ArgumentException("Ингредиент должен быть экземпляром IngredientModel или ReceiptComponentModel")
+        return ingredient
+
+    @staticmethod
+    def __check_step(step):
+        """Проверка типа шага приготовления"""
+        if not isinstance(step, CookingStepModel):
+            raise ArgumentException("Шаг должен быть экземпляром CookingStepModel")
+        return step
+
+    def mark_changed(self):
+        """
+        Отмечает изменение состава рецепта.
+
+        Вызывается после изменения ингредиентов, уже входящих в рецепт
+        (например, их количества или номенклатуры), чтобы сбросить рассчитанные
+        по рецепту данные и ссылки рецепта в индексах репозитория.
+        """
+        self.__composition_changed()
+
+    @staticmethod
+    def revision() -> int:
+        """
+        Номер изменения состава рецептов (общий для всех экземпляров).
+
+        Returns:
+            int: Номер последнего изменения ингредиентов любого рецепта
+        """
+        return ReceiptModel.__changes.revision
+
+    @staticmethod
+    def changes_since(revision: int, until: int = None):
+        """
+        Рецепты, состав которых изменялся после изменения с номером revision.
+
+        Args:
+            until (int): Номер последнего учитываемого изменения (None - до текущего)
+
+        Returns:
+            list: Измененные рецепты (могут повторяться) или None, если журнал
+                  изменений их уже не содержит
+        """
+        changes = ReceiptModel.__changes.since(revision, until)
+        return None if changes is None else [receipt for receipt, in changes]
+
+    def __composition_changed(self):
+        """Учет изменения ингредиентов рецепта"""
+        self.__version += 1
+        ReceiptModel.__changes.record(self)
 
     def __str__(self) -> str:
         """
@@ -0,0 +1,81 @@
+"""
+Модель ресторана сети.
+"""
+from enum import Enum
+from src.core.abstract_model import AbstractModel
+from src.core.geometry import as_point
+from src.core.validator import ArgumentException
+from src.models.storage_model import StorageModel
+
+
+class RestaurantServiceType(Enum):
+    """Режим работы ресторана"""
+    DELIVERY = "Только доставка"
+    COMBINED = "Доставка и посетители"
+    DINE_IN = "Только посетители"
+
+
+class RestaurantModel(AbstractModel):
+    """
+    Модель, представляющая ресторан: расположение в городе (координаты
+    в километрах в местной прямоугольной системе), режим работы и склад.
+    """
+
+    __slots__ = (
+        "__location",  # Координаты (x, y)
+        "__service_type",  # Режим работы
+        "__storage",  # Склад ресторана
+    )
+    _trusted_defaults = {"service_type": RestaurantServiceType.COMBINED, "storage": None}
+
+    def __init__(self, name: str = "", location: tuple = (0.0, 0.0),
+                 service_type: RestaurantServiceType = RestaurantServiceType.COMBINED,
+                 storage: StorageModel = None):
+        """
+        Args:
+            name (str): Наименование ресторана
+            location (tuple): Координаты (x, y)
+            service_type (RestaurantServiceType): Режим работы
+            storage (StorageModel): Склад ресторана
+        """
+        super().__init__(name)
+        self.location = location
+        self.service_type = service_type
+        self.storage = storage
+
+    @property
+    def location(self) -> tuple:
+        """Координаты (x, y)"""
+        return self.__location
+
+    @location.setter
+    def location(self, value: tuple):
+        self.__location = as_point(value)
+
+    @property
+    def service_type(self) -> RestaurantServiceType:
+        """Режим работы"""
+        return self.__service_type
+
+    @service_type.setter
+    def service_type(self, value: RestaurantServiceType):
+        if not isinstance(value, RestaurantServiceType):
+            raise ArgumentException("Режим работы должен быть экземпляром RestaurantServiceType")
+        self.__service_type = value
+
+    @property
+    def storage(self) -> StorageModel:
+        """Склад ресторана"""
+        return self.__storage
+
+    @storage.setter
+    def storage(self, value: StorageModel):
+        if value is not None and not isinstance(value, StorageModel):
+            raise ArgumentException("Склад должен быть экземпляром StorageModel")
+        self.__storage = value
+
+    @property
+    def delivers(self) -> bool:
+        """Ресторан принимает заказы на доставку (п. 3.2 ТЗ)"""
+        return self.__service_type != RestaurantServiceType.DINE_IN
+
@@ -1,10 +1,88 @@
+from dataclasses import dataclass, field, fields
 from src.models.company_model import CompanyModel
+from src.core.validator import OperationException
+
+
+@dataclass(frozen=True)
+class StorageSettings:
+    """Складской учет по умолчанию"""
+    allow_negative_balance: bool = False  # Списание "под сальдо" по умолчанию (ProductionService.post)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Размеры пулов"""
+    sqlite_connections: int = field(default=4, metadata=dict(positive=True))  # sqlite_reposity
+    parse_workers: int = field(default=0, metadata=dict(minimum=0))  # FileDataCreator; 0 - по числу ядер
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Размеры кэшей"""
+    rendered_cards: int = field(default=10_000, metadata=dict(positive=True))  # RecipeCardRenderer
+    receipt_expansions: int = field(default=10_000, metadata=dict(positive=True))  # ReceiptCalculator
+    unit_conversions: int = field(default=10_000, metadata=dict(positive=True))  # UnitConverter
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Хранение данных"""
+    sqlite_path: str = field(default="data.db", metadata=dict(min_length=1, max_length=255))  # sqlite_reposity
+
+
+# Раздел конфигурационного файла -> класс раздела настроек
+SECTIONS = {
+    "storage": StorageSettings,
+    "pools": PoolSettings,
+    "caches": CacheSettings,
+    "database": DatabaseSettings,
+}
+
+# Параметры раздела company -> свойства CompanyModel
+COMPANY_FIELDS = ("name", "inn", "account", "correspondent_account", "BIK", "ownership_type")
+
+
+class FrozenCompanyModel(CompanyModel):
+    """Организация замороженных настроек: реквизиты изменить нельзя"""
+    __slots__ = ()
+
+    @staticmethod
+    def copy_of(company: CompanyModel):
+        """Неизменяемая копия организации"""
+        return FrozenCompanyModel.from_trusted_row(FrozenCompanyModel.__row(company))
+
+    def __setattr__(self, name: str, value):
+        raise OperationException("Настройки заморожены и не могут изменяться")
+
+    def __reduce__(self):
+        # Восстановление при распаковке (pickle) - без вызова запрещенных сеттеров
+        return FrozenCompanyModel.from_trusted_row, (FrozenCompanyModel.__row(self),)
+
+    @staticmethod
+    def __row(company: CompanyModel) -> dict:
+        return {"id": company.id, **{key: getattr(company, key) for key in COMPANY_FIELDS}}
+
 
 class Settings:
+    """
+    Настройки приложения: организация и разделы storage, pools, caches, database.
+
+    Разделы - неизменяемые объекты. Загруженные из файла настройки
+    замораживаются (freeze), после чего их можно без блокировок передавать
+    между потоками и процессами: заменить организацию или раздел, как и
+    изменить реквизиты организации, уже нельзя.
+    """
+
     __organization: CompanyModel = None
+    __sections: dict = None  # Раздел -> объект раздела
+    __frozen: bool = False
 
-    def __init__(self):
-        self.__organization = CompanyModel("Новая организация")
+    def __init__(self, organization: CompanyModel = None, **sections):
+        self.__organization = organization or CompanyModel("Новая организация")
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Неизвестные разделы настроек: {', '.join(sorted(unknown))}")
+        self.__sections = {name: sections.get(name) or section() for name, section in SECTIONS.items()}
 
     @property
     def organization(self) -> CompanyModel:
@@ -12,7 +90,41 @@ class Settings:
 
     @organization.setter
     def organization(self, company_instance: CompanyModel):
+        if self.__frozen:
+            raise OperationException("Настройки заморожены и не могут изменяться")
         if isinstance(company_instance, CompanyModel):
             self.__organization = company_instance
         else:
-            raise ValueError("Необходимо передать объект CompanyModel")
\ No newline at end of file
+            raise ValueError("Необходимо передать объект CompanyModel")
+
+    @property
+    def storage(self) -> StorageSettings:
+        return self.__sections["storage"]
+
+    @property
+    def pools(self) -> PoolSettings:
+        return self.__sections["pools"]
+
+    @property
+    def caches(self) -> CacheSettings:
+        return self.__sections["caches"]
+
+    @property
+    def database(self) -> DatabaseSettings:
+        return self.__sections["database"]
+
+    @property
+    def frozen(self) -> bool:
+        return self.__frozen
+
+    def freeze(self):
+        """Запрет дальнейших изменений (организация заменяется неизменяемой копией); возвращает сами настройки"""
+        if not isinstance(self.__organization, FrozenCompanyModel):
+            self.__organization = FrozenCompanyModel.copy_of(self.__organization)
+        self.__frozen = True
+        return self
+
+    @staticmethod
+    def section_fields(section) -> list:
+        """Поля раздела с правилами проверки: [(имя, тип, правила)]"""
+        return [(item.name, item.type, dict(item.metadata)) for item in fields(section)]
@@ -0,0 +1,140 @@
+"""
+Модель складского движения номенклатуры.
+"""
+from datetime import datetime
+from enum import Enum
+from src.core.abstract_model import AbstractModel
+from src.core.validator import ArgumentException, Validator
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.unit_model import UnitModel
+
+
+class StockMovementType(Enum):
+    """Вид складского движения"""
+    RECEIPT = "Поступление"
+    WRITE_OFF = "Списание"
+    TRANSFER = "Перемещение"
+
+
+class StockMovementModel(AbstractModel):
+    """
+    Модель, представляющая одно складское движение: поступление, списание
+    или перемещение номенклатуры между складами.
+    """
+
+    __slots__ = (
+        "__movement_type",  # Вид движения
+        "__nomenclature",  # Номенклатура
+        "__storage",  # Склад (для перемещения - склад-отправитель)
+        "__target_storage",  # Склад-получатель (только для перемещения)
+        "__unit",  # Единица измерения количества
+        "__quantity",  # Количество
+        "__period",  # Дата и время движения
+    )
+    __checks = Validator.compile_schema({
+        "quantity": dict(expected_type=(int, float), positive=True,
+                         positive_message="Количество должно быть положительным числом"),
+        "period": dict(expected_type=datetime),
+    })
+    _trusted_defaults = {"target_storage": None}
+
+    def __init__(self, movement_type: StockMovementType, nomenclature: NomenclatureModel,
+                 storage: StorageModel, quantity: float, unit: UnitModel,
+                 period: datetime, target_storage: StorageModel = None):
+        """
+        Инициализирует модель движения.
+
+        Args:
+            movement_type (StockMovementType): Вид движения
+            nomenclature (NomenclatureModel): Номенклатура
+            storage (StorageModel): Склад (для перемещения - склад-отправитель)
+            quantity (float): Количество
+            unit (UnitModel): Единица измерения количества
+            period (datetime): Дата и время движения
+            target_storage (StorageModel): Склад-получатель для перемещения
+        """
+        if not isinstance(movement_type, StockMovementType):
+            raise ArgumentException("Вид движения должен быть экземпляром StockMovementType")
+        super().__init__(movement_type.value)
+        self.__movement_type = movement_type
+        self.nomenclature = nomenclature
+        self.storage = storage
+        self.quantity = quantity
+        self.unit = unit
+        self.period = period
+        self.target_storage = target_storage
+
+    @property
+    def movement_type(self) -> StockMovementType:
+        """Вид движения"""
+        return self.__movement_type
+
+    @property
+    def nomenclature(self) -> NomenclatureModel:
+        """Номенклатура"""
+        return self.__nomenclature
+
+    @nomenclature.setter
+    def nomenclature(self, value: NomenclatureModel):
+        if not isinstance(value, NomenclatureModel):
+            raise ArgumentException("Номенклатура должна быть экземпляром NomenclatureModel")
+        self.__nomenclature = value
+
+    @property
+    def storage(self) -> StorageModel:
+        """Склад (для перемещения - склад-отправитель)"""
+        return self.__storage
+
+    @storage.setter
+    def storage(self, value: StorageModel):
+        if not isinstance(value, StorageModel):
+            raise ArgumentException("Склад должен быть экземпляром StorageModel")
+        self.__storage = value
+
+    @property
+    def target_storage(self) -> StorageModel:
+        """Склад-получатель (только для перемещения)"""
+        return self.__target_storage
+
+    @target_storage.setter
+    def target_storage(self, value: StorageModel):
+        if self.__movement_type == StockMovementType.TRANSFER:
+            if not isinstance(value, StorageModel):
+                raise ArgumentException("Для перемещения необходимо указать склад-получатель")
+        elif value is not None:
+            raise ArgumentException("Склад-получатель указывается только для перемещения")
+        self.__target_storage = value
+
+    @property
+    def unit(self) -> UnitModel:
+        """Единица измерения количества"""
+        return self.__unit
+
+    @unit.setter
+    def unit(self, value: UnitModel):
+        if not isinstance(value, UnitModel):
+            raise ArgumentException("Единица измерения должна быть экземпляром UnitModel")
+        self.__unit = value
+
+    @property
+    def quantity(self) -> float:
+        """Количество в единице unit"""
+        return self.__quantity
+
+    @quantity.setter
+    def quantity(self, value: float):
+        self.__quantity = float(self.__checks["quantity"](value))
+
+    @property
+    def period(self) -> datetime:
+        """Дата и время движения"""
+        return self.__period
+
+    @period.setter
+    def period(self, value: datetime):
+        self.__period = self.__checks["period"](value)
+
+    def __str__(self) -> str:
+        return (f"{self.__movement_type.value} {self.__nomenclature.name} "
+                f"{self.__quantity} {self.__unit.name} ({self.__period:%d.%m.%Y})")
@@ -2,6 +2,8 @@ from src.core.validator import Validator
 from src.core.abstract_model import AbstractModel
 
 class StorageModel(AbstractModel):
+    __slots__ = ()
+
     def __init__(self, name: str = ""):
         super().__init__(name)
 
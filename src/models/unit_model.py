@@ -1,9 +1,15 @@
 from src.core.abstract_model import AbstractModel
+from src.core.change_journal import ChangeJournal
 from src.core.validator import ArgumentException, Validator
 
 class UnitModel(AbstractModel):
-    __base_unit = None
-    __factor: float = 1.0
+    __slots__ = ("__base_unit", "__factor")
+    __changes: ChangeJournal = ChangeJournal(maxlen=0)  # Счетчик изменений коэффициентов и базовых единиц
+    __checks = Validator.compile_schema({
+        "factor": dict(expected_type=(int, float), positive=True,
+                       positive_message="Коэффициент пересчета должен быть положительным числом"),
+    })
+    _trusted_defaults = {"factor": 1.0, "base_unit": None}
 
     def __init__(self, name: str = "", factor: float = 1.0, base_unit = None):
         super().__init__(name)
@@ -18,7 +24,13 @@ class UnitModel(AbstractModel):
     def base_unit(self, value):
         if value is not None and not isinstance(value, UnitModel):
             raise ArgumentException("Базовая единица измерения должна быть экземпляром UnitModel")
+        try:
+            changed = self.__base_unit is not value
+        except AttributeError:
+            changed = False  # Первичная установка в конструкторе
         self.__base_unit = value
+        if changed:
+            UnitModel.__changes.record()
 
     @property
     def factor(self) -> float:
@@ -26,10 +38,19 @@ class UnitModel(AbstractModel):
 
     @factor.setter
     def factor(self, value: float):
-        Validator.validate_argument(value, (int, float), "factor")
-        if value <= 0:
-            raise ArgumentException("Коэффициент пересчета должен быть положительным числом")
-        self.__factor = float(value)
+        value = float(self.__checks["factor"](value))
+        try:
+            changed = self.__factor != value
+        except AttributeError:
+            changed = False  # Первичная установка в конструкторе
+        self.__factor = value
+        if changed:
+            UnitModel.__changes.record()
+
+    @staticmethod
+    def revision() -> int:
+        # Номер изменения пересчетов (используется для сброса кэшей конвертации)
+        return UnitModel.__changes.revision
 
     @staticmethod
     def create_gramm():
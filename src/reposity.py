@@ -1,6 +1,9 @@
 """
 Репозиторий данных
 """
+from src.core.validator import OperationException
+
+
 class reposity:
     __data = {}
 
@@ -22,12 +25,148 @@ class reposity:
         """Сеттер для установки всех данных репозитория"""
         if not isinstance(value, dict):
             raise ValueError("Данные должны быть словарем")
+        receipts = value.get(self.receipt_key())
+        if isinstance(receipts, dict):
+            value[self.receipt_key()] = {name: self.receipt_entry(entry) for name, entry in receipts.items()}
         self.__data = value
     
     def set_data(self, key: str, value):
         """Установка данных по ключу"""
+        if key == self.receipt_key() and isinstance(value, dict):
+            value = {name: self.receipt_entry(entry) for name, entry in value.items()}
         self.__data[key] = value
+
+    def models(self, key: str) -> list:
+        """
+        Список моделей коллекции.
+
+        Для рецептов возвращаются объекты ReceiptModel из записей словаря.
+        """
+        collection = self.__data.get(key)
+        if not collection:
+            return []
+        if isinstance(collection, dict):
+            return [entry["receipt"] for entry in collection.values()]
+        return list(collection)
+
+    def get_by_id(self, key: str, model_id: str):
+        """Поиск модели коллекции по идентификатору (None - не найдена)"""
+        for model in self.models(key):
+            if model.id == model_id:
+                return model
+        return None
+
+    def find_by_name(self, key: str, name: str):
+        """Поиск первой модели коллекции с указанным наименованием (None - не найдена)"""
+        for model in self.models(key):
+            if model.name == name:
+                return model
+        return None
+
+    def add(self, key: str, model):
+        """
+        Добавление модели в коллекцию.
+
+        Рецепт можно передать как объект ReceiptModel или как готовую запись
+        {"receipt": ..., "ingredients": [...], "steps": [...]}.
+
+        Raises:
+            OperationException: Если рецепт с таким наименованием уже есть
+        """
+        if key == self.receipt_key():
+            entry = self.receipt_entry(model)
+            self._check_receipt_name(entry["receipt"])
+            collection = self.__data.get(key)
+            if not isinstance(collection, dict):
+                # Рецепты хранятся словарем "наименование -> запись"
+                collection = self.__data[key] = {}
+            collection[entry["receipt"].name] = entry
+            return entry["receipt"]
+
+        self.__data.setdefault(key, []).append(model)
+        return model
+
+    def get_or_add(self, key: str, name: str, factory):
+        """
+        Поиск модели по наименованию, а если ее нет - создание через factory() и добавление в коллекцию.
+
+        Returns:
+            Единственный экземпляр модели с этим наименованием в коллекции
+        """
+        model = self.find_by_name(key, name)
+        if model is None:
+            model = self.add(key, factory())
+        return model
+
+    def update(self, key: str, model):
+        """
+        Фиксация изменений модели (в простом репозитории модели изменяются на месте).
+
+        Переименованный рецепт переносится в словаре рецептов под новое наименование.
+
+        Raises:
+            OperationException: Если новое наименование рецепта занято другим рецептом
+        """
+        if key == self.receipt_key():
+            self._check_receipt_name(model)
+            collection = self.__data.get(key)
+            if isinstance(collection, dict) and model.name not in collection:
+                for name, entry in collection.items():
+                    if entry["receipt"] is model or entry["receipt"] == model:
+                        del collection[name]
+                        collection[model.name] = entry
+                        break
+        return model
+
+    def remove(self, key: str, model) -> bool:
+        """Удаление модели из коллекции"""
+        collection = self.__data.get(key)
+        if not collection:
+            return False
+        if isinstance(collection, dict):
+            for name, entry in collection.items():
+                if entry["receipt"] is model or entry["receipt"] == model:
+                    del collection[name]
+                    return True
+            return False
+        for index, item in enumerate(collection):
+            if item is model or item == model:
+                del collection[index]
+                return True
+        return False
     
+    def _check_receipt_name(self, receipt):
+        """
+        Проверка того, что наименование рецепта не занято другим рецептом
+        (рецепты хранятся словарем "наименование -> запись").
+
+        Raises:
+            OperationException: Если рецепт с таким наименованием уже есть
+        """
+        collection = self.__data.get(self.receipt_key())
+        if isinstance(collection, dict):
+            entry = collection.get(receipt.name)
+            if entry is not None and entry["receipt"] is not receipt and entry["receipt"] != receipt:
+                raise OperationException(f"Рецепт с наименованием '{receipt.name}' уже есть в репозитории")
+
+    @staticmethod
+    def receipt_entry(model) -> dict:
+        """
+        Запись рецепта {"receipt", "ingredients", "steps"}.
+
+        Состав в записи - представления состава самого рецепта, поэтому
+        запись не расходится с моделью после add_ingredient/add_step.
+        Если передана запись со списками, а рецепт еще пуст, списки
+        переносятся в рецепт.
+        """
+        if not isinstance(model, dict):
+            return {"receipt": model, "ingredients": model.ingredients, "steps": model.cooking_steps}
+        receipt = model["receipt"]
+        if not receipt.ingredients and not receipt.cooking_steps:
+            receipt.extend_ingredients(model.get("ingredients", ()))
+            receipt.extend_steps(model.get("steps", ()))
+        return {"receipt": receipt, "ingredients": receipt.ingredients, "steps": receipt.cooking_steps}
+
     """
     Ключ для единиц измерений
     """
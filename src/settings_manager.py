@@ -1,26 +1,70 @@
-from src.models.settings import Settings
+from src.models.settings import Settings, SECTIONS, COMPANY_FIELDS
+from src.core.validator import ArgumentException, Validator
 from src.models.company_model import CompanyModel
 import json
 import os
+import threading
+import time
+
+# Корень проекта (каталог, содержащий src)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _compile_section(section) -> dict:
+    """Функции проверки параметров раздела по типам и правилам его полей (собираются один раз)"""
+    checks = {}
+    for name, expected_type, rules in Settings.section_fields(section):
+        minimum = rules.pop("minimum", None)
+        check = Validator.compile_rule(name, expected_type, **rules)
+        if minimum is not None:
+            check = _with_minimum(check, name, minimum)
+        checks[name] = check
+    return checks
+
+
+def _with_minimum(check, name: str, minimum):
+    """Дополнение проверки нижней границей значения"""
+    def checked(value):
+        value = check(value)
+        if value < minimum:
+            raise ArgumentException(f"Аргумент '{name}' должен быть не меньше {minimum}")
+        return value
+    return checked
+
 
 class SettingsManager:
+    # Каталоги поиска конфигурационного файла, если указанного пути нет.
+    # Перед ними просматриваются каталоги из переменной окружения SETTINGS_PATH
+    search_paths: list = [".", os.path.join(".", "config"), _PROJECT_ROOT, os.path.join(_PROJECT_ROOT, "config")]
+    reload_interval: float = 1.0  # Не чаще чем раз в столько секунд проверяется изменение файла
+
     __config_file: str = ""
     __app_settings: Settings = None
+    __lock = threading.RLock()  # Защита создания экземпляра и замены настроек
+    __section_checks: dict = {name: _compile_section(section) for name, section in SECTIONS.items()}
+    __resolved: dict = {}  # Запрошенный путь -> найденный файл
+    __loaded_stamp: tuple = None  # (время изменения, размер) загруженного файла
+    __last_check: float = 0.0  # Время последней проверки изменения файла (time.monotonic)
 
     def __new__(cls, config_file: str = ""):
         if not hasattr(cls, '_instance'):
-            cls._instance = super(SettingsManager, cls).__new__(cls)
+            with SettingsManager.__lock:
+                if not hasattr(cls, '_instance'):
+                    cls._instance = super(SettingsManager, cls).__new__(cls)
         return cls._instance
 
     def __init__(self, config_file: str = ""):
-        if config_file:
-            self.config_file = config_file
-        if self.__app_settings is None:
-            self.__app_settings = Settings()
-            self.set_default_config()
+        with SettingsManager.__lock:
+            if config_file:
+                self.config_file = config_file
+            if self.__app_settings is None:
+                self.__app_settings = Settings(self.__default_company()).freeze()
 
     @property
     def app_config(self) -> Settings:
+        # Изменения загруженного файла подхватываются не чаще раза в reload_interval
+        if self.__loaded_stamp is not None and time.monotonic() - self.__last_check >= self.reload_interval:
+            self.reload_if_changed()
         return self.__app_settings
 
     @property
@@ -32,39 +76,77 @@ class SettingsManager:
         if not file_path or file_path.strip() == "":
             return 
         
-        if os.path.exists(file_path):
-            self.__config_file = file_path.strip()
-        else:
-            # Поиск файла в любой директории
-            for root, _, files in os.walk('.'):
-                if os.path.basename(file_path) in files:
-                    self.__config_file = os.path.join(root, os.path.basename(file_path))
-                    return
-            raise FileNotFoundError(f"Конфигурационный файл {file_path} не найден")
+        self.__config_file = self.resolve(file_path.strip())
+
+    @classmethod
+    def resolve(cls, file_path: str) -> str:
+        """
+        Поиск конфигурационного файла.
+
+        Существующий путь используется как есть, иначе имя файла ищется в каталогах
+        SETTINGS_PATH и search_paths (без обхода вложенных каталогов).
+        Найденное расположение запоминается.
+
+        Raises:
+            FileNotFoundError: Если файл не найден ни в одном каталоге
+        """
+        cached = SettingsManager.__resolved.get(file_path)
+        if cached is not None and os.path.isfile(cached):
+            return cached
+        if os.path.isfile(file_path):
+            return file_path
+
+        name = os.path.basename(file_path)
+        environment = [path for path in os.environ.get("SETTINGS_PATH", "").split(os.pathsep) if path]
+        for directory in environment + cls.search_paths:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                SettingsManager.__resolved[file_path] = candidate
+                return candidate
+        raise FileNotFoundError(f"Конфигурационный файл {file_path} не найден")
 
     def convert_config(self, config_data: dict) -> Settings:
-        """Преобразует данные конфигурации в объект Settings"""
-        settings = Settings()
-        
-        if "company" in config_data:
-            company_info = config_data["company"]
-            
-            # Устанавливаем все свойства компании
-            if "name" in company_info:
-                settings.organization.name = company_info["name"]
-            if "inn" in company_info:
-                settings.organization.inn = company_info["inn"]
-            if "account" in company_info:
-                settings.organization.account = company_info["account"]
-            if "correspondent_account" in company_info:
-                settings.organization.correspondent_account = company_info["correspondent_account"]
-            if "BIK" in company_info:
-                settings.organization.BIK = company_info["BIK"]
-            if "ownership_type" in company_info:
-                settings.organization.ownership_type = company_info["ownership_type"]
-            
-        
-        return settings
+        """
+        Преобразует данные конфигурации в объект Settings по схеме разделов.
+
+        Раздел company переносится в CompanyModel (с проверками ее свойств),
+        остальные разделы - в неизменяемые объекты разделов Settings;
+        отсутствующие параметры получают значения по умолчанию.
+
+        Raises:
+            ValueError: Если в конфигурации есть неизвестный раздел или параметр
+            ArgumentException: Если значение параметра не проходит проверку
+        """
+        if not isinstance(config_data, dict):
+            raise ValueError("Конфигурация должна быть словарем")
+        unknown = set(config_data) - {"company"} - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Неизвестные разделы конфигурации: {', '.join(sorted(unknown))}")
+
+        organization = CompanyModel("Новая организация")
+        for key, value in self.__section_data(config_data, "company").items():
+            if key not in COMPANY_FIELDS:
+                raise ValueError(f"Неизвестный параметр конфигурации company.{key}")
+            setattr(organization, key, value)
+
+        sections = {}
+        for name, section in SECTIONS.items():
+            checks = self.__section_checks[name]
+            values = {}
+            for key, value in self.__section_data(config_data, name).items():
+                if key not in checks:
+                    raise ValueError(f"Неизвестный параметр конфигурации {name}.{key}")
+                values[key] = checks[key](value)
+            sections[name] = section(**values)
+        return Settings(organization, **sections)
+
+    @staticmethod
+    def __section_data(config_data: dict, name: str) -> dict:
+        """Параметры раздела конфигурации"""
+        data = config_data.get(name, {})
+        if not isinstance(data, dict):
+            raise ValueError(f"Раздел конфигурации {name} должен быть словарем")
+        return data
 
     def load_config(self) -> bool:
         """Загружает конфигурацию из файла"""
@@ -72,23 +154,63 @@ class SettingsManager:
             raise FileNotFoundError("Не указан файл конфигурации")
 
         try:
+            stamp = self.__stamp()
             with open(self.__config_file, 'r', encoding='utf-8') as file:
                 config_data = json.load(file)
-                self.__app_settings = self.convert_config(config_data)
-                return True
+            # Настройки собираются полностью и только затем подменяются одним присваиванием
+            settings = self.convert_config(config_data).freeze()
+            with SettingsManager.__lock:
+                self.__app_settings = settings
+                self.__loaded_stamp = stamp
+                self.__last_check = time.monotonic()
+            return True
         except Exception as error:
             print(f"Ошибка загрузки конфигурации: {error}")
             return False
 
+    def reload_if_changed(self) -> bool:
+        """
+        Повторная загрузка конфигурации, если файл изменился после последней загрузки.
+
+        Ошибка чтения измененного файла не сбрасывает уже действующие настройки.
+
+        Returns:
+            bool: Настройки были перезагружены
+        """
+        with SettingsManager.__lock:
+            self.__last_check = time.monotonic()
+            if self.__loaded_stamp is None:
+                return False
+            try:
+                stamp = self.__stamp()
+            except OSError:
+                return False
+            if stamp == self.__loaded_stamp:
+                return False
+            # Неудачная попытка не повторяется до следующего изменения файла
+            self.__loaded_stamp = stamp
+            return self.load_config()
+
+    def __stamp(self) -> tuple:
+        """Признак изменения файла: время изменения и размер"""
+        stat = os.stat(self.__config_file)
+        return stat.st_mtime_ns, stat.st_size
+
     def set_default_config(self):
         """Устанавливает конфигурацию по умолчанию"""
+        settings = Settings(self.__default_company()).freeze()
+        with SettingsManager.__lock:
+            self.__app_settings = settings
+
+    @staticmethod
+    def __default_company() -> CompanyModel:
+        """Организация из конфигурации по умолчанию"""
         default_company = CompanyModel("Ромашка")
         default_company.inn = "123456789012"
         default_company.account = "12345678901"
         default_company.correspondent_account = "12345678901"
         default_company.BIK = "123456789"
         default_company.ownership_type = "ООО"
-        
-        self.__app_settings.organization = default_company
+        return default_company
 
     
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Репозиторий данных, загружаемый из бинарного снимка справочников
+"""
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity, REFERRER_KEYS
+from src.logics.catalogue_snapshot import CatalogueSnapshot, CatalogueSnapshotWriter
+
+# Коллекции, хранящиеся в снимке
+_SNAPSHOT_KEYS = (reposity.range_key(), reposity.nomenclature_group_key(),
+                  reposity.nomenclature_key(), reposity.receipt_key())
+
+
+class snapshot_reposity(indexed_reposity):
+    """
+    Репозиторий, справочники которого читаются из бинарного снимка
+    (CatalogueSnapshot), отображенного в память.
+
+    При создании читается только оглавление снимка. Поиск по id или
+    наименованию в еще не загруженной коллекции создает только найденную
+    модель (и модели, на которые она ссылается), а перебор, поиск по группе
+    или изменение коллекции загружает ее целиком - теми же экземплярами,
+    которые уже были выданы. Изменения хранятся в памяти; сохранить их
+    можно методом save.
+    """
+
+    __snapshot: CatalogueSnapshot = None  # Снимок справочников
+    __loaded: set = None  # Ключи загруженных коллекций
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Путь к файлу снимка (CatalogueSnapshotWriter)
+        """
+        self.__loaded = set()
+        super().__init__()
+        self.__snapshot = CatalogueSnapshot(path)
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot:
+        return self.__snapshot
+
+    @property
+    def data(self):
+        """Все данные репозитория (загружает еще не загруженные коллекции)"""
+        for key in _SNAPSHOT_KEYS:
+            self.__ensure_loaded(key)
+        return super().data
+
+    @data.setter
+    def data(self, value: dict):
+        """Сеттер для замены всех данных репозитория (снимок больше не используется)"""
+        self.__loaded.update(_SNAPSHOT_KEYS)
+        indexed_reposity.data.fset(self, value)
+
+    def is_loaded(self, key: str) -> bool:
+        """Признак того, что коллекция загружена целиком"""
+        return key in self.__loaded
+
+    def save(self, path: str) -> dict:
+        """
+        Запись текущего состояния в новый снимок.
+
+        Returns:
+            dict: Ключ коллекции -> количество записанных моделей
+        """
+        return CatalogueSnapshotWriter(self).write(path)
+
+    def close(self):
+        """Закрытие снимка (уже созданные модели остаются действительными)"""
+        self.__snapshot.close()
+
+    """
+    Чтение
+    """
+
+    def models(self, key: str) -> list:
+        self.__ensure_loaded(key)
+        return super().models(key)
+
+    def get_by_id(self, key: str, model_id: str):
+        if self.__lazy(key):
+            return self.__snapshot.get_by_id(key, model_id)
+        return super().get_by_id(key, model_id)
+
+    def find_by_name(self, key: str, name: str):
+        if self.__lazy(key):
+            return self.__snapshot.find_by_name(key, name)
+        return super().find_by_name(key, name)
+
+    def find_all_by_name(self, key: str, name: str) -> list:
+        if self.__lazy(key):
+            return self.__snapshot.find_all_by_name(key, name)
+        return super().find_all_by_name(key, name)
+
+    def find_nomenclature_by_group(self, group) -> list:
+        self.__ensure_loaded(reposity.nomenclature_key())
+        return super().find_nomenclature_by_group(group)
+
+    def find_units_by_base_unit(self, base_unit) -> list:
+        self.__ensure_loaded(reposity.range_key())
+        return super().find_units_by_base_unit(base_unit)
+
+    """
+    Запись
+    """
+
+    def set_data(self, key: str, value):
+        self.__loaded.add(key)
+        super().set_data(key, value)
+
+    def add(self, key: str, model):
+        self.__ensure_loaded(key)
+        return super().add(key, model)
+
+    def update(self, key: str, model):
+        self.__ensure_loaded(key)
+        return super().update(key, model)
+
+    def remove(self, key: str, model) -> bool:
+        # Для проверки ссылок загружаются коллекции, которые могут ссылаться на модель
+        for referrer_key in {key, *REFERRER_KEYS.get(key, ())}:
+            self.__ensure_loaded(referrer_key)
+        return super().remove(key, model)
+
+    """
+    Внутренние методы
+    """
+
+    def __lazy(self, key: str) -> bool:
+        """Признак того, что запрос к коллекции обслуживается снимком"""
+        return self.__snapshot is not None and key not in self.__loaded and key in _SNAPSHOT_KEYS
+
+    def __ensure_loaded(self, key: str):
+        """Загрузка коллекции из снимка при первом обращении"""
+        if not self.__lazy(key):
+            return
+        models = self.__snapshot.models(key)
+        if key == reposity.receipt_key():
+            collection = {receipt.name: reposity.receipt_entry(receipt) for receipt in models}
+        else:
+            collection = models
+        self.__loaded.add(key)
+        indexed_reposity.set_data(self, key, collection)
@@ -0,0 +1,462 @@
+"""
+Репозиторий данных с хранением в SQLite
+"""
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity, REFERRER_KEYS
+from src.core.connection_pool import ConnectionPool
+from src.core.validator import OperationException
+from src.settings_manager import SettingsManager
+from src.logics.catalogue_jsonl import order_by_dependencies
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, factor REAL NOT NULL, base_unit_id TEXT);
+CREATE TABLE IF NOT EXISTS nomenclature_groups (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, parent_id TEXT);
+CREATE TABLE IF NOT EXISTS nomenclature (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, full_name TEXT NOT NULL, group_id TEXT, unit_id TEXT,
+    price REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS receipts (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, portions INTEGER NOT NULL, cooking_time TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS receipt_ingredients (
+    receipt_id TEXT NOT NULL, position INTEGER NOT NULL, nomenclature_id TEXT,
+    quantity REAL NOT NULL, unit_id TEXT, component_receipt_id TEXT, PRIMARY KEY (receipt_id, position));
+CREATE TABLE IF NOT EXISTS receipt_steps (
+    receipt_id TEXT NOT NULL, step_number INTEGER NOT NULL, description TEXT NOT NULL,
+    PRIMARY KEY (receipt_id, step_number));
+CREATE INDEX IF NOT EXISTS ix_units_name ON units (name);
+CREATE INDEX IF NOT EXISTS ix_nomenclature_groups_name ON nomenclature_groups (name);
+CREATE INDEX IF NOT EXISTS ix_nomenclature_name ON nomenclature (name);
+CREATE INDEX IF NOT EXISTS ix_receipts_name ON receipts (name);
+"""
+
+# Ключ коллекции -> (таблица, колонки)
+_TABLES = {
+    reposity.range_key(): ("units", ("id", "name", "factor", "base_unit_id")),
+    reposity.nomenclature_group_key(): ("nomenclature_groups", ("id", "name", "parent_id")),
+    reposity.nomenclature_key(): ("nomenclature", ("id", "name", "full_name", "group_id", "unit_id", "price")),
+    reposity.receipt_key(): ("receipts", ("id", "name", "portions", "cooking_time")),
+}
+
+# Колонки, добавленные после создания схемы: таблица -> [(колонка, определение)]
+_MIGRATIONS = {
+    "nomenclature_groups": [("parent_id", "TEXT")],
+    "nomenclature": [("price", "REAL NOT NULL DEFAULT 0")],
+}
+
+# Порядок загрузки: коллекция загружается после тех, на которые ссылается
+_DEPENDENCIES = {
+    reposity.range_key(): (),
+    reposity.nomenclature_group_key(): (),
+    reposity.nomenclature_key(): (reposity.range_key(), reposity.nomenclature_group_key()),
+    reposity.receipt_key(): (reposity.range_key(), reposity.nomenclature_key()),
+}
+
+# Ключ коллекции -> номер колонки со ссылкой на строку той же коллекции
+_SELF_REFERENCES = {
+    reposity.range_key(): 3,
+    reposity.nomenclature_group_key(): 2,
+}
+
+
+class sqlite_reposity(indexed_reposity):
+    """
+    Репозиторий, хранящий единицы измерения, номенклатурные группы, номенклатуру
+    и рецепты (с ингредиентами и шагами) в базе SQLite.
+
+    Коллекции загружаются лениво - при первом обращении к ним, а поиск по id или
+    наименованию в еще не загруженной коллекции выполняется одним запросом
+    без загрузки всей коллекции. Запись коллекций выполняется пакетно
+    (executemany) в одной транзакции.
+    """
+
+    __pool: ConnectionPool = None  # Пул соединений с базой
+    __loaded: set = None  # Ключи загруженных коллекций
+    __identity: dict = None  # Ключ коллекции -> {id: модель} уже созданных объектов
+
+    def __init__(self, database: str = None, pool_size: int = None):
+        """
+        Args:
+            database (str): Путь к файлу базы данных (по умолчанию - database.sqlite_path настроек приложения)
+            pool_size (int): Количество соединений в пуле (по умолчанию - pools.sqlite_connections настроек)
+        """
+        if database is None or pool_size is None:
+            settings = SettingsManager().app_config
+            database = settings.database.sqlite_path if database is None else database
+            pool_size = settings.pools.sqlite_connections if pool_size is None else pool_size
+        self.__loaded = set()
+        self.__identity = {key: {} for key in _TABLES}
+        super().__init__()
+        self.__pool = ConnectionPool(database, pool_size)
+        with self.__pool.transaction() as connection:
+            connection.executescript(_SCHEMA)
+            self.__migrate(connection)
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self.__pool
+
+    @property
+    def data(self):
+        """Все данные репозитория (загружает еще не загруженные коллекции)"""
+        for key in _TABLES:
+            self.__ensure_loaded(key)
+        return super().data
+
+    @data.setter
+    def data(self, value: dict):
+        """Сеттер для замены всех данных репозитория с сохранением в базу"""
+        for key, collection in value.items():
+            if key in _TABLES:
+                self.__write_collection(key, collection)
+                self.__loaded.add(key)
+        indexed_reposity.data.fset(self, value)
+
+    def is_loaded(self, key: str) -> bool:
+        """Признак того, что коллекция загружена в память"""
+        return key in self.__loaded
+
+    def close(self):
+        """Закрытие соединений с базой"""
+        self.__pool.close()
+
+    """
+    Чтение
+    """
+
+    def models(self, key: str) -> list:
+        self.__ensure_loaded(key)
+        return super().models(key)
+
+    def get_by_id(self, key: str, model_id: str):
+        if self.__pool is None or key in self.__loaded or key not in _TABLES:
+            return super().get_by_id(key, model_id)
+        cached = self.__identity[key].get(model_id)
+        if cached is not None:
+            return cached
+        return self.__fetch_one(key, "id", model_id)
+
+    def find_by_name(self, key: str, name: str):
+        if self.__pool is None or key in self.__loaded or key not in _TABLES:
+            return super().find_by_name(key, name)
+        return self.__fetch_one(key, "name", name)
+
+    def find_all_by_name(self, key: str, name: str) -> list:
+        self.__ensure_loaded(key)
+        return super().find_all_by_name(key, name)
+
+    def find_nomenclature_by_group(self, group) -> list:
+        self.__ensure_loaded(reposity.nomenclature_key())
+        return super().find_nomenclature_by_group(group)
+
+    def find_units_by_base_unit(self, base_unit) -> list:
+        self.__ensure_loaded(reposity.range_key())
+        return super().find_units_by_base_unit(base_unit)
+
+    """
+    Запись
+    """
+
+    def set_data(self, key: str, value):
+        """Замена коллекции целиком: в базе - одной транзакцией"""
+        if key in _TABLES:
+            self.__write_collection(key, value)
+            self.__loaded.add(key)
+        super().set_data(key, value)
+
+    def add(self, key: str, model):
+        return self.add_many(key, [model])[0]
+
+    def add_many(self, key: str, models: list) -> list:
+        """
+        Пакетное добавление моделей одной транзакцией.
+
+        Raises:
+            OperationException: Если наименование рецепта занято (рецепты для проверки загружаются)
+        """
+        entries = [self.__entry(key, model) for model in models]
+        if key == reposity.receipt_key():
+            self.__ensure_loaded(key)
+            names = set()
+            for entry in entries:
+                receipt = self.__model_of(entry)
+                self._check_receipt_name(receipt)
+                if receipt.name in names:
+                    raise OperationException(f"Рецепт с наименованием '{receipt.name}' добавляется дважды")
+                names.add(receipt.name)
+        with self.__pool.transaction() as connection:
+            self.__insert(connection, key, entries)
+
+        result = []
+        for model in models:
+            if key in self.__loaded:
+                model = indexed_reposity.add(self, key, model)
+            elif isinstance(model, dict):
+                model = model["receipt"]
+            result.append(self.__identity[key].setdefault(model.id, model))
+        return result
+
+    def update(self, key: str, model):
+        """Сохранение изменений модели в базе и переиндексация"""
+        entry = self.__entry(key, model)
+        self._check_stored(key, self.__model_of(entry))
+        if key == reposity.receipt_key():
+            self._check_receipt_name(self.__model_of(entry))
+        with self.__pool.transaction() as connection:
+            if key == reposity.receipt_key():
+                self.__delete_receipt_parts(connection, [self.__model_of(entry).id])
+            self.__insert(connection, key, [entry])
+        return super().update(key, self.__model_of(entry))
+
+    def remove(self, key: str, model) -> bool:
+        """
+        Удаление модели из базы и из памяти.
+
+        Raises:
+            OperationException: Если модель используется (коллекции, которые могут
+                                на нее ссылаться, предварительно загружаются)
+        """
+        for referrer_key in REFERRER_KEYS.get(key, ()):
+            self.__ensure_loaded(referrer_key)
+        self.check_remove(model)
+        table, _ = _TABLES[key]
+        with self.__pool.transaction() as connection:
+            removed = connection.execute(f"DELETE FROM {table} WHERE id = ?", (model.id,)).rowcount > 0
+            if key == reposity.receipt_key():
+                self.__delete_receipt_parts(connection, [model.id])
+        self.__identity[key].pop(model.id, None)
+        if key in self.__loaded:
+            return self._discard(key, model)
+        return removed
+
+    """
+    Внутренние методы
+    """
+
+    def __ensure_loaded(self, key: str):
+        """Загрузка коллекции из базы при первом обращении"""
+        if self.__pool is None or key in self.__loaded or key not in _TABLES:
+            return
+        for dependency in _DEPENDENCIES[key]:
+            self.__ensure_loaded(dependency)
+
+        table, columns = _TABLES[key]
+        with self.__pool.connection() as connection:
+            rows = connection.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid").fetchall()
+            if key == reposity.receipt_key():
+                collection = self.__load_receipts(connection, rows)
+            else:
+                collection = self.__load_models(key, rows)
+
+        self.__loaded.add(key)
+        indexed_reposity.set_data(self, key, collection)
+
+    def __load_models(self, key: str, rows: list) -> list:
+        """Создание моделей справочника по строкам таблицы"""
+        identity = self.__identity[key]
+        # Строки, на которые ссылаются строки той же коллекции (базовые единицы, родители групп),
+        # создаются раньше: модель получает ссылки при создании, без вызова сеттеров
+        column = _SELF_REFERENCES.get(key)
+        ordered = rows
+        if column is not None:
+            by_id = {row[0]: row for row in rows}
+            ordered = order_by_dependencies(
+                rows, lambda row: row[0],
+                lambda row: [by_id[row[column]]] if row[column] in by_id else [])
+        for row in ordered:
+            if row[0] not in identity:
+                identity[row[0]] = self.__create(key, row)
+        return [identity[row[0]] for row in rows]
+
+    def __load_receipts(self, connection, rows: list) -> dict:
+        """Создание рецептов со всеми ингредиентами и шагами"""
+        identity = self.__identity[reposity.receipt_key()]
+        entries = {}
+        by_id = {}
+        for row in rows:
+            receipt = identity.get(row[0])
+            if receipt is None:
+                receipt = identity[row[0]] = self.__create(reposity.receipt_key(), row)
+            entry = {"receipt": receipt, "ingredients": [], "steps": []}
+            entries[receipt.name] = entry
+            by_id[row[0]] = entry
+
+        for receipt_id, nomenclature_id, quantity, unit_id, component_receipt_id in connection.execute(
+                "SELECT receipt_id, nomenclature_id, quantity, unit_id, component_receipt_id "
+                "FROM receipt_ingredients ORDER BY receipt_id, position"):
+            entry = by_id.get(receipt_id)
+            if entry is None:
+                continue
+            if component_receipt_id is not None:
+                component = by_id.get(component_receipt_id)
+                if component is None:
+                    raise OperationException(f"Не найдена вложенная технологическая карта {component_receipt_id}")
+                ingredient = ReceiptComponentModel.from_trusted_row(
+                    {"receipt": component["receipt"], "portions": quantity})
+            else:
+                ingredient = IngredientModel.from_trusted_row({
+                    "nomenclature": self.__require(reposity.nomenclature_key(), nomenclature_id),
+                    "quantity": quantity,
+                    "unit": self.__require(reposity.range_key(), unit_id)})
+            entry["ingredients"].append(ingredient)
+
+        for receipt_id, step_number, description in connection.execute(
+                "SELECT receipt_id, step_number, description FROM receipt_steps "
+                "ORDER BY receipt_id, step_number"):
+            entry = by_id.get(receipt_id)
+            if entry is not None:
+                entry["steps"].append(CookingStepModel.from_trusted_row(
+                    {"step_number": step_number, "description": description}))
+
+        # Состав хранится в самой модели рецепта, запись коллекции ссылается на него
+        return {name: reposity.receipt_entry(entry) for name, entry in entries.items()}
+
+    def __fetch_one(self, key: str, column: str, value):
+        """Поиск одной модели запросом к базе без загрузки коллекции"""
+        if key == reposity.receipt_key():
+            self.__ensure_loaded(key)
+            return super().get_by_id(key, value) if column == "id" else super().find_by_name(key, value)
+
+        table, columns = _TABLES[key]
+        with self.__pool.connection() as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE {column} = ? ORDER BY rowid LIMIT 1",
+                (value,)).fetchone()
+        if row is None:
+            return None
+        model = self.__identity[key].get(row[0])
+        if model is None:
+            model = self.__identity[key][row[0]] = self.__create(key, row)
+        return model
+
+    def __create(self, key: str, row: tuple):
+        """
+        Создание модели по строке таблицы.
+
+        Строки собственной базы уже проверены при записи - повторная валидация
+        не нужна. Ссылки на другие модели передаются при создании, поэтому
+        загрузка не считается изменением пересчетов единиц или иерархии групп
+        (UnitModel.revision, NomenclatureGroupModel.revision, NomenclatureModel.group_revision).
+        """
+        if key == reposity.range_key():
+            model = UnitModel.from_trusted_row({"id": row[0], "name": row[1], "factor": row[2],
+                                                "base_unit": self.__reference(reposity.range_key(), row[3])})
+        elif key == reposity.nomenclature_group_key():
+            model = NomenclatureGroupModel.from_trusted_row(
+                {"id": row[0], "name": row[1],
+                 "parent": self.__reference(reposity.nomenclature_group_key(), row[2])})
+        elif key == reposity.nomenclature_key():
+            model = NomenclatureModel.from_trusted_row(
+                {"id": row[0], "name": row[1], "full_name": row[2], "price": row[5],
+                 "group": self.__reference(reposity.nomenclature_group_key(), row[3]),
+                 "unit": self.__reference(reposity.range_key(), row[4])})
+        else:
+            model = ReceiptModel.from_trusted_row(
+                {"id": row[0], "name": row[1], "portions": row[2], "cooking_time": row[3]})
+        return model
+
+    def __reference(self, key: str, model_id):
+        """Модель, на которую ссылается строка (None - ссылки нет)"""
+        return self.__require(key, model_id) if model_id is not None else None
+
+    @staticmethod
+    def __migrate(connection):
+        """Добавление колонок, которых нет в базе, созданной прежней версией схемы"""
+        for table, columns in _MIGRATIONS.items():
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns:
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def __require(self, key: str, model_id: str):
+        """Получение модели, на которую есть ссылка (ошибка - если ее нет в базе)"""
+        model = self.__identity[key].get(model_id) or self.get_by_id(key, model_id)
+        if model is None:
+            raise OperationException(f"Не найдена модель {model_id} коллекции {key}")
+        return model
+
+    def __write_collection(self, key: str, collection):
+        """Полная перезапись коллекции в базе одной транзакцией"""
+        table, _ = _TABLES[key]
+        if isinstance(collection, dict):
+            entries = [reposity.receipt_entry(entry) for entry in collection.values()]
+        else:
+            entries = [self.__entry(key, model) for model in collection]
+        with self.__pool.transaction() as connection:
+            connection.execute(f"DELETE FROM {table}")
+            if key == reposity.receipt_key():
+                connection.execute("DELETE FROM receipt_ingredients")
+                connection.execute("DELETE FROM receipt_steps")
+            self.__insert(connection, key, entries)
+        self.__identity[key] = {self.__model_of(entry).id: self.__model_of(entry) for entry in entries}
+
+    def __insert(self, connection, key: str, entries: list):
+        """Пакетная вставка строк коллекции"""
+        table, columns = _TABLES[key]
+        placeholders = ", ".join("?" for _ in columns)
+        connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [self.__row(key, self.__model_of(entry)) for entry in entries])
+        if key != reposity.receipt_key():
+            return
+
+        connection.executemany(
+            "INSERT OR REPLACE INTO receipt_ingredients "
+            "(receipt_id, position, nomenclature_id, quantity, unit_id, component_receipt_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [self.__ingredient_row(entry["receipt"].id, position, ingredient)
+             for entry in entries
+             for position, ingredient in enumerate(entry["receipt"].ingredients)])
+        connection.executemany(
+            "INSERT OR REPLACE INTO receipt_steps (receipt_id, step_number, description) VALUES (?, ?, ?)",
+            [(entry["receipt"].id, step.step_number, step.description)
+             for entry in entries
+             for step in entry["receipt"].cooking_steps])
+
+    @staticmethod
+    def __delete_receipt_parts(connection, receipt_ids: list):
+        """Удаление ингредиентов и шагов рецептов"""
+        rows = [(receipt_id,) for receipt_id in receipt_ids]
+        connection.executemany("DELETE FROM receipt_ingredients WHERE receipt_id = ?", rows)
+        connection.executemany("DELETE FROM receipt_steps WHERE receipt_id = ?", rows)
+
+    @staticmethod
+    def __ingredient_row(receipt_id: str, position: int, ingredient) -> tuple:
+        """Строка состава рецепта: ингредиент или вложенная технологическая карта"""
+        if isinstance(ingredient, ReceiptComponentModel):
+            return (receipt_id, position, None, ingredient.portions, None, ingredient.receipt.id)
+        return (receipt_id, position, ingredient.nomenclature.id, ingredient.quantity, ingredient.unit.id, None)
+
+    @staticmethod
+    def __entry(key: str, model):
+        """Приведение рецепта к записи {"receipt", "ingredients", "steps"}"""
+        if key == reposity.receipt_key():
+            return reposity.receipt_entry(model)
+        return model
+
+    @staticmethod
+    def __model_of(entry):
+        """Модель из записи коллекции"""
+        return entry["receipt"] if isinstance(entry, dict) else entry
+
+    @staticmethod
+    def __row(key: str, model) -> tuple:
+        """Строка таблицы для модели"""
+        if key == reposity.range_key():
+            return (model.id, model.name, model.factor,
+                    model.base_unit.id if model.base_unit is not None else None)
+        if key == reposity.nomenclature_group_key():
+            return (model.id, model.name, model.parent.id if model.parent is not None else None)
+        if key == reposity.nomenclature_key():
+            return (model.id, model.name, model.full_name,
+                    model.group.id if model.group is not None else None,
+                    model.unit.id if model.unit is not None else None, model.price)
+        return (model.id, model.name, model.portions, model.cooking_time)
@@ -1,4 +1,5 @@
 from src.reposity import reposity
+from src.concurrent_reposity import concurrent_reposity
 from src.models.unit_model import UnitModel
 from src.models.nomenclature_group_model import NomenclatureGroupModel
 from src.models.nomenclature_model import NomenclatureModel
@@ -6,6 +7,7 @@ from src.models.receipt_model import ReceiptModel
 from src.models.ingredient_model import IngredientModel
 from src.models.cooking_step_model import CookingStepModel
 from abc import ABC, abstractmethod
+import threading
 
 class BaseDataCreator(ABC):
     """Абстрактный класс с шаблонным методом для создания данных"""
@@ -33,6 +35,12 @@ class BaseDataCreator(ABC):
     def _create_receipts(self, repo: reposity):
         pass
 
+    def _fill_receipt(self, receipt: ReceiptModel, ingredients: list, steps: list) -> dict:
+        """Заполняет рецепт ингредиентами и шагами и возвращает запись для репозитория"""
+        receipt.extend_ingredients(ingredients)
+        receipt.extend_steps(steps)
+        return reposity.receipt_entry(receipt)
+
 class DefaultDataCreator(BaseDataCreator):
     """Конкретная реализация создания данных по умолчанию"""
     
@@ -71,22 +79,19 @@ class DefaultDataCreator(BaseDataCreator):
     
     def _create_nomenclature(self, repo: reposity):
         """Создание номенклатуры"""
-        groups = repo.data.get(reposity.nomenclature_group_key(), [])
-        units = repo.data.get(reposity.range_key(), [])
-        
         # Находим нужные группы
-        flour_group = self._find_or_create_group(groups, "Мучные изделия")
-        veg_group = self._find_or_create_group(groups, "Овощи")
-        milk_group = self._find_or_create_group(groups, "Молочные продукты")
-        spice_group = self._find_or_create_group(groups, "Специи и приправы")
-        fruit_group = self._find_or_create_group(groups, "Фрукты")
+        flour_group = self._find_or_create_group(repo, "Мучные изделия")
+        veg_group = self._find_or_create_group(repo, "Овощи")
+        milk_group = self._find_or_create_group(repo, "Молочные продукты")
+        spice_group = self._find_or_create_group(repo, "Специи и приправы")
+        fruit_group = self._find_or_create_group(repo, "Фрукты")
         
         # Находим нужные единицы измерения
-        gram_unit = self._find_or_create_unit(units, "грамм", 1.0)
-        piece_unit = self._find_or_create_unit(units, "штука", 1.0)
-        spoon_unit = self._find_or_create_unit(units, "столовая ложка", 15.0)
-        tea_spoon_unit = self._find_or_create_unit(units, "чайная ложка", 5.0)
-        pinch_unit = self._find_or_create_unit(units, "щепотка", 1.0)
+        gram_unit = self._find_or_create_unit(repo, "грамм", 1.0)
+        piece_unit = self._find_or_create_unit(repo, "штука", 1.0)
+        spoon_unit = self._find_or_create_unit(repo, "столовая ложка", 15.0)
+        tea_spoon_unit = self._find_or_create_unit(repo, "чайная ложка", 5.0)
+        pinch_unit = self._find_or_create_unit(repo, "щепотка", 1.0)
         
         nomenclature_list = [
             # Мучные изделия
@@ -114,39 +119,26 @@ class DefaultDataCreator(BaseDataCreator):
         
         repo.set_data(reposity.nomenclature_key(), nomenclature_list)
     
-    def _find_or_create_group(self, groups: list, group_name: str):
+    def _find_or_create_group(self, repo: reposity, group_name: str):
         """Находит группу по имени или создает новую"""
-        for group in groups:
-            if group.name == group_name:
-                return group
-        return NomenclatureGroupModel(group_name)
+        return repo.get_or_add(reposity.nomenclature_group_key(), group_name,
+                               lambda: NomenclatureGroupModel(group_name))
     
-    def _find_or_create_unit(self, units: list, unit_name: str, factor: float = 1.0):
+    def _find_or_create_unit(self, repo: reposity, unit_name: str, factor: float = 1.0):
         """Находит единицу измерения по имени или создает новую"""
-        for unit in units:
-            if unit.name == unit_name:
-                return unit
-        return UnitModel(unit_name, factor)
+        return repo.get_or_add(reposity.range_key(), unit_name,
+                               lambda: UnitModel(unit_name, factor))
     
     def _create_receipts(self, repo: reposity):
         """Создание рецептов"""
-        nomenclature_list = repo.data.get(reposity.nomenclature_key(), [])
-        units_list = repo.data.get(reposity.range_key(), [])
-        
         # Создаем резервные объекты если что-то не найдено
         def find_nomenclature(name):
-            for item in nomenclature_list:
-                if item.name == name:
-                    return item
             # Если не нашли, создаем новую номенклатуру
-            return NomenclatureModel(name, name)
+            return repo.get_or_add(reposity.nomenclature_key(), name,
+                                   lambda: NomenclatureModel(name, name))
         
         def find_unit(name):
-            for unit in units_list:
-                if unit.name == name:
-                    return unit
-            # Если не нашли, создаем новую единицу
-            return UnitModel(name, 1.0)
+            return self._find_or_create_unit(repo, name)
         
         # Рецепт 1: Драники картофельные
         драники = ReceiptModel("Драники картофельные", 4, "30 мин")
@@ -195,16 +187,8 @@ class DefaultDataCreator(BaseDataCreator):
         
         # Сохраняем рецепты в репозиторий
         receipts_data = {
-            "Драники картофельные": {
-                "receipt": драники,
-                "ingredients": драники_ингредиенты,
-                "steps": драники_шаги
-            },
-            "Салат витаминный с морковью и яблоком": {
-                "receipt": салат,
-                "ingredients": салат_ингредиенты,
-                "steps": салат_шаги
-            }
+            "Драники картофельные": self._fill_receipt(драники, драники_ингредиенты, драники_шаги),
+            "Салат витаминный с морковью и яблоком": self._fill_receipt(салат, салат_ингредиенты, салат_шаги)
         }
         
         repo.set_data(reposity.receipt_key(), receipts_data)
@@ -212,32 +196,60 @@ class DefaultDataCreator(BaseDataCreator):
 class start_service:
     __repo: reposity = None
     __data_creator: BaseDataCreator = None
+    __lock = threading.Lock()  # Защита создания экземпляра и заполнения данных
 
     def __init__(self):
-        self.__repo = reposity()
-        self.__data_creator = DefaultDataCreator()
+        # Экземпляр инициализируется один раз: повторный вызов не должен
+        # подменять репозиторий, которым уже пользуются другие потоки
+        with start_service.__lock:
+            if self.__repo is not None:
+                return
+            self.__repo = concurrent_reposity()
+            self.__data_creator = DefaultDataCreator()
 
     # Singletone
     def __new__(cls):
         if not hasattr(cls, 'instance'):
-            cls.instance = super(start_service, cls).__new__(cls)
+            with start_service.__lock:
+                if not hasattr(cls, 'instance'):
+                    cls.instance = super(start_service, cls).__new__(cls)
         return cls.instance 
 
     @property
     def data(self):
         return self.__repo.data   
 
+    @property
+    def repository(self) -> concurrent_reposity:
+        return self.__repo
+
     """
     Основной метод для генерации эталонных данных с использованием шаблонного метода
     """
     def start(self):
-        self.__data_creator.create_data(self.__repo)
+        # Все коллекции заполняются под одной блокировкой: читатели видят либо старые, либо новые данные
+        with self.__repo.batch():
+            self.__data_creator.create_data(self.__repo)
+
+    """
+    Восстановление данных из журнала изменений (если журнал пуст - генерация эталонных данных);
+    дальнейшие изменения репозитория записываются в журнал
+    """
+    def restore(self, event_log) -> bool:
+        with self.__repo.batch():
+            counts = event_log.attach(self.__repo)
+            restored = any(counts.values())
+            if not restored:
+                self.__data_creator.create_data(self.__repo)
+        event_log.flush()
+        return restored
 
     """
     Фабричный метод для создания рецептов
     """
     def create_receipts(self):
         # Если рецепты еще не созданы, создаем их
-        if not self.__repo.data.get(reposity.receipt_key()):
-            self.__data_creator._create_receipts(self.__repo)
-        return self.__repo.data[reposity.receipt_key()]
\ No newline at end of file
+        with self.__repo.batch():
+            if not self.__repo.data.get(reposity.receipt_key()):
+                self.__data_creator._create_receipts(self.__repo)
+            return self.__repo.data[reposity.receipt_key()]
@@ -0,0 +1,1104 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from src.core.validator import ArgumentException, OperationException
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.unit_converter import UnitConverter
+from src.logics.stock_ledger import StockLedger
+from src.logics.stock_snapshot_job import StockSnapshotJob
+from src.logics.receipt_calculator import ReceiptCalculator
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+from src.models.production_order_model import ProductionOrderModel
+from src.logics.production_service import ProductionService, WriteOffMode
+from src.logics.receipt_cost_engine import ReceiptCostEngine
+from src.logics.delivery_router import DeliveryRouter
+from src.logics.delivery_menu import DeliveryMenu
+from src.logics.inventory_service import InventoryService
+from src.logics.group_rollup import GroupRollup, RollupMeasure
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.restaurant_model import RestaurantModel, RestaurantServiceType
+from src.models.district_model import DistrictModel
+from src.logics.catalogue_jsonl import CatalogueExporter, CatalogueImporter
+from src.logics.event_log import EventLog
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.sqlite_reposity import sqlite_reposity
+from src.start_service import DefaultDataCreator
+from src.file_data_creator import FileDataCreator
+from src.logics.recipe_card_markdown import RecipeCardParser, RecipeCardRenderer, parse_markdown_text
+from src.models.cooking_step_model import CookingStepModel
+
+
+class TestUnitConverter(unittest.TestCase):
+    """
+    Юнит-тесты для конвертера единиц измерения
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.ton = UnitModel("тонна", 1000.0, self.kg)
+        self.spoon = UnitModel("столовая ложка", 15.0, self.gram)
+        self.piece = UnitModel("штука", 1.0)
+        self.converter = UnitConverter([self.gram, self.kg, self.ton, self.spoon])
+
+    def test_ShouldConvertThroughChain_WhenUnitsShareRoot_QuantityIsConverted(self):
+        """Тест пересчета через цепочку базовых единиц"""
+        # Act & Assert
+        self.assertEqual(self.converter.to_root(self.ton), (self.gram, 1_000_000.0))
+        self.assertAlmostEqual(self.converter.convert(2, self.spoon, self.gram), 30.0)
+        self.assertAlmostEqual(self.converter.convert(0.5, self.ton, self.kg), 500.0)
+
+    def test_ShouldRaiseException_WhenRootsDiffer_ExceptionIsRaised(self):
+        """Тест пересчета между несовместимыми единицами"""
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.converter.convert(1, self.piece, self.gram)
+
+    def test_ShouldRaiseException_WhenChainHasCycle_ExceptionIsRaised(self):
+        """Тест обнаружения цикла в цепочке базовых единиц"""
+        # Arrange
+        self.gram.base_unit = self.ton
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.converter.to_root(self.kg)
+
+    def test_ShouldRecalculate_WhenFactorChanged_CacheIsInvalidated(self):
+        """Тест сброса кэша при изменении коэффициента"""
+        # Arrange
+        self.assertAlmostEqual(self.converter.convert(1, self.spoon, self.gram), 15.0)
+
+        # Act
+        self.spoon.factor = 18.0
+
+        # Assert
+        self.assertAlmostEqual(self.converter.convert(1, self.spoon, self.gram), 18.0)
+
+    def test_ShouldConvertBatch_WhenConvertManyCalled_AllQuantitiesAreConverted(self):
+        """Тест пакетного пересчета"""
+        # Act
+        result = self.converter.convert_many([1, 2, 1000], [self.kg, self.spoon, self.gram], self.gram)
+        single = self.converter.convert_many([1, 2], self.kg, self.gram)
+
+        # Assert
+        self.assertEqual(result, [1000.0, 30.0, 1000.0])
+        self.assertEqual(single, [1000.0, 2000.0])
+
+
+class TestStockLedger(unittest.TestCase):
+    """
+    Юнит-тесты для журнала складских движений
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.flour = NomenclatureModel("Мука", "Мука пшеничная", unit=self.kg)
+        self.main = StorageModel("Центральный склад")
+        self.kitchen = StorageModel("Склад ресторана")
+        self.ledger = StockLedger()
+
+    def movement(self, movement_type, quantity, unit, day, target=None):
+        return StockMovementModel(movement_type, self.flour, self.main, quantity, unit,
+                                  datetime(2024, 1, day), target)
+
+    def test_ShouldKeepRunningBalance_WhenMovementsPosted_BalanceIsAggregated(self):
+        """Тест остатков нарастающим итогом по складам"""
+        # Act
+        self.ledger.post_many([
+            self.movement(StockMovementType.RECEIPT, 10, self.kg, 1),
+            self.movement(StockMovementType.WRITE_OFF, 500, self.gram, 2),
+            self.movement(StockMovementType.TRANSFER, 2, self.kg, 3, self.kitchen),
+        ])
+
+        # Assert
+        self.assertAlmostEqual(self.ledger.balance(self.flour, self.main), 7.5)
+        self.assertAlmostEqual(self.ledger.balance(self.flour, self.main, self.gram), 7500.0)
+        self.assertAlmostEqual(self.ledger.balance(self.flour, self.kitchen), 2.0)
+
+    def test_ShouldUseSnapshot_WhenPeriodClosed_HistoricalBalanceIsReturned(self):
+        """Тест остатков на дату по снимку закрытого периода"""
+        # Arrange
+        self.ledger.post(self.movement(StockMovementType.RECEIPT, 10, self.kg, 1))
+        self.ledger.post(self.movement(StockMovementType.WRITE_OFF, 1, self.kg, 10))
+        self.ledger.post(self.movement(StockMovementType.WRITE_OFF, 2, self.kg, 20))
+
+        # Act
+        snapshot = self.ledger.close_period(datetime(2024, 1, 15))
+
+        # Assert
+        self.assertAlmostEqual(snapshot[(self.main, self.flour, self.gram)], 9000.0)
+        self.assertAlmostEqual(self.ledger.balance_at(self.flour, self.main, datetime(2024, 1, 5)), 10.0)
+        self.assertAlmostEqual(self.ledger.balance_at(self.flour, self.main, datetime(2024, 1, 25)), 7.0)
+
+    def test_ShouldRejectBatch_WhenMovementInClosedPeriod_NothingIsPosted(self):
+        """Тест запрета проведения в закрытый период"""
+        # Arrange
+        self.ledger.close_period(datetime(2024, 1, 15))
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.ledger.post_many([
+                self.movement(StockMovementType.RECEIPT, 1, self.kg, 20),
+                self.movement(StockMovementType.RECEIPT, 1, self.kg, 10),
+            ])
+        self.assertEqual(self.ledger.balance(self.flour, self.main), 0.0)
+
+    def test_ShouldRaiseException_WhenTransferWithoutTarget_ExceptionIsRaised(self):
+        """Тест валидации склада-получателя перемещения"""
+        # Act & Assert
+        with self.assertRaises(ArgumentException):
+            self.movement(StockMovementType.TRANSFER, 1, self.kg, 1)
+
+
+class TestStockSnapshotJob(unittest.TestCase):
+    """
+    Юнит-тесты для ежемесячных снимков остатков
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.piece = UnitModel("штука", 1.0)
+        self.eggs = NomenclatureModel("Яйца", "Яйца куриные С0", unit=self.piece)
+        self.storage = StorageModel("Склад ресторана")
+        self.ledger = StockLedger()
+        # Поступление 10 штук в начале каждого месяца и списание 3 штук в середине
+        for month in range(1, 13):
+            self.ledger.post_many([
+                StockMovementModel(StockMovementType.RECEIPT, self.eggs, self.storage, 10, self.piece,
+                                   datetime(2024, month, 1)),
+                StockMovementModel(StockMovementType.WRITE_OFF, self.eggs, self.storage, 3, self.piece,
+                                   datetime(2024, month, 15)),
+            ])
+
+    def test_ShouldCloseFinishedMonths_WhenJobRuns_SnapshotsAreCreatedIncrementally(self):
+        """Тест закрытия завершившихся месяцев с учетом задержки"""
+        # Arrange
+        now = [datetime(2024, 4, 1, 12)]
+        job = StockSnapshotJob(self.ledger, grace=timedelta(days=1), clock=lambda: now[0])
+
+        # Act
+        first = job.run_once()
+        now[0] = datetime(2024, 4, 2, 12)
+        second = job.run_once()
+
+        # Assert
+        self.assertEqual([period.month for period in first], [1, 2])
+        self.assertEqual([period.month for period in second], [3])
+        self.assertEqual(job.run_once(), [])
+        self.assertEqual(self.ledger.closed_period, StockLedger.month_end(2024, 3))
+
+    def test_ShouldCombineSnapshotAndDelta_WhenBalanceAtDateRequested_BalanceIsCorrect(self):
+        """Тест остатка на дату: снимок плюс движения после него"""
+        # Arrange
+        self.ledger.close_months(datetime(2024, 7, 1))
+
+        # Act & Assert
+        self.assertEqual(self.ledger.balance_at(self.eggs, self.storage, datetime(2024, 3, 31)), 21.0)
+        self.assertEqual(self.ledger.balance_at(self.eggs, self.storage, datetime(2024, 8, 10)), 59.0)
+        self.assertEqual(self.ledger.balance_at(self.eggs, self.storage, datetime(2023, 12, 31)), 0.0)
+        self.assertEqual(self.ledger.balance(self.eggs, self.storage), 84.0)
+
+    def test_ShouldStopThread_WhenJobStopped_ThreadIsFinished(self):
+        """Тест запуска и остановки фонового потока"""
+        # Arrange
+        job = StockSnapshotJob(self.ledger, interval=0.01, clock=lambda: datetime(2025, 1, 5))
+
+        # Act
+        job.start()
+        job.stop(timeout=5)
+
+        # Assert
+        self.assertFalse(job.is_running)
+        self.assertEqual(self.ledger.closed_period, StockLedger.month_end(2024, 12))
+
+    def test_ShouldKeepRunning_WhenRunFails_ErrorIsRecordedAndReported(self):
+        """Тест ошибки фонового запуска: поток продолжает работу, ошибка не теряется"""
+        # Arrange
+        ledger = FailingLedger(failures=2)
+        ledger.post(StockMovementModel(StockMovementType.RECEIPT, self.eggs, self.storage, 10, self.piece,
+                                       datetime(2024, 1, 1)))
+        job = StockSnapshotJob(ledger, interval=0.01, clock=lambda: datetime(2024, 3, 5))
+
+        # Act: после двух неудач месяцы закрываются
+        job.start()
+        deadline = time.monotonic() + 5
+        while ledger.closed_period is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Assert
+        self.assertTrue(job.is_running)
+        self.assertEqual(ledger.closed_period, StockLedger.month_end(2024, 2))
+        job.stop(timeout=5)
+
+        # Act & Assert: неудачный последний запуск сообщается при остановке
+        ledger.failures = 1
+        job = StockSnapshotJob(ledger, interval=60, clock=lambda: datetime(2024, 4, 5))
+        job.start()
+        deadline = time.monotonic() + 5
+        while job.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsInstance(job.last_error, OperationException)
+        self.assertTrue(job.is_running)
+        with self.assertRaisesRegex(OperationException, "занят"):
+            job.stop(timeout=5)
+        self.assertFalse(job.is_running)
+
+
+class FailingLedger(StockLedger):
+    """Журнал, закрытие месяцев которого не удается заданное количество раз"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def close_months(self, until: datetime) -> list:
+        if self.failures:
+            self.failures -= 1
+            raise OperationException("Журнал занят проведением документов")
+        return super().close_months(until)
+
+
+class TestReceiptCalculator(unittest.TestCase):
+    """
+    Юнит-тесты для расчета потребности по технологическим картам
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: тесто входит в состав пирога"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.piece = UnitModel("штука", 1.0)
+        self.flour = NomenclatureModel("Мука", "Мука пшеничная", unit=self.kg)
+        self.eggs = NomenclatureModel("Яйца", "Яйца куриные", unit=self.piece)
+        self.apples = NomenclatureModel("Яблоки", "Яблоки зеленые", unit=self.piece)
+
+        self.dough = ReceiptModel("Тесто", 2, "20 мин")
+        self.dough.add_ingredient(IngredientModel(self.flour, 400, self.gram))
+        self.dough.add_ingredient(IngredientModel(self.eggs, 2, self.piece))
+
+        self.pie = ReceiptModel("Пирог", 4, "60 мин")
+        self.pie.add_ingredient(ReceiptComponentModel(self.dough, 2))
+        self.pie.add_ingredient(IngredientModel(self.apples, 6, self.piece))
+        self.calculator = ReceiptCalculator()
+
+    def test_ShouldFlattenNestedCards_WhenReceiptExpanded_BaseNomenclatureIsReturned(self):
+        """Тест разворота составной технологической карты"""
+        # Act
+        result = self.calculator.expand(self.pie, 8)
+
+        # Assert
+        self.assertAlmostEqual(result[(self.flour, self.kg)], 0.8)
+        self.assertAlmostEqual(result[(self.eggs, self.piece)], 4.0)
+        self.assertAlmostEqual(result[(self.apples, self.piece)], 12.0)
+
+    def test_ShouldRecalculate_WhenNestedReceiptChanged_CacheIsInvalidated(self):
+        """Тест сброса запомненного разворота при изменении вложенной карты"""
+        # Arrange
+        self.calculator.expand(self.pie)
+
+        # Act
+        self.dough.add_ingredient(IngredientModel(self.flour, 100, self.gram))
+
+        # Assert
+        self.assertAlmostEqual(self.calculator.expand(self.pie)[(self.flour, self.kg)], 0.5)
+
+    def test_ShouldRaiseException_WhenCardsAreNestedCyclically_ExceptionIsRaised(self):
+        """Тест обнаружения циклического вложения карт"""
+        # Arrange
+        self.dough.add_ingredient(ReceiptComponentModel(self.pie, 1))
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.calculator.expand(self.pie)
+
+    def test_ShouldProtectCachedExpansion_WhenResultIsModified_CacheIsKept(self):
+        """Тест защиты запомненного разворота от изменения выданного результата"""
+        # Arrange
+        per_portion = self.calculator.per_portion(self.pie)
+
+        # Act & Assert
+        with self.assertRaises(TypeError):
+            per_portion[(self.flour, self.kg)] = 0
+        self.calculator.expand(self.pie).clear()
+        self.assertAlmostEqual(self.calculator.per_portion(self.pie)[(self.flour, self.kg)], 0.1)
+        self.assertAlmostEqual(self.calculator.expand(self.pie)[(self.apples, self.piece)], 6.0)
+
+    def test_ShouldAggregateOrders_WhenBatchExpanded_RequirementsAreSummed(self):
+        """Тест пакетного разворота производственных заказов"""
+        # Act
+        result = self.calculator.expand_orders([(self.pie, 4), (self.dough, 2), (self.pie, 4)])
+
+        # Assert
+        self.assertAlmostEqual(result[(self.flour, self.kg)], 1.2)
+        self.assertAlmostEqual(result[(self.eggs, self.piece)], 6.0)
+
+
+class TestProductionService(unittest.TestCase):
+    """
+    Юнит-тесты для пакетного проведения производства
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.piece = UnitModel("штука", 1.0)
+        self.potato = NomenclatureModel("Картофель", "Картофель молодой", unit=self.gram)
+        self.eggs = NomenclatureModel("Яйца", "Яйца куриные С0", unit=self.piece)
+        self.receipt = ReceiptModel("Драники", 4, "30 мин")
+        self.receipt.add_ingredient(IngredientModel(self.potato, 500, self.gram))
+        self.receipt.add_ingredient(IngredientModel(self.eggs, 1, self.piece))
+        self.storage = StorageModel("Склад ресторана")
+        self.ledger = StockLedger()
+        self.ledger.post_many([
+            StockMovementModel(StockMovementType.RECEIPT, self.potato, self.storage, 1000, self.gram,
+                               datetime(2024, 1, 1)),
+            StockMovementModel(StockMovementType.RECEIPT, self.eggs, self.storage, 1, self.piece,
+                               datetime(2024, 1, 1)),
+        ])
+        self.service = ProductionService(self.ledger)
+
+    def order(self, portions):
+        return ProductionOrderModel(self.receipt, portions, self.storage, datetime(2024, 1, 2))
+
+    def test_ShouldWriteOffBatch_WhenBalancesAreSufficient_MovementsArePosted(self):
+        """Тест списания ингредиентов пакета заказов одним проведением"""
+        # Act
+        movements = self.service.post([self.order(2), self.order(2)])
+
+        # Assert
+        self.assertEqual(len(movements), 2)
+        self.assertAlmostEqual(self.ledger.balance(self.potato, self.storage), 500.0)
+        self.assertAlmostEqual(self.ledger.balance(self.eggs, self.storage), 0.0)
+
+    def test_ShouldBlockWholeBatch_WhenBalanceIsInsufficient_NothingIsPosted(self):
+        """Тест блокировки пакета при недостатке остатков"""
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.service.post([self.order(4), self.order(4)], WriteOffMode.BLOCKING)
+        self.assertAlmostEqual(self.ledger.balance(self.potato, self.storage), 1000.0)
+        self.assertAlmostEqual(self.ledger.balance(self.eggs, self.storage), 1.0)
+
+    def test_ShouldDateWriteOffsByOrderPeriod_WhenBatchSpansPeriods_BalancesAtDateAreKept(self):
+        """Тест списания пакета заказов разных дат: движение на каждый период"""
+        # Act
+        movements = self.service.post([
+            self.order(2),
+            ProductionOrderModel(self.receipt, 2, self.storage, datetime(2024, 1, 5)),
+        ])
+
+        # Assert
+        self.assertEqual(len(movements), 4)
+        self.assertEqual(sorted({movement.period for movement in movements}),
+                         [datetime(2024, 1, 2), datetime(2024, 1, 5)])
+        self.assertAlmostEqual(self.ledger.balance_at(self.potato, self.storage, datetime(2024, 1, 3)), 750.0)
+        self.assertAlmostEqual(self.ledger.balance(self.potato, self.storage), 500.0)
+
+    def test_ShouldAllowNegativeBalance_WhenUnderBalanceMode_BalanceBecomesNegative(self):
+        """Тест списания "под сальдо" """
+        # Act
+        self.service.post([self.order(12)], WriteOffMode.UNDER_BALANCE)
+
+        # Assert
+        self.assertAlmostEqual(self.ledger.balance(self.potato, self.storage), -500.0)
+        self.assertAlmostEqual(self.ledger.balance(self.eggs, self.storage), -2.0)
+
+
+class TestCatalogueJsonl(unittest.TestCase):
+    """
+    Юнит-тесты для потокового импорта и экспорта справочников
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: эталонные данные и составной рецепт"""
+        self.source = indexed_reposity()
+        DefaultDataCreator().create_data(self.source)
+        salad = self.source.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+        self.lunch = ReceiptModel("Обед", 1, "1 ч")
+        self.lunch.add_ingredient(ReceiptComponentModel(salad, 0.5))
+        self.source.add(reposity.receipt_key(), self.lunch)
+        # Подгруппа добавляется раньше родительской группы
+        vegetables = NomenclatureGroupModel("Свежие овощи")
+        self.source.add(reposity.nomenclature_group_key(),
+                        NomenclatureGroupModel("Корнеплоды", vegetables))
+        self.source.add(reposity.nomenclature_group_key(), vegetables)
+
+    def export(self) -> str:
+        stream = io.StringIO()
+        CatalogueExporter(self.source).export(stream)
+        return stream.getvalue()
+
+    def test_ShouldWriteDependenciesFirst_WhenExported_ReferencesPointBackwards(self):
+        """Тест порядка записей: ссылки только на ранее выведенные записи"""
+        seen = set()
+        for line in self.export().splitlines():
+            record = json.loads(line)
+            references = [record.get("base_unit_id"), record.get("group_id"), record.get("unit_id"),
+                          record.get("parent_id")]
+            for item in record.get("ingredients", []):
+                references.extend(item.get(name) for name in ("receipt_id", "nomenclature_id", "unit_id"))
+            for reference in references:
+                if reference is not None:
+                    self.assertIn(reference, seen)
+            seen.add(record["id"])
+
+    def test_ShouldRestoreCatalogue_WhenImported_ModelsAndReferencesMatch(self):
+        """Тест загрузки выгрузки в пустой репозиторий"""
+        target = indexed_reposity()
+        counts = CatalogueImporter(target, batch_size=3).import_stream(io.StringIO(self.export()))
+
+        self.assertEqual(counts[reposity.range_key()], len(self.source.models(reposity.range_key())))
+        self.assertEqual(counts[reposity.receipt_key()], 3)
+        lunch = target.get_by_id(reposity.receipt_key(), self.lunch.id)
+        component = lunch.ingredients[0]
+        self.assertIs(component.receipt, target.find_by_name(reposity.receipt_key(), component.receipt.name))
+        self.assertEqual(len(component.receipt.ingredients), 5)
+        self.assertEqual(len(component.receipt.cooking_steps), 6)
+        self.assertEqual(target.find_by_name(reposity.nomenclature_group_key(), "Корнеплоды").parent.name,
+                         "Свежие овощи")
+
+        item = target.find_by_name(reposity.nomenclature_key(), "Картофель")
+        self.assertIs(item.group, target.get_by_id(reposity.nomenclature_group_key(), item.group.id))
+        kg = target.find_by_name(reposity.range_key(), "килограмм")
+        self.assertIs(kg.base_unit, target.find_by_name(reposity.range_key(), "грамм"))
+        self.assertEqual(self.export(), self.export())
+
+    def test_ShouldLoadIntoDatabase_WhenImportedIntoSqlite_BatchesArePersisted(self):
+        """Тест загрузки в репозиторий SQLite пакетами"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalogue.jsonl")
+            CatalogueExporter(self.source).export_file(path)
+            repo = sqlite_reposity(os.path.join(directory, "data.db"))
+            CatalogueImporter(repo, batch_size=4).import_file(path)
+            repo.close()
+
+            reopened = sqlite_reposity(os.path.join(directory, "data.db"))
+            lunch = reopened.get_by_id(reposity.receipt_key(), self.lunch.id)
+            self.assertEqual(lunch.ingredients[0].portions, 0.5)
+            self.assertEqual(len(reopened.models(reposity.nomenclature_key())),
+                             len(self.source.models(reposity.nomenclature_key())))
+            reopened.close()
+
+    def test_ShouldReportLine_WhenReferenceIsUnknown_ExceptionIsRaised(self):
+        """Тест ошибки при ссылке на незагруженную модель"""
+        lines = [json.dumps({"type": "group", "id": "g1", "name": "Овощи"}),
+                 json.dumps({"type": "nomenclature", "id": "n1", "name": "Морковь", "group_id": "g2"})]
+        with self.assertRaises(OperationException) as context:
+            CatalogueImporter(indexed_reposity()).import_stream(io.StringIO("\n".join(lines)))
+        self.assertIn("Строка 2", str(context.exception))
+
+
+class TestRecipeCardMarkdown(unittest.TestCase):
+    """
+    Юнит-тесты для разбора и вывода карт в формате Markdown
+    """
+
+    CARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Docs", "salat_vitaminniy.md")
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.repo = indexed_reposity()
+        DefaultDataCreator().create_data(self.repo)
+        with open(self.CARD, encoding="utf-8") as file:
+            self.text = file.read()
+
+    def test_ShouldParseCard_WhenResolversGiven_ModelsAreLinked(self):
+        """Тест разбора карты с поиском номенклатуры и единиц в репозитории"""
+        parser = RecipeCardParser(
+            lambda name, unit: self.repo.get_or_add(reposity.nomenclature_key(), name,
+                                                    lambda: NomenclatureModel(name, name, None, unit)),
+            lambda name: self.repo.find_by_name(reposity.range_key(), name))
+
+        receipt = parser.parse(self.text)["receipt"]
+
+        self.assertEqual(receipt.name, "Салат витаминный с морковью и яблоком")
+        self.assertEqual(receipt.portions, 2)
+        self.assertEqual(receipt.cooking_time, "15 мин")
+        self.assertEqual([item.quantity for item in receipt.ingredients], [2, 2, 100, 1, 10])
+        spoon = receipt.ingredients[3]
+        self.assertIs(spoon.unit, self.repo.find_by_name(reposity.range_key(), "столовая ложка"))
+        self.assertIs(spoon.nomenclature, self.repo.find_by_name(reposity.nomenclature_key(), "Сахар"))
+        self.assertEqual(len(receipt.cooking_steps), 6)
+        self.assertEqual(receipt.cooking_steps[0].description,
+                         "Подготовка овощей\nМорковь очистить и натереть на крупной терке.")
+
+    def test_ShouldRoundTrip_WhenRenderedCardIsParsed_CardIsUnchanged(self):
+        """Тест вывода карты в том же формате"""
+        receipt = RecipeCardParser().parse(self.text)["receipt"]
+        rendered = RecipeCardRenderer().render(receipt)
+
+        self.assertTrue(rendered.startswith("# САЛАТ ВИТАМИННЫЙ С МОРКОВЬЮ И ЯБЛОКОМ\n\n#### `2 порции`"))
+        self.assertIn("| Сахар        | 1 ст.л     |", rendered)
+        self.assertEqual(parse_markdown_text(rendered), parse_markdown_text(self.text))
+
+    def test_ShouldReuseRenderedCard_WhenReceiptIsUnchanged_CacheIsInvalidatedByVersion(self):
+        """Тест кэша выведенных карт по версии рецепта"""
+        renderer = RecipeCardRenderer()
+        receipt = self.repo.find_by_name(reposity.receipt_key(), "Драники картофельные")
+
+        first = renderer.render(receipt)
+        self.assertIs(renderer.render(receipt), first)
+
+        receipt.add_step(CookingStepModel(6, "Украсить зеленью."))
+        changed = renderer.render(receipt)
+        self.assertIsNot(changed, first)
+        self.assertIn("6. Украсить зеленью.", changed)
+        self.assertIs(RecipeCardRenderer.compiled(RecipeCardRenderer.ROW_TEMPLATE),
+                      RecipeCardRenderer.compiled(RecipeCardRenderer.ROW_TEMPLATE))
+
+    def test_ShouldRenderAgain_WhenRelatedModelsChange_CacheIsKeyedByRenderedValues(self):
+        """Тест вывода новой карты при изменении значений, не меняющих версию рецепта"""
+        renderer = RecipeCardRenderer()
+        receipt = self.repo.find_by_name(reposity.receipt_key(), "Драники картофельные")
+        ingredient = receipt.ingredients[0]
+        first = renderer.render(receipt)
+
+        ingredient.quantity = 501
+        self.assertIn("| 501 гр     |", renderer.render(receipt))
+        ingredient.nomenclature.name = "Картофель молодой"
+        self.assertIn("Картофель молодой", renderer.render(receipt))
+        receipt.cooking_time = "45 мин"
+        changed = renderer.render(receipt)
+        self.assertIn("45 мин", changed)
+        self.assertIsNot(changed, first)
+        self.assertIs(renderer.render(receipt), changed)
+
+    def test_ShouldEvictOldestCard_WhenCacheIsFull_SizeIsLimited(self):
+        """Тест ограничения количества сохраненных карт"""
+        renderer = RecipeCardRenderer(max_size=1)
+        receipts = self.repo.models(reposity.receipt_key())[:2]
+
+        first = renderer.render(receipts[0])
+        renderer.render(receipts[1])
+        self.assertIsNot(renderer.render(receipts[0]), first)
+        with self.assertRaises(ArgumentException):
+            RecipeCardRenderer(max_size=0)
+
+    def test_ShouldLoadMarkdownCards_WhenFileCreatorRuns_ReceiptIsAdded(self):
+        """Тест загрузки карт Markdown через создание данных из файлов"""
+        with tempfile.TemporaryDirectory() as directory:
+            shutil.copy(self.CARD, directory)
+            repo = indexed_reposity()
+            DefaultDataCreator()._create_units(repo)
+            FileDataCreator(directory, workers=1).create_data(repo)
+
+        receipt = repo.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+        self.assertEqual(len(receipt.ingredients), 5)
+        self.assertIs(receipt.ingredients[0].unit, repo.find_by_name(reposity.range_key(), "штука"))
+
+
+class TestReceiptCostEngine(unittest.TestCase):
+    """
+    Юнит-тесты для расчета себестоимости рецептов
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: салат входит в обед как вложенная карта"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.carrot = NomenclatureModel("Морковь", unit=self.kg, price=80)
+        self.bread = NomenclatureModel("Хлеб", unit=self.gram, price=0.1)
+        self.salad = ReceiptModel("Салат", 2, "15 мин")
+        self.salad.add_ingredient(IngredientModel(self.carrot, 500, self.gram))
+        self.lunch = ReceiptModel("Обед", 1, "1 ч")
+        self.lunch.add_ingredient(ReceiptComponentModel(self.salad, 1))
+        self.lunch.add_ingredient(IngredientModel(self.bread, 50, self.gram))
+        self.engine = ReceiptCostEngine()
+        self.engine.add_many([self.salad, self.lunch])
+
+    def test_ShouldCalculateCost_WhenReceiptsAdded_NestedCardsAreIncluded(self):
+        """Тест себестоимости порции с учетом вложенной карты"""
+        self.assertAlmostEqual(self.engine.cost(self.salad), 20.0)
+        self.assertAlmostEqual(self.engine.cost(self.lunch), 25.0)
+        self.assertAlmostEqual(self.engine.cost(self.salad, 2), 40.0)
+
+    def test_ShouldUpdateOnlyConsumers_WhenPriceChanged_CostsMatchFullRecompute(self):
+        """Тест пересчета на разницу цены только зависящих рецептов"""
+        self.assertEqual(self.engine.set_price(self.bread, 0.2), [self.lunch])
+        self.assertEqual(set(self.engine.set_price(self.carrot, 100)), {self.salad, self.lunch})
+
+        incremental = {receipt: self.engine.cost(receipt) for receipt in self.engine.receipts}
+        full = self.engine.recompute_all()
+        for receipt, cost in full.items():
+            self.assertAlmostEqual(incremental[receipt], cost)
+        self.assertAlmostEqual(self.engine.cost(self.lunch), 35.0)
+
+    def test_ShouldPickUpChanges_WhenPriceOrCompositionChangedDirectly_CostIsRefreshed(self):
+        """Тест учета цен, измененных в моделях, и изменения состава вложенной карты"""
+        self.bread.price = 0.3
+        self.assertEqual(self.engine.sync_prices(), {self.lunch})
+        self.assertAlmostEqual(self.engine.cost(self.lunch), 35.0)
+
+        self.salad.add_ingredient(IngredientModel(self.bread, 100, self.gram))
+        self.assertAlmostEqual(self.engine.cost(self.lunch), 50.0)
+        with self.assertRaises(ArgumentException):
+            self.carrot.price = -1
+
+    def test_ShouldRejectReceipt_WhenIngredientUnitIsNotConvertibleToPriceUnit(self):
+        """Тест рецепта с единицей ингредиента, которую нельзя пересчитать в единицу цены"""
+        # Arrange: картофель оценивается поштучно, а в рецепт входит в граммах
+        piece = UnitModel("штука", 1.0)
+        potato = NomenclatureModel("Картофель", unit=piece, price=20)
+        pancakes = ReceiptModel("Драники", 4, "30 мин")
+        pancakes.add_ingredient(IngredientModel(potato, 500, self.gram))
+
+        # Act & Assert
+        with self.assertRaisesRegex(OperationException, "Картофель"):
+            self.engine.add(pancakes)
+        self.assertNotIn(pancakes, self.engine.receipts)
+        self.assertEqual(self.engine.set_price(potato, 30), [])
+
+        # Act & Assert: расход в разных единицах одной позиции приводится к единице цены
+        self.salad.add_ingredient(IngredientModel(self.carrot, 0.25, self.kg))
+        self.assertAlmostEqual(self.engine.cost(self.salad), 30.0)
+
+
+class TestDeliveryRouter(unittest.TestCase):
+    """
+    Юнит-тесты для маршрутизации заказов на доставку
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: город 10 x 10 км из двух районов и невыпуклого третьего"""
+        import random
+        random.seed(7)
+        self.restaurants = [RestaurantModel(f"Ресторан {number}", (random.uniform(0, 10), random.uniform(0, 10)),
+                                            random.choice(list(RestaurantServiceType)))
+                            for number in range(60)]
+        self.west = DistrictModel("Запад", [(0, 0), (5, 0), (5, 10), (0, 10)], 150)
+        self.east = DistrictModel("Восток", [(5, 0), (10, 0), (10, 6), (5, 6)], 200)
+        # Район в форме буквы "П" над восточным
+        self.north = DistrictModel("Север", [(5, 6), (10, 6), (10, 10), (9, 10), (9, 7), (6, 7), (6, 10), (5, 10)], 300)
+        self.router = DeliveryRouter(self.restaurants, [self.west, self.east, self.north])
+
+    def brute_force(self, point):
+        delivering = [item for item in self.restaurants if item.delivers]
+        return min(delivering, key=lambda item: (item.location[0] - point[0]) ** 2 + (item.location[1] - point[1]) ** 2)
+
+    def test_ShouldFindNearestDeliveringRestaurant_WhenQueried_MatchesBruteForce(self):
+        """Тест поиска ближайшего ресторана: совпадает с полным перебором и пропускает рестораны без доставки"""
+        import random
+        random.seed(8)
+        for _ in range(500):
+            point = (random.uniform(-2, 12), random.uniform(-2, 12))
+            restaurant, _ = self.router.nearest_restaurant(point)
+            self.assertIs(restaurant, self.brute_force(point))
+            self.assertTrue(restaurant.delivers)
+
+    def test_ShouldFindDistrict_WhenPointIsInsidePolygon_OutsidePointsAreRejected(self):
+        """Тест определения района, в том числе внутри невыпуклой границы"""
+        self.assertIs(self.router.district_of((2, 5)), self.west)
+        self.assertIs(self.router.district_of((7, 3)), self.east)
+        self.assertIs(self.router.district_of((5.5, 9)), self.north)
+        self.assertIsNone(self.router.district_of((7.5, 8.5)))
+        self.assertIsNone(self.router.district_of((11, 5)))
+        self.assertIsNone(self.router.district_of((-1, 5)))
+
+    def test_ShouldRouteQueue_WhenBatchIsRouted_PricesFollowDistricts(self):
+        """Тест маршрутизации очереди заказов"""
+        routes = self.router.route_many([(2, 5), (7, 3), (7.5, 8.5)])
+
+        self.assertEqual([route.price for route in routes[:2]], [150, 200])
+        self.assertIs(routes[0].restaurant, self.brute_force((2, 5)))
+        self.assertIsNone(routes[2])
+        self.assertIsNone(DeliveryRouter([], [self.west]).route((2, 5)))
+        with self.assertRaises(ArgumentException):
+            self.router.route((1, "2"))
+
+
+class TestDeliveryMenu(unittest.TestCase):
+    """
+    Юнит-тесты для меню доставки с упаковкой
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: салат и суп в коробке, суп - еще и в стакане"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.piece = UnitModel("штука", 1.0)
+        self.carrot = NomenclatureModel("Морковь", unit=self.gram, price=0.1)
+        self.box = NomenclatureModel("Коробка", unit=self.piece, price=12)
+        self.cup = NomenclatureModel("Стакан", unit=self.piece, price=7)
+        self.salad = ReceiptModel("Салат", 2, "15 мин")
+        self.salad.add_ingredient(IngredientModel(self.carrot, 400, self.gram))
+        self.soup = ReceiptModel("Суп", 1, "1 ч")
+        self.soup.add_ingredient(IngredientModel(self.carrot, 100, self.gram))
+        self.menu = DeliveryMenu([IngredientModel(self.box, 1, self.piece)])
+        self.menu.add(self.salad)
+        self.menu.add(self.soup, [IngredientModel(self.box, 1, self.piece), IngredientModel(self.cup, 1, self.piece)])
+
+    def test_ShouldIncludePackaging_WhenDishAdded_CompositionAndCostPerPortion(self):
+        """Тест состава и себестоимости порции доставки с упаковкой"""
+        composition = self.menu.composition(self.salad)
+
+        self.assertAlmostEqual(composition[(self.carrot, self.gram)], 200)
+        self.assertAlmostEqual(composition[(self.box, self.piece)], 1)
+        self.assertAlmostEqual(self.menu.cost(self.salad), 32.0)
+        self.assertAlmostEqual(self.menu.cost(self.soup, 2), 58.0)
+        self.assertEqual(len(self.salad.ingredients), 1)
+        with self.assertRaises(ArgumentException):
+            self.menu.cost(ReceiptModel("Компот"))
+
+    def test_ShouldInvalidateOnlyAffectedDishes_WhenRecipeOrPackagingChanged(self):
+        """Тест сброса только затронутых блюд при изменении рецепта, цены и упаковки"""
+        soup_variant = self.menu.variant(self.soup)
+
+        self.assertEqual(self.menu.set_price(self.cup, 10), [self.soup])
+        self.assertAlmostEqual(self.menu.cost(self.soup), 32.0)
+
+        self.salad.add_ingredient(IngredientModel(self.carrot, 200, self.gram))
+        self.assertAlmostEqual(self.menu.cost(self.salad), 42.0)
+
+        self.assertEqual(self.menu.set_packaging([IngredientModel(self.cup, 2, self.piece)]), [self.salad])
+        self.assertIs(self.menu.variant(self.soup), soup_variant)
+        self.assertEqual(self.menu.precompute(), {self.salad: 50.0, self.soup: 32.0})
+
+        self.assertTrue(self.menu.remove(self.soup))
+        self.assertEqual(self.menu.set_price(self.box, 20), [])
+        self.assertEqual(self.menu.receipts, [self.salad])
+
+    def test_ShouldRejectDish_WhenIngredientUnitIsNotConvertibleToPriceUnit_MenuIsUnchanged(self):
+        """Тест блюда и упаковки в единице, которую нельзя пересчитать в единицу цены"""
+        # Arrange: картофель оценивается поштучно, а в рецепт входит в граммах
+        potato = NomenclatureModel("Картофель", unit=self.piece, price=20)
+        pancakes = ReceiptModel("Драники", 4, "30 мин")
+        pancakes.add_ingredient(IngredientModel(potato, 500, self.gram))
+        salad_variant = self.menu.variant(self.salad)
+
+        # Act & Assert
+        with self.assertRaisesRegex(OperationException, "Картофель"):
+            self.menu.add(pancakes)
+        self.assertIsNone(self.menu.variant(pancakes))
+        with self.assertRaisesRegex(OperationException, "Коробка"):
+            self.menu.set_packaging([IngredientModel(self.box, 10, self.gram)])
+        self.assertIs(self.menu.variant(self.salad), salad_variant)
+        self.assertAlmostEqual(self.menu.cost(self.salad), 32.0)
+
+        # Act & Assert: рецепт меню изменен на месте
+        self.salad.add_ingredient(IngredientModel(potato, 100, self.gram))
+        with self.assertRaisesRegex(OperationException, "Картофель"):
+            self.menu.cost(self.salad)
+
+
+class TestInventoryService(unittest.TestCase):
+    """
+    Юнит-тесты для плановой и частичной инвентаризации
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: мука и молоко на двух складах"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.dry = NomenclatureGroupModel("Бакалея")
+        self.dairy = NomenclatureGroupModel("Молочные продукты")
+        self.flour = NomenclatureModel("Мука", group=self.dry, unit=self.kg)
+        self.rice = NomenclatureModel("Рис", group=self.dry, unit=self.kg)
+        self.milk = NomenclatureModel("Молоко", group=self.dairy, unit=self.kg)
+        self.main = StorageModel("Центральный склад")
+        self.kitchen = StorageModel("Склад ресторана")
+        self.ledger = StockLedger()
+        self.ledger.post_many([
+            StockMovementModel(StockMovementType.RECEIPT, nomenclature, storage, 10, self.kg, datetime(2024, 1, 1))
+            for nomenclature in (self.flour, self.rice, self.milk) for storage in (self.main, self.kitchen)])
+        self.service = InventoryService(self.ledger)
+        self.period = datetime(2024, 1, 31)
+
+    def test_ShouldAdjustBalances_WhenFullCountConducted_UncountedItemsAreWrittenOff(self):
+        """Тест плановой инвентаризации: излишки, недостачи и непосчитанные позиции"""
+        discrepancies = self.service.conduct([
+            (self.main, self.flour, 12),
+            (self.main, self.rice, 4000, self.gram),
+            (self.main, self.rice, 6),
+            (self.kitchen, self.flour, 9.5),
+            (self.kitchen, self.rice, 10),
+            (self.kitchen, self.milk, 10),
+        ], self.period)
+
+        differences = {(item.storage, item.nomenclature): item.difference for item in discrepancies}
+        self.assertEqual(differences, {(self.main, self.flour): 2000.0, (self.main, self.milk): -10000.0,
+                                       (self.kitchen, self.flour): -500.0})
+        self.assertAlmostEqual(self.ledger.balance(self.flour, self.main), 12)
+        self.assertAlmostEqual(self.ledger.balance(self.milk, self.main), 0)
+        self.assertAlmostEqual(self.ledger.balance(self.flour, self.kitchen), 9.5)
+        self.assertEqual(len(self.ledger.movements), 9)
+
+    def test_ShouldLimitToGroupsAndStorages_WhenPartialCountConducted(self):
+        """Тест частичной инвентаризации группы на одном складе"""
+        discrepancies = self.service.conduct([(self.kitchen, self.flour, 7)], self.period,
+                                             storages=[self.kitchen], groups=[self.dry])
+
+        self.assertEqual({(item.nomenclature, item.counted) for item in discrepancies},
+                         {(self.flour, 7000.0), (self.rice, 0.0)})
+        self.assertAlmostEqual(self.ledger.balance(self.milk, self.kitchen), 10)
+        self.assertAlmostEqual(self.ledger.balance(self.rice, self.main), 10)
+        with self.assertRaises(ArgumentException):
+            self.service.reconcile([(self.kitchen, self.milk, 1)], self.period, groups=[self.dry])
+        with self.assertRaises(ArgumentException):
+            self.service.reconcile([(self.main, self.flour, 1)], self.period, storages=[self.kitchen])
+        with self.assertRaises(ArgumentException):
+            self.service.reconcile([(self.main, self.flour, -1)], self.period)
+
+    def test_ShouldIncludeSubgroups_WhenPartialCountConducted(self):
+        """Тест частичной инвентаризации группы вместе с ее подгруппами"""
+        food = NomenclatureGroupModel("Продукты")
+        self.dry.parent = food
+        cereals = NomenclatureGroupModel("Крупы", self.dry)
+        self.rice.group = cereals
+
+        discrepancies = self.service.reconcile([(self.main, self.rice, 8)], self.period,
+                                               storages=[self.main], groups=[food])
+
+        self.assertEqual({(item.nomenclature, item.counted) for item in discrepancies},
+                         {(self.rice, 8000.0), (self.flour, 0.0)})
+        with self.assertRaises(ArgumentException):
+            self.service.reconcile([(self.main, self.milk, 1)], self.period, groups=[food])
+
+
+class TestGroupRollup(unittest.TestCase):
+    """
+    Юнит-тесты для итогов по иерархии групп номенклатуры
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: продукты -> молочные -> сыры, продукты -> бакалея"""
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.food = NomenclatureGroupModel("Продукты")
+        self.dairy = NomenclatureGroupModel("Молочные продукты", self.food)
+        self.cheese = NomenclatureGroupModel("Сыры", self.dairy)
+        self.dry = NomenclatureGroupModel("Бакалея", self.food)
+        self.brie = NomenclatureModel("Бри", group=self.cheese, unit=self.kg, price=1000)
+        self.milk = NomenclatureModel("Молоко", group=self.dairy, unit=self.kg, price=80)
+        self.flour = NomenclatureModel("Мука", group=self.dry, unit=self.kg, price=50)
+        self.main = StorageModel("Центральный склад")
+        self.kitchen = StorageModel("Склад ресторана")
+        self.ledger = StockLedger()
+        self.ledger.post_many([self.movement(StockMovementType.RECEIPT, item, 10, 1)
+                               for item in (self.brie, self.milk, self.flour)])
+
+    def movement(self, movement_type, nomenclature, quantity, day, target=None):
+        return StockMovementModel(movement_type, nomenclature, self.main, quantity, self.kg,
+                                  datetime(2024, 1, day), target)
+
+    def test_ShouldRollUpSubtrees_WhenMovementsPosted_TotalsFollowLedger(self):
+        """Тест итогов поддеревьев: начальная загрузка и учет новых пакетов через подписку"""
+        rollup = GroupRollup(self.ledger)
+        self.ledger.post_many([
+            self.movement(StockMovementType.WRITE_OFF, self.brie, 2, 2),
+            self.movement(StockMovementType.TRANSFER, self.milk, 3, 3, self.kitchen),
+        ])
+
+        self.assertAlmostEqual(rollup.total(self.food, RollupMeasure.BALANCE, unit=self.gram), 28000)
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.BALANCE, self.main, self.gram), 15000)
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.BALANCE, self.kitchen, self.gram), 3000)
+        self.assertAlmostEqual(rollup.total(self.food, RollupMeasure.CONSUMPTION, unit=self.gram), 2000)
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.COST), 2000)
+        self.assertEqual(rollup.total(self.dry, RollupMeasure.COST), 0.0)
+        self.assertEqual(set(rollup.subgroups(self.food)), {self.dairy, self.cheese, self.dry})
+
+        # Итоги новой сводки по тому же журналу совпадают с накопленными
+        fresh = GroupRollup(self.ledger)
+        for group in (self.food, self.dairy, self.cheese, self.dry):
+            self.assertAlmostEqual(fresh.total(group, RollupMeasure.BALANCE, unit=self.gram),
+                                   rollup.total(group, RollupMeasure.BALANCE, unit=self.gram))
+
+    def test_ShouldRebuildTotals_WhenHierarchyChanged(self):
+        """Тест пересборки итогов при переносе группы и номенклатуры"""
+        rollup = GroupRollup(self.ledger)
+
+        self.cheese.parent = self.food
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.BALANCE, unit=self.gram), 10000)
+        self.milk.group = self.dry
+        self.assertAlmostEqual(rollup.total(self.dry, RollupMeasure.BALANCE, unit=self.gram), 20000)
+        self.assertAlmostEqual(rollup.total(self.food, RollupMeasure.BALANCE, unit=self.gram), 30000)
+
+        rollup.close()
+        self.ledger.post(self.movement(StockMovementType.WRITE_OFF, self.flour, 1, 2))
+        self.assertAlmostEqual(rollup.total(self.dry, RollupMeasure.BALANCE, unit=self.gram), 20000)
+
+    def test_ShouldRejectCostAndTotals_WhenUnitsDoNotMatch_QuantitiesAreStillCounted(self):
+        """Тест отказа в стоимости расхода, единицу которого нельзя пересчитать в единицу цены"""
+        rollup = GroupRollup(self.ledger)
+        piece = UnitModel("штука", 1.0)
+        self.milk.unit = piece
+
+        with self.assertRaisesRegex(OperationException, "Молоко"):
+            self.ledger.post(self.movement(StockMovementType.WRITE_OFF, self.milk, 1, 2))
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.BALANCE, unit=self.gram), 19000)
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.CONSUMPTION, unit=self.gram), 1000)
+        self.assertEqual(rollup.total(self.dairy, RollupMeasure.COST), 0.0)
+
+        for measure, unit in ((RollupMeasure.BALANCE, self.kg), (RollupMeasure.CONSUMPTION, None),
+                              (RollupMeasure.COST, self.gram)):
+            with self.subTest(measure=measure):
+                with self.assertRaises(ArgumentException):
+                    rollup.total(self.food, measure, unit=unit)
+
+    def test_ShouldMoveTotals_WhenItemsAndGroupsMove_TotalsMatchRebuild(self):
+        """Тест переноса итогов по цепочкам групп без пересборки"""
+        rollup = GroupRollup(self.ledger)
+        self.ledger.post(self.movement(StockMovementType.WRITE_OFF, self.brie, 2, 2))
+        rollup.total(self.food, RollupMeasure.BALANCE, unit=self.gram)
+
+        self.brie.group = self.dry
+        self.milk.group = self.cheese
+        self.assertEqual(NomenclatureModel.group_moves_since(NomenclatureModel.group_revision() - 2),
+                         [(self.brie, self.cheese, self.dry), (self.milk, self.dairy, self.cheese)])
+        self.assertAlmostEqual(rollup.total(self.dry, RollupMeasure.COST), 2000)
+        self.cheese.parent = self.dry
+        self.assertAlmostEqual(rollup.total(self.dairy, RollupMeasure.BALANCE, unit=self.gram), 0)
+        self.assertAlmostEqual(rollup.total(self.dry, RollupMeasure.BALANCE, unit=self.gram), 28000)
+        self.assertEqual(set(rollup.subgroups(self.dry)), {self.cheese})
+        self.assertTotalsMatchRebuild(rollup)
+
+        # Несколько переносов групп и изменение без подробностей - полная пересборка
+        self.dairy.parent = None
+        self.cheese.parent = self.dairy
+        NomenclatureGroupModel.mark_changed()
+        self.assertTotalsMatchRebuild(rollup)
+        self.assertEqual(set(rollup.subgroups(self.dry)), set())
+
+    def assertTotalsMatchRebuild(self, rollup):
+        fresh = GroupRollup(self.ledger)
+        for group in (self.food, self.dairy, self.cheese, self.dry):
+            for measure in (RollupMeasure.BALANCE, RollupMeasure.CONSUMPTION):
+                self.assertAlmostEqual(rollup.total(group, measure, self.main, self.gram),
+                                       fresh.total(group, measure, self.main, self.gram))
+            self.assertAlmostEqual(rollup.total(group, RollupMeasure.COST), fresh.total(group, RollupMeasure.COST))
+
+
+class TestEventLog(unittest.TestCase):
+    """
+    Юнит-тесты для журнала изменений репозитория
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: каталог журнала и подключенный репозиторий"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.repo = indexed_reposity()
+        self.log = EventLog(self.directory.name, batch_size=5, compact_every=None)
+        self.log.attach(self.repo)
+        DefaultDataCreator().create_data(self.repo)
+
+    def tearDown(self):
+        self.log.close()
+        self.directory.cleanup()
+
+    def restore(self) -> indexed_reposity:
+        repo = indexed_reposity()
+        EventLog(self.directory.name).replay(repo)
+        return repo
+
+    def test_ShouldRestoreChanges_WhenReplayed_LastEventWins(self):
+        """Тест восстановления добавлений, изменений и удалений; недописанная строка отбрасывается"""
+        salt = self.repo.find_by_name(reposity.nomenclature_key(), "Соль")
+        salt.price = 12.5
+        self.repo.update(reposity.nomenclature_key(), salt)
+        pepper = self.repo.find_by_name(reposity.nomenclature_key(), "Перец черный")
+        for receipt in self.repo.models(reposity.receipt_key()):
+            self.repo.remove(reposity.receipt_key(), receipt)
+        self.repo.remove(reposity.nomenclature_key(), pepper)
+        crate = self.repo.add(reposity.range_key(), UnitModel("ящик", 10000.0,
+                              self.repo.find_by_name(reposity.range_key(), "грамм")))
+        self.log.close()
+        with open(self.log.log_path, "a", encoding="utf-8") as stream:
+            stream.write('{"op": "put", "record": {"type": "un')
+
+        repo = self.restore()
+
+        self.assertEqual(repo.get_by_id(reposity.nomenclature_key(), salt.id).price, 12.5)
+        self.assertIsNone(repo.get_by_id(reposity.nomenclature_key(), pepper.id))
+        self.assertEqual(repo.models(reposity.receipt_key()), [])
+        self.assertIs(repo.get_by_id(reposity.range_key(), crate.id).base_unit,
+                      repo.find_by_name(reposity.range_key(), "грамм"))
+        with open(self.log.log_path, "rb") as stream:
+            self.assertTrue(stream.read().endswith(b"\n"))
+
+    def test_ShouldReplaySnapshotAndDelta_WhenCompacted_LogIsTruncated(self):
+        """Тест сжатия: снимок содержит состояние, журнал - только последующие события"""
+        self.log.compact()
+        self.assertEqual(os.path.getsize(self.log.log_path), 0)
+        salad = self.repo.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+        lunch = ReceiptModel("Обед", 1, "1 ч")
+        lunch.add_ingredient(ReceiptComponentModel(salad, 0.5))
+        self.repo.add(reposity.receipt_key(), lunch)
+        self.log.flush()
+
+        with open(self.log.log_path, encoding="utf-8") as stream:
+            self.assertEqual(len(stream.readlines()), 1)
+        repo = self.restore()
+
+        self.assertEqual(len(repo.models(reposity.nomenclature_key())),
+                         len(self.repo.models(reposity.nomenclature_key())))
+        component = repo.get_by_id(reposity.receipt_key(), lunch.id).ingredients[0]
+        self.assertIs(component.receipt, repo.get_by_id(reposity.receipt_key(), salad.id))
+        self.assertEqual(len(component.receipt.ingredients), 5)
+
+    def test_ShouldRejectCorruptedLine_WhenNotLast_ExceptionIsRaised(self):
+        """Тест ошибки при повреждении строки в середине журнала"""
+        self.log.close()
+        with open(self.log.log_path, encoding="utf-8") as stream:
+            lines = stream.readlines()
+        lines[1] = "{broken\n"
+        with open(self.log.log_path, "w", encoding="utf-8") as stream:
+            stream.writelines(lines)
+
+        with self.assertRaises(OperationException) as context:
+            self.restore()
+        self.assertIn("строка 2", str(context.exception))
+
+    def test_ShouldFlushBuffer_WhenIntervalElapsesWithoutEvents(self):
+        """Тест фиксации буфера фоновым потоком без новых событий"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = EventLog(directory, batch_size=1000, flush_interval=0.05, compact_every=None)
+            log.attach(indexed_reposity())
+            try:
+                log.changed("put", reposity.range_key(), [UnitModel("грамм", 1.0)])
+                log.changed("put", reposity.range_key(), [UnitModel("штука", 1.0)])
+                deadline = time.monotonic() + 5
+                while log.pending and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(log.pending, 0)
+                with open(log.log_path, encoding="utf-8") as stream:
+                    self.assertGreaterEqual(len(stream.readlines()), 1)
+            finally:
+                log.close()
+
+    def test_ShouldCompactInBackground_WhenThresholdReached_StateIsKept(self):
+        """Тест фонового сжатия: новые события пишутся в новый журнал, состояние не теряется"""
+        with tempfile.TemporaryDirectory() as directory:
+            repo = indexed_reposity()
+            log = EventLog(directory, batch_size=1, compact_every=2)
+            log.attach(repo)
+            DefaultDataCreator().create_data(repo)
+            log.close()
+
+            self.assertTrue(os.path.exists(log.snapshot_path))
+            restored = indexed_reposity()
+            EventLog(directory).replay(restored)
+            for key in (reposity.range_key(), reposity.nomenclature_key(), reposity.receipt_key()):
+                self.assertEqual({model.id for model in restored.models(key)},
+                                 {model.id for model in repo.models(key)})
+
+
+        # Прерванное сжатие: события файла сжатия учитываются при восстановлении
+        self.log.close()
+        os.replace(self.log.log_path, os.path.join(self.directory.name, "events.compacting.jsonl"))
+        self.assertEqual(len(self.restore().models(reposity.receipt_key())),
+                         len(self.repo.models(reposity.receipt_key())))
+
+
+if __name__ == '__main__':
+    unittest.main()
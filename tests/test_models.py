@@ -1,14 +1,32 @@
+import dataclasses
+import gc
+import json
+import os
+import pickle
+import tempfile
+import threading
 import uuid
+import weakref
+from unittest import mock
 from src.settings_manager import SettingsManager
 from src.models.company_model import CompanyModel
 from src.models.settings import Settings
 import unittest
 from src.core.abstract_model import AbstractModel
-from src.core.validator import ArgumentException
+from src.core.validator import ArgumentException, OperationException, Validator
 from src.models.storage_model import StorageModel
 from src.models.unit_model import UnitModel
 from src.models.nomenclature_group_model import NomenclatureGroupModel
 from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+from src.models.production_order_model import ProductionOrderModel
+from src.sqlite_reposity import sqlite_reposity
+from src.logics.stock_ledger import StockLedger
+from src.logics.production_service import ProductionService
+from src.logics.recipe_card_markdown import RecipeCardRenderer
+from datetime import datetime
 
 class TestCompanyModel(unittest.TestCase):
 
@@ -154,6 +172,147 @@ class TestCompanyModel(unittest.TestCase):
         assert storage1 == storage2
 
 
+class TestSettingsDiscovery(unittest.TestCase):
+    """Тесты поиска конфигурационного файла и перезагрузки при его изменении"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager = SettingsManager()
+        self.interval = SettingsManager.reload_interval
+
+    def tearDown(self):
+        SettingsManager.reload_interval = self.interval
+        self.manager.config_file = "settings.json"
+        self.manager.load_config()
+        self.directory.cleanup()
+
+    def write(self, name: str, company_name: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"company": {"name": company_name, "inn": "123456789012"}}, file, ensure_ascii=False)
+        return path
+
+    def test_search_path_is_cached(self):
+        """Файл ищется только в каталогах поиска, найденный путь запоминается"""
+        path = self.write("discovery_settings.json", "Поиск")
+        with mock.patch.dict(os.environ, {"SETTINGS_PATH": self.directory.name}):
+            self.assertEqual(SettingsManager.resolve("discovery_settings.json"), path)
+        # Без каталога в окружении используется запомненное расположение
+        self.assertEqual(SettingsManager.resolve("discovery_settings.json"), path)
+        with self.assertRaises(FileNotFoundError):
+            SettingsManager.resolve("missing_settings.json")
+
+    def test_hot_reload_swaps_settings(self):
+        """Изменение файла подхватывается при обращении к настройкам"""
+        path = self.write("reload_settings.json", "Первая")
+        self.manager.config_file = path
+        self.assertTrue(self.manager.load_config())
+        settings = self.manager.app_config
+        self.assertEqual(settings.organization.name, "Первая")
+
+        SettingsManager.reload_interval = 0
+        self.assertIs(self.manager.app_config, settings)
+        self.write("reload_settings.json", "Вторая организация")
+        os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+
+        self.assertEqual(self.manager.app_config.organization.name, "Вторая организация")
+        self.assertEqual(settings.organization.name, "Первая")
+        self.assertFalse(self.manager.reload_if_changed())
+
+
+class TestSettingsSchema(unittest.TestCase):
+    """Тесты загрузки всех разделов конфигурации по схеме"""
+
+    def setUp(self):
+        self.manager = SettingsManager()
+
+    def test_sections_are_loaded(self):
+        """Разделы конфигурации переносятся в неизменяемые объекты"""
+        settings = self.manager.convert_config({
+            "company": {"name": "Ромашка", "inn": 771234567890},
+            "pools": {"sqlite_connections": 8},
+            "database": {"sqlite_path": "/var/lib/app/data.db"},
+        })
+        self.assertEqual(settings.organization.inn, "771234567890")
+        self.assertEqual(settings.pools.sqlite_connections, 8)
+        self.assertEqual(settings.pools.parse_workers, 0)
+        self.assertEqual(settings.database.sqlite_path, "/var/lib/app/data.db")
+        self.assertFalse(settings.storage.allow_negative_balance)
+        self.assertEqual(settings.caches.unit_conversions, 10_000)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.pools.sqlite_connections = 1
+
+    def test_unknown_and_invalid_values_are_rejected(self):
+        """Неизвестные параметры и неверные значения не пропускаются"""
+        with self.assertRaises(ValueError):
+            self.manager.convert_config({"company": {"INN": "771234567890"}})
+        with self.assertRaises(ValueError):
+            self.manager.convert_config({"cache": {}})
+        with self.assertRaises(ArgumentException):
+            self.manager.convert_config({"pools": {"sqlite_connections": 0}})
+        with self.assertRaises(ArgumentException):
+            self.manager.convert_config({"pools": {"parse_workers": -1}})
+        with self.assertRaises(ArgumentException):
+            self.manager.convert_config({"storage": {"allow_negative_balance": "да"}})
+
+    def test_loaded_settings_are_frozen_and_shareable(self):
+        """Загруженные настройки заморожены и передаются между процессами"""
+        manager = SettingsManager("settings.json")
+        self.assertTrue(manager.load_config())
+        settings = manager.app_config
+        self.assertTrue(settings.frozen)
+        self.assertEqual(settings.organization.inn, "771234567890")
+        with self.assertRaises(OperationException):
+            settings.organization = CompanyModel("Другая")
+        with self.assertRaises(OperationException):
+            settings.organization.inn = "123456789012"
+        self.assertEqual(settings.organization.inn, "771234567890")
+
+        restored = pickle.loads(pickle.dumps(settings))
+        self.assertEqual(restored.organization.name, "Ромашка")
+        self.assertEqual(restored.caches, settings.caches)
+        with self.assertRaises(OperationException):
+            restored.organization.name = "Другая"
+
+    def test_sections_are_used_by_consumers(self):
+        """Компоненты, созданные без явных параметров, берут их из разделов настроек"""
+        previous = self.manager.config_file
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "app.db")
+            path = os.path.join(directory, "settings.json")
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump({"pools": {"sqlite_connections": 2}, "caches": {"rendered_cards": 1},
+                           "database": {"sqlite_path": database},
+                           "storage": {"allow_negative_balance": True}}, stream)
+            try:
+                self.manager.config_file = path
+                self.assertTrue(self.manager.load_config())
+
+                repo = sqlite_reposity()
+                self.assertEqual(repo.pool.database, database)
+                repo.close()
+
+                gram = UnitModel("грамм", 1.0)
+                flour = NomenclatureModel("Мука", unit=gram)
+                bread, pie = ReceiptModel("Хлеб", 1), ReceiptModel("Пирог", 1)
+                for receipt in (bread, pie):
+                    receipt.add_ingredient(IngredientModel(flour, 100, gram))
+                renderer = RecipeCardRenderer()
+                card = renderer.render(bread)
+                renderer.render(pie)
+                self.assertIsNot(renderer.render(bread), card)
+
+                # Списание "под сальдо" - без остатка на складе
+                order = ProductionOrderModel(bread, 2, StorageModel("Склад"), datetime(2024, 1, 1))
+                self.assertEqual(len(ProductionService(StockLedger()).post([order])), 1)
+            finally:
+                if previous:
+                    self.manager.config_file = previous
+                    self.manager.load_config()
+                else:
+                    self.manager.set_default_config()
+
+
 class TestAbstractReference(unittest.TestCase):
 
     
@@ -175,6 +334,81 @@ class TestAbstractReference(unittest.TestCase):
         model = AbstractModel("A" * 50)
         self.assertEqual(len(model.name), 50)
 
+    def test_compact_storage(self):
+        """Тест компактного хранения: слоты вместо __dict__ и UUID как число"""
+        unit = UnitModel("грамм", 1.0)
+        ingredient_unit = UnitModel("штука", 1.0)
+        self.assertFalse(hasattr(unit, "__dict__"))
+        self.assertFalse(hasattr(NomenclatureModel("Тест"), "__dict__"))
+        self.assertFalse(hasattr(CompanyModel("Тест"), "__dict__"))
+        self.assertEqual(str(uuid.UUID(unit.id)), unit.id)
+        self.assertNotEqual(unit, ingredient_unit)
+
+    def test_id_round_trip(self):
+        """Тест сохранения идентификатора в исходной записи"""
+        model = AbstractModel("Тест")
+        canonical = str(uuid.uuid4())
+        model.id = canonical
+        self.assertEqual(model.id, canonical)
+
+        model.id = "код-001"
+        self.assertEqual(model.id, "код-001")
+
+        other = AbstractModel("Другая")
+        other.id = "код-001"
+        self.assertEqual(model, other)
+
+    def test_id_key_is_stored_form(self):
+        """Тест ключа индексов: идентификатор в форме хранения без форматирования"""
+        model = AbstractModel("Тест")
+        canonical = str(uuid.uuid4())
+        model.id = canonical
+        self.assertEqual(model.id_key, uuid.UUID(canonical).int)
+        self.assertEqual(AbstractModel.id_key_of(canonical), model.id_key)
+        self.assertEqual(AbstractModel.id_key_of(canonical.upper()), canonical.upper())
+
+        model.id = "код-001"
+        self.assertEqual(model.id_key, "код-001")
+        self.assertEqual(AbstractModel.id_key_of("код-001"), model.id_key)
+
+
+class TestCompiledValidation(unittest.TestCase):
+
+    def test_compiled_rule(self):
+        """Тест собранной функции проверки"""
+        check = Validator.compile_rule("quantity", (int, float), positive=True)
+        self.assertEqual(check(2.5), 2.5)
+        with self.assertRaises(ArgumentException):
+            check(None)
+        with self.assertRaises(ArgumentException):
+            check("2")
+        with self.assertRaises(ArgumentException):
+            check(0)
+
+    def test_compiled_digits_rule(self):
+        """Тест правила для реквизитов из цифр"""
+        checks = Validator.compile_schema({"BIK": dict(digits=9, exception=ValueError)})
+        self.assertEqual(checks["BIK"](123456789), "123456789")
+        with self.assertRaises(ValueError):
+            checks["BIK"]("12345678a")
+
+    def test_from_trusted_row(self):
+        """Тест создания модели из доверенной строки без валидации"""
+        gram = UnitModel("грамм", 1.0)
+        model_id = str(uuid.uuid4())
+        nomenclature = NomenclatureModel.from_trusted_row({"id": model_id, "name": "Морковь", "unit": gram})
+
+        self.assertEqual(nomenclature.id, model_id)
+        self.assertEqual(nomenclature.name, "Морковь")
+        self.assertEqual(nomenclature.full_name, "")
+        self.assertIsNone(nomenclature.group)
+        self.assertIs(nomenclature.unit, gram)
+
+        company = CompanyModel.from_trusted_row({"name": "Ромашка", "inn": "123456789012"})
+        self.assertEqual(company.inn, "123456789012")
+        self.assertEqual(company.BIK, "")
+        self.assertIsNotNone(company.id)
+
 
 class TestUnitModel(unittest.TestCase):
     
@@ -193,6 +427,37 @@ class TestUnitModel(unittest.TestCase):
         with self.assertRaises(ArgumentException):
             UnitModel("тест", -1)  # Отрицательный коэффициент
 
+    def test_ShouldBumpRevision_WhenInitialisedUnitChanges_CreationDoesNotCount(self):
+        """Тест учета изменений пересчетов: только изменение значений созданной единицы"""
+        revision = UnitModel.revision()
+        gram = UnitModel("грамм", 1.0)
+        kilogram = UnitModel("килограмм", 1000.0, gram)
+        UnitModel.from_trusted_row({"name": "тонна", "factor": 1000.0, "base_unit": kilogram})
+        kilogram.factor = 1000
+        kilogram.base_unit = gram
+        self.assertEqual(UnitModel.revision(), revision)
+
+        kilogram.factor = 100.0
+        self.assertEqual(UnitModel.revision(), revision + 1)
+        kilogram.base_unit = None
+        self.assertEqual(UnitModel.revision(), revision + 2)
+
+    def test_ShouldCountEveryChange_WhenUnitsChangedByThreads_NoRevisionIsLost(self):
+        """Тест учета изменений пересчетов из нескольких потоков"""
+        units = [UnitModel(f"единица {number}", 1.0) for number in range(8)]
+        revision = UnitModel.revision()
+
+        def change(unit):
+            for step in range(500):
+                unit.factor = 2.0 if step % 2 == 0 else 1.0
+
+        threads = [threading.Thread(target=change, args=(unit,)) for unit in units]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(UnitModel.revision(), revision + 8 * 500)
+
 
 class TestNomenclatureModel(unittest.TestCase):
     
@@ -223,5 +488,129 @@ class TestNomenclatureModel(unittest.TestCase):
         with self.assertRaises(ArgumentException):
             NomenclatureModel("Тест", "A" * 256)
 
+    def test_group_hierarchy(self):
+        """Тест иерархии групп: цепочка родителей, запрет циклов, учет переносов"""
+        food = NomenclatureGroupModel("Продукты")
+        dairy = NomenclatureGroupModel("Молочные продукты", food)
+        cheese = NomenclatureGroupModel("Сыры", dairy)
+        self.assertEqual(cheese.ancestors, [cheese, dairy, food])
+
+        with self.assertRaises(ArgumentException):
+            food.parent = cheese
+        with self.assertRaises(ArgumentException):
+            food.parent = "Продукты"
+        self.assertIsNone(food.parent)
+
+        revision = NomenclatureModel.group_revision()
+        item = NomenclatureModel("Творог", group=cheese)
+        self.assertEqual(NomenclatureModel.group_revision(), revision)
+        item.group = dairy
+        self.assertEqual(NomenclatureModel.group_moves_since(revision), [(item, cheese, dairy)])
+
+    def test_ShouldJournalEveryMove_WhenItemsMovedByThreads_ModelsAreNotRetained(self):
+        """Тест журнала переносов: номера без повторов из потоков, слабые ссылки на модели"""
+        first, second = NomenclatureGroupModel("Первая"), NomenclatureGroupModel("Вторая")
+        items = [NomenclatureModel(f"Товар {number}", group=first) for number in range(4)]
+        revision = NomenclatureModel.group_revision()
+
+        def move(item):
+            for step in range(200):
+                item.group = second if step % 2 == 0 else first
+
+        threads = [threading.Thread(target=move, args=(item,)) for item in items]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        moves = NomenclatureModel.group_moves_since(revision)
+        self.assertEqual(NomenclatureModel.group_revision(), revision + 4 * 200)
+        self.assertEqual(len(moves), 4 * 200)
+        for item in items:
+            self.assertEqual(sum(1 for model, _, _ in moves if model is item), 200)
+
+        revision = NomenclatureGroupModel.revision()
+        temporary = NomenclatureGroupModel("Временная")
+        temporary.parent = first
+        self.assertEqual(NomenclatureGroupModel.moves_since(revision), [(temporary, None, first)])
+        reference = weakref.ref(temporary)
+        del temporary
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertIsNone(NomenclatureGroupModel.moves_since(revision))
+
+class TestReceiptModel(unittest.TestCase):
+    """Тесты состава рецепта"""
+
+    def setUp(self):
+        self.gram = UnitModel("грамм", 1.0)
+        self.receipt = ReceiptModel("Салат", 2, "15 мин")
+        self.ingredients = [IngredientModel(NomenclatureModel(f"Товар {number}"), 10, self.gram)
+                            for number in range(3)]
+
+    def test_views_are_read_only_and_not_copied(self):
+        """Представления не копируются при обращении и отражают изменения"""
+        view = self.receipt.ingredients
+        self.assertIs(view, self.receipt.ingredients)
+        self.assertEqual(len(view), 0)
+
+        self.receipt.add_ingredient(self.ingredients[0])
+        self.assertEqual(list(view), self.ingredients[:1])
+        self.assertEqual(view, self.ingredients[:1])
+        self.assertFalse(hasattr(view, "append"))
+        with self.assertRaises(TypeError):
+            view[0] = self.ingredients[1]
+
+    def test_composition_changes_are_journaled_without_retaining_receipts(self):
+        """Журнал изменений состава: изменения из потоков и слабые ссылки на рецепты"""
+        receipts = [ReceiptModel(f"Рецепт {number}") for number in range(4)]
+        revision = ReceiptModel.revision()
+
+        def change(receipt):
+            for _ in range(200):
+                receipt.mark_changed()
+
+        threads = [threading.Thread(target=change, args=(receipt,)) for receipt in receipts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(ReceiptModel.revision(), revision + 4 * 200)
+        self.assertEqual(len(ReceiptModel.changes_since(revision)), 4 * 200)
+        self.assertEqual(ReceiptModel.changes_since(revision, revision + 1), [ReceiptModel.changes_since(revision)[0]])
+
+        revision = ReceiptModel.revision()
+        self.receipt.add_ingredient(self.ingredients[0])
+        self.assertEqual(ReceiptModel.changes_since(revision), [self.receipt])
+        reference = weakref.ref(self.receipt)
+        del self.receipt
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertIsNone(ReceiptModel.changes_since(revision))
+
+    def test_extend_is_one_change(self):
+        """Пакетное добавление - одно изменение рецепта"""
+        version = self.receipt.version
+        self.receipt.extend_ingredients(self.ingredients)
+        self.receipt.extend_steps([CookingStepModel(1, "Нарезать"), CookingStepModel(2, "Смешать")])
+
+        self.assertEqual(self.receipt.version, version + 2)
+        self.assertEqual(self.receipt.ingredients[1:], tuple(self.ingredients[1:]))
+        self.assertEqual([step.step_number for step in self.receipt.cooking_steps], [1, 2])
+
+    def test_extend_checks_all_items_first(self):
+        """При ошибке в пакете рецепт не изменяется"""
+        version = self.receipt.version
+        with self.assertRaises(ArgumentException):
+            self.receipt.extend_ingredients([self.ingredients[0], "не ингредиент"])
+        self.assertEqual(len(self.receipt.ingredients), 0)
+        self.assertEqual(self.receipt.version, version)
+
+    def test_trusted_row_views(self):
+        """Представления работают у моделей, созданных из доверенных данных"""
+        receipt = ReceiptModel.from_trusted_row({"name": "Суп", "portions": 4})
+        receipt.add_ingredient(self.ingredients[0])
+        self.assertEqual(len(receipt.ingredients), 1)
+        self.assertEqual(len(receipt.cooking_steps), 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
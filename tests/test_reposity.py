@@ -0,0 +1,676 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from src.reposity import reposity
+from src.indexed_reposity import indexed_reposity
+from src.sqlite_reposity import sqlite_reposity
+from src.snapshot_reposity import snapshot_reposity
+from src.concurrent_reposity import concurrent_reposity
+from src.core.validator import OperationException
+from src.start_service import DefaultDataCreator
+from src.models.unit_model import UnitModel
+from src.models.nomenclature_group_model import NomenclatureGroupModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.receipt_model import ReceiptModel
+from src.models.receipt_component_model import ReceiptComponentModel
+from src.models.ingredient_model import IngredientModel
+from src.models.cooking_step_model import CookingStepModel
+from src.models.storage_model import StorageModel
+from src.models.stock_movement_model import StockMovementModel, StockMovementType
+from src.logics.stock_ledger import StockLedger
+from src.logics.catalogue_snapshot import CatalogueSnapshotWriter
+
+
+class TestIndexedReposity(unittest.TestCase):
+    """
+    Юнит-тесты для репозитория с индексами
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.repo = indexed_reposity()
+        self.gram = UnitModel("грамм", 1.0)
+        self.kg = UnitModel("килограмм", 1000.0, self.gram)
+        self.group = NomenclatureGroupModel("Овощи")
+        self.repo.set_data(reposity.range_key(), [self.gram, self.kg])
+        self.repo.set_data(reposity.nomenclature_group_key(), [self.group])
+
+    def test_ShouldFindModel_WhenSearchedByIdAndName_ModelIsReturned(self):
+        """Тест поиска по идентификатору и наименованию"""
+        # Act & Assert
+        self.assertIs(self.repo.get_by_id(reposity.range_key(), self.kg.id), self.kg)
+        self.assertIs(self.repo.find_by_name(reposity.range_key(), "грамм"), self.gram)
+        self.assertIsNone(self.repo.find_by_name(reposity.range_key(), "литр"))
+
+    def test_ShouldKeepSecondaryIndexes_WhenNomenclatureAddedAndRemoved_IndexesAreConsistent(self):
+        """Тест вторичных индексов номенклатуры по группе и единиц по базовой единице"""
+        # Arrange
+        carrot = NomenclatureModel("Морковь", "Морковь столовая", self.group, self.gram)
+
+        # Act
+        self.repo.add(reposity.nomenclature_key(), carrot)
+
+        # Assert
+        self.assertEqual(self.repo.find_nomenclature_by_group(self.group), [carrot])
+        self.assertEqual(self.repo.find_units_by_base_unit(self.gram), [self.kg])
+
+        # Act
+        self.assertTrue(self.repo.remove(reposity.nomenclature_key(), carrot))
+
+        # Assert
+        self.assertEqual(self.repo.find_nomenclature_by_group(self.group), [])
+        self.assertIsNone(self.repo.get_by_id(reposity.nomenclature_key(), carrot.id))
+        self.assertEqual(self.repo.data[reposity.nomenclature_key()], [])
+
+    def test_ShouldRejectDuplicateReceiptName_WhenAdded_RenamedReceiptIsRekeyed(self):
+        """Тест уникальности наименований рецептов и переноса записи при переименовании"""
+        # Arrange
+        soup = self.repo.add(reposity.receipt_key(), ReceiptModel("Суп", 2))
+        salad = self.repo.add(reposity.receipt_key(), ReceiptModel("Салат", 1))
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            self.repo.add(reposity.receipt_key(), ReceiptModel("Суп", 4))
+        self.assertIs(self.repo.get_by_id(reposity.receipt_key(), soup.id), soup)
+        self.assertIs(self.repo.data[reposity.receipt_key()]["Суп"]["receipt"], soup)
+
+        soup.name = "Борщ"
+        self.repo.update(reposity.receipt_key(), soup)
+        receipts = self.repo.data[reposity.receipt_key()]
+        self.assertNotIn("Суп", receipts)
+        self.assertIs(receipts["Борщ"]["receipt"], soup)
+        self.assertIs(self.repo.find_by_name(reposity.receipt_key(), "Борщ"), soup)
+
+        salad.name = "Борщ"
+        with self.assertRaises(OperationException):
+            self.repo.update(reposity.receipt_key(), salad)
+        self.assertTrue(self.repo.remove(reposity.receipt_key(), soup))
+        self.assertIsNone(self.repo.get_by_id(reposity.receipt_key(), soup.id))
+
+    def test_ShouldRejectUpdate_WhenModelWasNotAdded_IndexesAreUnchanged(self):
+        """Тест отказа в сохранении модели, которая не добавлена в коллекцию"""
+        # Arrange
+        kg = UnitModel("кг", 1000.0, self.gram)
+        copy = UnitModel(self.gram.name, 1.0)
+        copy.id = self.gram.id
+
+        # Act & Assert
+        for model in (kg, copy):
+            with self.assertRaises(OperationException):
+                self.repo.update(reposity.range_key(), model)
+        self.assertIsNone(self.repo.get_by_id(reposity.range_key(), kg.id))
+        self.assertIsNone(self.repo.find_by_name(reposity.range_key(), "кг"))
+        self.assertEqual(self.repo.find_units_by_base_unit(self.gram), [self.kg])
+        self.assertIs(self.repo.get_by_id(reposity.range_key(), self.gram.id), self.gram)
+
+    def test_ShouldReindexModel_WhenNameChanged_NewNameIsFound(self):
+        """Тест переиндексации модели после изменения наименования"""
+        # Act
+        self.gram.name = "г"
+        self.repo.update(reposity.range_key(), self.gram)
+
+        # Assert
+        self.assertIsNone(self.repo.find_by_name(reposity.range_key(), "грамм"))
+        self.assertIs(self.repo.find_by_name(reposity.range_key(), "г"), self.gram)
+
+    def test_ShouldIndexReceipts_WhenReceiptAdded_ReceiptIsFoundById(self):
+        """Тест индексации рецептов, хранящихся словарем"""
+        # Arrange
+        receipt = ReceiptModel("Омлет", 1, "10 мин")
+
+        # Act
+        self.repo.add(reposity.receipt_key(), receipt)
+
+        # Assert
+        self.assertIs(self.repo.get_by_id(reposity.receipt_key(), receipt.id), receipt)
+        self.assertIn("Омлет", self.repo.data[reposity.receipt_key()])
+
+    def test_ShouldReturnStoredInstance_WhenModelWithSameIdAdded_NoDuplicateIsCreated(self):
+        """Тест карты идентичности: один экземпляр на идентификатор"""
+        # Arrange
+        copy = UnitModel("грамм", 1.0)
+        copy.id = self.gram.id
+
+        # Act
+        stored = self.repo.add(reposity.range_key(), copy)
+        found = self.repo.get_or_add(reposity.range_key(), "литр", lambda: UnitModel("литр", 1000.0))
+
+        # Assert
+        self.assertIs(stored, self.gram)
+        self.assertIs(self.repo.get_or_add(reposity.range_key(), "литр", lambda: UnitModel("литр")), found)
+        self.assertEqual(len(self.repo.data[reposity.range_key()]), 3)
+
+    def test_ShouldJoinBySet_WhenModelsAreHashed_EqualModelsCollapse(self):
+        """Тест хеширования моделей по идентификатору"""
+        # Arrange
+        copy = UnitModel("грамм", 1.0)
+        copy.id = self.gram.id
+
+        # Act
+        units = {self.gram, self.kg, copy}
+        factors = {self.gram: 1.0}
+
+        # Assert
+        self.assertEqual(len(units), 2)
+        self.assertEqual(factors[copy], 1.0)
+
+    def test_ShouldBlockRemoval_WhenModelIsReferenced_ReferrersAreReported(self):
+        """Тест блокировки удаления используемых моделей по обратному индексу ссылок"""
+        # Arrange
+        carrot = self.repo.add(reposity.nomenclature_key(), NomenclatureModel("Морковь", "", self.group, self.kg))
+        salad = ReceiptModel("Салат", 1, "10 мин")
+        self.repo.add(reposity.receipt_key(), salad)
+        salad.add_ingredient(IngredientModel(carrot, 100, self.gram))
+        self.repo.update(reposity.receipt_key(), salad)
+
+        # Act & Assert
+        self.assertEqual(self.repo.referrers(self.kg), [carrot])
+        with self.assertRaisesRegex(OperationException, "Салат"):
+            self.repo.remove(reposity.nomenclature_key(), carrot)
+        with self.assertRaises(OperationException):
+            self.repo.remove(reposity.nomenclature_group_key(), self.group)
+        with self.assertRaises(OperationException):
+            self.repo.remove(reposity.range_key(), self.gram)
+
+        self.assertTrue(self.repo.remove(reposity.receipt_key(), salad))
+        self.assertFalse(self.repo.is_referenced(carrot))
+        self.assertTrue(self.repo.remove(reposity.nomenclature_key(), carrot))
+        self.assertTrue(self.repo.remove(reposity.nomenclature_group_key(), self.group))
+
+    def test_ShouldBlockRemoval_WhenReceiptIsEditedInPlace_ReferencesFollowReceiptChanges(self):
+        """Тест ссылок рецепта, состав которого изменен без update"""
+        # Arrange
+        carrot = self.repo.add(reposity.nomenclature_key(), NomenclatureModel("Морковь", "", self.group, self.kg))
+        beet = self.repo.add(reposity.nomenclature_key(), NomenclatureModel("Свекла", "", self.group, self.kg))
+        salad = self.repo.add(reposity.receipt_key(), ReceiptModel("Салат", 1, "10 мин"))
+
+        # Act & Assert: добавление ингредиента
+        ingredient = IngredientModel(carrot, 100, self.gram)
+        salad.add_ingredient(ingredient)
+        with self.assertRaisesRegex(OperationException, "Салат"):
+            self.repo.remove(reposity.nomenclature_key(), carrot)
+
+        # Act & Assert: замена номенклатуры ингредиента с отметкой изменения рецепта
+        ingredient.nomenclature = beet
+        salad.mark_changed()
+        self.assertEqual(self.repo.referrers(beet), [salad])
+        self.assertTrue(self.repo.remove(reposity.nomenclature_key(), carrot))
+
+        # Act & Assert: журнал изменений переполнен - ссылки рецептов перерегистрируются целиком
+        draft = ReceiptModel("Черновик", 1, "")
+        for _ in range(2000):
+            draft.mark_changed()
+        salad.add_ingredient(IngredientModel(beet, 50, self.gram))
+        for _ in range(2000):
+            draft.mark_changed()
+        self.assertEqual(self.repo.referrers(beet), [salad])
+        with self.assertRaises(OperationException):
+            self.repo.remove(reposity.nomenclature_key(), beet)
+
+    def test_ShouldBlockRemoval_WhenNomenclatureIsInLedger_LedgerIsReferenceSource(self):
+        """Тест блокировки удаления номенклатуры, включенной в складской учет (п. 6.2 ТЗ)"""
+        # Arrange
+        carrot = self.repo.add(reposity.nomenclature_key(), NomenclatureModel("Морковь", "", self.group, self.kg))
+        ledger = StockLedger()
+        self.repo.add_reference_source(ledger)
+        ledger.post(StockMovementModel(StockMovementType.RECEIPT, carrot, StorageModel("Склад"), 5, self.kg,
+                                       datetime(2024, 1, 1)))
+
+        # Act & Assert
+        with self.assertRaisesRegex(OperationException, "Поступление Морковь"):
+            self.repo.remove(reposity.nomenclature_key(), carrot)
+        self.assertIn(carrot, self.repo.models(reposity.nomenclature_key()))
+
+
+class TestConcurrentReposity(unittest.TestCase):
+    """
+    Юнит-тесты для потокобезопасного репозитория
+    """
+
+    THREADS = 16
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.repo = concurrent_reposity()
+        self.gram = UnitModel("грамм", 1.0)
+        self.group = NomenclatureGroupModel("Овощи")
+        self.repo.set_data(reposity.range_key(), [self.gram])
+        self.repo.set_data(reposity.nomenclature_group_key(), [self.group])
+
+    def run_threads(self, target):
+        """Запуск target(номер потока) в нескольких потоках с общим стартом"""
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(number):
+            try:
+                barrier.wait()
+                target(number)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_ShouldKeepIndexesConsistent_WhenManyThreadsAddAndRead_NoModelIsLost(self):
+        """Тест параллельного добавления, чтения и удаления"""
+        key = reposity.nomenclature_key()
+
+        def target(number):
+            for index in range(200):
+                model = self.repo.add(key, NomenclatureModel(f"Товар {number}-{index}", "", self.group, self.gram))
+                self.assertIs(self.repo.get_by_id(key, model.id), model)
+                if index % 4 == 0:
+                    self.assertTrue(self.repo.remove(key, model))
+                self.repo.find_nomenclature_by_group(self.group)
+
+        self.run_threads(target)
+
+        models = self.repo.snapshot(key)
+        self.assertEqual(len(models), self.THREADS * 150)
+        self.assertEqual(len(self.repo.find_nomenclature_by_group(self.group)), len(models))
+        for model in models:
+            self.assertIs(self.repo.find_by_name(key, model.name), model)
+
+    def test_ShouldReportReferrers_WhenReceiptsAreEditedInPlaceByThreads_NoReferenceIsLost(self):
+        """Тест проверки ссылок параллельно с изменением рецептов на месте"""
+        carrot = self.repo.add(reposity.nomenclature_key(), NomenclatureModel("Морковь", "", self.group, self.gram))
+
+        def target(number):
+            for index in range(20):
+                receipt = self.repo.add(reposity.receipt_key(), ReceiptModel(f"Салат {number}-{index}", 1))
+                receipt.add_ingredient(IngredientModel(carrot, 100, self.gram))
+                self.assertIn(receipt, self.repo.referrers(carrot))
+                self.assertTrue(self.repo.is_referenced(carrot))
+
+        self.run_threads(target)
+
+        self.assertEqual(len(self.repo.referrers(carrot)), self.THREADS * 20)
+        with self.assertRaises(OperationException):
+            self.repo.remove(reposity.nomenclature_key(), carrot)
+
+    def test_ShouldChangeStoredModel_WhenUpdatedWithOtherInstance_IdentityIsKept(self):
+        """Тест изменения используемой модели: хранящийся экземпляр не подменяется"""
+        key = reposity.nomenclature_key()
+        carrot = self.repo.add(key, NomenclatureModel("Морковь", "", self.group, self.gram))
+        other = UnitModel("г", 1.0)
+        other.id = self.gram.id
+
+        with self.assertRaises(OperationException):
+            self.repo.update(reposity.range_key(), other)
+        stored = self.repo.update(reposity.range_key(), other, change=lambda unit: setattr(unit, "name", other.name))
+        self.assertIs(stored, self.gram)
+        self.assertIs(carrot.unit, stored)
+        self.assertIs(self.repo.find_by_name(reposity.range_key(), "г"), self.gram)
+        with self.assertRaises(OperationException):
+            self.repo.remove(reposity.range_key(), other)
+
+    def test_ShouldCreateOneModel_WhenManyThreadsGetOrAdd_NoDuplicatesAppear(self):
+        """Тест атомарности поиска с добавлением"""
+        key = reposity.range_key()
+        self.run_threads(lambda number: [self.repo.get_or_add(key, f"единица {index}", lambda: UnitModel(f"единица {index}"))
+                                         for index in range(50)])
+        self.assertEqual(len(self.repo.snapshot(key)), 51)
+
+    def test_ShouldCountEveryUpdate_WhenThreadsRetryOptimisticConflicts_NoUpdateIsLost(self):
+        """Тест оптимистичной блокировки: каждое изменение применяется ровно один раз"""
+        key = reposity.nomenclature_group_key()
+        conflicts = []
+
+        def target(number):
+            for _ in range(50):
+                while True:
+                    current = self.repo.get_by_id(key, self.group.id)
+                    version = current.row_version
+                    name = str(int(current.name) + 1 if current.name.isdigit() else 1)
+                    try:
+                        self.repo.update(key, current, version, lambda group: setattr(group, "name", name))
+                        break
+                    except OperationException:
+                        conflicts.append(number)
+
+        self.run_threads(target)
+
+        stored = self.repo.get_by_id(key, self.group.id)
+        self.assertEqual(stored.name, str(self.THREADS * 50))
+        self.assertEqual(stored.row_version, self.THREADS * 50)
+        self.assertEqual(len(self.repo.snapshot(key)), 1)
+
+    def test_ShouldRejectUpdate_WhenVersionIsStale_ExceptionIsRaised(self):
+        """Тест отказа в изменении по устаревшей версии"""
+        key = reposity.nomenclature_group_key()
+        self.repo.update(key, self.group, 0)
+        self.assertEqual(self.group.row_version, 1)
+        with self.assertRaises(OperationException):
+            self.repo.update(key, self.group, 0, lambda group: setattr(group, "name", "Фрукты"))
+        self.assertEqual(self.group.name, "Овощи")
+        self.assertEqual(self.group.row_version, 1)
+
+    def test_ShouldReturnConsistentCopy_WhenDataIsRead_StoredCollectionsAreUnchanged(self):
+        """Тест чтения всех данных: копия коллекций, снятая под блокировками"""
+        data = self.repo.data
+        data[reposity.range_key()].clear()
+
+        self.assertEqual(self.repo.models(reposity.range_key()), [self.gram])
+        self.assertEqual(self.repo.data[reposity.nomenclature_group_key()], [self.group])
+
+    def test_ShouldHideHalfSeededData_WhenBatchIsWritten_ReaderSeesAllOrNothing(self):
+        """Тест пакетного заполнения: читатель не видит частично заполненных коллекций"""
+        observed = []
+
+        def target(number):
+            if number == 0:
+                for _ in range(50):
+                    with self.repo.batch():
+                        DefaultDataCreator().create_data(self.repo)
+            else:
+                for _ in range(50):
+                    with self.repo.batch([reposity.range_key(), reposity.nomenclature_key()]):
+                        observed.append((len(self.repo.models(reposity.range_key())),
+                                         len(self.repo.models(reposity.nomenclature_key()))))
+
+        self.run_threads(target)
+        self.assertTrue(all(pair in {(1, 0), (8, 12)} for pair in observed))
+
+
+class TestSqliteReposity(unittest.TestCase):
+    """
+    Интеграционные тесты для репозитория на SQLite
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "reposity.db")
+        self.repos = []
+
+    def tearDown(self):
+        """Закрытие соединений и удаление базы"""
+        for repo in self.repos:
+            repo.close()
+        self.directory.cleanup()
+
+    def open(self) -> sqlite_reposity:
+        repo = sqlite_reposity(self.database, pool_size=2)
+        self.repos.append(repo)
+        return repo
+
+    def test_ShouldRestoreData_WhenReopened_AllCollectionsAreLoaded(self):
+        """Тест сохранения эталонных данных и их загрузки после переоткрытия базы"""
+        # Arrange
+        DefaultDataCreator().create_data(self.open())
+
+        # Act
+        repo = self.open()
+        receipts = repo.data[reposity.receipt_key()]
+
+        # Assert
+        self.assertEqual(len(repo.data[reposity.range_key()]), 8)
+        self.assertEqual(len(repo.data[reposity.nomenclature_key()]), 12)
+        entry = receipts["Драники картофельные"]
+        self.assertEqual(len(entry["ingredients"]), 7)
+        self.assertEqual(len(entry["steps"]), 5)
+        self.assertIs(entry["ingredients"][0].nomenclature,
+                      repo.find_by_name(reposity.nomenclature_key(), "Картофель"))
+
+    def test_ShouldNotCountAsChange_WhenReferencesAreLoaded_RevisionsAreKept(self):
+        """Тест загрузки ссылок из базы без отметки изменения единиц и групп"""
+        # Arrange
+        DefaultDataCreator().create_data(self.open())
+        units = UnitModel.revision()
+        groups = NomenclatureGroupModel.revision()
+
+        # Act
+        repo = self.open()
+        repo.data
+
+        # Assert
+        self.assertEqual(UnitModel.revision(), units)
+        self.assertEqual(NomenclatureGroupModel.revision(), groups)
+        kilogram = repo.find_by_name(reposity.range_key(), "килограмм")
+        self.assertIs(kilogram.base_unit, repo.find_by_name(reposity.range_key(), "грамм"))
+
+    def test_ShouldRejectDuplicateReceiptName_WhenAdded_DatabaseIsUnchanged(self):
+        """Тест отказа в добавлении рецепта с занятым наименованием"""
+        # Arrange
+        DefaultDataCreator().create_data(self.open())
+        repo = self.open()
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            repo.add(reposity.receipt_key(), ReceiptModel("Драники картофельные", 1))
+        self.assertEqual(len(self.open().find_all_by_name(reposity.receipt_key(), "Драники картофельные")), 1)
+
+    def test_ShouldRejectUpdate_WhenModelWasNotAdded_DatabaseIsUnchanged(self):
+        """Тест отказа в сохранении модели, которая не добавлена в базу"""
+        # Arrange
+        repo = self.open()
+
+        # Act & Assert
+        with self.assertRaises(OperationException):
+            repo.update(reposity.range_key(), UnitModel("кг", 1000.0))
+        self.assertIsNone(self.open().find_by_name(reposity.range_key(), "кг"))
+
+    def test_ShouldKeepPrice_WhenDatabaseHasOldSchema_ColumnIsAdded(self):
+        """Тест сохранения цены номенклатуры в базе, созданной без колонки цены"""
+        # Arrange
+        connection = sqlite3.connect(self.database)
+        connection.execute("CREATE TABLE nomenclature (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+                           "full_name TEXT NOT NULL, group_id TEXT, unit_id TEXT)")
+        connection.execute("INSERT INTO nomenclature VALUES ('n1', 'Соль', 'Соль', NULL, NULL)")
+        connection.commit()
+        connection.close()
+
+        # Act
+        repo = self.open()
+        salt = repo.get_by_id(reposity.nomenclature_key(), "n1")
+        salt.price = 12.5
+        repo.update(reposity.nomenclature_key(), salt)
+
+        # Assert
+        self.assertEqual(salt.price, 12.5)
+        self.assertEqual(self.open().get_by_id(reposity.nomenclature_key(), "n1").price, 12.5)
+
+    def test_ShouldRestoreNestedCards_WhenReceiptIncludesReceipt_ComponentIsLoaded(self):
+        """Тест сохранения составной технологической карты"""
+        # Arrange
+        repo = self.open()
+        DefaultDataCreator().create_data(repo)
+        salad = repo.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+        lunch = ReceiptModel("Комплексный обед", 1, "30 мин")
+        lunch.add_ingredient(ReceiptComponentModel(salad, 0.5))
+        repo.add(reposity.receipt_key(), lunch)
+
+        # Act
+        loaded = self.open().find_by_name(reposity.receipt_key(), "Комплексный обед")
+
+        # Assert
+        self.assertEqual(len(loaded.ingredients), 1)
+        self.assertEqual(loaded.ingredients[0].receipt.name, salad.name)
+        self.assertEqual(loaded.ingredients[0].portions, 0.5)
+        self.assertEqual(len(loaded.ingredients[0].receipt.ingredients), 5)
+
+    def test_ShouldNotLoadCollection_WhenSingleModelRequested_ModelIsFetchedLazily(self):
+        """Тест ленивой загрузки: поиск по имени не загружает коллекцию целиком"""
+        # Arrange
+        DefaultDataCreator().create_data(self.open())
+        repo = self.open()
+
+        # Act
+        kg = repo.find_by_name(reposity.range_key(), "килограмм")
+
+        # Assert
+        self.assertFalse(repo.is_loaded(reposity.range_key()))
+        self.assertEqual(kg.base_unit.name, "грамм")
+        self.assertIs(repo.get_by_id(reposity.range_key(), kg.id), kg)
+        self.assertIn(kg, repo.models(reposity.range_key()))
+        self.assertTrue(repo.is_loaded(reposity.range_key()))
+
+    def test_ShouldBlockRemoval_WhenReferrersAreNotLoaded_ReferrersAreLoadedForCheck(self):
+        """Тест блокировки удаления используемой модели до загрузки ссылающихся коллекций"""
+        # Arrange
+        DefaultDataCreator().create_data(self.open())
+        repo = self.open()
+        potato = repo.find_by_name(reposity.nomenclature_key(), "Картофель")
+
+        # Act & Assert
+        with self.assertRaisesRegex(OperationException, "Драники"):
+            repo.remove(reposity.nomenclature_key(), potato)
+        self.assertIsNotNone(self.open().get_by_id(reposity.nomenclature_key(), potato.id))
+
+    def test_ShouldPersistBatch_WhenModelsAddedAndRemoved_ChangesAreSaved(self):
+        """Тест пакетного добавления и удаления моделей"""
+        # Arrange
+        repo = self.open()
+        groups = [NomenclatureGroupModel(f"Группа {number}") for number in range(100)]
+
+        # Act
+        repo.add_many(reposity.nomenclature_group_key(), groups)
+        repo.remove(reposity.nomenclature_group_key(), groups[0])
+
+        # Assert
+        reopened = self.open()
+        self.assertEqual(len(reopened.models(reposity.nomenclature_group_key())), 99)
+        self.assertIsNone(reopened.get_by_id(reposity.nomenclature_group_key(), groups[0].id))
+
+    def test_ShouldSaveModelComposition_WhenStepAddedAfterSeeding_EntryFollowsModel(self):
+        """Тест записи рецепта: состав в записи коллекции и в базе совпадает с моделью"""
+        # Arrange
+        repo = self.open()
+        DefaultDataCreator().create_data(repo)
+        receipt = repo.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+
+        # Act
+        receipt.add_step(CookingStepModel(7, "Украсить зеленью."))
+        entry = repo.data[reposity.receipt_key()][receipt.name]
+        repo.set_data(reposity.receipt_key(), dict(repo.data[reposity.receipt_key()]))
+        reopened = self.open().get_by_id(reposity.receipt_key(), receipt.id)
+
+        # Assert
+        self.assertEqual(len(entry["steps"]), 7)
+        self.assertEqual(len(receipt.cooking_steps), 7)
+        self.assertEqual(len(reopened.cooking_steps), 7)
+
+    def test_ShouldRestoreGroupHierarchy_WhenReopened_ParentsAreResolved(self):
+        """Тест сохранения иерархии групп, в том числе в базе без колонки родителя"""
+        # Arrange
+        connection = sqlite3.connect(self.database)
+        connection.execute("CREATE TABLE nomenclature_groups (id TEXT PRIMARY KEY, name TEXT NOT NULL)")
+        connection.commit()
+        connection.close()
+        repo = self.open()
+        food = NomenclatureGroupModel("Продукты")
+        dairy = NomenclatureGroupModel("Молочные продукты", food)
+        cheese = NomenclatureGroupModel("Сыры", dairy)
+        repo.add_many(reposity.nomenclature_group_key(), [cheese, dairy, food])
+
+        # Act
+        lazy = self.open().get_by_id(reposity.nomenclature_group_key(), cheese.id)
+        loaded = {group.name: group for group in self.open().models(reposity.nomenclature_group_key())}
+
+        # Assert
+        self.assertEqual([group.name for group in lazy.ancestors], ["Сыры", "Молочные продукты", "Продукты"])
+        self.assertIs(loaded["Сыры"].parent, loaded["Молочные продукты"])
+        self.assertIsNone(loaded["Продукты"].parent)
+
+
+class TestSnapshotReposity(unittest.TestCase):
+    """
+    Интеграционные тесты для репозитория из бинарного снимка справочников
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: снимок эталонных данных с составным рецептом"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "catalogue.snap")
+        self.source = indexed_reposity()
+        DefaultDataCreator().create_data(self.source)
+        salad = self.source.find_by_name(reposity.receipt_key(), "Салат витаминный с морковью и яблоком")
+        self.lunch = ReceiptModel("Обед", 1, "1 ч")
+        self.lunch.add_ingredient(ReceiptComponentModel(salad, 0.5))
+        self.source.add(reposity.receipt_key(), self.lunch)
+        CatalogueSnapshotWriter(self.source).write(self.path)
+        self.repos = []
+
+    def tearDown(self):
+        for repo in self.repos:
+            repo.close()
+        self.directory.cleanup()
+
+    def open(self, path: str = None) -> snapshot_reposity:
+        repo = snapshot_reposity(path or self.path)
+        self.repos.append(repo)
+        return repo
+
+    def test_ShouldCreateOnlyRequestedModels_WhenSearched_CollectionIsLoadedLater(self):
+        """Тест ленивого создания моделей и сохранения экземпляров при загрузке коллекции"""
+        # Arrange
+        repo = self.open()
+        snapshot = repo.snapshot
+
+        # Act
+        salt = repo.find_by_name(reposity.nomenclature_key(), "Соль")
+        lunch = repo.get_by_id(reposity.receipt_key(), self.lunch.id)
+
+        # Assert
+        self.assertEqual(salt.unit.name, "чайная ложка")
+        self.assertEqual(salt.unit.base_unit.name, "грамм")
+        self.assertEqual(snapshot.materialized(reposity.nomenclature_key()), 6)
+        self.assertFalse(repo.is_loaded(reposity.nomenclature_key()))
+        component = lunch.ingredients[0]
+        self.assertEqual(component.portions, 0.5)
+        self.assertEqual(len(component.receipt.ingredients), 5)
+        self.assertEqual(len(component.receipt.cooking_steps), 6)
+        self.assertIsNone(repo.get_by_id(reposity.nomenclature_key(), "нет такой"))
+
+        items = repo.models(reposity.nomenclature_key())
+        self.assertEqual(len(items), 12)
+        self.assertIn(salt, items)
+        self.assertIs(repo.find_by_name(reposity.nomenclature_key(), "Соль"), salt)
+        self.assertIs(repo.find_by_name(reposity.receipt_key(), "Обед"), lunch)
+
+    def test_ShouldKeepChanges_WhenSavedAndReopened_NewSnapshotIsUsed(self):
+        """Тест сохранения изменений в новый снимок"""
+        # Arrange
+        repo = self.open()
+        salt = repo.find_by_name(reposity.nomenclature_key(), "Соль")
+        salt.price = 12.5
+        repo.update(reposity.nomenclature_key(), salt)
+        pepper = repo.find_by_name(reposity.nomenclature_key(), "Перец черный")
+        with self.assertRaises(OperationException):
+            repo.remove(reposity.nomenclature_key(), pepper)
+        food = repo.add(reposity.nomenclature_group_key(), NomenclatureGroupModel("Продукты"))
+        vegetables = repo.find_by_name(reposity.nomenclature_group_key(), "Овощи")
+        vegetables.parent = food
+        repo.update(reposity.nomenclature_group_key(), vegetables)
+
+        # Act
+        path = os.path.join(self.directory.name, "changed.snap")
+        counts = repo.save(path)
+        reopened = self.open(path)
+
+        # Assert
+        self.assertEqual(counts[reposity.nomenclature_group_key()], 8)
+        self.assertEqual(reopened.get_by_id(reposity.nomenclature_key(), salt.id).price, 12.5)
+        potato = reopened.find_by_name(reposity.nomenclature_key(), "Картофель")
+        self.assertEqual([group.name for group in potato.group.ancestors], ["Овощи", "Продукты"])
+
+    def test_ShouldRejectFile_WhenItIsNotSnapshot_ExceptionIsRaised(self):
+        """Тест ошибки открытия файла другого формата"""
+        path = os.path.join(self.directory.name, "catalogue.jsonl")
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write('{"type": "unit"}\n')
+
+        with self.assertRaises(OperationException):
+            snapshot_reposity(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,20 @@
+import json
+import os
+import tempfile
+import threading
 import unittest
-from src.start_service import start_service
+from src.start_service import start_service, BaseDataCreator, DefaultDataCreator
+from src.file_data_creator import FileDataCreator
+from src.logics.event_log import EventLog
+from src.indexed_reposity import indexed_reposity
+from src.reposity import reposity
 from src.models.receipt_model import ReceiptModel
 from src.models.ingredient_model import IngredientModel
 from src.models.cooking_step_model import CookingStepModel
 from src.models.nomenclature_model import NomenclatureModel
 from src.models.unit_model import UnitModel
 from src.models.nomenclature_group_model import NomenclatureGroupModel
-from src.core.validator import ArgumentException
+from src.core.validator import ArgumentException, OperationException
 
 class TestStartServiceData(unittest.TestCase):
     """
@@ -33,6 +41,39 @@ class TestStartServiceData(unittest.TestCase):
             with self.subTest(unit=expected_unit):
                 self.assertIn(expected_unit, unit_names, f"Единица измерения '{expected_unit}' должна быть создана")
 
+    def test_ShouldKeepRepository_WhenServiceRequestedFromThreads_SingleInstanceIsShared(self):
+        """Тест потокобезопасности одиночки: повторное создание не подменяет репозиторий"""
+        # Arrange
+        repository = self.service.repository
+        instances = []
+
+        # Act
+        threads = [threading.Thread(target=lambda: instances.append(start_service())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertTrue(all(instance is self.service for instance in instances))
+        self.assertIs(self.service.repository, repository)
+        self.assertGreater(len(self.service.data["range_model"]), 0)
+
+    def test_ShouldNotDuplicateUnits_WhenServiceStarts_UnitNamesAreUnique(self):
+        """Тест отсутствия дублей единиц измерения после создания эталонных данных"""
+        # Arrange
+        units = self.service.data["range_model"]
+
+        # Act
+        unit_names = [unit.name for unit in units]
+        ingredient_units = {ingredient.unit
+                            for entry in self.service.create_receipts().values()
+                            for ingredient in entry["ingredients"]}
+
+        # Assert
+        self.assertEqual(len(unit_names), len(set(unit_names)), "Единицы измерения не должны дублироваться")
+        self.assertTrue(ingredient_units.issubset(set(units)), "Ингредиенты должны ссылаться на единицы из репозитория")
+
     def test_ShouldCreateGroups_WhenServiceStarts_GroupsAreCreated(self):
         """Тест создания номенклатурных групп при запуске сервиса"""
         # Arrange
@@ -99,6 +140,49 @@ class TestStartServiceData(unittest.TestCase):
                 self.assertGreater(len(ingredients), 0, f"Рецепт '{receipt_name}' должен содержать ингредиенты")
                 self.assertGreater(len(steps), 0, f"Рецепт '{receipt_name}' должен содержать шаги приготовления")
 
+    def test_ShouldRequireAllSteps_WhenCreatorIsSubclassed_FillReceiptIsShared(self):
+        """Тест шаблонного метода: абстрактны все шаги, заполнение рецепта - общий помощник"""
+        # Arrange
+        class PartialCreator(BaseDataCreator):
+            def _create_units(self, repo): pass
+            def _create_groups(self, repo): pass
+            def _create_nomenclature(self, repo): pass
+
+        # Act & Assert
+        self.assertEqual(BaseDataCreator.__abstractmethods__,
+                         {"_create_units", "_create_groups", "_create_nomenclature", "_create_receipts"})
+        with self.assertRaises(TypeError):
+            PartialCreator()
+        self.assertNotIn("_fill_receipt", DefaultDataCreator.__dict__)
+
+    def test_ShouldRestoreData_WhenEventLogExists_ReferenceDataIsNotRecreated(self):
+        """Тест восстановления данных из журнала изменений вместо повторной генерации"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = EventLog(directory)
+            try:
+                restored = self.service.restore(log)
+            finally:
+                log.close()
+            self.assertFalse(restored)
+            receipts = self.service.create_receipts()
+            log = EventLog(directory)
+            try:
+                restored = self.service.restore(log)
+            finally:
+                log.close()
+            self.assertTrue(restored)
+            restored_receipts = self.service.create_receipts()
+            self.assertEqual(restored_receipts.keys(), receipts.keys())
+            for name, entry in receipts.items():
+                self.assertIs(restored_receipts[name]["receipt"], entry["receipt"])
+
+            repo = indexed_reposity()
+            counts = EventLog(directory).replay(repo)
+
+        self.assertEqual(counts[reposity.receipt_key()], 2)
+        self.assertEqual(sorted(model.name for model in repo.models(reposity.range_key())),
+                         sorted(model.name for model in self.service.data[reposity.range_key()]))
+
 class TestIngredientModel(unittest.TestCase):
     """
     Юнит-тесты для модели ингредиента
@@ -201,5 +285,84 @@ class TestReceiptModel(unittest.TestCase):
         with self.assertRaises(ArgumentException):
             ReceiptModel("Тестовый рецепт", 2, "A" * 51)
 
+
+class TestFileDataCreator(unittest.TestCase):
+    """
+    Интеграционные тесты для создания рецептов из файлов
+    """
+
+    def setUp(self):
+        """Настройка тестового окружения: каталог с картами в формате JSON"""
+        self.directory = tempfile.TemporaryDirectory()
+        for number in range(20):
+            self.write(f"card_{number:02}.json", {
+                "name": f"Блюдо {number}",
+                "portions": 2,
+                "cooking_time": "10 мин",
+                "ingredients": [{"nomenclature": "Картофель", "quantity": 200, "unit": "грамм"},
+                                {"nomenclature": f"Специя {number % 3}", "quantity": 1, "unit": "щепотка"}],
+                "steps": ["Подготовить", {"step_number": 2, "description": "Приготовить"}],
+            })
+        self.write("duplicate.json", {"name": "Блюдо 1", "ingredients": [], "steps": []})
+        self.write("readme.txt", {})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, card: dict):
+        with open(os.path.join(self.directory.name, name), "w", encoding="utf-8") as file:
+            json.dump(card, file, ensure_ascii=False)
+
+    def test_ShouldMergeCards_WhenParsedInProcessPool_ReferencesAreReused(self):
+        """Тест параллельного разбора и объединения с эталонными справочниками"""
+        # Arrange
+        repo = indexed_reposity()
+        creator = FileDataCreator(self.directory.name, workers=2, reference_creator=DefaultDataCreator())
+
+        # Act
+        creator.create_data(repo)
+
+        # Assert
+        self.assertEqual(len(creator.paths), 21)
+        self.assertEqual(len(repo.models(reposity.receipt_key())), 20)
+        receipt = repo.find_by_name(reposity.receipt_key(), "Блюдо 7")
+        self.assertEqual([step.step_number for step in receipt.cooking_steps], [1, 2])
+        potato = receipt.ingredients[0]
+        self.assertIs(potato.nomenclature, repo.find_by_name(reposity.nomenclature_key(), "Картофель"))
+        self.assertIs(potato.unit, repo.find_by_name(reposity.range_key(), "грамм"))
+        self.assertEqual(len(repo.find_all_by_name(reposity.range_key(), "щепотка")), 1)
+        self.assertEqual(len(repo.find_all_by_name(reposity.nomenclature_key(), "Специя 1")), 1)
+
+    def test_ShouldNameFile_WhenCardIsInvalid_ExceptionIsRaised(self):
+        """Тест ошибки разбора с указанием файла"""
+        # Arrange
+        self.write("broken.json", {"portions": 2})
+
+        # Act & Assert
+        with self.assertRaises(OperationException) as context:
+            FileDataCreator(self.directory.name, workers=1).create_data(indexed_reposity())
+        self.assertIn("broken.json", str(context.exception))
+
+    def test_ShouldNameCardAndUnit_WhenUnitIsUnknown_RepositoryIsUnchanged(self):
+        """Тест отказа создавать неизвестную единицу измерения корневой"""
+        # Arrange
+        self.write("unknown_unit.json", {
+            "name": "Блюдо с неизвестной единицей",
+            "ingredients": [{"nomenclature": "Шафран", "quantity": 1, "unit": "пакетик"}],
+            "steps": [],
+        })
+        repo = indexed_reposity()
+        DefaultDataCreator()._create_units(repo)
+        units = repo.models(reposity.range_key())
+
+        # Act & Assert
+        with self.assertRaises(OperationException) as context:
+            FileDataCreator(self.directory.name, workers=1)._create_receipts(repo)
+        self.assertIn("Блюдо с неизвестной единицей", str(context.exception))
+        self.assertIn("пакетик", str(context.exception))
+        self.assertEqual(repo.models(reposity.range_key()), units)
+        self.assertEqual(repo.models(reposity.nomenclature_key()), [])
+        self.assertEqual(repo.models(reposity.receipt_key()), [])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()